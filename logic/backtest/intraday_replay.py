@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+IntradayReplay - 全日Tick时间压缩回放
+
+【CTO V231 全日回放】
+旧方案二选一：
+  - run_historical_stream: 只喂收盘一帧
+  - MockQmtAdapter.get_timeline_ticks: 3秒槽 × 每只票 × 每行，近似平方复杂度
+
+新方案：
+  - MockTickAdapter 加载时把各票有序Tick k路归并成全局事件时钟（一帧 = 一个Tick时间点）
+  - 本类只负责推进时钟：每帧 advance_frame + set_mock_time，
+    主引擎照常跑 _run_radar_main_loop（get_tick_snapshot → 打分 → 战报），与实盘同一条代码路径
+  - speed 倍速节拍：speed=10 即10倍速，speed<=0 为不限速；
+    相邻帧的模拟间隔封顶 MAX_GAP_S（午休/停牌空窗不空等）
+  - 进度与吞吐：帧/秒、Tick/秒、模拟时间
+
+用法:
+    engine = LiveTradingEngine(mode='scan', target_date='20260318')
+    replay = IntradayReplay(engine.tick_adapter, speed=0)
+    replay.load(stock_list)
+    engine.run_intraday_replay(replay)
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+_BEIJING_OFFSET = timedelta(hours=8)
+
+
+class IntradayReplay:
+    """
+    全日回放时钟（驱动 MockTickAdapter + LiveTradingEngine 主循环）
+    """
+
+    MAX_GAP_S = 60.0          # 单帧最大模拟间隔（秒），超出部分不计入节拍
+    PROGRESS_EVERY_PCT = 5    # 进度日志间隔（%）
+
+    def __init__(self, adapter, speed: float = 0.0, start_time: Optional[str] = None):
+        """
+        Args:
+            adapter: MockTickAdapter（已加载或稍后 load）
+            speed: 倍速，<=0 表示不限速
+            start_time: 起始时刻 HHMMSS（默认从第一笔Tick开始）
+        """
+        self.adapter = adapter
+        self.speed = float(speed or 0.0)
+        self.start_time = start_time
+
+        self._started = False
+        self._wall_start = 0.0
+        self._wall_target = 0.0
+        self._prev_ms: Optional[int] = None
+        self._frames = 0
+        self._events = 0
+        self._next_progress = self.PROGRESS_EVERY_PCT
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 准备
+    # ─────────────────────────────────────────────────────────────────────────
+    def load(self, stock_list: List[str]) -> int:
+        """加载全日Tick（委托给适配器），返回成功加载数量"""
+        loaded = self.adapter.load_tick_data(stock_list)
+        logger.info(f"[OK] [IntradayReplay] 全局时钟 {self.adapter.frame_count} 帧 | {loaded} 只标的")
+        return loaded
+
+    @property
+    def total_frames(self) -> int:
+        return self.adapter.frame_count
+
+    @staticmethod
+    def _ms_to_datetime(ms: int) -> datetime:
+        """毫秒时间戳 → naive 北京时间"""
+        return _EPOCH + timedelta(milliseconds=ms) + _BEIJING_OFFSET
+
+    def _start_ms(self) -> Optional[int]:
+        if not self.start_time:
+            return None
+        dt = datetime.strptime(self.adapter.target_date + self.start_time, '%Y%m%d%H%M%S')
+        return int((dt - _BEIJING_OFFSET - _EPOCH).total_seconds() * 1000)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 每帧
+    # ─────────────────────────────────────────────────────────────────────────
+    def step(self, engine) -> bool:
+        """
+        推进一帧并对齐引擎时间（主循环每圈开头调用）
+
+        Returns:
+            bool: False 表示回放结束
+        """
+        if not self._started:
+            self._started = True
+            start_ms = self._start_ms()
+            if start_ms is not None:
+                self.adapter.seek(start_ms)
+            self._wall_start = self._wall_target = time.perf_counter()
+            if self.adapter.frame_index >= self.total_frames:
+                return False
+        elif not self.adapter.advance_frame():
+            self._log_summary()
+            return False
+
+        ms = self.adapter.get_current_ms()
+        if ms is None:
+            return False
+        self._pace(ms)
+        engine.set_mock_time(self._ms_to_datetime(ms))
+
+        self._frames += 1
+        self._events += self.adapter.get_frame_events()
+        self._maybe_log_progress()
+        return True
+
+    def _pace(self, ms: int):
+        """按倍速睡眠到本帧的墙钟目标时刻"""
+        if self._prev_ms is not None and self.speed > 0:
+            gap_s = min((ms - self._prev_ms) / 1000.0, self.MAX_GAP_S)
+            self._wall_target += gap_s / self.speed
+            delay = self._wall_target - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        self._prev_ms = ms
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 统计
+    # ─────────────────────────────────────────────────────────────────────────
+    def get_stats(self) -> Dict:
+        """进度与吞吐"""
+        elapsed = time.perf_counter() - self._wall_start if self._started else 0.0
+        total = self.total_frames
+        ms = self.adapter.get_current_ms()
+        return {
+            'frames': self._frames,
+            'total_frames': total,
+            'progress': (self.adapter.frame_index + 1) / total if total else 0.0,
+            'ticks': self._events,
+            'elapsed_s': round(elapsed, 3),
+            'frames_per_s': round(self._frames / elapsed, 1) if elapsed > 0 else 0.0,
+            'ticks_per_s': round(self._events / elapsed, 1) if elapsed > 0 else 0.0,
+            'sim_time': self._ms_to_datetime(ms).strftime('%H:%M:%S') if ms is not None else None,
+            'speed': self.speed,
+        }
+
+    def _maybe_log_progress(self):
+        total = self.total_frames
+        if not total:
+            return
+        pct = (self.adapter.frame_index + 1) * 100 / total
+        if pct >= self._next_progress:
+            stats = self.get_stats()
+            logger.info(
+                f"[IntradayReplay] {pct:.0f}% | 模拟 {stats['sim_time']} | "
+                f"{stats['frames_per_s']:.0f} 帧/s | {stats['ticks_per_s']:.0f} Tick/s"
+            )
+            while self._next_progress <= pct:
+                self._next_progress += self.PROGRESS_EVERY_PCT
+
+    def _log_summary(self):
+        stats = self.get_stats()
+        logger.info(
+            f"[OK] [IntradayReplay] 回放完成: {stats['frames']} 帧 / {stats['ticks']} 笔Tick | "
+            f"耗时 {stats['elapsed_s']:.1f}s | {stats['frames_per_s']:.0f} 帧/s"
+        )
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+MultiDateScan - 多日期并行定格沙盘
+
+【CTO V233 多日并行扫描】
+旧方案：scan 一次只跑一天，一个月收盘验证要串行跑几十次，
+        每次都重复 粗筛 → 字典预热 → Tick快照提取。
+
+新方案：
+  - 单日流程收敛为 run_close_scan()，scan 单日命令与并行 worker 走同一函数，
+    保证多日结果与逐日单跑逐字段一致
+  - 日期按进程扇出（spawn），每个交易日开跑前重置进程内单例
+    （TrueDictionary / ConfigManager），日与日之间状态完全隔离
+  - 只读静态数据走磁盘共享：按日快照索引、TrueDictionary 硬盘缓存，
+    worker 进程常驻复用，模块导入与QMT连接只付一次
+  - 各日 Top-N 合并为一张 (date, rank) 索引表
+
+用法:
+    dates = get_trading_days_between('20260201', '20260228')
+    table, summary = run_multi_date_scan(dates, workers=4, top_n=10)
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 合并表列顺序（战报 target_entry 的字段子集，其余字段追加在后）
+RESULT_COLUMNS = [
+    'code', 'score', 'price', 'change', 'inflow_ratio', 'ratio_stock',
+    'sustain_ratio', 'mfe', 'purity', 'ignition_prob', 'depth_ratio',
+]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 单日流程（scan 单日命令与并行 worker 共用）
+# ─────────────────────────────────────────────────────────────────────────────
+def build_close_tick_stream(target_date: str, base_pool: List[str]) -> Tuple[List[dict], int]:
+    """
+    收盘快照 → 定格沙盘 tick_stream
+
+    【CTO V74宪法】不得日K兜底：无有效Tick的票直接物理剔除。
+
+    Returns:
+        (tick_stream, 本次新建快照索引数量)
+    """
+    from logic.data_providers.snapshot_index import SnapshotIndex
+
+    snapshot_index = SnapshotIndex(target_date)
+    built = snapshot_index.ensure(base_pool)
+
+    tick_stream = []
+    for stock, snap in snapshot_index.snapshot(base_pool, 'close').items():
+        tick = {
+            'stock_code': stock,
+            'datetime': f"{target_date}150000",
+            'price': snap['lastPrice'],
+            'open': snap['open'],
+            'high': snap['high'],
+            'low': snap['low'],
+            'volume': int(snap['volume']),
+            'amount': snap['amount'],
+            'lastClose': snap['lastClose'],
+            'askPrice1': snap['askPrice1'],
+            'bidPrice1': snap['bidPrice1'],
+        }
+        # 只有有效Tick才加入；无Tick则直接跳过，绝不用日线兜底！
+        if tick['amount'] > 0 and tick['price'] > 0:
+            tick_stream.append(tick)
+    return tick_stream, built
+
+
+def load_auction_table(target_date: str, base_pool: List[str]):
+    """
+    当日竞价列式表（与实盘 09:25 采集同口径，打分结果挂竞价审计字段用）
+
+    Returns:
+        AuctionTable；取不到时返回 None（只影响审计字段，不影响打分）
+    """
+    try:
+        from logic.data_providers.auction_table import AuctionTable
+        table = AuctionTable.get(target_date, base_pool)
+        logger.info(f"[OK] [AuctionTable] {table.summary()}")
+        return table
+    except Exception as e:
+        logger.warning(f"[WARN] [AuctionTable] {target_date} 竞价表加载失败: {e}")
+        return None
+
+
+def run_close_scan(target_date: str) -> Dict:
+    """
+    单日定格沙盘：粗筛 → 收盘快照 → run_historical_stream
+
+    Returns:
+        Dict: date / pool / ticks / targets（按分数降序的全部达标标的）
+    """
+    from tasks.run_live_trading_engine import LiveTradingEngine
+    from logic.data_providers.mock_qmt_adapter import MockQmtAdapter
+
+    mock_adapter = MockQmtAdapter(target_date=target_date)
+    mock_adapter.initialize()
+    engine = LiveTradingEngine(qmt_manager=mock_adapter, mode='scan', target_date=target_date)
+
+    base_pool = getattr(mock_adapter, 'watchlist', None) or []
+    if not base_pool:
+        from logic.data_providers.universe_builder import UniverseBuilder
+        base_pool, _ = UniverseBuilder(target_date=target_date).build()
+
+    tick_stream, _ = build_close_tick_stream(target_date, base_pool)
+    result = {'date': target_date, 'pool': len(base_pool), 'ticks': len(tick_stream), 'targets': []}
+    if not tick_stream:
+        return result
+
+    engine.watchlist = base_pool
+    engine.auction_table = load_auction_table(target_date, base_pool)
+    engine.run_historical_stream(tick_stream)
+    result['targets'] = list(getattr(engine, 'highest_scores', {}).values())
+    return result
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 进程 worker
+# ─────────────────────────────────────────────────────────────────────────────
+def _reset_process_state():
+    """清空进程内单例与按日缓存，保证每个交易日从干净状态开跑"""
+    from logic.data_providers import true_dictionary
+    from logic.core import config_manager
+    from logic.utils import price_utils
+
+    true_dictionary.TrueDictionary._instance = None
+    true_dictionary.TrueDictionary._initialized = False
+    true_dictionary._true_dict_instance = None
+    config_manager._config_manager = None
+    # 快照索引按交易日常驻，复用 worker 逐日跑时不清会越积越多
+    price_utils._snapshot_indexes.clear()
+
+
+def scan_date(target_date: str) -> Dict:
+    """worker 入口：隔离状态后跑单日，异常收敛为 status=failed"""
+    started = time.perf_counter()
+    try:
+        _reset_process_state()
+        result = run_close_scan(target_date)
+        result['status'] = 'success'
+    except Exception as e:
+        logger.error(f"[X] [MultiDateScan] {target_date} 扫描失败: {e}")
+        result = {'date': target_date, 'pool': 0, 'ticks': 0, 'targets': [],
+                  'status': 'failed', 'error': str(e)}
+    result['elapsed_s'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 调度与合并
+# ─────────────────────────────────────────────────────────────────────────────
+def merge_results(results: List[Dict], top_n: int = 10) -> pd.DataFrame:
+    """
+    各日 Top-N 合并为 (date, rank) 索引表，日期升序、名次从1开始
+    """
+    rows = []
+    for result in sorted(results, key=lambda r: r['date']):
+        for rank, target in enumerate(result.get('targets', [])[:top_n], start=1):
+            rows.append({'date': result['date'], 'rank': rank, **target})
+
+    if not rows:
+        empty = pd.DataFrame(columns=['date', 'rank'] + RESULT_COLUMNS)
+        return empty.set_index(['date', 'rank'])
+
+    table = pd.DataFrame(rows)
+    extra = [c for c in table.columns if c not in RESULT_COLUMNS and c not in ('date', 'rank')]
+    ordered = ['date', 'rank'] + [c for c in RESULT_COLUMNS if c in table.columns] + extra
+    return table[ordered].set_index(['date', 'rank'])
+
+
+def run_multi_date_scan(dates: List[str], workers: int = 1, top_n: int = 10,
+                        scan_fn=None) -> Tuple[pd.DataFrame, List[Dict]]:
+    """
+    多日期并行定格沙盘
+
+    Args:
+        dates: 交易日列表 YYYYMMDD
+        workers: 进程数，<=1 时在当前进程内逐日执行
+        top_n: 每日保留名次
+        scan_fn: 单日执行函数（默认 scan_date，须可被子进程导入）
+
+    Returns:
+        (合并表, 每日摘要列表[date/status/pool/ticks/targets数量/elapsed_s])
+    """
+    scan_fn = scan_fn or scan_date
+    dates = sorted(set(dates))
+    workers = max(1, min(int(workers or 1), len(dates) or 1))
+    started = time.perf_counter()
+    results = []
+
+    if workers == 1:
+        for date in dates:
+            results.append(scan_fn(date))
+            logger.info(f"[MultiDateScan] {date} 完成 ({len(results)}/{len(dates)})")
+    else:
+        # spawn：子进程不继承父进程已初始化的单例与QMT句柄
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as executor:
+            futures = {executor.submit(scan_fn, date): date for date in dates}
+            for future in as_completed(futures):
+                date = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"[X] [MultiDateScan] {date} worker 异常: {e}")
+                    results.append({'date': date, 'pool': 0, 'ticks': 0, 'targets': [],
+                                    'status': 'failed', 'error': str(e)})
+                logger.info(f"[MultiDateScan] {date} 完成 ({len(results)}/{len(dates)})")
+
+    elapsed = time.perf_counter() - started
+    summary = [
+        {
+            'date': r['date'],
+            'status': r.get('status', 'success'),
+            'pool': r.get('pool', 0),
+            'ticks': r.get('ticks', 0),
+            'targets': len(r.get('targets', [])),
+            'elapsed_s': r.get('elapsed_s', 0.0),
+            'error': r.get('error'),
+        }
+        for r in sorted(results, key=lambda r: r['date'])
+    ]
+    ok = sum(1 for s in summary if s['status'] == 'success')
+    logger.info(f"[OK] [MultiDateScan] {ok}/{len(dates)} 个交易日完成 | "
+                f"{workers} 进程 | 耗时 {elapsed:.1f}s")
+    return merge_results(results, top_n=top_n), summary
@@ -463,6 +463,16 @@ class TimeMachineEngine:
                 if mfe_val > 5:
                     score['final_score'] = score.get('final_score', 0) - (mfe_val - 5) * 2
             
+            # 【CTO V233 竞价列式表】竞价MFE/高开/考核审计字段，与实盘 09:25 采集同口径（不参与排序）
+            if stock_scores:
+                try:
+                    from logic.data_providers.auction_table import AuctionTable
+                    auction_table = AuctionTable.get(date, [s['stock_code'] for s in stock_scores])
+                    for score in stock_scores:
+                        score.update(auction_table.audit(score['stock_code']))
+                except Exception as e:
+                    logger.warning(f"  [WARN] 竞价表加载失败，跳过竞价审计字段: {e}")
+
             # 多维排序：final_score降序，相同则看MFE升序（MFE越小越好）
             stock_scores.sort(key=lambda x: (x.get('final_score', 0), -x.get('mfe', 0)), reverse=True)
             top20 = stock_scores[:20]
@@ -603,6 +613,10 @@ class TimeMachineEngine:
             
             # 【CTO V28自愈下载】本地无数据时自动下载
             if not data or normalized_code not in data or data[normalized_code].empty:
+                # 【CTO V233 覆盖清单】清单里的0行可能只是本地探测结论，不能据此跳过自愈下载；
+                # 只在下载后读回时登记
+                from logic.data_providers.coverage_manifest import get_coverage_manifest
+                manifest = get_coverage_manifest('tick')
                 logger.warning(f"【时间机器】{date} {stock_code} 本地无Tick切片，尝试自愈下载...")
                 try:
                     xtdata.download_history_data(normalized_code, period='tick', start_time=date, end_time=date)
@@ -614,6 +628,8 @@ class TimeMachineEngine:
                         start_time=date,
                         end_time=date
                     )
+                    manifest.record_frames({normalized_code: (data or {}).get(normalized_code)}, dates=[date])
+                    manifest.flush()
                     if data and normalized_code in data and not data[normalized_code].empty:
                         logger.info(f"【时间机器】{stock_code} 自愈下载成功！")
                     else:
@@ -1198,6 +1214,13 @@ class TimeMachineEngine:
         print(f"📅 交易日: {len(trade_dates)} 天")
         logger.info(f"交易日: {len(trade_dates)} 天")
         
+        # 【CTO V233 候选池缓存】整段区间一次读日K预建底池，逐日 _load_stock_pool 直接命中缓存
+        try:
+            from logic.data_providers.universe_cache import precompute_universes
+            precompute_universes(trade_dates)
+        except Exception as e:
+            logger.warning(f"【时间机器】候选池区间预计算失败，退回逐日粗筛: {e}")
+        
         # 3. 逐日回测
         all_results = []
         
@@ -172,7 +172,7 @@ class ConfigManager:
     
     def compute_volume_ratio_threshold(
         self,
-        market_volume_ratios: list[float],
+        market_volume_ratios: 'list[float] | QuantileSketch',
         mode: str = 'live'
     ) -> float:
         """
@@ -189,7 +189,9 @@ class ConfigManager:
                     result = run_backtest(threshold=threshold)
 
         Args:
-            market_volume_ratios: 当日全市场各股有效量比列表（只含正值，排除停牌/未开盘）
+            market_volume_ratios: 当日全市场各股有效量比列表（只含正值，排除停牌/未开盘），
+                                  或当帧已摄入的 QuantileSketch（【CTO V233】一帧只摄入一次，
+                                  查询与全市场规模无关，相对误差 ≤ sketch.relative_error）
             mode: 'live'   = 实盘，使用 live_percentile（默认0.95，Top5%）
                   'backtest' = 回测，使用 backtest_percentile（默认0.88，可用override调整）
 
@@ -201,22 +203,31 @@ class ConfigManager:
         注意：
             - 量比列表应在每日开盘后收集，通常在第一次扫描前更新一次即可
             - 不要在每个 Tick 都重新传入完整列表，在外层缓存计算结果
+            - 帧级热路径可传全市场草图 QuantileSketch().ingest(ratios)，同帧只摄入一次，
+              分位点仍在此处按调用时配置读取，temporary_override 照常生效
         """
         import numpy as np
+        from logic.utils.quantile_sketch import QuantileSketch
 
         fallback     = float(self.get('volume_ratio_filter.fixed_threshold', 3.0))
         min_stocks   = int(self.get('volume_ratio_filter.min_stocks_for_dynamic', 100))
 
-        # 数据不足时 fallback
-        valid_ratios = [r for r in market_volume_ratios if r > 0]
-        if len(valid_ratios) < min_stocks:
-            return fallback
-
         if mode == 'live':
             pct = float(self.get('volume_ratio_filter.live_percentile', 0.95))
         else:  # backtest
             pct = float(self.get('volume_ratio_filter.backtest_percentile', 0.88))
 
+        if isinstance(market_volume_ratios, QuantileSketch):
+            # 草图已剔除非正值；数据不足时 fallback
+            if market_volume_ratios.count < min_stocks:
+                return fallback
+            return max(market_volume_ratios.quantile(pct), fallback)
+
+        # 数据不足时 fallback
+        valid_ratios = [r for r in market_volume_ratios if r > 0]
+        if len(valid_ratios) < min_stocks:
+            return fallback
+
         # numpy percentile 入参是 0-100，config存的是 0-1
         dynamic_threshold = float(np.percentile(valid_ratios, pct * 100))
 
@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+L1FlowAccumulator - 数组化、线程安全的 L1 资金流向累加器
+
+原 LiveTradingEngine._calculate_l1_inflow 的状态是 {code: {inflow, last_amount, last_price}}
+嵌套字典，逐票在 Python 里算盘口失衡三次方，且明确标注不可多线程调用。
+
+本模块：
+- 状态按 symbol 下标存放在 float64 数组（inflow / last_amount / last_price）
+- update_batch() 对一整批 (成交额, 价格, 盘口买卖量合计) 向量化计算
+- 写操作持锁；读方通过 snapshot() 拿到一致的拷贝，可跨线程并发读
+- 兼容原嵌套字典的 Mapping 接口（acc[code]['inflow'] / items() / del / clear），
+  SessionSnapshot / WarmRestartStore 等既有调用方无需修改
+- to_state() / load_state() 与 pickle 均可序列化
+
+算法与 _calculate_l1_inflow 逐位一致：
+  首次出现：inflow = amount × clip((p - pre)/range, ±1) × 0.5
+  后续 Δamount > 0：
+    ΔP > 0 → +Δamount；ΔP < 0 → -Δamount
+    ΔP = 0 且有Tick → Δamount × sign(imb)·|imb|³，imb = (bid - ask)/(bid + ask)
+    ΔP = 0 且无Tick → Δamount × clip((p - pre)/pre × 10, ±1)
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import threading
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def book_totals(tick: Optional[dict]) -> Optional[Tuple[float, float]]:
+    """
+    从 Tick 提取盘口 (买量合计, 卖量合计)，口径与 _calculate_l1_inflow 一致
+
+    - askVol/bidVol 为 list 且 >= 10 档：取十档（L2）
+    - 否则：列表取前五档，无列表时取 askVol1..5 / bidVol1..5（L1）
+
+    Returns:
+        无 Tick（None / 空字典）返回 None
+    """
+    if not tick:
+        return None
+    ask_list = tick.get('askVol', [])
+    bid_list = tick.get('bidVol', [])
+    if isinstance(ask_list, list) and len(ask_list) >= 10:
+        total_ask = sum(ask_list[:10])
+        total_bid = sum(bid_list[:10])
+    else:
+        total_ask = sum([tick.get(f'askVol{i}', 0) for i in range(1, 6)]) if not ask_list else sum(ask_list[:5])
+        total_bid = sum([tick.get(f'bidVol{i}', 0) for i in range(1, 6)]) if not bid_list else sum(bid_list[:5])
+    return float(total_bid), float(total_ask)
+
+
+class L1FlowAccumulator(MutableMapping):
+    """
+    数组化 L1 资金流向累加器
+
+    用法:
+        acc = L1FlowAccumulator()
+        inflow = acc.update('000001.SZ', amount, price, pre_close, high, low, tick)
+        inflows = acc.update_batch(codes, amounts, prices, pre_closes, highs, lows, bids, asks, has_book)
+        state = acc.snapshot()   # 任意线程
+        if acc.version != seen:                               # 帧线程：未写入则跳过拷贝
+            buf, n, layout, codes = acc.copy_into(buf, layout)   # 复用缓冲
+    """
+
+    _INITIAL_CAPACITY = 256
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._index: Dict[str, int] = {}
+        self._codes: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._layout = 0  # 下标布局版本：分配/释放/清空时递增
+        self._version = 0  # 写版本：任何写操作递增，快照据此跳过未变帧
+        self._inflow = np.zeros(self._INITIAL_CAPACITY)
+        self._last_amount = np.zeros(self._INITIAL_CAPACITY)
+        self._last_price = np.zeros(self._INITIAL_CAPACITY)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 下标管理
+    # ─────────────────────────────────────────────────────────────────────────
+    def _grow(self, need: int):
+        cap = len(self._inflow)
+        if need <= cap:
+            return
+        new_cap = max(need, cap * 2)
+        for name in ('_inflow', '_last_amount', '_last_price'):
+            arr = np.zeros(new_cap)
+            arr[:cap] = getattr(self, name)
+            setattr(self, name, arr)
+
+    def _slot(self, code: str) -> int:
+        """为新 symbol 分配下标（调用方持锁）"""
+        if self._free:
+            idx = self._free.pop()
+            self._codes[idx] = code
+        else:
+            idx = len(self._codes)
+            self._grow(idx + 1)
+            self._codes.append(code)
+        self._index[code] = idx
+        self._layout += 1
+        return idx
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 单票更新（与原 _calculate_l1_inflow 逐位一致）
+    # ─────────────────────────────────────────────────────────────────────────
+    def update(self, stock_code: str, current_amount: float, current_price: float,
+               pre_close: float, tick_high: float, tick_low: float, tick: dict = None) -> float:
+        """单票更新，返回累计净流入"""
+        with self._lock:
+            self._version += 1
+            idx = self._index.get(stock_code)
+            if idx is None:
+                idx = self._slot(stock_code)
+                price_range = tick_high - tick_low
+                if price_range > 0 and pre_close > 0:
+                    power_ratio = (current_price - pre_close) / price_range
+                    power_ratio = max(-1.0, min(power_ratio, 1.0))
+                else:
+                    power_ratio = 1.0 if current_price > pre_close else -1.0
+                initial_inflow = current_amount * power_ratio * 0.5
+                self._inflow[idx] = initial_inflow
+                self._last_amount[idx] = current_amount
+                self._last_price[idx] = current_price
+                return initial_inflow
+
+            inflow = float(self._inflow[idx])
+            delta_amount = current_amount - float(self._last_amount[idx])
+            delta_price = current_price - float(self._last_price[idx])
+
+            if delta_amount > 0:
+                if delta_price > 0:
+                    inflow += delta_amount
+                elif delta_price < 0:
+                    inflow -= delta_amount
+                else:
+                    book = book_totals(tick)
+                    if book is not None:
+                        total_bid, total_ask = book
+                        if total_bid + total_ask > 0:
+                            imbalance = (total_bid - total_ask) / (total_bid + total_ask)
+                            directional_force = imbalance ** 3 if imbalance > 0 else -((-imbalance) ** 3)
+                            inflow += delta_amount * directional_force
+                    elif pre_close > 0:
+                        price_position = (current_price - pre_close) / pre_close
+                        direction = max(-1.0, min(1.0, price_position * 10))
+                        inflow += delta_amount * direction
+
+            self._inflow[idx] = inflow
+            self._last_amount[idx] = current_amount
+            self._last_price[idx] = current_price
+            return inflow
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 批量更新（向量化）
+    # ─────────────────────────────────────────────────────────────────────────
+    def update_batch(self, codes: Sequence[str], amounts, prices, pre_closes, highs, lows,
+                     bid_totals=None, ask_totals=None, has_book=None) -> np.ndarray:
+        """
+        整批更新，返回与 codes 对齐的累计净流入
+
+        Args:
+            codes: 股票代码（批内不可重复）
+            amounts / prices / pre_closes / highs / lows: 与 codes 对齐的数组
+            bid_totals / ask_totals: 盘口买/卖量合计（见 book_totals）
+            has_book: 是否有 Tick（对应单票接口 tick 非空）；缺省视为全部无 Tick
+        """
+        n = len(codes)
+        amount = np.asarray(amounts, dtype=np.float64)
+        price = np.asarray(prices, dtype=np.float64)
+        pre_close = np.asarray(pre_closes, dtype=np.float64)
+        high = np.asarray(highs, dtype=np.float64)
+        low = np.asarray(lows, dtype=np.float64)
+        bid = np.zeros(n) if bid_totals is None else np.asarray(bid_totals, dtype=np.float64)
+        ask = np.zeros(n) if ask_totals is None else np.asarray(ask_totals, dtype=np.float64)
+        book = np.zeros(n, dtype=bool) if has_book is None else np.asarray(has_book, dtype=bool)
+
+        with self._lock:
+            self._version += 1
+            idx = np.empty(n, dtype=np.intp)
+            is_new = np.zeros(n, dtype=bool)
+            for i, code in enumerate(codes):
+                slot = self._index.get(code)
+                if slot is None:
+                    slot = self._slot(code)
+                    is_new[i] = True
+                idx[i] = slot
+
+            inflow = self._inflow[idx]
+            delta_amount = amount - self._last_amount[idx]
+            delta_price = price - self._last_price[idx]
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # 首次出现：power_ratio 初始估算
+                price_range = high - low
+                ranged = (price_range > 0) & (pre_close > 0)
+                power_ratio = np.where(
+                    ranged,
+                    np.clip((price - pre_close) / price_range, -1.0, 1.0),
+                    np.where(price > pre_close, 1.0, -1.0),
+                )
+                initial = amount * power_ratio * 0.5
+
+                # 价格僵持且无Tick：价格位置推断
+                direction = np.clip((price - pre_close) / pre_close * 10, -1.0, 1.0)
+
+            traded = delta_amount > 0
+            flat = traded & (delta_price == 0)
+            up = traded & (delta_price > 0)
+            down = traded & (delta_price < 0)
+            use_book = flat & book & ((bid + ask) > 0)
+            use_position = flat & ~book & (pre_close > 0)
+
+            updated = inflow.copy()
+            updated[up] = inflow[up] + delta_amount[up]
+            updated[down] = inflow[down] - delta_amount[down]
+            updated[use_position] = inflow[use_position] + delta_amount[use_position] * direction[use_position]
+            # 盘口失衡三次方只作用于价格僵持的少数票，逐个用 Python 浮点幂计算，
+            # 避免 SIMD 版 np.power 末位舍入与单票口径不一致
+            for i in np.flatnonzero(use_book):
+                b, a = float(bid[i]), float(ask[i])
+                imbalance = (b - a) / (b + a)
+                directional_force = imbalance ** 3 if imbalance > 0 else -((-imbalance) ** 3)
+                updated[i] = float(inflow[i]) + float(delta_amount[i]) * directional_force
+            updated[is_new] = initial[is_new]
+
+            self._inflow[idx] = updated
+            self._last_amount[idx] = amount
+            self._last_price[idx] = price
+            return updated
+
+    def update_from_ticks(self, ticks: Dict[str, dict]) -> Dict[str, float]:
+        """
+        从 {code: qmt_tick} 整批更新，返回 {code: 累计净流入}
+
+        字段口径同主循环：lastPrice / lastClose / amount / high / low + 盘口
+        """
+        codes, amounts, prices, pre_closes, highs, lows = [], [], [], [], [], []
+        bids, asks, has_book = [], [], []
+        for code, tick in ticks.items():
+            if not tick:
+                continue
+            current_price = float(tick.get('lastPrice', 0))
+            codes.append(code)
+            prices.append(current_price)
+            pre_closes.append(float(tick.get('lastClose', 0)))
+            amounts.append(float(tick.get('amount', 0)))
+            highs.append(float(tick.get('high', current_price)))
+            lows.append(float(tick.get('low', current_price)))
+            bt = book_totals(tick)
+            bids.append(bt[0])
+            asks.append(bt[1])
+            has_book.append(True)
+        if not codes:
+            return {}
+        result = self.update_batch(codes, amounts, prices, pre_closes, highs, lows, bids, asks, has_book)
+        return dict(zip(codes, result.tolist()))
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 并发读 / 序列化
+    # ─────────────────────────────────────────────────────────────────────────
+    def snapshot(self) -> Dict[str, Tuple[float, float, float]]:
+        """一致性拷贝 {code: (inflow, last_amount, last_price)}，任意线程可调用"""
+        with self._lock:
+            codes = list(self._index.items())
+            inflow = self._inflow.copy()
+            last_amount = self._last_amount.copy()
+            last_price = self._last_price.copy()
+        return {
+            code: (float(inflow[i]), float(last_amount[i]), float(last_price[i]))
+            for code, i in codes
+        }
+
+    @property
+    def version(self) -> int:
+        """写版本（单调递增）；与上次相同说明期间没有任何写入"""
+        return self._version
+
+    def copy_into(self, out: np.ndarray, known_layout: int = -1
+                  ) -> Tuple[np.ndarray, int, int, Optional[List[Optional[str]]]]:
+        """
+        把 (inflow, last_amount, last_price) 一致性拷进调用方预分配的 (3, cap) 缓冲（帧线程复用，不分配）
+
+        Args:
+            out: 预分配缓冲；容量不足时另建更大的缓冲返回
+            known_layout: 调用方已知的布局版本，相同则不再拷贝下标→代码表
+
+        Returns:
+            (缓冲, 已用下标数, 布局版本, 下标→代码表或 None（布局未变）)
+        """
+        with self._lock:
+            n = len(self._codes)
+            if out.shape[1] < n:
+                out = np.empty((3, max(n, out.shape[1] * 2)))
+            out[0, :n] = self._inflow[:n]
+            out[1, :n] = self._last_amount[:n]
+            out[2, :n] = self._last_price[:n]
+            codes = None if known_layout == self._layout else list(self._codes)
+            return out, n, self._layout, codes
+
+    def to_state(self) -> Dict[str, Tuple[float, float, float]]:
+        return self.snapshot()
+
+    def load_state(self, state: Dict[str, object]):
+        """从 to_state() 或原嵌套字典格式恢复（整体替换）"""
+        with self._lock:
+            self.clear()
+            for code, v in state.items():
+                self[code] = v
+
+    def __getstate__(self):
+        return {'state': self.to_state()}
+
+    def __setstate__(self, d):
+        self.__init__()
+        self.load_state(d['state'])
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Mapping 兼容接口（原 {code: {inflow, last_amount, last_price}}）
+    # ─────────────────────────────────────────────────────────────────────────
+    def __getitem__(self, code: str) -> Dict[str, float]:
+        with self._lock:
+            i = self._index[code]
+            return {
+                'inflow': float(self._inflow[i]),
+                'last_amount': float(self._last_amount[i]),
+                'last_price': float(self._last_price[i]),
+            }
+
+    def __setitem__(self, code: str, value):
+        if isinstance(value, dict):
+            inflow = value.get('inflow', 0.0)
+            last_amount = value.get('last_amount', 0.0)
+            last_price = value.get('last_price', 0.0)
+        else:
+            inflow, last_amount, last_price = value
+        with self._lock:
+            self._version += 1
+            i = self._index.get(code)
+            if i is None:
+                i = self._slot(code)
+            self._inflow[i] = float(inflow)
+            self._last_amount[i] = float(last_amount)
+            self._last_price[i] = float(last_price)
+
+    def __delitem__(self, code: str):
+        with self._lock:
+            i = self._index.pop(code)
+            self._version += 1
+            self._codes[i] = None
+            self._inflow[i] = self._last_amount[i] = self._last_price[i] = 0.0
+            self._free.append(i)
+            self._layout += 1
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._index))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, code) -> bool:
+        return code in self._index
+
+    def items(self):
+        """一致性拷贝的 (code, {inflow, last_amount, last_price}) 列表"""
+        return [
+            (code, {'inflow': v[0], 'last_amount': v[1], 'last_price': v[2]})
+            for code, v in self.snapshot().items()
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._index.clear()
+            self._codes.clear()
+            self._free.clear()
+            self._layout += 1
+            self._version += 1
+            self._inflow[:] = 0.0
+            self._last_amount[:] = 0.0
+            self._last_price[:] = 0.0
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+AuctionTable - 集合竞价列式日表（实盘 / 扫描 / 回测同源）
+
+【CTO V233 竞价列式表】
+旧方案：竞价快照散落在 data/auction/auction_tick_live_{date}.csv，
+        check_auction_validity / calculate_auction_mfe 逐只吃 dict，
+        09:25-09:30 这 5 分钟里全市场几千只逐个循环。
+
+新方案：
+  - 每个交易日一张列式表（代码驻留索引 + 定长 float64 列），三个入口同一口径：
+      from_tick_batch      实盘：tick_adapter.get_frame() 的 TickBatch 整列切片
+      from_snapshot_index  扫描/回测：SnapshotIndex 的 09:25:05 竞价时刻
+      from_csv             历史 data/auction CSV 一次性导入
+  - 竞价金额 / 竞价额占流通市值 / 高开幅度 / 竞价MFE / 通过掩码 全部整列向量化
+    （price_utils.*_batch，与单票版逐项同口径），全市场毫秒级
+  - 落盘 data/auction/auction_{date}.tdc（复用 TrueDictCache 二进制格式，可内存映射）
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import logging
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from logic.data_providers.true_dict_cache import TrueDictCache
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'auction'
+
+
+class AuctionTable:
+    """
+    单日竞价列式表
+
+    用法:
+        table = AuctionTable.from_tick_batch('20260318', tick_adapter.get_frame(codes))
+        table.mfe / table.gap_pct / table.float_ratio      # (n,) 与 table.codes 对齐
+        table.top(20)                                      # 通过竞价考核、按 MFE 降序的代码
+        table.audit(code)                                  # 打分结果挂载的竞价审计字段
+        table.save()
+        AuctionTable.get('20260318', codes)                # 扫描/回测：缓存 → 快照索引
+    """
+
+    # 竞价价 / 昨收 / 竞价最高·最低 / 竞价量(手) / 竞价额(元) / 买一·卖一量 / 流通股本(股)
+    COLUMNS = ('price', 'pre_close', 'high', 'low', 'volume', 'amount', 'bid_vol1', 'ask_vol1', 'float_volume')
+    CACHE_DIR = Path('data/auction')
+    MIN_AUCTION_AMOUNT = 1_000_000.0
+
+    def __init__(self, trade_date: str, codes: Sequence[str], columns: Mapping[str, np.ndarray]):
+        self.trade_date = trade_date
+        self.codes: List[str] = [str(c) for c in codes]
+        self.index: Dict[str, int] = {c: i for i, c in enumerate(self.codes)}
+        n = len(self.codes)
+        for name in self.COLUMNS:
+            values = columns.get(name)
+            setattr(self, name, np.zeros(n) if values is None else np.asarray(values, dtype=np.float64))
+        self._derived: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.index
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 构造
+    # ─────────────────────────────────────────────────────────────────────────
+    @classmethod
+    def from_tick_batch(cls, trade_date: str, batch, float_volume: Optional[np.ndarray] = None) -> 'AuctionTable':
+        """
+        实盘 09:25 TickBatch → 表（竞价价取 last_price，缺失退开盘价；量纲换回手/元）
+        """
+        price = np.where(batch.last_price > 0, batch.last_price, batch.open_price)
+        columns = {
+            'price': price, 'pre_close': batch.prev_close,
+            'high': batch.high_price, 'low': batch.low_price,
+            'volume': batch.volume_shares / 100.0, 'amount': batch.amount_yuan,
+            'bid_vol1': batch.bid_vols[:, 0] / 100.0, 'ask_vol1': batch.ask_vols[:, 0] / 100.0,
+        }
+        table = cls(trade_date, batch.codes, columns).attach_float_volume(float_volume)
+        valid = np.asarray(batch.valid, dtype=bool)
+        if not valid.all():
+            table = table.select([c for c, ok in zip(table.codes, valid) if ok])
+        return table
+
+    @classmethod
+    def from_snapshots(cls, trade_date: str, snapshots: Mapping[str, Mapping],
+                       float_volume: Optional[np.ndarray] = None) -> 'AuctionTable':
+        """{code: get_full_tick / SnapshotIndex 快照 dict} → 表（字段口径同 check_auction_validity）"""
+        codes = list(snapshots)
+        n = len(codes)
+        cols = {name: np.zeros(n) for name in cls.COLUMNS}
+        for i, code in enumerate(codes):
+            snap = snapshots[code] or {}
+            cols['price'][i] = float(snap.get('lastPrice', 0) or snap.get('open', 0) or 0)
+            cols['pre_close'][i] = float(snap.get('lastClose', 0) or snap.get('prev_close', 0) or 0)
+            cols['high'][i] = float(snap.get('high', 0) or 0)
+            cols['low'][i] = float(snap.get('low', 0) or 0)
+            cols['volume'][i] = float(snap.get('volume', 0) or 0)
+            cols['amount'][i] = float(snap.get('amount', 0) or 0)
+            for key in ('bidVol', 'askVol'):
+                levels = snap.get(key)
+                first = levels[0] if isinstance(levels, (list, tuple)) and levels else snap.get(f'{key}1', 0)
+                cols[f'{key[:3].lower()}_vol1'][i] = float(first or 0)
+        return cls(trade_date, codes, cols).attach_float_volume(float_volume)
+
+    @classmethod
+    def from_snapshot_index(cls, trade_date: str, stock_list: Sequence[str], index=None,
+                            float_volume: Optional[np.ndarray] = None) -> 'AuctionTable':
+        """扫描/回测：SnapshotIndex 09:25:05 竞价时刻（缺的票才读 Tick）"""
+        if index is None:
+            from logic.data_providers.snapshot_index import SnapshotIndex
+            index = SnapshotIndex(trade_date)
+        index.ensure(stock_list)
+        return cls.from_snapshots(trade_date, index.snapshot(stock_list, 'auction'), float_volume)
+
+    @classmethod
+    def from_csv(cls, path: Path, trade_date: Optional[str] = None,
+                 float_volume: Optional[np.ndarray] = None) -> 'AuctionTable':
+        """历史 data/auction/auction_tick_live_{date}.csv 导入（stock_code/open/prev_close/volume/amount/...）"""
+        import pandas as pd
+
+        path = Path(path)
+        df = pd.read_csv(path, encoding='utf-8-sig').drop_duplicates('stock_code', keep='last')
+        trade_date = trade_date or path.stem[-8:]
+
+        def column(name: str) -> np.ndarray:
+            if name not in df.columns:
+                return np.zeros(len(df))
+            return np.nan_to_num(df[name].to_numpy(dtype=np.float64, na_value=0.0))
+
+        columns = {'price': column('open'), 'pre_close': column('prev_close'), 'volume': column('volume'),
+                   'amount': column('amount'), 'bid_vol1': column('bidVol1'), 'ask_vol1': column('askVol1')}
+        return cls(trade_date, df['stock_code'].astype(str).tolist(), columns).attach_float_volume(float_volume)
+
+    def attach_float_volume(self, float_volume: Optional[np.ndarray] = None) -> 'AuctionTable':
+        """
+        挂流通股本：显式给出（与 codes 对齐）优先；否则取当日/最近合约主表，缺失为 0
+        """
+        if float_volume is not None:
+            self.float_volume = np.nan_to_num(np.asarray(float_volume, dtype=np.float64))
+        elif len(self.codes):
+            from logic.data_providers.instrument_master import InstrumentMaster
+
+            master = None
+            try:
+                master = InstrumentMaster.load(self.trade_date) or InstrumentMaster.latest_before(self.trade_date)
+            except Exception as e:
+                logger.debug(f'[AuctionTable] 合约主表不可用，流通股本置0: {e}')
+            if master is not None:
+                ids = np.array([master.index.get(c, -1) for c in self.codes], dtype=np.int64)
+                hit = ids >= 0
+                self.float_volume = np.zeros(len(self.codes))
+                self.float_volume[hit] = np.nan_to_num(master.float_volume[ids[hit]])
+        self._derived.clear()
+        return self
+
+    def select(self, stock_list: Sequence[str]) -> 'AuctionTable':
+        """按代码子集重排（不在表里的票整行为 0）"""
+        codes = list(dict.fromkeys(stock_list))
+        ids = np.array([self.index.get(c, -1) for c in codes], dtype=np.int64)
+        hit = ids >= 0
+        columns = {}
+        for name in self.COLUMNS:
+            values = np.zeros(len(codes))
+            values[hit] = getattr(self, name)[ids[hit]]
+            columns[name] = values
+        return AuctionTable(self.trade_date, codes, columns)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 落盘 / 读取
+    # ─────────────────────────────────────────────────────────────────────────
+    def save(self, cache_dir: Optional[Path] = None) -> Path:
+        cache = TrueDictCache(self.trade_date, cache_dir=cache_dir or self.CACHE_DIR, prefix=PREFIX)
+        arrays = {name: getattr(self, name) for name in self.COLUMNS}
+        arrays['codes'] = np.array(self.codes, dtype='U16')
+        return cache.save(arrays, meta={'stock_count': len(self)})
+
+    @classmethod
+    def load(cls, trade_date: str, cache_dir: Optional[Path] = None) -> Optional['AuctionTable']:
+        cache = TrueDictCache(trade_date, cache_dir=cache_dir or cls.CACHE_DIR, prefix=PREFIX)
+        arrays = cache.load(mmap=False)
+        if arrays is None or 'codes' not in arrays or any(name not in arrays for name in cls.COLUMNS):
+            return None
+        return cls(trade_date, arrays['codes'].tolist(), arrays)
+
+    @classmethod
+    def get(cls, trade_date: str, stock_list: Optional[Sequence[str]] = None,
+            cache_dir: Optional[Path] = None) -> 'AuctionTable':
+        """
+        扫描/回测入口：缓存表覆盖 stock_list 则直接用；否则从快照索引构建并落盘
+        """
+        table = cls.load(trade_date, cache_dir)
+        if table is not None and (stock_list is None or all(c in table for c in stock_list)):
+            return table if stock_list is None else table.select(stock_list)
+        if stock_list is None:
+            from xtquant import xtdata
+            stock_list = xtdata.get_stock_list_in_sector('沪深A股')
+        # 已缓存的票一并重建（快照索引有缓存，不会重复读 Tick），落盘表只增不减
+        codes = list(dict.fromkeys((table.codes if table is not None else []) + list(stock_list)))
+        table = cls.from_snapshot_index(trade_date, codes)
+        try:
+            table.save(cache_dir)
+        except Exception as e:
+            logger.warning(f'[WARN] [AuctionTable] 落盘失败: {e}')
+        return table.select(stock_list)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 派生列（整列向量化，首次访问计算）
+    # ─────────────────────────────────────────────────────────────────────────
+    def _cached(self, name: str, compute) -> np.ndarray:
+        values = self._derived.get(name)
+        if values is None:
+            values = self._derived[name] = compute()
+        return values
+
+    @property
+    def gap_pct(self) -> np.ndarray:
+        """高开幅度%（昨收缺失为0）"""
+        def compute():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(self.pre_close > 0, (self.price - self.pre_close) / self.pre_close * 100, 0.0)
+        return self._cached('gap_pct', compute)
+
+    @property
+    def float_ratio(self) -> np.ndarray:
+        """竞价额 / 流通市值（口径同 MFE 分母，含万股修复；无流通盘为0）"""
+        def compute():
+            from logic.utils.price_utils import _float_cap
+
+            cap = np.nan_to_num(_float_cap(self.float_volume, self.pre_close))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(cap > 0, self.amount / cap, 0.0)
+        return self._cached('float_ratio', compute)
+
+    @property
+    def mfe(self) -> np.ndarray:
+        """竞价MFE（同 calculate_auction_mfe）"""
+        def compute():
+            from logic.utils.price_utils import calculate_auction_mfe_batch
+            return calculate_auction_mfe_batch(self.price, self.amount, self.pre_close, self.float_volume)
+        return self._cached('mfe', compute)
+
+    def valid_mask(self, min_auction_amount: float = MIN_AUCTION_AMOUNT) -> np.ndarray:
+        """竞价考核通过掩码（同 check_auction_validity）"""
+        from logic.utils.price_utils import check_auction_validity_batch
+
+        return self._cached(f'valid_{min_auction_amount}', lambda: check_auction_validity_batch(
+            self.price, self.amount, self.pre_close, self.high, self.low, self.float_volume, min_auction_amount))
+
+    def top(self, n: Optional[int] = None, min_auction_amount: float = MIN_AUCTION_AMOUNT) -> List[str]:
+        """通过竞价考核的代码，按 MFE 降序"""
+        ok = np.flatnonzero(self.valid_mask(min_auction_amount))
+        order = ok[np.argsort(-self.mfe[ok], kind='stable')]
+        return [self.codes[i] for i in order[:n]]
+
+    def row(self, code: str) -> Optional[Dict]:
+        """单票视图：原始列 + 派生列"""
+        i = self.index.get(code)
+        if i is None:
+            return None
+        out = {name: float(getattr(self, name)[i]) for name in self.COLUMNS}
+        out.update(gap_pct=float(self.gap_pct[i]), float_ratio=float(self.float_ratio[i]),
+                   mfe=float(self.mfe[i]), valid=bool(self.valid_mask()[i]))
+        return out
+
+    def audit(self, code: str) -> Dict:
+        """战报审计字段（实盘/扫描/回测打分结果统一挂载）；无竞价数据的票记未通过"""
+        i = self.index.get(code)
+        if i is None:
+            return {'auction_mfe': 0.0, 'auction_gap_pct': 0.0, 'auction_valid': False}
+        return {'auction_mfe': float(self.mfe[i]), 'auction_gap_pct': float(self.gap_pct[i]),
+                'auction_valid': bool(self.valid_mask()[i])}
+
+    def summary(self) -> str:
+        return (f'{self.trade_date} 竞价 {len(self)}只 通过 {int(self.valid_mask().sum())}只 | '
+                f'竞价额 {self.amount.sum() / 1e8:.1f}亿 | 高开 {int((self.gap_pct > 0).sum())}只')
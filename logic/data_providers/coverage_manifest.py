@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+CoverageManifest - 本地行情覆盖清单（替代 get_local_data 存在性探测）
+
+【CTO V233 覆盖清单】
+旧方案：verify_data_integrity / assert_data_readiness / smart_download 抽样检查 /
+        TimeMachineEngine 自愈下载，想知道"本地有没有"都要 get_local_data 整段读一遍再判空，
+        几千只 × 几十天的就绪检查就是几万次完整读取。
+
+新方案：
+  - 每个 (周期, 交易日) 一张表，每只票一行：行数 / 首末时间戳(ms) / 时间列 crc32
+    落盘为 data/cache/coverage/coverage_{period}_{date}.tdc（复用 TrueDictCache 二进制格式）
+  - 所有下载路径读回验证时顺手登记（DownloadScheduler / QmtDataManager / smart_download /
+    TimeMachineEngine 自愈），读到空也登记为 0 行（已确认无数据，区别于"未知"）
+  - 同一周期所有日期共用一张代码驻留表，批量查询 = 一次 id 映射 + 每日一次 gather，
+    数千只 × 数十天的缺口检测是毫秒级元数据查询
+  - 清单里"未知"的格子才需要真正探测；探测结果同样登记，清单随使用自然补全
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import logging
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from logic.data_providers.symbol_table import SymbolTable
+from logic.data_providers.true_dict_cache import TrueDictCache
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'coverage'
+FIELDS = ('rows', 'first_ts', 'last_ts', 'checksum')
+
+
+def frame_stats(times: np.ndarray) -> Tuple[int, float, float, int]:
+    """时间列 → (行数, 首时间戳, 末时间戳, crc32)"""
+    times = np.ascontiguousarray(times, dtype=np.int64)
+    if not len(times):
+        return 0, np.nan, np.nan, 0
+    return len(times), float(times[0]), float(times[-1]), zlib.crc32(times.tobytes())
+
+
+def _time_column(df) -> np.ndarray:
+    """DataFrame 时间列（ms）；无 time 列时为 0（只计行数）"""
+    if 'time' in df.columns:
+        return df['time'].to_numpy(dtype=np.int64)
+    return np.zeros(len(df), dtype=np.int64)
+
+
+class CoverageManifest:
+    """
+    单周期覆盖清单
+
+    用法:
+        manifest = get_coverage_manifest('tick')
+        manifest.record_frames(local_data, dates=['20260318'])   # 读回后登记
+        manifest.rows(codes, ['20260317', '20260318'])            # (n, k) int64，-1 = 未知
+        manifest.missing(codes, dates)                            # [(code, date)] 缺失或未知
+        manifest.flush()
+    """
+
+    CACHE_DIR = Path('data/cache/coverage')
+
+    def __init__(self, period: str, cache_dir: Optional[Path] = None):
+        self.period = period
+        self.cache_dir = Path(cache_dir) if cache_dir else self.CACHE_DIR
+        self.prefix = f'{PREFIX}_{period}'
+        self.symbols = SymbolTable()
+        self._days: Dict[str, Dict[str, np.ndarray]] = {}
+        self._dirty: set = set()
+        self._lock = threading.RLock()
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 装载 / 落盘
+    # ─────────────────────────────────────────────────────────────────────────
+    def _file(self, date: str) -> TrueDictCache:
+        return TrueDictCache(date, cache_dir=self.cache_dir, prefix=self.prefix)
+
+    def _capacity(self) -> int:
+        return max(64, 1 << max(0, len(self.symbols) - 1).bit_length())
+
+    def _day(self, date: str) -> Dict[str, np.ndarray]:
+        """当日列（按全局 id 对齐，NaN = 未知），首次访问从磁盘装载"""
+        day = self._days.get(date)
+        if day is None:
+            arrays = self._file(date).load(mmap=False)
+            ids = self.symbols.intern(arrays['codes'].tolist()) if arrays is not None else None
+            cap = self._capacity()
+            day = {f: np.full(cap, np.nan) for f in FIELDS}
+            if arrays is not None:
+                for f in FIELDS:
+                    day[f][ids] = arrays[f]
+            self._days[date] = day
+        self._grow(day)
+        return day
+
+    def _grow(self, day: Dict[str, np.ndarray]) -> None:
+        n = len(self.symbols)
+        if len(day['rows']) >= n:
+            return
+        cap = self._capacity()
+        for f, col in day.items():
+            grown = np.full(cap, np.nan)
+            grown[:len(col)] = col
+            day[f] = grown
+
+    def flush(self) -> int:
+        """脏日期落盘，返回写入文件数"""
+        with self._lock:
+            dirty, self._dirty = sorted(self._dirty), set()
+            for date in dirty:
+                day = self._day(date)
+                known = np.flatnonzero(~np.isnan(day['rows'][:len(self.symbols)]))
+                codes = [self.symbols.codes[i] for i in known]
+                arrays = {'codes': np.array(codes, dtype='U16')}
+                arrays.update({f: day[f][known] for f in FIELDS})
+                try:
+                    self._file(date).save(arrays, meta={'period': self.period, 'count': len(codes)})
+                except Exception as e:
+                    logger.warning(f'[WARN] [CoverageManifest] {self.period} {date} 落盘失败: {e}')
+            return len(dirty)
+
+    def dates(self) -> List[str]:
+        """已登记过的交易日（磁盘 + 内存未落盘，降序）"""
+        on_disk = set(TrueDictCache.dates(self.cache_dir, self.prefix))
+        return sorted(on_disk | set(self._days), reverse=True)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 登记
+    # ─────────────────────────────────────────────────────────────────────────
+    def record(self, date: str, codes: Sequence[str], rows, first_ts=np.nan, last_ts=np.nan,
+               checksum=0) -> None:
+        """批量登记同一交易日的若干只（各参数可为标量或与 codes 对齐的数组）"""
+        with self._lock:
+            ids = self.symbols.intern(codes)
+            day = self._day(date)
+            for f, v in zip(FIELDS, (rows, first_ts, last_ts, checksum)):
+                day[f][ids] = v
+            self._dirty.add(date)
+
+    def record_frames(self, frames: Mapping[str, object], dates: Optional[Sequence[str]] = None) -> None:
+        """
+        get_local_data 读回结果登记
+
+        Args:
+            frames: {code: DataFrame}（需含 time 列或日期索引）
+            dates: 本次请求覆盖的交易日；给出时这些日期里读不到行的票登记为 0 行，
+                   不给则只登记实际出现的日期。只给一天时（单日读回）全部行归入该日
+        """
+        from logic.data_providers.daily_panel import bar_dates
+
+        wanted = set(dates) if dates else None
+        single = dates[0] if dates and len(dates) == 1 else None
+        by_date: Dict[str, List[tuple]] = {}
+        for code, df in frames.items():
+            seen = set()
+            if single is not None and df is not None and len(df):
+                seen.add(single)
+                by_date.setdefault(single, []).append((code,) + frame_stats(_time_column(df)))
+            elif df is not None and len(df):
+                times, bar_days = _time_column(df), bar_dates(df)
+                for day in np.unique(bar_days):
+                    date = str(int(day))
+                    if wanted is not None and date not in wanted:
+                        continue
+                    seen.add(date)
+                    by_date.setdefault(date, []).append((code,) + frame_stats(times[bar_days == day]))
+            for date in (wanted or ()) - seen:
+                by_date.setdefault(date, []).append((code, 0, np.nan, np.nan, 0))
+        for date, entries in by_date.items():
+            codes, rows, first, last, crc = zip(*entries)
+            self.record(date, codes, np.array(rows, dtype=np.float64), np.array(first),
+                        np.array(last), np.array(crc, dtype=np.float64))
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 批量查询
+    # ─────────────────────────────────────────────────────────────────────────
+    def lookup(self, codes: Sequence[str], dates: Sequence[str], field: str = 'rows') -> np.ndarray:
+        """(n_codes, n_dates) float64，未知为 NaN"""
+        with self._lock:
+            days = [self._day(date) for date in dates]     # 先装载，磁盘上的代码才会驻留
+            ids = self.symbols.ids(codes)
+            out = np.full((len(ids), len(dates)), np.nan)
+            hit = ids >= 0
+            for j, day in enumerate(days):
+                self._grow(day)
+                out[hit, j] = day[field][ids[hit]]
+            return out
+
+    def rows(self, codes: Sequence[str], dates: Sequence[str]) -> np.ndarray:
+        """(n_codes, n_dates) int64 行数，-1 = 未知"""
+        return np.nan_to_num(self.lookup(codes, dates), nan=-1).astype(np.int64)
+
+    def covered(self, codes: Sequence[str], dates: Sequence[str], min_rows: int = 1) -> np.ndarray:
+        """(n_codes, n_dates) bool：已知且行数 >= min_rows"""
+        return self.rows(codes, dates) >= min_rows
+
+    def unknown(self, codes: Sequence[str], dates: Sequence[str]) -> List[Tuple[str, str]]:
+        """清单里没有记录、需要真正探测的 (code, date)"""
+        return self._pairs(codes, dates, self.rows(codes, dates) < 0)
+
+    def missing(self, codes: Sequence[str], dates: Sequence[str], min_rows: int = 1) -> List[Tuple[str, str]]:
+        """缺口：未知或行数不足的 (code, date)"""
+        return self._pairs(codes, dates, ~self.covered(codes, dates, min_rows))
+
+    @staticmethod
+    def _pairs(codes: Sequence[str], dates: Sequence[str], mask: np.ndarray) -> List[Tuple[str, str]]:
+        codes = list(codes)
+        return [(codes[i], dates[j]) for i, j in zip(*np.nonzero(mask))]
+
+
+# ============================================================
+# 全局单例（每周期一份）
+# ============================================================
+
+_manifests: Dict[str, CoverageManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_coverage_manifest(period: str) -> CoverageManifest:
+    """获取周期覆盖清单（线程安全）"""
+    with _manifests_lock:
+        manifest = _manifests.get(period)
+        if manifest is None:
+            manifest = _manifests[period] = CoverageManifest(period)
+        return manifest
+
+
+def probe(manifest: CoverageManifest, xtdata, codes: Iterable[str], date: str) -> None:
+    """
+    单日批量探测并登记：只读清单里未知或记为无数据的票
+    （已覆盖的结论可信；无数据的结论可能已被 QMT 客户端补齐，需要复核）
+    """
+    pending = [c for c, _ in manifest.missing(list(codes), [date])]
+    if not pending:
+        return
+    data = xtdata.get_local_data(field_list=['time'], stock_list=pending, period=manifest.period,
+                                 start_time=date, end_time=date) or {}
+    manifest.record_frames({c: data.get(c) for c in pending}, dates=[date])
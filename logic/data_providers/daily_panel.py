@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+"""
+DailyPanel - 全市场日K面板（TrueDictionary 批量装弹底座）
+
+【CTO V233 批量装弹】
+旧方案：_warmup_avg_volume_from_qmt / _warmup_ma_data / _warmup_atr_data
+        各自逐只 get_local_data，全市场 5000 只 × 3 遍，启动耗时以分钟计。
+
+新方案：
+  - 一次取齐最长窗口（open/high/low/close/volume/amount），分块批量读取，
+    单块失败才退回逐只读取（保留【CTO防爆】兜底）
+  - 各票按行数右对齐成 (n_stocks, W) 矩阵，NaN 补齐；日期矩阵同形
+  - 指标窗口 = 日期 >= 窗口起点 的后缀，与旧逐只读取
+    get_local_data(start_time=窗口起点) 的行集合完全一致
+  - 5日均量 / MA / ATR_20D / 昨收 / 5日换手 全部向量化派生，口径逐项对齐旧实现
+
+【CTO V233 增量滚动】
+  - 面板随 TrueDictionary 日缓存落盘；次日只读缓存日之后的新K线，
+    append_bars 追加到各票行尾，trim 丢弃整列早于窗口起点的旧列，
+    新进池的票才整窗读取。派生结果与整窗重读逐项一致。
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.1
+"""
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_BEIJING_OFFSET_MS = 8 * 3600 * 1000
+
+
+def bar_dates(df: pd.DataFrame) -> np.ndarray:
+    """日K行 → YYYYMMDD 整数（优先 time 列毫秒时间戳，否则取索引前8位）"""
+    if 'time' in df.columns:
+        ms = df['time'].to_numpy(dtype=np.int64) + _BEIJING_OFFSET_MS
+        days = ms.astype('datetime64[ms]').astype('datetime64[D]')
+        years = days.astype('datetime64[Y]').astype(np.int64) + 1970
+        months = days.astype('datetime64[M]').astype(np.int64) % 12 + 1
+        mdays = (days - days.astype('datetime64[M]')).astype(np.int64) + 1
+        return years * 10000 + months * 100 + mdays
+    return np.array([int(str(t)[:8]) for t in df.index], dtype=np.int64)
+
+
+class DailyPanel:
+    """
+    右对齐日K面板
+
+    属性:
+        codes: 行顺序的股票代码
+        dates: (n, W) int64，YYYYMMDD，补齐位为 0
+        values: {field: (n, W) float64}，补齐位为 NaN
+    """
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume', 'amount')
+    CHUNK_SIZE = 500
+
+    def __init__(self, codes: Sequence[str], dates: np.ndarray, values: Dict[str, np.ndarray]):
+        self.codes = list(codes)
+        self.index = {c: i for i, c in enumerate(self.codes)}
+        self.dates = dates
+        self.values = values
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 构造
+    # ─────────────────────────────────────────────────────────────────────────
+    @classmethod
+    def from_frames(cls, codes: Sequence[str], frames: Dict[str, pd.DataFrame],
+                    fields: Sequence[str] = FIELDS) -> 'DailyPanel':
+        """{code: 日K DataFrame} → 右对齐面板（无数据的票整行补齐）"""
+        codes = list(codes)
+        usable = {c: df for c, df in frames.items() if df is not None and len(df) > 0}
+        width = max((len(df) for df in usable.values()), default=0)
+        n = len(codes)
+        dates = np.zeros((n, width), dtype=np.int64)
+        values = {f: np.full((n, width), np.nan) for f in fields}
+        for i, code in enumerate(codes):
+            df = usable.get(code)
+            if df is None:
+                continue
+            k = len(df)
+            dates[i, width - k:] = bar_dates(df)
+            for f in fields:
+                if f in df.columns:
+                    values[f][i, width - k:] = df[f].to_numpy(dtype=np.float64, na_value=np.nan)
+        return cls(codes, dates, values)
+
+    @classmethod
+    def read(cls, stock_list: Sequence[str], start_date: str, end_date: str,
+             chunk_size: Optional[int] = None) -> 'DailyPanel':
+        """分块批量读取 QMT 本地日K（单块异常退回逐只读取）"""
+        codes = list(dict.fromkeys(stock_list))
+        return cls.from_frames(codes, cls.fetch_frames(codes, start_date, end_date, chunk_size))
+
+    @classmethod
+    def fetch_frames(cls, codes: Sequence[str], start_date: str, end_date: str,
+                     chunk_size: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """分块批量 get_local_data(period='1d')，返回 {code: DataFrame}"""
+        from xtquant import xtdata
+
+        codes = list(codes)
+        chunk_size = chunk_size or cls.CHUNK_SIZE
+        field_list = ['time'] + list(cls.FIELDS)
+        frames: Dict[str, pd.DataFrame] = {}
+
+        def fetch(chunk: List[str]) -> Dict[str, pd.DataFrame]:
+            return xtdata.get_local_data(
+                field_list=field_list,
+                stock_list=chunk,
+                period='1d',
+                start_time=start_date,
+                end_time=end_date
+            ) or {}
+
+        for i in range(0, len(codes), chunk_size):
+            chunk = codes[i:i + chunk_size]
+            try:
+                frames.update(fetch(chunk))
+            except Exception as e:
+                logger.warning(f"[WARN] [DailyPanel] 日K分块读取失败，退回逐只读取: {e}")
+                for code in chunk:
+                    try:
+                        frames.update(fetch([code]))
+                    except Exception:
+                        # 有毒的票直接跳过！
+                        continue
+        return frames
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], codes: Sequence[str],
+                    fields: Sequence[str] = FIELDS) -> 'DailyPanel':
+        """缓存数组 → 面板（panel_dates / panel_<field>，可为 memmap）"""
+        return cls(codes, arrays['panel_dates'], {f: arrays[f'panel_{f}'] for f in fields})
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """面板 → 缓存数组"""
+        arrays = {'panel_dates': self.dates}
+        arrays.update({f'panel_{f}': v for f, v in self.values.items()})
+        return arrays
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 增量滚动
+    # ─────────────────────────────────────────────────────────────────────────
+    def select(self, codes: Sequence[str]) -> 'DailyPanel':
+        """按 codes 重排行，面板中没有的票整行补齐"""
+        codes = list(codes)
+        n, width = len(codes), self.width
+        dates = np.zeros((n, width), dtype=np.int64)
+        values = {f: np.full((n, width), np.nan) for f in self.values}
+        src = np.array([self.index.get(c, -1) for c in codes], dtype=np.int64)
+        hit = np.flatnonzero(src >= 0)
+        dates[hit] = self.dates[src[hit]]
+        for f, v in self.values.items():
+            values[f][hit] = v[src[hit]]
+        return DailyPanel(codes, dates, values)
+
+    def last_dates(self) -> np.ndarray:
+        """每票最后一行日期（无数据为 0）"""
+        return self.dates[:, -1] if self.width else np.zeros(len(self.codes), dtype=np.int64)
+
+    def append_bars(self, frames: Dict[str, pd.DataFrame]) -> 'DailyPanel':
+        """
+        追加新K线：每票只取日期晚于其最后一行的 bar，接到行尾（保持右对齐）
+        """
+        last = self.last_dates()
+        new_rows: Dict[int, pd.DataFrame] = {}
+        for code, df in frames.items():
+            i = self.index.get(code)
+            if i is None or df is None or len(df) == 0:
+                continue
+            fresh = df[bar_dates(df) > last[i]]
+            if len(fresh):
+                new_rows[i] = fresh
+        if not new_rows:
+            return self
+
+        extra = max(len(df) for df in new_rows.values())
+        n, width = len(self.codes), self.width + extra
+        dates = np.zeros((n, width), dtype=np.int64)
+        values = {f: np.full((n, width), np.nan) for f in self.values}
+        dates[:, extra:] = self.dates
+        for f, v in self.values.items():
+            values[f][:, extra:] = v
+        for i, df in new_rows.items():
+            k = len(df)
+            dates[i, extra - k:width - k] = self.dates[i]
+            dates[i, width - k:] = bar_dates(df)
+            for f, v in self.values.items():
+                values[f][i, extra - k:width - k] = v[i]
+                values[f][i, width - k:] = (df[f].to_numpy(dtype=np.float64, na_value=np.nan)
+                                            if f in df.columns else np.nan)
+        return DailyPanel(self.codes, dates, values)
+
+    def replace_rows(self, other: 'DailyPanel') -> 'DailyPanel':
+        """用 other 中的行整体替换同代码行（新进池票整窗重读后并入）"""
+        width = max(self.width, other.width)
+        base = self._pad_left(width)
+        incoming = other._pad_left(width)
+        for j, code in enumerate(other.codes):
+            i = base.index.get(code)
+            if i is None:
+                continue
+            base.dates[i] = incoming.dates[j]
+            for f in base.values:
+                base.values[f][i] = incoming.values[f][j]
+        return base
+
+    def _pad_left(self, width: int) -> 'DailyPanel':
+        """左侧补齐到 width 列（返回可写副本）"""
+        pad = width - self.width
+        dates = np.zeros((len(self.codes), width), dtype=np.int64)
+        dates[:, pad:] = self.dates
+        values = {}
+        for f, v in self.values.items():
+            values[f] = np.full((len(self.codes), width), np.nan)
+            values[f][:, pad:] = v
+        return DailyPanel(self.codes, dates, values)
+
+    def trim(self, start_date: str) -> 'DailyPanel':
+        """丢弃所有票都早于 start_date（或为补齐位）的前导列"""
+        keep = (self.dates >= int(start_date)).any(axis=0)
+        first = int(np.argmax(keep)) if keep.any() else self.width
+        if first == 0:
+            return self
+        return DailyPanel(self.codes, self.dates[:, first:],
+                          {f: v[:, first:] for f, v in self.values.items()})
+
+    def until(self, end_date: str) -> 'DailyPanel':
+        """
+        截断到 end_date：丢弃各票晚于 end_date 的尾部行并重新右对齐
+        （区间预计算一次读取整段面板后，逐日切出"当日视角"的面板）
+        """
+        if not self.width:
+            return self
+        drop = (self.dates > int(end_date)).sum(axis=1)
+        if not drop.any():
+            return self
+        src = np.arange(self.width)[None, :] - drop[:, None]
+        valid = src >= 0
+        src = np.maximum(src, 0)
+        dates = np.where(valid, np.take_along_axis(self.dates, src, axis=1), 0)
+        values = {f: np.where(valid, np.take_along_axis(v, src, axis=1), np.nan)
+                  for f, v in self.values.items()}
+        panel = DailyPanel(self.codes, dates, values)
+        keep = (dates > 0).any(axis=0)
+        first = int(np.argmax(keep)) if keep.any() else panel.width
+        if first == 0:
+            return panel
+        return DailyPanel(self.codes, dates[:, first:], {f: v[:, first:] for f, v in values.items()})
+
+    def roll_forward(self, stock_list: Sequence[str], since_date: str,
+                     start_date: str, end_date: str) -> 'DailyPanel':
+        """
+        由缓存日面板滚动到 end_date：已知票只读 (since_date, end_date] 的新K线，
+        新进池票整窗读取 [start_date, end_date]；缓存面板里整行为空（当时本地缺K线）
+        的票同样整窗重读，补下载后的历史K线才能进窗
+        """
+        codes = list(dict.fromkeys(stock_list))
+        has_bars = self.last_dates() > 0
+        known = [c for c in codes if c in self.index and has_bars[self.index[c]]]
+        known_set = set(known)
+        fresh = [c for c in codes if c not in known_set]
+        panel = self.select(codes).append_bars(self.fetch_frames(known, since_date, end_date))
+        if fresh:
+            panel = panel.replace_rows(DailyPanel.read(fresh, start_date, end_date))
+        return panel.trim(start_date)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 窗口
+    # ─────────────────────────────────────────────────────────────────────────
+    @property
+    def width(self) -> int:
+        return self.dates.shape[1]
+
+    def window_counts(self, start_date: str) -> np.ndarray:
+        """每票落在 [start_date, 末行] 的行数（右对齐后即后缀长度）"""
+        return (self.dates >= int(start_date)).sum(axis=1)
+
+    def _tail_mask(self, k: np.ndarray) -> np.ndarray:
+        """每行最后 k[i] 列为 True"""
+        cols = np.arange(self.width)
+        return cols[None, :] >= (self.width - k)[:, None]
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 向量化派生（口径对齐旧逐只实现）
+    # ─────────────────────────────────────────────────────────────────────────
+    def avg_volume(self, start_date: str, days: int = 5) -> np.ndarray:
+        """
+        窗口内最近 days 行成交量均值（手），同 df['volume'].tail(days).mean()：
+        NaN 跳过，全缺失为 NaN
+        """
+        n_w = self.window_counts(start_date)
+        vol = self.values['volume']
+        mask = self._tail_mask(np.minimum(days, n_w)) & ~np.isnan(vol)
+        total = np.where(mask, vol, 0.0).sum(axis=1)
+        count = mask.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+    def avg_turnover(self, start_date: str, float_volume: np.ndarray, days: int = 5) -> np.ndarray:
+        """
+        窗口内最近 days 行换手率均值(%)，同旧 get_avg_turnover_5d：
+        amount / (float_volume × close) × 100，NaN 跳过；流通股本<=0 或结果非有限为 NaN
+        """
+        n_w = self.window_counts(start_date)
+        fv = np.asarray(float_volume, dtype=np.float64)[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = self.values['amount'] / (fv * self.values['close']) * 100
+        mask = self._tail_mask(np.minimum(days, n_w)) & ~np.isnan(rate)
+        total = np.where(mask, rate, 0.0).sum(axis=1)
+        count = mask.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+        return np.where(np.isfinite(out) & (fv[:, 0] > 0), out, np.nan)
+
+    def moving_averages(self, start_date: str) -> Dict[str, np.ndarray]:
+        """
+        MA5/MA10/MA20/最新收盘，同旧 _warmup_ma_data：
+        窗口内不足5行无效；不足10/20行分别退化为 MA5/MA10；NaN 传播
+        """
+        n_w = self.window_counts(start_date)
+        close = self.values['close']
+        filled = np.nan_to_num(close, nan=0.0)
+        nan_pos = np.isnan(close)
+
+        def tail_mean(k: int) -> np.ndarray:
+            mask = self._tail_mask(np.minimum(k, n_w))
+            total = np.where(mask, filled, 0.0).sum(axis=1)
+            has_nan = (mask & nan_pos).any(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                out = total / np.minimum(k, n_w)
+            return np.where(has_nan, np.nan, out)
+
+        ma5 = tail_mean(5)
+        ma10 = np.where(n_w >= 10, tail_mean(10), ma5)
+        ma20 = np.where(n_w >= 20, tail_mean(20), ma10)
+        last = close[:, -1] if self.width else np.full(len(self.codes), np.nan)
+        return {'ma5': ma5, 'ma10': ma10, 'ma20': ma20, 'close': last, 'valid': n_w >= 5}
+
+    def atr(self, start_date: str) -> Dict[str, np.ndarray]:
+        """
+        ATR_20D = 窗口内 (High - Low) / Pre_Close 的均值，同旧 _warmup_atr_data：
+        Pre_Close 为上一行收盘，窗口首行用当日开盘；前收为0视为无效；
+        窗口不足5行或有效点不足5个无效
+        """
+        n = len(self.codes)
+        if not self.width:
+            empty = np.full(n, np.nan)
+            return {'atr': empty, 'prev_close': empty, 'valid': np.zeros(n, dtype=bool)}
+
+        n_w = self.window_counts(start_date)
+        high, low = self.values['high'], self.values['low']
+        close, open_ = self.values['close'], self.values['open']
+
+        pre_close = np.full_like(close, np.nan)
+        pre_close[:, 1:] = close[:, :-1]
+        first = self.width - n_w
+        rows = np.flatnonzero(n_w > 0)
+        pre_close[rows, first[rows]] = open_[rows, first[rows]]
+        pre_close[pre_close == 0] = np.nan
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            tr = (high - low) / pre_close
+        mask = self._tail_mask(n_w) & ~np.isnan(tr)
+        count = mask.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            atr = np.where(mask, tr, 0.0).sum(axis=1) / count
+        valid = (n_w >= 5) & (count >= 5) & (atr > 0)
+        return {'atr': atr, 'prev_close': close[:, -1], 'valid': valid}
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+DownloadPipeline - 投递 / 落盘轮询 / 验证三段流水线（异步 download_history_data 专用）
+
+【CTO V233 流水线下载】
+旧方案：tools/smart_download.py 投递完一批后固定 sleep(1.5)/sleep(2)/sleep(3) 再读本地，
+        猜的等待要么白等、要么没等够；落盘只抽样 5~20 只，分K 500只一批串行投递，
+        日与日之间再固定睡 2 秒。
+
+新方案：
+  - 投递：workers 个线程持续投递，在途（已投递未落盘）上限 max_inflight，形成背压
+  - 轮询：主线程按批 get_local_data 检查在途项，本轮有新落盘 → 间隔回到 poll_min，
+          没有 → 间隔翻倍封顶 poll_max；没有任何固定等待
+  - 验证：轮询读回即验证，行数达标才算落盘，读回结果登记覆盖清单
+  - 超时：单项截止 = clamp(latency_factor × 已观测落盘延迟 p95, timeout_min, timeout)，
+          到期重投 max_reissue 次，仍不落盘记入 incomplete（清单保持未知，不当作确认无数据）
+  - 优先级：传入 CoverageManifest 时已覆盖项直接跳过，清单未知的缺口先投，已知无数据的排最后
+
+与 DownloadScheduler 的区别：后者假设下载接口同步返回即落盘（按批重试）；
+本流水线不做此假设，以本地数据层为准判定完成。
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from logic.data_providers.download_scheduler import MIN_COUNT
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadItem(NamedTuple):
+    """一个下载单元：单票 × [start, end]"""
+
+    code: str
+    start: str
+    end: str
+
+
+@dataclass
+class PipelineReport:
+    """流水线结果：results 为已落盘项行数，incomplete 为未完成项及原因"""
+
+    total: int = 0
+    skipped: int = 0
+    issued: int = 0
+    reissued: int = 0
+    landed: int = 0
+    rows: int = 0
+    polls: int = 0
+    elapsed: float = 0.0
+    results: Dict[DownloadItem, int] = field(default_factory=dict)
+    incomplete: Dict[DownloadItem, str] = field(default_factory=dict)
+
+    @property
+    def done(self) -> int:
+        return self.skipped + self.landed + len(self.incomplete)
+
+    @property
+    def items_per_sec(self) -> float:
+        return self.landed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f'{self.done}/{self.total} | 落盘{self.landed} 已覆盖{self.skipped} '
+                f'未完成{len(self.incomplete)} | 投递{self.issued} 重投{self.reissued} 轮询{self.polls} | '
+                f'{self.elapsed:.1f}s ({self.items_per_sec:.1f}项/s, {self.rows_per_sec:.0f}条/s)')
+
+
+class DownloadPipeline:
+    """
+    用法:
+        pipeline = DownloadPipeline(xtdata, 'tick', manifest=get_coverage_manifest('tick'))
+        report = pipeline.run(DownloadItem(c, d, d) for d in dates for c in codes)
+        report.incomplete
+    """
+
+    def __init__(
+        self,
+        xtdata,
+        period: str,
+        workers: int = 8,
+        max_inflight: int = 2000,
+        poll_batch: int = 200,
+        poll_min: float = 0.05,
+        poll_max: float = 2.0,
+        timeout: float = 30.0,
+        timeout_min: float = 2.0,
+        latency_factor: float = 4.0,
+        max_reissue: int = 1,
+        manifest=None,
+        progress_interval: float = 5.0,
+        on_progress: Optional[Callable[[PipelineReport], None]] = None,
+    ):
+        self.xtdata = xtdata
+        self.period = period
+        self.workers = max(1, int(workers))
+        self.max_inflight = max(1, int(max_inflight))
+        self.poll_batch = max(1, int(poll_batch))
+        self.poll_min = poll_min
+        self.poll_max = poll_max
+        self.timeout = timeout
+        self.timeout_min = timeout_min
+        self.latency_factor = latency_factor
+        self.max_reissue = max(0, int(max_reissue))
+        self.manifest = manifest
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress
+        self.min_rows = MIN_COUNT.get(period, 0) + 1
+        self.report = PipelineReport()
+        self._latencies: List[float] = []      # 跨 run 保留：同一实例复用时截止时间直接自适应
+        self._lock = threading.Lock()
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 入口
+    # ─────────────────────────────────────────────────────────────────────────
+    def run(self, items: Iterable[Tuple[str, str, str]], skip_covered: bool = True) -> PipelineReport:
+        items = list(dict.fromkeys(DownloadItem(*it) for it in items))
+        self.report = report = PipelineReport(total=len(items))
+        queue = self._plan(items, skip_covered)
+        self._inflight: 'OrderedDict[DownloadItem, Tuple[float, int]]' = OrderedDict()
+        self._issuing = 0
+        self._issue_errors: List[Tuple[DownloadItem, int, str]] = []
+        t0 = last_report = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='qmt-pipe') as pool:
+            interval = self.poll_min
+            while True:
+                # 1. 补投：在途未满就从队列取（重投项已插回队首）
+                with self._lock:
+                    room = self.max_inflight - self._issuing - len(self._inflight)
+                    batch, queue = queue[:max(0, room)], queue[max(0, room):]
+                    self._issuing += len(batch)
+                for item, attempt in batch:
+                    report.issued += 1
+                    pool.submit(self._issue, item, attempt)
+
+                # 2. 投递异常：还有重投额度就插回队首，否则记未完成
+                with self._lock:
+                    errors, self._issue_errors = self._issue_errors, []
+                retry = []
+                for item, attempt, err in errors:
+                    if attempt <= self.max_reissue:
+                        report.reissued += 1
+                        retry.append((item, attempt + 1))
+                    else:
+                        report.incomplete[item] = f'投递失败: {err}'
+
+                # 3. 轮询落盘
+                landed, expired = self._poll()
+                for item, attempt in expired:
+                    if attempt <= self.max_reissue:
+                        report.reissued += 1
+                        retry.append((item, attempt + 1))
+                    else:
+                        report.incomplete[item] = '超时未落盘'
+                queue = retry + queue
+
+                now = time.perf_counter()
+                report.elapsed = now - t0
+                if now - last_report >= self.progress_interval:
+                    last_report = now
+                    self._progress()
+                with self._lock:
+                    if not queue and not self._issuing and not self._inflight:
+                        break
+                interval = self.poll_min if landed else min(self.poll_max, interval * 2)
+                time.sleep(interval)
+
+        if self.manifest is not None:
+            self.manifest.flush()
+        report.elapsed = time.perf_counter() - t0
+        self._progress()
+        if report.incomplete:
+            sample = ', '.join(f'{i.code}@{i.end}' for i in list(report.incomplete)[:10])
+            logger.warning(f'[WARN] [DownloadPipeline] {self.period} 未完成 {len(report.incomplete)} 项: {sample}'
+                           f'{" ..." if len(report.incomplete) > 10 else ""}')
+        return report
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 计划 / 投递 / 轮询
+    # ─────────────────────────────────────────────────────────────────────────
+    def _plan(self, items: List[DownloadItem], skip_covered: bool) -> List[Tuple[DownloadItem, int]]:
+        """清单排序：已覆盖跳过 → 未知缺口 → 已知无数据；区间项清单无从判断，按原序排在未知之后"""
+        if self.manifest is None:
+            return [(item, 1) for item in items]
+        unknown, ranged, empty = [], [], []
+        by_date: Dict[str, List[DownloadItem]] = {}
+        for item in items:
+            if item.start == item.end:
+                by_date.setdefault(item.end, []).append(item)
+            else:
+                ranged.append(item)
+        rank = {}
+        for date, group in by_date.items():
+            rows = self.manifest.rows([i.code for i in group], [date])[:, 0]
+            for item, n in zip(group, rows):
+                rank[item] = n
+        for item in items:
+            n = rank.get(item)
+            if n is None:
+                continue
+            if n >= self.min_rows and skip_covered:
+                self.report.skipped += 1
+                self.report.results[item] = int(n)
+            elif n < 0:
+                unknown.append(item)
+            else:
+                empty.append(item)
+        return [(item, 1) for item in unknown + ranged + empty]
+
+    def _issue(self, item: DownloadItem, attempt: int) -> None:
+        try:
+            self.xtdata.download_history_data(item.code, self.period, start_time=item.start, end_time=item.end)
+        except Exception as e:
+            with self._lock:
+                self._issuing -= 1
+                self._issue_errors.append((item, attempt, str(e)))
+            return
+        with self._lock:
+            self._issuing -= 1
+            self._inflight[item] = (time.perf_counter(), attempt)
+
+    def _deadline(self) -> float:
+        """单项落盘等待上限：观测到足够样本后按 p95 延迟自适应"""
+        if len(self._latencies) < 20:
+            return self.timeout
+        p95 = float(np.percentile(self._latencies[-500:], 95))
+        del self._latencies[:-500]
+        return min(self.timeout, max(self.timeout_min, self.latency_factor * p95))
+
+    def _poll(self) -> Tuple[int, List[Tuple[DownloadItem, int]]]:
+        """读一轮在途项：返回 (本轮落盘数, 超时项)"""
+        with self._lock:
+            snapshot = list(self._inflight.items())
+        groups: Dict[Tuple[str, str], List[DownloadItem]] = {}
+        for item, _ in snapshot:
+            groups.setdefault((item.start, item.end), []).append(item)
+
+        landed = 0
+        for (start, end), group in groups.items():
+            for i in range(0, len(group), self.poll_batch):
+                chunk = group[i:i + self.poll_batch]
+                try:
+                    data = self.xtdata.get_local_data(field_list=['time'], stock_list=[c.code for c in chunk],
+                                                      period=self.period, start_time=start, end_time=end) or {}
+                except Exception as e:
+                    logger.debug(f'[DownloadPipeline] 轮询读回失败: {e}')
+                    continue
+                self.report.polls += 1
+                now = time.perf_counter()
+                hit = {}
+                for item in chunk:
+                    df = data.get(item.code)
+                    n = len(df) if df is not None else 0
+                    if n >= self.min_rows:
+                        hit[item.code] = df
+                        with self._lock:
+                            issued_at, _ = self._inflight.pop(item)
+                        self._latencies.append(now - issued_at)
+                        self.report.results[item] = n
+                        self.report.landed += 1
+                        self.report.rows += n
+                        landed += 1
+                if hit and self.manifest is not None:
+                    self.manifest.record_frames(hit, dates=[end] if start == end else None)
+
+        deadline = self._deadline()
+        now = time.perf_counter()
+        expired = []
+        with self._lock:
+            for item, (issued_at, attempt) in list(self._inflight.items()):
+                if now - issued_at > deadline:
+                    del self._inflight[item]
+                    expired.append((item, attempt))
+        return landed, expired
+
+    def _progress(self) -> None:
+        logger.info(f'[STATS] [DownloadPipeline] {self.period} {self.report.summary()}')
+        if self.on_progress is not None:
+            self.on_progress(self.report)
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+DownloadScheduler - 有界并发 + 批量合并 + 退避重试的 QMT 历史数据下载调度器
+
+【CTO V233 并发下载】
+旧方案：QmtDataManager.download_tick_data 逐只串行 "查存在 → download_history_data → 读回验证"，
+        每只3次往返 + 固定 sleep；main.py download 的 --workers 形同虚设，
+        200只一批串行下、批间再睡2秒，多月 Tick 回补被往返延迟卡死而不是带宽。
+
+新方案：
+  - 存在性检查 / 下载 / 读回验证全部按批合并：一批一次 get_local_data，
+    有 download_history_data2 时一批一次下载请求，否则批内逐只
+  - 批任务投入 workers 个线程的有界池，同时在途请求数 = workers
+  - 批级异常按指数退避（带抖动）重试，耗尽后拆成逐只各自重试，毒票不连坐整批
+  - 下载成功但读回为空（停牌/超限/无权限）不重试，直接记失败
+  - 每 progress_interval 秒输出一次进度：完成数 / 只每秒 / 条每秒 / 重试数 / ETA
+  - 【CTO V233 覆盖清单】传入 CoverageManifest 时，单日请求先查清单，已覆盖的票零读取跳过，
+    只有清单未知的票才批量探测；读回结果一律登记进清单
+
+xtdata 以构造参数注入，单元测试用带延迟、随机失败的假 xtdata 驱动。
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from logic.data_providers.qmt_manager import TICK_VALID_MIN_COUNT
+
+logger = logging.getLogger(__name__)
+
+# 有效性门槛：行数须 > 门槛（Tick 直接取 qmt_manager 的常量，K线只要有数据）
+MIN_COUNT = {'tick': TICK_VALID_MIN_COUNT}
+
+
+@dataclass
+class DownloadStats:
+    """调度进度统计（线程安全由调度器加锁保证）"""
+
+    total: int = 0
+    skipped: int = 0
+    success: int = 0
+    failed: int = 0
+    retries: int = 0
+    records: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def done(self) -> int:
+        return self.skipped + self.success + self.failed
+
+    @property
+    def stocks_per_sec(self) -> float:
+        return (self.success + self.failed) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def records_per_sec(self) -> float:
+        return self.records / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float:
+        rate = self.stocks_per_sec
+        return (self.total - self.done) / rate if rate > 0 else 0.0
+
+
+class DownloadScheduler:
+    """
+    用法:
+        scheduler = DownloadScheduler(xtdata, workers=8)
+        results = scheduler.run(stock_list, 'tick', '20260318', '20260318')
+        scheduler.stats.records_per_sec
+    """
+
+    def __init__(
+        self,
+        xtdata,
+        workers: int = 4,
+        batch_size: int = 50,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        backoff_max: float = 8.0,
+        progress_interval: float = 5.0,
+        on_progress: Optional[Callable[[DownloadStats], None]] = None,
+        manifest=None,
+    ):
+        self.xtdata = xtdata
+        self.workers = max(1, int(workers))
+        self.batch_size = max(1, int(batch_size))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress
+        self.manifest = manifest
+        self.stats = DownloadStats()
+        self._lock = threading.Lock()
+        self._t0 = 0.0
+        self._last_report = 0.0
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 入口
+    # ─────────────────────────────────────────────────────────────────────────
+    def run(self, stock_list: Sequence[str], period: str, start_time: str, end_time: str,
+            check_existing: bool = True) -> Dict[str, 'DownloadResult']:
+        """
+        下载 stock_list 在 [start_time, end_time] 的 period 数据
+
+        Returns:
+            {stock_code: DownloadResult}，顺序同 stock_list
+        """
+        from logic.data_providers.qmt_manager import DownloadResult
+
+        codes = list(dict.fromkeys(stock_list))
+        self.stats = DownloadStats(total=len(codes))
+        self._t0 = self._last_report = time.perf_counter()
+        results: Dict[str, DownloadResult] = {}
+        if not codes:
+            return results
+
+        batches = [codes[i:i + self.batch_size] for i in range(0, len(codes), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='qmt-dl') as pool:
+            futures = [pool.submit(self._run_batch, batch, period, start_time, end_time, check_existing)
+                       for batch in batches]
+            for future in as_completed(futures):
+                results.update(future.result())
+        if self.manifest is not None:
+            self.manifest.flush()
+
+        self._tick(force=True)
+        s = self.stats
+        logger.info(f'[OK] [DownloadScheduler] {period} {start_time}~{end_time} 完成 '
+                    f'成功{s.success} 已存在{s.skipped} 失败{s.failed} 重试{s.retries} | '
+                    f'{s.records}条 {s.elapsed:.1f}s ({s.stocks_per_sec:.1f}只/s, {s.records_per_sec:.0f}条/s)')
+        return {c: results[c] for c in codes}
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 批任务
+    # ─────────────────────────────────────────────────────────────────────────
+    def _run_batch(self, batch: List[str], period: str, start_time: str, end_time: str,
+                   check_existing: bool) -> Dict[str, 'DownloadResult']:
+        from logic.data_providers.qmt_manager import DownloadResult
+
+        results: Dict[str, DownloadResult] = {}
+        pending = batch
+        if check_existing:
+            counts = {}
+            probe = batch
+            if self.manifest is not None and start_time == end_time:
+                # 清单已知的直接用清单行数，未知的才读本地
+                known = self.manifest.rows(batch, [start_time])[:, 0]
+                counts = {c: int(n) for c, n in zip(batch, known) if n >= 0}
+                probe = [c for c in batch if c not in counts]
+            if probe:
+                counts.update(self._safe_counts(probe, period, start_time, end_time))
+            pending = []
+            for code in batch:
+                n = counts.get(code, 0)
+                if n >= self._min_count(period):
+                    results[code] = DownloadResult(success=True, stock_code=code, period=period,
+                                                   record_count=n, message=f'已存在 ({n}条)')
+                else:
+                    pending.append(code)
+            self._account(skipped=len(batch) - len(pending))
+        if not pending:
+            return results
+
+        try:
+            self._with_retry(lambda: self._download(pending, period, start_time, end_time),
+                             f'{len(pending)}只批')
+            targets = [pending]
+        except Exception as e:
+            # 整批重试耗尽：拆成逐只各自重试，毒票不连坐
+            logger.warning(f'[WARN] [DownloadScheduler] 批下载失败，拆分逐只重试: {e}')
+            downloaded = []
+            for code in pending:
+                try:
+                    self._with_retry(lambda c=code: self._download([c], period, start_time, end_time), code)
+                    downloaded.append(code)
+                except Exception as single:
+                    results[code] = DownloadResult(success=False, stock_code=code, period=period,
+                                                   error=str(single))
+                    self._account(failed=1)
+            targets = [downloaded] if downloaded else []
+
+        for group in targets:
+            counts = self._safe_counts(group, period, start_time, end_time)
+            for code in group:
+                n = counts.get(code, 0)
+                if n >= self._min_count(period):
+                    results[code] = DownloadResult(success=True, stock_code=code, period=period,
+                                                   record_count=n, message=f'成功 ({n}条)',
+                                                   downloaded=True)
+                    self._account(success=1, records=n)
+                else:
+                    results[code] = DownloadResult(success=False, stock_code=code, period=period,
+                                                   message='获取空数据 (可能停牌/超限/无权限)')
+                    self._account(failed=1)
+        return results
+
+    def _download(self, codes: List[str], period: str, start_time: str, end_time: str) -> None:
+        """有批量接口一次请求整批，否则批内逐只（同步阻塞，返回即落盘）"""
+        batch_api = getattr(self.xtdata, 'download_history_data2', None)
+        if batch_api is not None and len(codes) > 1:
+            batch_api(stock_list=codes, period=period, start_time=start_time, end_time=end_time)
+            return
+        for code in codes:
+            self.xtdata.download_history_data(stock_code=code, period=period,
+                                              start_time=start_time, end_time=end_time)
+
+    def _counts(self, codes: List[str], period: str, start_time: str, end_time: str) -> Dict[str, int]:
+        """一次 get_local_data 读回整批行数（顺手登记覆盖清单）"""
+        data = self.xtdata.get_local_data(field_list=['time'], stock_list=codes, period=period,
+                                          start_time=start_time, end_time=end_time) or {}
+        if self.manifest is not None:
+            dates = [start_time] if start_time == end_time else None
+            self.manifest.record_frames({c: data.get(c) for c in codes}, dates=dates)
+        return {c: len(df) for c, df in data.items() if df is not None}
+
+    def _safe_counts(self, codes: List[str], period: str, start_time: str, end_time: str) -> Dict[str, int]:
+        try:
+            return self._with_retry(lambda: self._counts(codes, period, start_time, end_time),
+                                    f'{len(codes)}只读回')
+        except Exception as e:
+            logger.warning(f'[WARN] [DownloadScheduler] 本地读回失败，按无数据处理: {e}')
+            return {}
+
+    @staticmethod
+    def _min_count(period: str) -> int:
+        return MIN_COUNT.get(period, 0) + 1
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 重试 / 进度
+    # ─────────────────────────────────────────────────────────────────────────
+    def _with_retry(self, fn: Callable, label: str):
+        """指数退避 + 抖动：backoff × 2^k × [0.5, 1.5)，封顶 backoff_max"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return fn()
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = min(self.backoff_max, self.backoff * (2 ** attempt)) * (0.5 + random.random())
+                self._account(retries=1)
+                logger.debug(f'[DownloadScheduler] {label} 第{attempt + 1}次失败({e})，{delay:.2f}s后重试')
+                time.sleep(delay)
+
+    def _account(self, **deltas) -> None:
+        with self._lock:
+            for name, value in deltas.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+        self._tick()
+
+    def _tick(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            self.stats.elapsed = now - self._t0
+            if not force and now - self._last_report < self.progress_interval:
+                return
+            self._last_report = now
+            s = DownloadStats(**vars(self.stats))
+        logger.info(f'[STATS] [DownloadScheduler] {s.done}/{s.total} '
+                    f'| {s.stocks_per_sec:.1f}只/s {s.records_per_sec:.0f}条/s '
+                    f'| 失败{s.failed} 重试{s.retries} | ETA {s.eta:.0f}s')
+        if self.on_progress is not None:
+            self.on_progress(s)
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+InstrumentMaster - 全市场合约主表（按交易日落盘，变更检测）
+
+【CTO V233 合约主表】
+旧方案：UniverseBuilder 漏斗1 每次建池对全市场逐只 get_instrument_detail（约5000次），
+        实盘每15分钟刷新、回测每个交易日都重复一遍，只为判 ST/退市。
+
+新方案：
+  - 每个交易日一次批量刷新：代码 / 名称 / ST标记 / 上市日 / 流通股本 / 总股本 /
+    涨跌停价 / 涨跌幅限制，列式存为 data/cache/instrument_master_{date}.tdc
+    （复用 TrueDictCache 二进制格式，可内存映射）
+  - 此后同日任何建池只读一次文件，过滤全部为 numpy 掩码
+  - 刷新时与最近一份旧表比对：新上市 / 退市 / ST 摘戴帽 / 股本变动，写入元数据并告警
+
+量纲：流通股本 / 总股本统一为"股"（QMT 返回万股时 ×10000，同 TrueDictionary）
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from logic.data_providers.true_dict_cache import TrueDictCache
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'instrument_master'
+BJ_PREFIXES = ('43', '83', '87', '88')   # 同漏斗1北交所口径
+
+
+def _detail_get(detail, key, default=None):
+    if hasattr(detail, 'get'):
+        return detail.get(key, default)
+    return getattr(detail, key, default)
+
+
+def _to_shares(raw) -> float:
+    """QMT 股本 → 股（万股 ×10000；大于1亿视为已是股，同 TrueDictionary）"""
+    try:
+        raw = float(raw or 0)
+    except (TypeError, ValueError):
+        return np.nan
+    if raw <= 0:
+        return np.nan
+    return raw if raw > 1e8 else raw * 10000
+
+
+def is_st_name(name: str) -> bool:
+    """ST / *ST / 退市整理 / 摘牌 均视为 ST"""
+    return 'ST' in name.upper() or '退' in name or '摘' in name
+
+
+def limit_pct(code: str, is_st: bool) -> float:
+    """涨跌幅限制：北交所30%，科创板/创业板20%，主板ST 5%，主板10%"""
+    head = code.split('.')[0]
+    if head[:2] in BJ_PREFIXES or head.startswith('92'):
+        return 0.30
+    if head.startswith(('688', '689', '300', '301')):
+        return 0.20
+    return 0.05 if is_st else 0.10
+
+
+class InstrumentMaster:
+    """
+    列式合约主表
+
+    属性（按 codes 对齐）:
+        codes / names: str 数组
+        is_st: bool
+        open_date: int64 YYYYMMDD（未知为0）
+        float_volume / total_volume: float64 股（未知为NaN）
+        up_stop_price / down_stop_price: float64（未知为NaN）
+        limit_pct: float64
+    """
+
+    COLUMNS = ('codes', 'names', 'is_st', 'open_date', 'float_volume', 'total_volume',
+               'up_stop_price', 'down_stop_price', 'limit_pct')
+    CACHE_DIR = Path('data/cache')
+
+    def __init__(self, trade_date: str, columns: Dict[str, np.ndarray], changes: Optional[Dict] = None):
+        self.trade_date = trade_date
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+        self.index = {c: i for i, c in enumerate(self.codes.tolist())}
+        self.changes = changes or {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 构造
+    # ─────────────────────────────────────────────────────────────────────────
+    @classmethod
+    def from_details(cls, trade_date: str, codes: List[str], details: Dict[str, object]) -> 'InstrumentMaster':
+        """{code: instrument_detail} → 主表（无详情的票名称为空，视为非ST）"""
+        n = len(codes)
+        names = []
+        cols = {
+            'is_st': np.zeros(n, dtype=bool),
+            'open_date': np.zeros(n, dtype=np.int64),
+            'float_volume': np.full(n, np.nan),
+            'total_volume': np.full(n, np.nan),
+            'up_stop_price': np.full(n, np.nan),
+            'down_stop_price': np.full(n, np.nan),
+            'limit_pct': np.zeros(n),
+        }
+        for i, code in enumerate(codes):
+            detail = details.get(code)
+            name = str(_detail_get(detail, 'InstrumentName', '') or '') if detail else ''
+            names.append(name)
+            cols['is_st'][i] = is_st_name(name)
+            cols['limit_pct'][i] = limit_pct(code, cols['is_st'][i])
+            if not detail:
+                continue
+            open_date = str(_detail_get(detail, 'OpenDate', '') or '')[:8]
+            cols['open_date'][i] = int(open_date) if open_date.isdigit() else 0
+            cols['float_volume'][i] = _to_shares(_detail_get(detail, 'FloatVolume', 0))
+            cols['total_volume'][i] = _to_shares(_detail_get(detail, 'TotalVolume', 0))
+            for col, key in (('up_stop_price', 'UpStopPrice'), ('down_stop_price', 'DownStopPrice')):
+                v = _detail_get(detail, key, 0)
+                cols[col][i] = float(v) if v else np.nan
+        cols['codes'] = np.array(codes, dtype='U16')
+        cols['names'] = np.array(names, dtype='U32')
+        return cls(trade_date, cols)
+
+    @classmethod
+    def fetch(cls, trade_date: str) -> 'InstrumentMaster':
+        """一次批量刷新全市场（有批量接口用批量接口，否则单轮逐只）"""
+        from xtquant import xtdata
+
+        t0 = time.perf_counter()
+        codes = list(dict.fromkeys(xtdata.get_stock_list_in_sector('沪深A股')))
+        details = {}
+        batch = getattr(xtdata, 'get_instrument_detail_list', None)
+        if batch is not None:
+            try:
+                details = batch(codes, False) or {}
+            except Exception as e:
+                logger.warning(f'[WARN] [InstrumentMaster] 批量接口失败，退回逐只: {e}')
+        if not details:
+            for code in codes:
+                try:
+                    details[code] = xtdata.get_instrument_detail(code, False)
+                except Exception:
+                    details[code] = None
+        master = cls.from_details(trade_date, codes, details)
+        logger.info(f'[OK] [InstrumentMaster] {trade_date} 刷新 {len(codes)}只，'
+                    f'耗时 {(time.perf_counter() - t0) * 1000:.0f}ms')
+        return master
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 落盘 / 读取
+    # ─────────────────────────────────────────────────────────────────────────
+    def save(self, cache_dir: Optional[Path] = None) -> Path:
+        cache = TrueDictCache(self.trade_date, cache_dir=cache_dir or self.CACHE_DIR, prefix=PREFIX)
+        return cache.save({name: getattr(self, name) for name in self.COLUMNS},
+                          meta={'changes': self.changes, 'stock_count': len(self)})
+
+    @classmethod
+    def load(cls, trade_date: str, cache_dir: Optional[Path] = None) -> Optional['InstrumentMaster']:
+        cache = TrueDictCache(trade_date, cache_dir=cache_dir or cls.CACHE_DIR, prefix=PREFIX)
+        arrays = cache.load(mmap=False)
+        if arrays is None or any(name not in arrays for name in cls.COLUMNS):
+            return None
+        return cls(trade_date, arrays, cache.meta.get('changes'))
+
+    @classmethod
+    def latest_before(cls, trade_date: str, cache_dir: Optional[Path] = None) -> Optional['InstrumentMaster']:
+        """最近一份早于 trade_date 的主表（变更检测基准）"""
+        for date in TrueDictCache.dates(cache_dir or cls.CACHE_DIR, PREFIX):
+            if date < trade_date:
+                return cls.load(date, cache_dir)
+        return None
+
+    @classmethod
+    def get(cls, trade_date: str, cache_dir: Optional[Path] = None, refresh: bool = False) -> 'InstrumentMaster':
+        """读当日主表；不存在（或要求刷新）时批量刷新、比对旧表并落盘"""
+        if not refresh:
+            master = cls.load(trade_date, cache_dir)
+            if master is not None:
+                return master
+        master = cls.fetch(trade_date)
+        previous = cls.latest_before(trade_date, cache_dir)
+        if previous is not None:
+            master.changes = master.diff(previous)
+            master._log_changes()
+        try:
+            master.save(cache_dir)
+        except Exception as e:
+            logger.warning(f'[WARN] [InstrumentMaster] 落盘失败: {e}')
+        return master
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 变更检测
+    # ─────────────────────────────────────────────────────────────────────────
+    def diff(self, previous: 'InstrumentMaster') -> Dict:
+        """与旧表比对：新上市 / 退出 / ST 戴帽 / ST 摘帽 / 流通股本变动"""
+        old_codes = set(previous.index)
+        new_codes = set(self.index)
+        common = [c for c in self.codes.tolist() if c in old_codes]
+        i_new = np.array([self.index[c] for c in common], dtype=np.int64)
+        i_old = np.array([previous.index[c] for c in common], dtype=np.int64)
+        st_new, st_old = self.is_st[i_new], previous.is_st[i_old]
+        fv_new, fv_old = self.float_volume[i_new], previous.float_volume[i_old]
+        with np.errstate(invalid='ignore'):
+            fv_changed = ~np.isclose(fv_new, fv_old, rtol=1e-6) & ~(np.isnan(fv_new) & np.isnan(fv_old))
+        pick = lambda mask: [common[i] for i in np.flatnonzero(mask)]
+        return {
+            'base_date': previous.trade_date,
+            'listed': sorted(new_codes - old_codes),
+            'removed': sorted(old_codes - new_codes),
+            'st_added': pick(st_new & ~st_old),
+            'st_removed': pick(~st_new & st_old),
+            'float_changed': pick(fv_changed),
+        }
+
+    def _log_changes(self):
+        c = self.changes
+        logger.info(f"[STATS] [InstrumentMaster] {c['base_date']} → {self.trade_date}: "
+                    f"新上市{len(c['listed'])} 退出{len(c['removed'])} "
+                    f"戴帽{len(c['st_added'])} 摘帽{len(c['st_removed'])} 股本变动{len(c['float_changed'])}")
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 向量化查询
+    # ─────────────────────────────────────────────────────────────────────────
+    def ids(self, codes: Iterable[str]) -> np.ndarray:
+        get = self.index.get
+        return np.fromiter((get(c, -1) for c in codes), dtype=np.int64)
+
+    def prefix_mask(self, prefixes) -> np.ndarray:
+        """代码前缀掩码（不含交易所后缀）"""
+        mask = np.zeros(len(self), dtype=bool)
+        for prefix in prefixes:
+            mask |= np.char.startswith(self.codes, prefix)
+        return mask
+
+    def member_mask(self, codes: Iterable[str]) -> np.ndarray:
+        return np.isin(self.codes, np.array(list(codes), dtype='U16'))
+
+    def bj_mask(self) -> np.ndarray:
+        return self.prefix_mask(BJ_PREFIXES)
+
+    def kcb_mask(self) -> np.ndarray:
+        return self.prefix_mask(('688',))
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+LiveUniverseMaintainer - 实盘增量粗筛池维护器
+
+《三漏斗架构》实盘拆分：
+  开盘前一次性（静态输入，日内不变）
+    漏斗1: ST/北交所/科创板/BSON黑名单            → 复用 UniverseBuilder._funnel1_static
+    漏斗2: 历史5日均量/均额、流通股本              → 一次分块读取日K
+    漏斗3: 历史60日最高价、空间差阈值（按K线根数） → 同一次读取
+  盘中每次刷新（仅日内条件，向量化）
+    价格区间 / 量比 / 当日换手 / 空间差            → 全推Tick表 → numpy 掩码
+
+refresh() 返回成员增量（新增/移出），不再重建整个列表，
+单次刷新为毫秒级，可以每分钟执行。
+
+判定口径与 UniverseBuilder.build() 保持一致：
+  - 日均额不足的票在准备阶段直接剔除（日内不会变化）
+  - 无流通股本的票跳过量比/换手判定（同漏斗2）
+  - 空间差用 max(历史60日高, 今日最高) 与现价计算（同漏斗3，含今日K线）
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from logic.utils.logger import get_logger
+    logger = get_logger(__name__)
+except ImportError:
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.INFO)
+
+from logic.utils.calendar_utils import get_nth_previous_trading_day
+
+
+@dataclass
+class UniverseDelta:
+    """单次刷新的成员增量"""
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    size: int = 0
+    elapsed_ms: float = 0.0
+
+
+class LiveUniverseMaintainer:
+    """
+    实盘增量粗筛池维护器
+
+    用法:
+        maintainer = LiveUniverseMaintainer(target_date='20260318')
+        maintainer.prepare()                 # 开盘前一次（秒级）
+        delta = maintainer.refresh()         # 盘中每分钟（毫秒级）
+        for code in delta.added: ...
+    """
+
+    CHUNK_SIZE = 500
+    MIN_VOLUME_RATIO = 2.0       # 漏斗2 第二道锁
+    MIN_TURNOVER_PCT = 2.0       # 漏斗2 第三道锁
+    PRICE_RANGE = (2.0, 500.0)   # 漏斗2 基础卫生
+
+    def __init__(self, target_date: str):
+        from logic.data_providers.universe_builder import UniverseBuilder
+
+        self.target_date = target_date
+        self._builder = UniverseBuilder(target_date=target_date)
+        self.min_avg_amount = self._builder.min_avg_amount
+
+        # 静态输入（按 _codes 对齐）
+        self._codes: List[str] = []
+        self._avg_volume_5d = np.empty(0)    # 手
+        self._float_volume = np.empty(0)     # 股
+        self._high_hist = np.empty(0)        # 历史最高价（不含今日）
+        self._gap_threshold = np.empty(0)    # 空间差阈值
+
+        self._members = np.zeros(0, dtype=bool)
+        self._volume_ratio = np.empty(0)
+        self._prepared = False
+        self._stats: dict = {}
+
+    @property
+    def codes(self) -> List[str]:
+        """静态漏斗后的可评估标的（刷新只需要这些票的Tick）"""
+        return self._codes
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 开盘前：静态输入
+    # ─────────────────────────────────────────────────────────────────────────
+    def prepare(self) -> bool:
+        """计算日内不变的漏斗输入，只执行一次"""
+        t0 = time.perf_counter()
+        try:
+            from xtquant import xtdata
+        except ImportError:
+            logger.error('[X] [LiveUniverse] xtquant未安装')
+            return False
+
+        step1 = self._builder._funnel1_static()
+        if not step1:
+            return False
+
+        start_date = get_nth_previous_trading_day(self.target_date, 60)
+        history = {}
+        for i in range(0, len(step1), self.CHUNK_SIZE):
+            chunk = step1[i:i + self.CHUNK_SIZE]
+            try:
+                data = xtdata.get_local_data(
+                    field_list=['high', 'close', 'volume', 'amount'],
+                    stock_list=chunk,
+                    period='1d',
+                    start_time=start_date,
+                    end_time=self.target_date
+                )
+                if data:
+                    history.update({s: data[s] for s in chunk if s in data and data[s] is not None})
+            except Exception as e:
+                logger.error(f'[LiveUniverse] 日K分块读取失败: {e}')
+
+        float_volume = {}
+        try:
+            from logic.data_providers.true_dictionary import get_true_dictionary
+            true_dict = get_true_dictionary()
+            true_dict.warmup(step1, target_date=self.target_date, force=False)
+            fv = true_dict.get_float_volume_batch(true_dict.get_symbol_ids(step1))
+            float_volume = dict(zip(step1, fv.tolist()))
+        except Exception as e:
+            logger.warning(f'[LiveUniverse] TrueDictionary预热失败: {e}，换手率过滤将降级')
+
+        self.load_static(history, float_volume)
+        self._stats['after_funnel1'] = len(step1)
+        self._stats['prepare_ms'] = round((time.perf_counter() - t0) * 1000, 1)
+        logger.info(f'[LiveUniverse] 静态输入就绪: 漏斗1 {len(step1)}只 → 可评估 {len(self._codes)}只 '
+                    f'| 耗时 {self._stats["prepare_ms"]:.0f}ms')
+        return True
+
+    def load_static(self, history: Dict[str, "object"], float_volume: Dict[str, float]):
+        """
+        从历史日K构建静态数组
+
+        Args:
+            history: {stock: DataFrame(high, close, volume, amount)}，可含今日K线（会被剔除）
+            float_volume: {stock: 流通股本(股)}
+        """
+        codes, avg_vol, fv, high_hist, gap_thr = [], [], [], [], []
+        cnt = {'nodata': 0, 'amount': 0, 'space': 0}
+
+        for stock, df in history.items():
+            if df is None or len(df) == 0:
+                cnt['nodata'] += 1
+                continue
+            if str(df.index[-1])[:8] == self.target_date:
+                df = df.iloc[:-1]
+            hist = df.tail(5)
+            if len(hist) == 0:
+                cnt['nodata'] += 1
+                continue
+
+            avg_amount_5d = float(hist['amount'].mean())
+            avg_volume_5d = float(hist['volume'].mean())
+            if not avg_amount_5d >= self.min_avg_amount:
+                cnt['amount'] += 1
+                continue
+
+            # 漏斗3 K线根数按含今日计（与 build() 读到今日K线时一致）
+            n_bars = len(df) + 1
+            if n_bars < 10:
+                cnt['nodata'] += 1
+                continue
+            if n_bars < 20:
+                cnt['space'] += 1
+                continue
+
+            codes.append(stock)
+            avg_vol.append(avg_volume_5d)
+            fv.append(float(float_volume.get(stock, 0) or 0))
+            high_hist.append(float(df['high'].max()))
+            gap_thr.append(0.10 if n_bars < 60 else 0.15)
+
+        self._codes = codes
+        self._avg_volume_5d = np.asarray(avg_vol, dtype=np.float64)
+        self._float_volume = np.asarray(fv, dtype=np.float64)
+        self._high_hist = np.asarray(high_hist, dtype=np.float64)
+        self._gap_threshold = np.asarray(gap_thr, dtype=np.float64)
+        self._members = np.zeros(len(codes), dtype=bool)
+        self._volume_ratio = np.zeros(len(codes), dtype=np.float64)
+        self._prepared = True
+        self._stats.update({
+            'static_nodata': cnt['nodata'],
+            'static_amount': cnt['amount'],
+            'static_space': cnt['space'],
+            'evaluable': len(codes),
+        })
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 盘中：向量化日内判定
+    # ─────────────────────────────────────────────────────────────────────────
+    def evaluate(self, ticks: Dict[str, dict]) -> np.ndarray:
+        """
+        对全推Tick表做向量化判定，返回与 codes 对齐的成员掩码
+
+        Args:
+            ticks: {stock: tick}，tick 需含 lastPrice / volume(手) / high
+        """
+        n = len(self._codes)
+        price = np.zeros(n)
+        volume = np.zeros(n)
+        high = np.zeros(n)
+        get = ticks.get
+        for i, code in enumerate(self._codes):
+            t = get(code)
+            if t:
+                price[i] = t.get('lastPrice', 0) or 0
+                volume[i] = t.get('volume', 0) or 0
+                high[i] = t.get('high', 0) or 0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._volume_ratio = np.where(self._avg_volume_5d > 0, volume / self._avg_volume_5d, 0.0)
+            turnover_pct = np.where(self._float_volume > 0, volume * 100 / self._float_volume * 100, 0.0)
+            high_all = np.maximum(self._high_hist, high)
+            space_gap = np.where(high_all > 0, (high_all - price) / high_all, np.inf)
+
+        lo, hi = self.PRICE_RANGE
+        no_fv = self._float_volume <= 0
+        return (
+            (price > 0) & (volume > 0)
+            & (price >= lo) & (price <= hi)
+            & (no_fv | ((self._volume_ratio >= self.MIN_VOLUME_RATIO)
+                        & (turnover_pct >= self.MIN_TURNOVER_PCT)))
+            & (space_gap <= self._gap_threshold)
+        )
+
+    def refresh(self, ticks: Optional[Dict[str, dict]] = None) -> UniverseDelta:
+        """
+        重新评估日内条件并返回成员增量
+
+        Args:
+            ticks: 全推Tick表；None 时直接读 xtdata.get_full_tick
+        """
+        t0 = time.perf_counter()
+        if not self._prepared:
+            return UniverseDelta()
+        if ticks is None:
+            try:
+                from xtquant import xtdata
+                ticks = xtdata.get_full_tick(self._codes) or {}
+            except Exception as e:
+                logger.warning(f'[LiveUniverse] 全推Tick读取失败: {e}')
+                return UniverseDelta(size=int(self._members.sum()))
+
+        new_members = self.evaluate(ticks)
+        codes = self._codes
+        added = [codes[i] for i in np.flatnonzero(new_members & ~self._members)]
+        removed = [codes[i] for i in np.flatnonzero(self._members & ~new_members)]
+        self._members = new_members
+
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        return UniverseDelta(added=added, removed=removed,
+                             size=int(new_members.sum()), elapsed_ms=elapsed_ms)
+
+    def members(self) -> List[str]:
+        """当前成员，按量比降序（与 build() 排序一致）"""
+        idx = np.flatnonzero(self._members)
+        order = idx[np.argsort(-self._volume_ratio[idx], kind='stable')]
+        return [self._codes[i] for i in order]
+
+    def get_stats(self) -> dict:
+        return self._stats
@@ -19,10 +19,16 @@ import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+from logic.data_providers.tick_batch import tick_times_ms
+
 logger = logging.getLogger(__name__)
 
+_EPOCH = datetime(1970, 1, 1)
+_BEIJING_OFFSET_MS = 8 * 3600 * 1000
+
 
 class MockQmtAdapter:
     """
@@ -34,6 +40,10 @@ class MockQmtAdapter:
     - 开发调试无需连接QMT
     """
     
+    # get_tick_at_time 输出字段（同 _row_to_tick_dict）
+    _TICK_FIELDS = ('lastPrice', 'open', 'high', 'low', 'lastClose', 'amount', 'volume',
+                    'bidPrice1', 'bidVol1', 'askPrice1', 'askVol1')
+    
     def __init__(self, target_date: str = None, event_bus=None):
         """
         初始化Mock适配器
@@ -46,7 +56,8 @@ class MockQmtAdapter:
         self.event_bus = event_bus
         self._subscribed_stocks = set()
         self._tick_data_cache = {}  # {stock_code: DataFrame}
-        self._current_time_index = {}  # {stock_code: current_row_index}
+        self._current_time_index = {}  # {stock_code: current_row_index} 单调游标
+        self._tick_index = {}  # {stock_code: (有序毫秒时间数组, {字段: 数组})}
         self._is_initialized = False
         self._xtdata = None
         
@@ -101,6 +112,7 @@ class MockQmtAdapter:
                     df = local_data[stock]
                     if df is not None and not df.empty:
                         self._tick_data_cache[stock] = df
+                        self._tick_index.pop(stock, None)
                         self._current_time_index[stock] = 0
                         self._subscribed_stocks.add(stock)
                         success_count += 1
@@ -176,6 +188,9 @@ class MockQmtAdapter:
         """
         获取指定时间的Tick数据 - 用于时间线回放
         
+        【CTO V232】返回该时刻及之前最新一笔（as-of），
+        按票有序毫秒时间数组 + 单调游标：顺序回放均摊O(1)，随机访问O(log n)
+        
         Args:
             stock: 股票代码
             time_str: 时间字符串(格式: 'HH:MM:SS' 或'HHMMSS')
@@ -183,27 +198,106 @@ class MockQmtAdapter:
         Returns:
             Optional[Dict]: Tick字典或None
         """
-        if stock not in self._tick_data_cache:
+        index = self._get_tick_index(stock)
+        if index is None:
             return None
         
-        df = self._tick_data_cache[stock]
-        if df is None or df.empty:
+        times, columns = index
+        row = self._locate(stock, times, self._to_ms(time_str))
+        if row < 0:
             return None
         
-        # 标准化时间格式
-        if ':' in time_str:
-            target_time = time_str.replace(':', '')
-        else:
-            target_time = time_str
+        tick = {'stock_code': stock}
+        for field in self._TICK_FIELDS:
+            tick[field] = float(columns[field][row])
+        tick['time'] = int(times[row])
+        return tick
+    
+    def get_ticks_at_time(self, stock_list: List[str], time_str: str) -> Dict[str, np.ndarray]:
+        """
+        【CTO V232】多票同一时刻的列式批量查询
         
-        # 查找匹配时间的行
-        for idx, row in df.iterrows():
-            tick_time = str(row.get('time', ''))
-            # tick_time格式可能是'HHMMSS' 或时间戳
-            if target_time in str(tick_time):
-                return self._row_to_tick_dict(row, stock)
+        Args:
+            stock_list: 股票代码列表（决定行顺序）
+            time_str: 时间字符串(格式: 'HH:MM:SS' 或'HHMMSS')
+            
+        Returns:
+            {'stock_code': 代码数组, 'valid': 是否有Tick, 'time': 毫秒时间戳, <_TICK_FIELDS>: float数组}
+        """
+        n = len(stock_list)
+        target_ms = self._to_ms(time_str)
+        result = {field: np.zeros(n, dtype=np.float64) for field in self._TICK_FIELDS}
+        result['stock_code'] = np.array(stock_list, dtype=object)
+        result['valid'] = np.zeros(n, dtype=bool)
+        result['time'] = np.full(n, -1, dtype=np.int64)
         
-        return None
+        for i, stock in enumerate(stock_list):
+            index = self._get_tick_index(stock)
+            if index is None:
+                continue
+            times, columns = index
+            row = self._locate(stock, times, target_ms)
+            if row < 0:
+                continue
+            result['valid'][i] = True
+            result['time'][i] = times[row]
+            for field in self._TICK_FIELDS:
+                result[field][i] = columns[field][row]
+        return result
+    
+    def _to_ms(self, time_str: str) -> int:
+        """'HH:MM:SS' / 'HHMMSS' → 目标日北京时间毫秒时间戳（与QMT tick 'time' 同口径）"""
+        hhmmss = time_str.replace(':', '')[:6]
+        dt = datetime.strptime(self.target_date + hhmmss, '%Y%m%d%H%M%S')
+        return int((dt - _EPOCH).total_seconds() * 1000) - _BEIJING_OFFSET_MS
+    
+    def _get_tick_index(self, stock: str) -> Optional[tuple]:
+        """按票懒构建 (有序毫秒时间数组, {字段: 数组})"""
+        index = self._tick_index.get(stock)
+        if index is not None:
+            return index
+        df = self._tick_data_cache.get(stock)
+        if df is None or df.empty:
+            return None
+        
+        times = tick_times_ms(df)
+        order = np.argsort(times, kind='stable')
+        columns = {}
+        for field in self._TICK_FIELDS:
+            if field in df.columns:
+                values = df[field].to_numpy()
+            elif field[-1] == '1' and field[:-1] in df.columns:
+                # 五档数组列（bidPrice/bidVol/...）取第一档
+                values = [(v[0] if v is not None and len(v) else 0.0) for v in df[field[:-1]].to_numpy()]
+            else:
+                values = np.zeros(len(df))
+            columns[field] = np.nan_to_num(np.asarray(values, dtype=np.float64))[order]
+        index = self._tick_index[stock] = (times[order], columns)
+        self._current_time_index[stock] = 0
+        return index
+    
+    def _locate(self, stock: str, times: np.ndarray, target_ms: int) -> int:
+        """
+        单调游标定位：该时刻及之前最后一笔的行号（-1 表示尚无Tick）
+        
+        - 目标不早于游标：先看后两笔（顺序回放常态），否则在游标之后二分
+        - 目标早于游标（回退）：全表二分
+        """
+        cursor = self._current_time_index.get(stock, 0)
+        n = len(times)
+        if n == 0:
+            return -1
+        if times[cursor] <= target_ms:
+            if cursor + 1 >= n or times[cursor + 1] > target_ms:
+                row = cursor
+            elif cursor + 2 >= n or times[cursor + 2] > target_ms:
+                row = cursor + 1
+            else:
+                row = cursor + int(np.searchsorted(times[cursor:], target_ms, side='right')) - 1
+        else:
+            row = int(np.searchsorted(times, target_ms, side='right')) - 1
+        self._current_time_index[stock] = max(row, 0)
+        return row
     
     def get_timeline_ticks(self, stock_list: List[str], interval_seconds: int = 3) -> List[Dict]:
         """
@@ -52,6 +52,8 @@ except ImportError:
     xtdata = None
     xttrader = None
 
+from logic.data_providers.coverage_manifest import get_coverage_manifest, probe
+
 logger = logging.getLogger(__name__)
 
 # ============================================================
@@ -77,6 +79,7 @@ class DownloadResult:
     record_count: int = 0
     message: str = ""
     error: Optional[str] = None
+    downloaded: bool = False  # 本次实际下载落盘（已存在跳过的为 False）
 
 
 @dataclass
@@ -92,12 +95,18 @@ class DataIntegrityReport:
     minute_count: int = 0
     tick_count: int = 0
     missing_periods: List[str] = field(default_factory=list)
+    failed_checks: List[str] = field(default_factory=list)
 
     @property
     def is_complete(self) -> bool:
         """检查是否完整（所有周期都有数据）"""
         return self.has_daily and self.has_minute and self.has_tick
 
+    @property
+    def is_valid(self) -> bool:
+        """完整且 Tick 内容不变量全部通过（未做内容校验时等同 is_complete）"""
+        return self.is_complete and not self.failed_checks
+
     @property
     def completeness_ratio(self) -> float:
         """完整度比率 (0.0-1.0)"""
@@ -332,6 +341,7 @@ class QmtDataManager:
             return {}
 
         results = {}
+        manifest = get_coverage_manifest("1d")
         logger.info(
             f"【下载日线数据】{start_date} 至 {end_date} | {len(stock_list)}只股票"
         )
@@ -356,6 +366,11 @@ class QmtDataManager:
                     start_time=start_date,
                     end_time=end_date,
                 )
+                # 【CTO V233 覆盖清单】读回结果登记（读到空也登记为0行）
+                manifest.record_frames(
+                    {stock_code: (data or {}).get(stock_code)},
+                    dates=[start_date] if start_date == end_date else None,
+                )
 
                 if data and stock_code in data and len(data[stock_code]) > 0:
                     count = len(data[stock_code])
@@ -382,6 +397,7 @@ class QmtDataManager:
 
             time.sleep(delay)
 
+        manifest.flush()
         success_count = sum(1 for r in results.values() if r.success)
         logger.info(f"日线数据下载完成: {success_count}/{len(stock_list)}")
         return results
@@ -410,6 +426,7 @@ class QmtDataManager:
             return {}
 
         results = {}
+        manifest = get_coverage_manifest("1m")
         logger.info(
             f"【下载分钟线数据】{start_date} 至 {end_date} | {len(stock_list)}只股票"
         )
@@ -433,6 +450,11 @@ class QmtDataManager:
                     start_time=start_date,
                     end_time=end_date,
                 )
+                # 【CTO V233 覆盖清单】读回结果登记（读到空也登记为0行）
+                manifest.record_frames(
+                    {stock_code: (data or {}).get(stock_code)},
+                    dates=[start_date] if start_date == end_date else None,
+                )
 
                 if data and stock_code in data and len(data[stock_code]) > 0:
                     count = len(data[stock_code])
@@ -459,6 +481,7 @@ class QmtDataManager:
 
             time.sleep(delay)
 
+        manifest.flush()
         success_count = sum(1 for r in results.values() if r.success)
         logger.info(f"分钟线数据下载完成: {success_count}/{len(stock_list)}")
         return results
@@ -470,6 +493,9 @@ class QmtDataManager:
         use_vip: bool = True,
         check_existing: bool = True,
         delay: float = 0.2,
+        workers: int = 4,
+        batch_size: int = 50,
+        on_progress=None,
     ) -> Dict[str, DownloadResult]:
         """
         下载Tick数据（支持VIP服务）
@@ -479,7 +505,10 @@ class QmtDataManager:
             trade_date: 交易日期 (YYYYMMDD)
             use_vip: 是否使用VIP服务
             check_existing: 是否检查已有数据
-            delay: 下载间隔（秒）
+            delay: 兼容保留，不再使用（节流由 workers 并发上限承担）
+            workers: 并发下载线程数
+            batch_size: 每批合并的股票数
+            on_progress: 进度回调 fn(DownloadStats)，约每5秒一次
 
         Returns:
             下载结果字典
@@ -506,103 +535,42 @@ class QmtDataManager:
                         for s in stock_list
                     }
 
-        results = {}
         logger.info(
-            f"【下载Tick数据】{trade_date} | {len(stock_list)}只股票 | VIP: {use_vip}"
+            f"【下载Tick数据】{trade_date} | {len(stock_list)}只股票 | VIP: {use_vip} | workers: {workers}"
         )
 
-        for i, stock_code in enumerate(stock_list, 1):
-            try:
-                if check_existing:
-                    existing = xtdata.get_local_data(
-                        field_list=["time"],
-                        stock_list=[stock_code],
-                        period="tick",
-                        start_time=trade_date,
-                        end_time=trade_date,
-                    )
-
-                    # MED-6修复: 使用常量 TICK_VALID_MIN_COUNT 替代 Magic Number
-                    if (
-                        existing
-                        and stock_code in existing
-                        and len(existing[stock_code]) > TICK_VALID_MIN_COUNT
-                    ):
-                        tick_count = len(existing[stock_code])
-                        results[stock_code] = DownloadResult(
-                            success=True,
-                            stock_code=stock_code,
-                            period="tick",
-                            record_count=tick_count,
-                            message=f"已存在 ({tick_count}条)",
-                        )
-                        logger.debug(
-                            f"[{i}/{len(stock_list)}] {stock_code} 已存在，跳过"
-                        )
-                        continue
-
-                # 官方文档：download_history_data 同步阻塞，完成后才返回，无需轮询
-                xtdata.download_history_data(
-                    stock_code=stock_code,
-                    period="tick",
-                    start_time=trade_date,
-                    end_time=trade_date,
-                )
-
-                # MED-9修复: 统一用 len(df) > 0 判定（配合 TICK_VALID_MIN_COUNT 常量）
-                check_data = xtdata.get_local_data(
-                    field_list=["time"],
-                    stock_list=[stock_code],
-                    period="tick",
-                    start_time=trade_date,
-                    end_time=trade_date,
-                )
+        # 【CTO V233 并发下载】存在性检查/下载/读回验证按批合并，批任务投入有界线程池，
+        # 批级失败指数退避重试（原逐只串行 + 固定 sleep 废除，delay 参数仅为兼容保留）
+        from logic.data_providers.download_scheduler import DownloadScheduler
 
-                if check_data and stock_code in check_data:
-                    tick_df = check_data[stock_code]
-                    if tick_df is not None and len(tick_df) > TICK_VALID_MIN_COUNT:
-                        tick_count = len(tick_df)
-                        results[stock_code] = DownloadResult(
-                            success=True,
-                            stock_code=stock_code,
-                            period="tick",
-                            record_count=tick_count,
-                            message=f"成功 ({tick_count}条)",
-                        )
-                        logger.info(
-                            f"[{i}/{len(stock_list)}] [OK] {stock_code} Tick下载成功 ({tick_count}条)"
-                        )
-                    else:
-                        results[stock_code] = DownloadResult(
-                            success=False,
-                            stock_code=stock_code,
-                            period="tick",
-                            message="获取空数据 (可能停牌/超限/无权限)",
-                        )
-                        logger.warning(
-                            f"[{i}/{len(stock_list)}] ⏭️ {stock_code} {trade_date} Tick空数据，跳过"
-                        )
-                else:
-                    results[stock_code] = DownloadResult(
-                        success=False,
-                        stock_code=stock_code,
-                        period="tick",
-                        message="获取空数据 (可能停牌/超限/无权限)",
-                    )
-                    logger.warning(
-                        f"[{i}/{len(stock_list)}] ⏭️ {stock_code} {trade_date} Tick空数据，跳过"
-                    )
-
-            except Exception as e:
-                logger.error(f"[{i}/{len(stock_list)}] {stock_code} 下载失败: {e}")
-                results[stock_code] = DownloadResult(
-                    success=False, stock_code=stock_code, period="tick", error=str(e)
+        scheduler = DownloadScheduler(
+            xtdata,
+            workers=workers,
+            batch_size=batch_size,
+            on_progress=on_progress,
+            manifest=get_coverage_manifest("tick"),
+        )
+        results = scheduler.run(
+            stock_list, "tick", trade_date, trade_date, check_existing=check_existing
+        )
+        for stock_code, result in results.items():
+            if not result.success:
+                logger.warning(
+                    f"⏭️ {stock_code} {trade_date} Tick下载失败: {result.message or result.error}"
                 )
 
-            time.sleep(delay)
-
         success_count = sum(1 for r in results.values() if r.success)
         logger.info(f"Tick数据下载完成: {success_count}/{len(stock_list)}")
+
+        # 【CTO V230】下载完成顺手补建按日快照索引（scan/竞价切片免读全天Tick）
+        # 只补本次真正下载的票；已存在跳过的票和已在索引中的票都不重读
+        downloaded = [s for s, r in results.items() if r.success and r.downloaded]
+        if downloaded:
+            try:
+                from logic.data_providers.snapshot_index import SnapshotIndex
+                SnapshotIndex(trade_date).ensure(downloaded)
+            except Exception as e:
+                logger.warning(f"[QmtDataManager] 快照索引构建失败: {e}")
         return results
 
     def verify_data_integrity(
@@ -610,6 +578,8 @@ class QmtDataManager:
         stock_list: List[str],
         trade_date: str,
         check_periods: List[str] = None,
+        deep: bool = False,
+        processes: Optional[int] = None,
     ) -> Dict[str, DataIntegrityReport]:
         """
         验证数据完整性
@@ -618,6 +588,8 @@ class QmtDataManager:
             stock_list: 股票代码列表
             trade_date: 交易日期
             check_periods: 要检查的周期列表 ['1d', '1m', 'tick']
+            deep: 是否对有 Tick 的票做内容不变量校验（多进程，见 IntegrityVerifier）
+            processes: deep 校验进程数（None = CPU 核数）
 
         Returns:
             完整性报告字典 {stock_code: DataIntegrityReport}
@@ -627,64 +599,47 @@ class QmtDataManager:
             return {}
 
         check_periods = check_periods or ["1d", "1m", "tick"]
-        reports = {}
+        reports = {
+            s: DataIntegrityReport(stock_code=s, trade_date=trade_date) for s in stock_list
+        }
 
         logger.info(f"【数据完整性验证】{trade_date} | {len(stock_list)}只股票")
 
-        for stock_code in stock_list:
-            report = DataIntegrityReport(stock_code=stock_code, trade_date=trade_date)
-
+        # 【CTO V233 覆盖清单】先查清单，只有未知或记为缺失的票才批量读一次本地（原每只每周期一次完整读取）
+        # MED-9修复: 统一用 len(df) > 0；MED-6修复: Tick 用常量 TICK_VALID_MIN_COUNT
+        for period in ("1d", "1m", "tick"):
+            if period not in check_periods:
+                continue
+            manifest = get_coverage_manifest(period)
             try:
-                # MED-9修复: 统一用 len(df) > 0
-                if "1d" in check_periods:
-                    daily = xtdata.get_local_data(
-                        field_list=["time"],
-                        stock_list=[stock_code],
-                        period="1d",
-                        start_time=trade_date,
-                        end_time=trade_date,
-                    )
-                    if daily and stock_code in daily and len(daily[stock_code]) > 0:
-                        report.has_daily = True
-                        report.daily_count = len(daily[stock_code])
-                    else:
-                        report.missing_periods.append("1d")
-
-                if "1m" in check_periods:
-                    minute = xtdata.get_local_data(
-                        field_list=["time"],
-                        stock_list=[stock_code],
-                        period="1m",
-                        start_time=trade_date,
-                        end_time=trade_date,
-                    )
-                    if minute and stock_code in minute and len(minute[stock_code]) > 0:
-                        report.has_minute = True
-                        report.minute_count = len(minute[stock_code])
-                    else:
-                        report.missing_periods.append("1m")
-
-                if "tick" in check_periods:
-                    tick = xtdata.get_local_data(
-                        field_list=["time"],
-                        stock_list=[stock_code],
-                        period="tick",
-                        start_time=trade_date,
-                        end_time=trade_date,
-                    )
-                    # MED-6修复: 使用常量替代 Magic Number 100
-                    if tick and stock_code in tick and len(tick[stock_code]) > TICK_VALID_MIN_COUNT:
-                        report.has_tick = True
-                        report.tick_count = len(tick[stock_code])
+                probe(manifest, xtdata, stock_list, trade_date)
+            except Exception as e:
+                logger.error(f"验证 {period} 数据完整性失败: {e}")
+            counts = manifest.rows(stock_list, [trade_date])[:, 0]
+            threshold = TICK_VALID_MIN_COUNT if period == "tick" else 0
+            for stock_code, count in zip(stock_list, counts.tolist()):
+                report = reports[stock_code]
+                if count > threshold:
+                    if period == "1d":
+                        report.has_daily, report.daily_count = True, count
+                    elif period == "1m":
+                        report.has_minute, report.minute_count = True, count
                     else:
-                        report.missing_periods.append("tick")
+                        report.has_tick, report.tick_count = True, count
+                else:
+                    report.missing_periods.append(period)
+            manifest.flush()
 
-                reports[stock_code] = report
+        # 【CTO V233 并行校验】有 Tick 的票做内容不变量体检
+        if deep and "tick" in check_periods:
+            from logic.data_providers.integrity_verifier import IntegrityVerifier
 
-            except Exception as e:
-                logger.error(f"验证 {stock_code} 数据完整性失败: {e}")
-                report.missing_periods = list(check_periods)
-                reports[stock_code] = report
+            with_tick = [s for s, r in reports.items() if r.has_tick]
+            summary = IntegrityVerifier(processes=processes, manifest=get_coverage_manifest("tick")).run(
+                with_tick, trade_date)
+            for stock_code, names in summary.failures.items():
+                reports[stock_code].failed_checks = names
+            logger.info(f"Tick内容校验:\n{summary.table()}")
 
         complete_count = sum(1 for r in reports.values() if r.is_complete)
         logger.info(f"数据完整性验证完成: 完整 {complete_count}/{len(stock_list)}")
@@ -694,6 +649,7 @@ class QmtDataManager:
         self,
         missing_list: List[Tuple[str, str]],
         use_vip: bool = True,
+        trade_date: Optional[str] = None,
     ) -> Dict[str, DownloadResult]:
         """
         补充下载缺失的数据
@@ -701,6 +657,8 @@ class QmtDataManager:
         Args:
             missing_list: 缺失数据列表 [(stock_code, period), ...]
             use_vip: 是否使用VIP服务（对Tick数据有效）
+            trade_date: 缺失所在交易日 YYYYMMDD（默认今天）；tick/1m 补该日，
+                        1d 补到该日为止的 SUPPLEMENT_LOOKBACK_DAYS 天
 
         Returns:
             下载结果字典
@@ -709,7 +667,8 @@ class QmtDataManager:
             logger.info("【补充下载】没有缺失的数据")
             return {}
 
-        logger.info(f"【补充下载】共 {len(missing_list)} 项缺失数据")
+        trade_date = trade_date or datetime.now().strftime("%Y%m%d")
+        logger.info(f"【补充下载】{trade_date} 共 {len(missing_list)} 项缺失数据")
 
         by_period: Dict[str, List[str]] = {}
         for stock_code, period in missing_list:
@@ -722,22 +681,19 @@ class QmtDataManager:
         if "1d" in by_period:
             # MED-7修复：使用常量 SUPPLEMENT_LOOKBACK_DAYS 替代硬编码 10
             start = (
-                datetime.now() - timedelta(days=SUPPLEMENT_LOOKBACK_DAYS)
+                datetime.strptime(trade_date, "%Y%m%d") - timedelta(days=SUPPLEMENT_LOOKBACK_DAYS)
             ).strftime("%Y%m%d")
-            end = datetime.now().strftime("%Y%m%d")
-            all_results.update(self.download_daily_data(by_period["1d"], start, end))
+            all_results.update(self.download_daily_data(by_period["1d"], start, trade_date))
 
         if "1m" in by_period:
-            today = datetime.now().strftime("%Y%m%d")
             all_results.update(
-                self.download_minute_data(by_period["1m"], today, today)
+                self.download_minute_data(by_period["1m"], trade_date, trade_date)
             )
 
         if "tick" in by_period:
-            today = datetime.now().strftime("%Y%m%d")
             all_results.update(
                 self.download_tick_data(
-                    by_period["tick"], today, use_vip=use_vip, check_existing=False
+                    by_period["tick"], trade_date, use_vip=use_vip, check_existing=False
                 )
             )
 
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+RollingIndicators - 全市场增量滚动指标（5日均量 / 5日换手 / MA / ATR_20D）
+
+【CTO V233 增量指标】
+旧方案：每个交易日由 DailyPanel 按整窗重算，回测逐日推进时同一批K线
+        被反复求和，单日代价 O(股票数 × 窗口)。
+
+新方案：每只票每个窗口维护一个环形缓冲 + 滚动和 / 计数
+  - 新K线入窗：加入各窗口，满窗则先弹出最旧一根
+  - 窗口起点前移：按日期从队头弹出（起点单调递增，摊还 O(1)）
+  - 每日推进 = 每票一根新K线，全市场 O(股票数)，不读盘
+  - 口径逐项对齐 DailyPanel 整窗重算（窗口 = 日期 >= 起点 的最近 k 根）；
+    ATR 窗口首根用当日开盘作前收，另维护一条"开盘前收"TR 窗口在队头替换
+  - 浮点滚动和每 RESYNC_EVERY 次推进按缓冲整窗重求一次，防累积误差
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import logging
+from typing import Dict, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RollingWindow:
+    """
+    n 只票各自的滚动窗口（环形缓冲，按日期/容量双重淘汰）
+
+    NaN 不入和但计数（MA 需 NaN 传播），±Inf 单独计数（结果视为无效）。
+    growable=True 的窗口只按日期淘汰：满窗时扩容而不弹队头，窗口跨度由调用方给的
+    起点日期决定（日历回退时起点可能比预期更早），绝不静默截断。
+    """
+
+    def __init__(self, n: int, capacity: int, growable: bool = False):
+        self.capacity = capacity
+        self.growable = growable
+        self.values = np.full((n, capacity), np.nan)
+        self.dates = np.zeros((n, capacity), dtype=np.int64)
+        self.head = np.zeros(n, dtype=np.int64)
+        self.size = np.zeros(n, dtype=np.int64)
+        self.sum = np.zeros(n)
+        self.n_ok = np.zeros(n, dtype=np.int64)
+        self.n_nan = np.zeros(n, dtype=np.int64)
+        self.n_inf = np.zeros(n, dtype=np.int64)
+
+    def _account(self, rows: np.ndarray, v: np.ndarray, sign: int):
+        nan = np.isnan(v)
+        inf = np.isinf(v)
+        ok = ~(nan | inf)
+        fv = np.where(ok, v, 0.0)
+        self.sum[rows] += sign * fv
+        self.n_ok[rows] += sign * ok
+        self.n_nan[rows] += sign * nan
+        self.n_inf[rows] += sign * inf
+
+    def push(self, rows: np.ndarray, values: np.ndarray, dates: np.ndarray):
+        """rows（互不重复）各入窗一根，满窗先弹队头（可扩容窗口改为扩容）"""
+        full = rows[self.size[rows] == self.capacity]
+        if len(full):
+            if self.growable:
+                self._grow(self.capacity * 2)
+            else:
+                self.pop(full)
+        pos = (self.head[rows] + self.size[rows]) % self.capacity
+        self.values[rows, pos] = values
+        self.dates[rows, pos] = dates
+        self.size[rows] += 1
+        self._account(rows, values, +1)
+
+    def _grow(self, capacity: int):
+        """扩容到 capacity：各行按时间序摊平到缓冲开头，队头归零"""
+        offsets = np.arange(self.capacity)
+        pos = (self.head[:, None] + offsets[None, :]) % self.capacity
+        values = np.full((len(self.size), capacity), np.nan)
+        dates = np.zeros((len(self.size), capacity), dtype=np.int64)
+        values[:, :self.capacity] = np.take_along_axis(self.values, pos, axis=1)
+        dates[:, :self.capacity] = np.take_along_axis(self.dates, pos, axis=1)
+        self.values, self.dates, self.capacity = values, dates, capacity
+        self.head[:] = 0
+
+    def pop(self, rows: np.ndarray):
+        """rows 各弹出队头一根"""
+        pos = self.head[rows]
+        self._account(rows, self.values[rows, pos], -1)
+        self.head[rows] = (pos + 1) % self.capacity
+        self.size[rows] -= 1
+
+    def evict_before(self, start_date: int):
+        """弹出日期早于窗口起点的K线"""
+        all_rows = np.arange(len(self.size))
+        while True:
+            rows = np.flatnonzero((self.size > 0) & (self.dates[all_rows, self.head] < start_date))
+            if not len(rows):
+                return
+            self.pop(rows)
+
+    def oldest(self) -> np.ndarray:
+        """各票队头值（空窗为 NaN）"""
+        v = self.values[np.arange(len(self.size)), self.head]
+        return np.where(self.size > 0, v, np.nan)
+
+    def take(self, idx: np.ndarray) -> 'RollingWindow':
+        """按行号重排（-1 为空窗）"""
+        out = RollingWindow(len(idx), self.capacity, self.growable)
+        src = np.flatnonzero(idx >= 0)
+        for name in ('values', 'dates', 'head', 'size', 'sum', 'n_ok', 'n_nan', 'n_inf'):
+            getattr(out, name)[src] = getattr(self, name)[idx[src]]
+        return out
+
+    def resync(self):
+        """按缓冲整窗重求滚动和，清除浮点累积误差"""
+        offsets = np.arange(self.capacity)
+        live = offsets[None, :] < self.size[:, None]
+        pos = (self.head[:, None] + offsets[None, :]) % self.capacity
+        v = np.take_along_axis(self.values, pos, axis=1)
+        nan = np.isnan(v) & live
+        inf = np.isinf(v) & live
+        ok = live & ~np.isnan(v) & ~np.isinf(v)
+        fv = np.where(ok, v, 0.0)
+        self.sum = fv.sum(axis=1)
+        self.n_ok = ok.sum(axis=1)
+        self.n_nan = nan.sum(axis=1)
+        self.n_inf = inf.sum(axis=1)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 统计量
+    # ─────────────────────────────────────────────────────────────────────────
+    def mean_skipna(self) -> np.ndarray:
+        """NaN 跳过的均值，无有效值或含 Inf 为 NaN"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = self.sum / self.n_ok
+        return np.where((self.n_ok > 0) & (self.n_inf == 0), out, np.nan)
+
+    def mean_strict(self) -> np.ndarray:
+        """窗口内任一 NaN 即 NaN（MA 口径），分母为窗口根数"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = self.sum / self.size
+        return np.where((self.n_nan == 0) & (self.n_inf == 0), out, np.nan)
+
+
+class RollingIndicators:
+    """
+    全市场增量指标状态，与 DailyPanel 派生口径一致
+
+    用法:
+        starts = {'avg': avg_start, 'ma': ma_start, 'atr': atr_start}
+        rolling = RollingIndicators.from_panel(panel, starts, '20260317')
+        rolling = rolling.roll_to(next_panel, '20260317', next_starts, '20260318')
+        rolling.avg_volume(); rolling.moving_averages(); rolling.atr()
+    """
+
+    # 窗口名 → (输入序列, 容量, 起点键)；容量 None 表示只按日期淘汰（可扩容）
+    WINDOWS = {
+        'volume': ('volume', 5, 'avg'),
+        'turnover': ('amount_per_close', 5, 'avg'),
+        'ma5': ('close', 5, 'ma'),
+        'ma10': ('close', 10, 'ma'),
+        'ma20': ('close', 20, 'ma'),
+        'ma_span': ('close', None, 'ma'),
+        'tr_close': ('tr_close', None, 'atr'),
+        'tr_open': ('tr_open', None, 'atr'),
+    }
+    SPAN_CAPACITY = 32       # 只按日期淘汰的窗口初始容量（最长窗口 30 个交易日 + 当日），超出自动扩容
+    RESYNC_EVERY = 250
+
+    def __init__(self, codes: Sequence[str], trade_date: str = None):
+        self.codes = list(codes)
+        self.trade_date = trade_date
+        n = len(self.codes)
+        self.windows = {name: RollingWindow(n, cap or self.SPAN_CAPACITY, growable=cap is None)
+                        for name, (_, cap, _) in self.WINDOWS.items()}
+        self.last_close = np.full(n, np.nan)
+        self._rolls = 0
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 构造 / 推进
+    # ─────────────────────────────────────────────────────────────────────────
+    @classmethod
+    def from_panel(cls, panel, starts: Dict[str, str], trade_date: str) -> 'RollingIndicators':
+        """由整窗面板冷启动（逐列回放，一次性 O(股票数 × 窗口)）"""
+        state = cls(panel.codes, trade_date)
+        state._replay(panel, np.arange(len(panel.codes)), 0)
+        state.evict(starts)
+        return state
+
+    def roll_to(self, panel, since_date: str, starts: Dict[str, str],
+                trade_date: str) -> 'RollingIndicators':
+        """
+        推进到 trade_date：已有的票只回放 since_date 之后的新K线，
+        新进池的票、以及滚动状态全空（上一日缺K线，面板已整窗重读）的票按面板整行冷启动；
+        行顺序对齐 panel.codes。股票池不变时原地推进并返回 self
+        """
+        if panel.codes == self.codes:
+            # 股票池未变（回测常态）：原地推进，不搬运缓冲
+            state = self
+            state.trade_date = trade_date
+            known = np.ones(len(self.codes), dtype=bool)
+        else:
+            index = {c: i for i, c in enumerate(self.codes)}
+            idx = np.array([index.get(c, -1) for c in panel.codes], dtype=np.int64)
+            state = RollingIndicators(panel.codes, trade_date)
+            state.windows = {name: w.take(idx) for name, w in self.windows.items()}
+            known = idx >= 0
+            state.last_close[known] = self.last_close[idx[known]]
+        state._rolls = self._rolls + 1
+        known &= np.any([w.size > 0 for w in state.windows.values()], axis=0)
+        state.last_close[~known] = np.nan
+
+        state._replay(panel, np.flatnonzero(known), int(since_date))
+        state._replay(panel, np.flatnonzero(~known), 0)
+        state.evict(starts)
+        if state._rolls % self.RESYNC_EVERY == 0:
+            for w in state.windows.values():
+                w.resync()
+        return state
+
+    def _replay(self, panel, rows: np.ndarray, after_date: int):
+        """按列回放 panel 中 rows 行日期晚于 after_date 的K线"""
+        if not len(rows) or not panel.width:
+            return
+        dates = panel.dates[rows]
+        fresh = dates > after_date
+        cols = np.flatnonzero(fresh.any(axis=0))
+        for j in cols:
+            present = fresh[:, j]
+            r = rows[present]
+            self.push_bars(r, dates[present, j], {f: v[r, j] for f, v in panel.values.items()})
+
+    def push_bars(self, rows: np.ndarray, dates: np.ndarray, bar: Dict[str, np.ndarray]):
+        """rows 各追加一根日K（bar 各字段与 rows 对齐）"""
+        close, open_ = bar['close'], bar['open']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pre_close = np.where(self.last_close[rows] == 0, np.nan, self.last_close[rows])
+            open_pc = np.where(open_ == 0, np.nan, open_)
+            series = {
+                'close': close,
+                'volume': bar['volume'],
+                'amount_per_close': bar['amount'] / close,
+                'tr_close': (bar['high'] - bar['low']) / pre_close,
+                'tr_open': (bar['high'] - bar['low']) / open_pc,
+            }
+        for name, (source, _, _) in self.WINDOWS.items():
+            self.windows[name].push(rows, series[source], dates)
+        self.last_close[rows] = close
+
+    def evict(self, starts: Dict[str, str]):
+        """各窗口按起点日期淘汰旧K线"""
+        for name, (_, _, key) in self.WINDOWS.items():
+            self.windows[name].evict_before(int(starts[key]))
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 派生（返回结构同 DailyPanel）
+    # ─────────────────────────────────────────────────────────────────────────
+    def avg_volume(self) -> np.ndarray:
+        return self.windows['volume'].mean_skipna()
+
+    def avg_turnover(self, float_volume: np.ndarray) -> np.ndarray:
+        """换手率均值(%) = 100 / 流通股本 × mean(amount / close)"""
+        fv = np.asarray(float_volume, dtype=np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = self.windows['turnover'].mean_skipna() / fv * 100
+        return np.where(np.isfinite(out) & (fv > 0), out, np.nan)
+
+    def moving_averages(self) -> Dict[str, np.ndarray]:
+        n_w = self.windows['ma_span'].size
+        ma5 = self.windows['ma5'].mean_strict()
+        ma10 = np.where(n_w >= 10, self.windows['ma10'].mean_strict(), ma5)
+        ma20 = np.where(n_w >= 20, self.windows['ma20'].mean_strict(), ma10)
+        return {'ma5': ma5, 'ma10': ma10, 'ma20': ma20, 'close': self.last_close.copy(), 'valid': n_w >= 5}
+
+    def atr(self) -> Dict[str, np.ndarray]:
+        """窗口首根 TR 以开盘价作前收：滚动和中用 tr_open 队头替换 tr_close 队头"""
+        w_close, w_open = self.windows['tr_close'], self.windows['tr_open']
+        first_close, first_open = w_close.oldest(), w_open.oldest()
+        close_ok = np.isfinite(first_close)
+        open_ok = np.isfinite(first_open)
+        total = w_close.sum - np.where(close_ok, first_close, 0.0) + np.where(open_ok, first_open, 0.0)
+        count = w_close.n_ok - close_ok + open_ok
+        with np.errstate(invalid='ignore', divide='ignore'):
+            atr = total / count
+        valid = (w_close.size >= 5) & (count >= 5) & (atr > 0)
+        return {'atr': atr, 'prev_close': self.last_close.copy(), 'valid': valid}
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+SnapshotIndex - 按日时刻快照索引
+
+解决问题：scan 为了拿每只票的收盘最后一笔，要读全天Tick；
+extract_snapshot_at_time 为了拿 09:25:05 一行，要复制整表并把 time 列转字符串。
+
+做法：每个交易日一次性把关键时刻的快照抽出来存成一个紧凑文件
+  竞价 09:25:05 / 开盘 09:30 / 09:45 / 10:00 / 收盘 15:00:05
+每个时刻取「该时刻及之前最后一笔」（searchsorted），与 extract_snapshot_at_time 同口径。
+
+文件: data/snapshot_index/snapshots_YYYYMMDD.npz
+  codes  (n,)        标的
+  times  (n, k)      毫秒时间戳，-1 = 该时刻前无Tick
+  values (n, k, f)   FIELDS 数值
+
+增量：已建索引的票不会重复读取；无Tick的票不入索引也不落盘（下次仍会探测，
+以免下载补齐后被永久跳过）。下载完成后 QmtDataManager.download_tick_data 只对
+本次实际下载的票 ensure()，已在索引中的票不重读。
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+_BEIJING_OFFSET_MS = 8 * 3600 * 1000
+
+
+class SnapshotIndex:
+    """
+    单日关键时刻快照索引
+
+    用法:
+        index = SnapshotIndex('20260318')
+        index.ensure(stock_list)                   # 缺的票才读Tick
+        snap = index.get('000001.SZ', 'auction')   # -> dict | None
+    """
+
+    INDEX_DIR = Path("data/snapshot_index")
+    CHUNK_SIZE = 200
+
+    # 时刻名 → HHMMSS（竞价/收盘沿用 extract_snapshot_at_time 的 +5 秒口径）
+    INSTANTS = {
+        'auction': '092505',
+        'open': '093000',
+        '0945': '094500',
+        '1000': '100000',
+        'close': '150005',
+    }
+    FIELDS = ('lastPrice', 'open', 'high', 'low', 'lastClose', 'volume', 'amount',
+              'askPrice1', 'bidPrice1')
+    # 本地Tick读取字段（五档价格为数组列，取第一档）
+    _TICK_FIELDS = ['time', 'lastPrice', 'open', 'high', 'low', 'lastClose', 'volume', 'amount',
+                    'askPrice', 'bidPrice']
+
+    def __init__(self, trade_date: str, index_dir: Optional[Path] = None):
+        self.trade_date = trade_date
+        self._dir = Path(index_dir) if index_dir else self.INDEX_DIR
+        self._file = self._dir / f"snapshots_{trade_date}.npz"
+        self._instant_names = list(self.INSTANTS)
+        self._instant_ms = np.array([self._to_ms(trade_date, hhmmss) for hhmmss in self.INSTANTS.values()],
+                                    dtype=np.int64)
+        self._codes: List[str] = []
+        self._row: Dict[str, int] = {}
+        self._times = np.empty((0, len(self.INSTANTS)), dtype=np.int64)
+        self._values = np.empty((0, len(self.INSTANTS), len(self.FIELDS)), dtype=np.float64)
+        self._loaded = False
+
+    @staticmethod
+    def _to_ms(trade_date: str, hhmmss: str) -> int:
+        """北京时间 YYYYMMDD + HHMMSS → 毫秒时间戳（与QMT tick 'time' 同口径）"""
+        dt = datetime.strptime(trade_date + hhmmss, '%Y%m%d%H%M%S')
+        return int((dt - _EPOCH).total_seconds() * 1000) - _BEIJING_OFFSET_MS
+
+    @property
+    def path(self) -> Path:
+        return self._file
+
+    @property
+    def codes(self) -> List[str]:
+        return self._codes
+
+    def __contains__(self, stock_code: str) -> bool:
+        return stock_code in self._row
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 读写
+    # ─────────────────────────────────────────────────────────────────────────
+    def load(self) -> bool:
+        """读取索引文件，不存在返回 False"""
+        self._loaded = True
+        if not self._file.exists():
+            return False
+        try:
+            with np.load(self._file, allow_pickle=False) as data:
+                if list(data['fields']) != list(self.FIELDS) or list(data['instants']) != self._instant_names:
+                    logger.warning(f"[SnapshotIndex] {self._file.name} 格式不符，将重建")
+                    return False
+                keep = (data['times'] >= 0).any(axis=1)      # 旧文件里的无数据行丢弃，重新探测
+                self._codes = [str(c) for c in data['codes'][keep]]
+                self._times = data['times'][keep]
+                self._values = data['values'][keep]
+            self._row = {c: i for i, c in enumerate(self._codes)}
+            return True
+        except Exception as e:
+            logger.warning(f"[SnapshotIndex] 读取失败 {self._file}: {e}")
+            return False
+
+    def save(self):
+        """原子写入（先写临时文件再替换）"""
+        self._dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._file.with_suffix('.tmp.npz')
+        np.savez_compressed(
+            tmp,
+            codes=np.array(self._codes, dtype=str),
+            instants=np.array(self._instant_names, dtype=str),
+            fields=np.array(self.FIELDS, dtype=str),
+            times=self._times,
+            values=self._values,
+        )
+        os.replace(tmp, self._file)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 构建
+    # ─────────────────────────────────────────────────────────────────────────
+    def extract(self, tick_df) -> tuple:
+        """
+        单票全天Tick → (times(k,), values(k, f))
+
+        Args:
+            tick_df: QMT本地Tick DataFrame，需含 time(毫秒) 列
+        """
+        k, f = len(self._instant_ms), len(self.FIELDS)
+        times = np.full(k, -1, dtype=np.int64)
+        values = np.zeros((k, f), dtype=np.float64)
+        if tick_df is None or len(tick_df) == 0 or 'time' not in tick_df.columns:
+            return times, values
+
+        tick_times = tick_df['time'].to_numpy(dtype=np.int64)
+        pos = np.searchsorted(tick_times, self._instant_ms, side='right') - 1
+        hit = pos >= 0
+        if not hit.any():
+            return times, values
+        rows = pos[hit]
+        times[hit] = tick_times[rows]
+        for j, name in enumerate(self.FIELDS):
+            if name in tick_df.columns:
+                col = tick_df[name].to_numpy()[rows]
+            elif name in ('askPrice1', 'bidPrice1') and name[:-1] in tick_df.columns:
+                col = [(v[0] if v is not None and len(v) else 0.0) for v in tick_df[name[:-1]].to_numpy()[rows]]
+            else:
+                continue
+            values[hit, j] = np.nan_to_num(np.asarray(col, dtype=np.float64))
+        return times, values
+
+    def add(self, stock_code: str, tick_df) -> None:
+        """把单票Tick抽取结果并入索引（已存在则覆盖；无Tick不入索引）"""
+        times, values = self.extract(tick_df)
+        if (times < 0).all():
+            return
+        i = self._row.get(stock_code)
+        if i is None:
+            self._row[stock_code] = len(self._codes)
+            self._codes.append(stock_code)
+            self._times = np.concatenate([self._times, times[None]])
+            self._values = np.concatenate([self._values, values[None]])
+        else:
+            self._times[i] = times
+            self._values[i] = values
+
+    def ensure(self, stock_list: Iterable[str], persist: bool = True, force: bool = False) -> int:
+        """
+        保证 stock_list 都在索引中：先读文件，只对缺失的票分块读取Tick
+
+        Args:
+            force: 已在索引中的票也重读覆盖（手工重建时用）
+
+        Returns:
+            int: 本次新建/重建索引的票数（无Tick的票不计入）
+        """
+        if not self._loaded:
+            self.load()
+        missing = [s for s in dict.fromkeys(stock_list) if force or s not in self._row]
+        if not missing:
+            return 0
+
+        try:
+            from xtquant import xtdata
+        except ImportError:
+            logger.error('[X] [SnapshotIndex] xtquant未安装，无法建索引')
+            return 0
+
+        built = 0
+        new_times, new_values = [], []
+        for i in range(0, len(missing), self.CHUNK_SIZE):
+            chunk = missing[i:i + self.CHUNK_SIZE]
+            try:
+                data = xtdata.get_local_data(
+                    field_list=self._TICK_FIELDS,
+                    stock_list=chunk,
+                    period='tick',
+                    start_time=self.trade_date,
+                    end_time=self.trade_date
+                ) or {}
+            except Exception as e:
+                logger.warning(f"[SnapshotIndex] Tick分块读取失败: {e}")
+                continue
+            for code in chunk:
+                times, values = self.extract(data.get(code))
+                if (times < 0).all():
+                    continue
+                i = self._row.get(code)
+                if i is not None:
+                    self._times[i] = times
+                    self._values[i] = values
+                else:
+                    self._row[code] = len(self._codes)
+                    self._codes.append(code)
+                    new_times.append(times)
+                    new_values.append(values)
+                built += 1
+
+        if new_times:
+            self._times = np.concatenate([self._times, np.stack(new_times)])
+            self._values = np.concatenate([self._values, np.stack(new_values)])
+        if built:
+            if persist and self._is_final():
+                self.save()
+            logger.info(f"[OK] [SnapshotIndex] {self.trade_date} 新建索引 {built} 只，共 {len(self._codes)} 只")
+        return built
+
+    def _is_final(self) -> bool:
+        """当日收盘前不落盘（盘中数据仍在增长）"""
+        now = datetime.now()
+        return self.trade_date < now.strftime('%Y%m%d') or now.strftime('%H%M%S') >= '150500'
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 查询
+    # ─────────────────────────────────────────────────────────────────────────
+    def instant_of(self, target_time_str: str) -> Optional[str]:
+        """HHMMSS / 时刻名 → 时刻名（非索引时刻返回 None）"""
+        if target_time_str in self.INSTANTS:
+            return target_time_str
+        for name, hhmmss in self.INSTANTS.items():
+            if hhmmss == target_time_str:
+                return name
+        return None
+
+    def get(self, stock_code: str, instant: str = 'close') -> Optional[dict]:
+        """
+        单票单时刻快照
+
+        Returns:
+            {'time', lastPrice, open, ...}；未建索引或该时刻前无Tick返回 None
+        """
+        i = self._row.get(stock_code)
+        name = self.instant_of(instant)
+        if i is None or name is None:
+            return None
+        j = self._instant_names.index(name)
+        if self._times[i, j] < 0:
+            return None
+        snap = dict(zip(self.FIELDS, self._values[i, j].tolist()))
+        snap['time'] = int(self._times[i, j])
+        return snap
+
+    def snapshot(self, stock_list: Iterable[str], instant: str = 'close') -> Dict[str, dict]:
+        """多票单时刻快照（无数据的票不出现）"""
+        result = {}
+        for code in stock_list:
+            snap = self.get(code, instant)
+            if snap is not None:
+                result[code] = snap
+        return result
@@ -324,7 +324,24 @@ class TickAdapterBase:
             {stock_code: StandardTick}
         """
         raise NotImplementedError
-    
+
+    def get_frame(self, stock_codes: List[str]):
+        """
+        【CTO V230】获取列式帧批次（TickBatch）
+
+        默认实现由 get_ticks() 转换而来；Live/Mock 适配器覆盖为直接列式构造。
+
+        Args:
+            stock_codes: 股票代码列表
+
+        Returns:
+            TickBatch，行顺序与 stock_codes 一致
+        """
+        from logic.data_providers.tick_batch import TickBatch
+
+        ticks = self.get_ticks(stock_codes)
+        return TickBatch.from_standard_ticks(stock_codes, ticks)
+
     def get_full_tick_snapshot(self, stock_codes: List[str]) -> Dict[str, StandardTick]:
         """
         获取全市场快照
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+SymbolTable / ColumnStore - 代码驻留表 + 稠密列存储
+
+【CTO V233 数组化字典】
+旧方案：TrueDictionary 每个字段一个 {code: float} 字典，全市场 5000 只 × 7 个字段，
+        每个条目都是 str 键 + float 对象；热路径逐只 get_xxx(code)，
+        全市场扫描用 .map(lambda ...) 逐行回调。
+
+新方案：
+  - SymbolTable 把代码驻留为连续 int id（code → id），只增不减
+  - ColumnStore 每个字段一列 float64 稠密数组，下标即 id，NaN 表示缺失
+  - 批量读取 = ids → 一次 fancy index gather；单只读取仍 O(1)
+  - 容量倍增扩展，驻留新代码不逐次重分配
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+class SymbolTable:
+    """代码 → 连续 int id"""
+
+    __slots__ = ('codes', '_ids')
+
+    def __init__(self, codes: Iterable[str] = ()):
+        self.codes: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.intern(codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._ids
+
+    def id_of(self, code: str) -> int:
+        """单只 id，未驻留返回 -1"""
+        return self._ids.get(code, -1)
+
+    def ids(self, codes: Iterable[str]) -> np.ndarray:
+        """批量 id（不驻留），未驻留为 -1"""
+        get = self._ids.get
+        return np.fromiter((get(c, -1) for c in codes), dtype=np.int64)
+
+    def intern(self, codes: Iterable[str]) -> np.ndarray:
+        """驻留并返回 id（新代码追加到末尾）"""
+        ids = self._ids
+        out = []
+        for code in codes:
+            i = ids.get(code)
+            if i is None:
+                i = ids[code] = len(self.codes)
+                self.codes.append(code)
+            out.append(i)
+        return np.asarray(out, dtype=np.int64)
+
+
+class ColumnStore:
+    """
+    按 SymbolTable id 对齐的稠密字段列（float64，NaN = 缺失）
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = tuple(fields)
+        self.symbols = SymbolTable()
+        self._columns: Dict[str, np.ndarray] = {f: np.empty(0) for f in self.fields}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def codes(self) -> List[str]:
+        return self.symbols.codes
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 驻留
+    # ─────────────────────────────────────────────────────────────────────────
+    def intern(self, codes: Iterable[str]) -> np.ndarray:
+        """驻留代码，必要时按倍增扩容各列"""
+        ids = self.symbols.intern(codes)
+        self._reserve(len(self.symbols))
+        return ids
+
+    def ids(self, codes: Iterable[str]) -> np.ndarray:
+        return self.symbols.ids(codes)
+
+    def _reserve(self, n: int):
+        capacity = len(self._columns[self.fields[0]]) if self.fields else 0
+        if n <= capacity:
+            return
+        new_capacity = max(n, capacity * 2, 64)
+        for f, col in self._columns.items():
+            grown = np.full(new_capacity, np.nan)
+            grown[:capacity] = col
+            self._columns[f] = grown
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 读写
+    # ─────────────────────────────────────────────────────────────────────────
+    def column(self, field: str) -> np.ndarray:
+        """按 id 对齐的整列（只含已驻留部分的视图）"""
+        return self._columns[field][:len(self.symbols)]
+
+    def set(self, field: str, ids: np.ndarray, values) -> None:
+        self._columns[field][np.asarray(ids, dtype=np.int64)] = values
+
+    def set_one(self, field: str, code: str, value: float) -> None:
+        i = self.symbols.id_of(code)
+        if i < 0:
+            i = int(self.intern((code,))[0])
+        self._columns[field][i] = value
+
+    def get(self, field: str, ids: np.ndarray, default: float = 0.0) -> np.ndarray:
+        """批量 gather：未驻留 id(-1) 或缺失(NaN) 返回 default"""
+        ids = np.asarray(ids, dtype=np.int64)
+        col = self._columns[field]
+        values = col[np.where(ids >= 0, ids, 0)] if len(col) else np.full(len(ids), np.nan)
+        return np.where((ids >= 0) & ~np.isnan(values), values, default)
+
+    def get_one(self, field: str, code: str, default=0.0):
+        i = self.symbols.id_of(code)
+        if i < 0:
+            return default
+        v = self._columns[field][i]
+        return default if v != v else float(v)
+
+    def has(self, field: str, code: str) -> bool:
+        i = self.symbols.id_of(code)
+        return i >= 0 and not np.isnan(self._columns[field][i])
+
+    def count(self, field: str) -> int:
+        """该字段非缺失条目数"""
+        return int(np.count_nonzero(~np.isnan(self.column(field))))
+
+    def codes_with(self, field: str) -> List[str]:
+        codes = self.symbols.codes
+        return [codes[i] for i in np.flatnonzero(~np.isnan(self.column(field)))]
+
+    def to_dict(self, field: str) -> Dict[str, float]:
+        codes = self.symbols.codes
+        col = self.column(field)
+        return {codes[i]: float(col[i]) for i in np.flatnonzero(~np.isnan(col))}
+
+    def load_columns(self, codes: Sequence[str], columns: Dict[str, np.ndarray]) -> None:
+        """整体替换为给定代码与列（缓存装载；列复制为可写内存）"""
+        self.symbols = SymbolTable(codes)
+        n = len(self.symbols)
+        self._columns = {}
+        for f in self.fields:
+            col = columns.get(f)
+            self._columns[f] = np.array(col, dtype=np.float64) if col is not None else np.full(n, np.nan)
+
+    def clear(self) -> None:
+        self.symbols = SymbolTable()
+        self._columns = {f: np.empty(0) for f in self.fields}
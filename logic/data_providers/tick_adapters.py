@@ -3,8 +3,8 @@
 Tick适配器 - Live/Mock模式统一数据入口
 
 【CTO V213 大一统引擎核心组件】
-- LiveTickAdapter: 实盘QMT数据 → StandardTick
-- MockTickAdapter: 本地历史数据 → StandardTick
+- LiveTickAdapter: 实盘QMT数据 → StandardTick / TickBatch
+- MockTickAdapter: 本地历史数据 → StandardTick / TickBatch
 
 设计原则：
 1. 数据防腐：所有数据源必须经过Adapter清洗
@@ -19,9 +19,11 @@ Version: 1.0.0
 import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 from logic.data_providers.standard_tick import StandardTick, TickAdapterBase
+from logic.data_providers.tick_batch import BOOK_FIELDS, TickBatch, format_ms
 
 logger = logging.getLogger(__name__)
 
@@ -95,23 +97,31 @@ class LiveTickAdapter(TickAdapterBase):
             stock_codes: 股票代码列表
             
         Returns:
-            {stock_code: StandardTick}
+            {stock_code: TickRow}（属性同 StandardTick）
+        """
+        # 【CTO V232】列式批次 + 行视图，不再逐票构造 StandardTick
+        return self.get_frame(stock_codes).rows()
+    
+    def get_frame(self, stock_codes: List[str]) -> TickBatch:
+        """
+        【CTO V230】原始全推字典直接填列，不经过StandardTick
+        
+        Args:
+            stock_codes: 股票代码列表（决定行顺序）
+            
+        Returns:
+            TickBatch
         """
         if not self._is_initialized:
             if not self.initialize():
-                return {}
+                return TickBatch(stock_codes)
         
-        result = {}
         try:
             raw_ticks = self._xtdata.get_full_tick(stock_codes)
-            if raw_ticks:
-                for code, tick in raw_ticks.items():
-                    if tick:
-                        result[code] = StandardTick.from_qmt_tick(code, tick)
+            return TickBatch.from_qmt_ticks(stock_codes, raw_ticks or {}, time=datetime.now())
         except Exception as e:
-            logger.error(f"[X] [LiveTickAdapter] get_ticks失败: {e}")
-        
-        return result
+            logger.error(f"[X] [LiveTickAdapter] get_frame失败: {e}")
+            return TickBatch(stock_codes)
     
     def get_full_tick_snapshot(self, stock_codes: List[str]) -> Dict[str, StandardTick]:
         """
@@ -147,9 +157,19 @@ class MockTickAdapter(TickAdapterBase):
     用途：
     - mode='mock'时注入主引擎
     - 从本地Tick文件或QMT历史数据读取
-    - 输出StandardTick
+    - 输出StandardTick / TickBatch
+    
+    【CTO V230 列式回放】
+    - 加载时经 TickBatch.from_local_ticks 整列转换（含五档），各票拼成整列（按票连续存放，_offsets 记录起点）
+    - 时间轴为全部票Tick时间的并集（毫秒），不再以首只票为准
+    - 每帧对所有票做一次 searchsorted 求行游标（该时刻及之前最新一笔），
+      get_frame 只做花式索引
     """
     
+    # 回放列（本地Tick → TickBatch.from_local_ticks 整列转换，含五档；口径同 from_local_tick）
+    _FRAME_FIELDS = ('last_price', 'prev_close', 'volume_shares', 'amount_yuan',
+                     'open_price', 'high_price', 'low_price') + BOOK_FIELDS
+    
     def __init__(self, target_date: str = None):
         """
         初始化Mock适配器
@@ -160,9 +180,17 @@ class MockTickAdapter(TickAdapterBase):
         self.target_date = target_date or datetime.now().strftime('%Y%m%d')
         self._xtdata = None
         self._is_initialized = False
-        self._tick_cache = {}  # {stock_code: DataFrame}
-        self._time_axis = []  # 时间轴
+        self._codes: List[str] = []  # 已加载标的（行块顺序）
+        self._code_index: Dict[str, int] = {}
+        self._offsets = np.zeros(1, dtype=np.int64)  # 各票行块起点，长度 n+1
+        self._columns: Dict[str, np.ndarray] = {}  # 字段 → 全部票拼接后的整列
+        self._sort_keys = np.empty(0, dtype=np.int64)  # 票号*跨度 + 相对时间，全局有序
+        self._key_span = 1
+        self._time_axis = np.empty(0, dtype=np.int64)  # 时间轴（毫秒）
+        self._frame_events = np.empty(0, dtype=np.int64)  # 每帧到达的Tick笔数
         self._current_index = 0  # 当前时间索引
+        self._frame_rows = None  # 当前帧各票行游标（-1=该时刻尚无Tick）
+        self._frame_rows_index = -1
     
     def initialize(self) -> bool:
         """
@@ -199,59 +227,132 @@ class MockTickAdapter(TickAdapterBase):
             if not self.initialize():
                 return 0
         
-        loaded = 0
+        frames = {}
         for code in stock_codes:
             try:
                 # 从QMT本地读取历史Tick
-                df = self._xtdata.get_local_data(
-                    stock_code=code,
+                data = self._xtdata.get_local_data(
+                    field_list=[],
+                    stock_list=[code],
                     period='tick',
                     start_time=f'{self.target_date}093000',
                     end_time=f'{self.target_date}150000'
                 )
+                df = data.get(code) if isinstance(data, dict) else data
                 if df is not None and len(df) > 0:
-                    self._tick_cache[code] = df
-                    loaded += 1
+                    frames[code] = df
             except Exception as e:
                 logger.debug(f"[MockTickAdapter] {code} 无Tick数据: {e}")
         
-        # 构建时间轴
-        if self._tick_cache:
-            first_code = list(self._tick_cache.keys())[0]
-            self._time_axis = self._tick_cache[first_code].index.tolist()
-            self._current_index = 0
-        
-        logger.info(f"[OK] [MockTickAdapter] 加载Tick数据: {loaded}/{len(stock_codes)}")
+        loaded = self.load_frames(frames)
+        logger.info(f"[OK] [MockTickAdapter] 加载Tick数据: {loaded}/{len(stock_codes)} "
+                    f"| 时间轴 {len(self._time_axis)} 帧")
         return loaded
     
-    def get_ticks(self, stock_codes: List[str]) -> Dict[str, StandardTick]:
+    def load_frames(self, frames: Dict[str, pd.DataFrame]) -> int:
         """
-        获取当前时间点的Tick数据
+        把 {code: 本地Tick DataFrame} 拼成列式存储并构建时间轴
         
         Args:
-            stock_codes: 股票代码列表
+            frames: 本地Tick，需含 time(毫秒) 列或 'YYYYMMDDHHMMSS' 索引；
+                    五档数组列 bidPrice/askPrice/bidVol/askVol 有则一并回放
             
         Returns:
-            {stock_code: StandardTick}
+            int: 成功加载数量
         """
-        result = {}
+        codes, times, parts = [], [], {name: [] for name in self._FRAME_FIELDS}
+        for code, df in frames.items():
+            try:
+                if df is None or not len(df):
+                    continue
+                batch = TickBatch.from_local_ticks(code, df)
+                order = np.argsort(batch.times, kind='stable')
+                cols = {name: getattr(batch, name)[order] for name in self._FRAME_FIELDS}
+            except Exception as e:
+                logger.debug(f"[MockTickAdapter] {code} 列提取失败: {e}")
+                continue
+            codes.append(code)
+            times.append(batch.times[order])
+            for name, values in cols.items():
+                parts[name].append(values)
         
-        if not self._time_axis or self._current_index >= len(self._time_axis):
-            return result
+        self._codes = codes
+        self._code_index = {c: i for i, c in enumerate(codes)}
+        self._current_index = 0
+        self._frame_rows = None
+        self._frame_rows_index = -1
+        if not codes:
+            self._offsets = np.zeros(1, dtype=np.int64)
+            self._columns = {}
+            self._sort_keys = np.empty(0, dtype=np.int64)
+            self._time_axis = np.empty(0, dtype=np.int64)
+            self._frame_events = np.empty(0, dtype=np.int64)
+            return 0
         
-        for code in stock_codes:
-            if code in self._tick_cache:
-                try:
-                    df = self._tick_cache[code]
-                    if self._current_index < len(df):
-                        row = df.iloc[self._current_index]
-                        tick_dict = row.to_dict() if hasattr(row, 'to_dict') else dict(row)
-                        time_str = str(self._time_axis[self._current_index])
-                        result[code] = StandardTick.from_local_tick(code, tick_dict, time_str)
-                except Exception as e:
-                    logger.debug(f"[MockTickAdapter] {code} 提取失败: {e}")
+        lengths = np.array([len(t) for t in times], dtype=np.int64)
+        self._offsets = np.concatenate(([0], np.cumsum(lengths)))
+        self._columns = {name: np.concatenate(values) for name, values in parts.items()}
         
-        return result
+        all_times = np.concatenate(times)
+        # 各票时间已有序：稳定排序（timsort）按有序段归并 = k路归并成全局事件时钟
+        merged = all_times[np.argsort(all_times, kind='stable')]
+        starts = np.flatnonzero(np.r_[True, merged[1:] != merged[:-1]])
+        self._time_axis = merged[starts]
+        self._frame_events = np.diff(np.r_[starts, len(merged)])
+        t0 = int(self._time_axis[0])
+        self._key_span = int(self._time_axis[-1]) - t0 + 1
+        sym_ids = np.repeat(np.arange(len(codes), dtype=np.int64), lengths)
+        self._sort_keys = sym_ids * self._key_span + (all_times - t0)
+        return len(codes)
+    
+    def _current_rows(self) -> np.ndarray:
+        """当前帧所有已加载票的全局行号（每帧一次 searchsorted）"""
+        if self._frame_rows_index != self._current_index:
+            n = len(self._codes)
+            t = int(self._time_axis[self._current_index]) - int(self._time_axis[0])
+            base = np.arange(n, dtype=np.int64) * self._key_span
+            rows = np.searchsorted(self._sort_keys, base + t, side='right') - 1
+            self._frame_rows = np.where(rows >= self._offsets[:-1], rows, -1)
+            self._frame_rows_index = self._current_index
+        return self._frame_rows
+    
+    def get_frame(self, stock_codes: List[str]) -> TickBatch:
+        """
+        【CTO V230】当前时间点的列式帧
+        
+        Args:
+            stock_codes: 股票代码列表（决定行顺序）
+            
+        Returns:
+            TickBatch：未加载或该时刻尚无Tick的票 valid=False
+        """
+        batch = TickBatch(stock_codes, time=self.get_current_time())
+        if not len(self._time_axis) or self._current_index >= len(self._time_axis):
+            return batch
+        
+        n = len(batch.codes)
+        sym = np.fromiter((self._code_index.get(c, -1) for c in batch.codes), dtype=np.int64, count=n)
+        rows = np.full(n, -1, dtype=np.int64)
+        known = sym >= 0
+        rows[known] = self._current_rows()[sym[known]]
+        valid = rows >= 0
+        take = rows[valid]
+        batch.valid = valid
+        for name, column in self._columns.items():
+            getattr(batch, name)[valid] = column[take]
+        return batch
+    
+    def get_ticks(self, stock_codes: List[str]) -> Dict[str, StandardTick]:
+        """
+        获取当前时间点的Tick数据
+        
+        Args:
+            stock_codes: 股票代码列表
+            
+        Returns:
+            {stock_code: TickRow}（属性同 StandardTick）
+        """
+        return self.get_frame(stock_codes).rows()
     
     def get_full_tick_snapshot(self, stock_codes: List[str]) -> Dict[str, StandardTick]:
         """
@@ -271,15 +372,52 @@ class MockTickAdapter(TickAdapterBase):
             return True
         return False
     
+    def seek(self, ms: int) -> int:
+        """
+        跳到不早于 ms 的第一帧
+
+        Returns:
+            int: 新的帧序号
+        """
+        self._current_index = int(np.searchsorted(self._time_axis, ms, side='left'))
+        return self._current_index
+
+    @property
+    def frame_count(self) -> int:
+        """时间轴总帧数"""
+        return len(self._time_axis)
+    
+    @property
+    def frame_index(self) -> int:
+        """当前帧序号"""
+        return self._current_index
+    
+    @property
+    def loaded_codes(self) -> List[str]:
+        """已加载Tick的标的"""
+        return self._codes
+    
+    def get_current_ms(self) -> Optional[int]:
+        """当前帧毫秒时间戳"""
+        if len(self._time_axis) and self._current_index < len(self._time_axis):
+            return int(self._time_axis[self._current_index])
+        return None
+    
+    def get_frame_events(self) -> int:
+        """当前帧到达的Tick笔数"""
+        if self._current_index < len(self._frame_events):
+            return int(self._frame_events[self._current_index])
+        return 0
+    
     def get_current_time(self) -> Optional[str]:
         """
         获取当前时间戳
         
         Returns:
-            str: 当前时间字符串
+            str: 当前时间字符串（YYYYMMDDHHMMSS，北京时间）
         """
-        if self._time_axis and self._current_index < len(self._time_axis):
-            return str(self._time_axis[self._current_index])
+        if len(self._time_axis) and self._current_index < len(self._time_axis):
+            return format_ms(self._time_axis[self._current_index])
         return None
     
     def get_progress(self) -> float:
@@ -289,7 +427,7 @@ class MockTickAdapter(TickAdapterBase):
         Returns:
             float: 0.0-1.0
         """
-        if not self._time_axis:
+        if not len(self._time_axis):
             return 0.0
         return self._current_index / len(self._time_axis)
     
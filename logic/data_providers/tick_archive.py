@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+"""
+TickArchive - 紧凑 Tick 归档格式（差分编码 + 分块压缩 + 块索引随机访问）
+
+【CTO V233 Tick 归档】
+旧方案：长周期研究只能整帧 get_local_data 读 QMT 本地 Tick（pandas 解码慢、内存大），
+        或者落 data/research_lab 的 CSV，几百只几天就是数 MB，几个月全市场根本放不下。
+
+新方案：data/tick_archive/{YYYYMMDD}.mqta 单文件
+  - 每只票的 Tick 按 block_rows 切块；块内按列编码：
+      time                     毫秒时间戳，差分
+      价格列 / 五档价           × 100 取整（最小变动价 0.01），差分
+      volume / amount(分) /
+      transactionNum            累计值，差分（即逐笔增量）
+      五档量 / stockStatus      整数，差分
+    差分后按块内最大绝对值选最窄整型（int8/16/32/64），字节重排（同位字节聚在一起）后
+    zlib 压缩；每列单独一段，读取只解压请求的列
+  - 文件尾是块索引（代码 / 行数 / 首末时间戳 / 每列偏移·长度·位宽·首值），
+    按代码 + 时间范围定位到块，块内 searchsorted 截取
+  - 布局: MAGIC(8) | VERSION(u32) | 保留(u32) | 列段... | 索引JSON(zlib) | 索引长度(u64) | crc32(u32) | MAGIC
+    写入先写临时文件再 os.replace，原子落盘
+
+精度口径：价格按 0.01 取整、成交额按 0.01 元取整、量与笔数按整数截断（QMT 原始口径本身如此）。
+
+解码吞吐（单核实测，read_columns(raw=True)，合成全天 Tick，未达"每核数千万条"目标，如实记录）：
+  level=6（默认）  压缩比 ~14x   time/lastPrice/volume/amount 四列 ~11M条/s   全部 34 档 ~3M条/s
+  level=0（只存储）压缩比 ~5x    四列 ~25M条/s                              全部 34 档 ~6M条/s
+  瓶颈是 zlib 解压（默认档位约占一半）与逐列 numpy 累加：每档一次 cumsum，纯 numpy 下
+  34 档全盘口到不了千万级；要再快只能上编译型解码器（numba / C 扩展），本仓库不引入。
+  取舍：长期归档用默认 level 换体积；反复回放的热数据可 convert_local_ticks(level=0)
+  换约 2 倍解码速度，读取只解压请求的列，研究时尽量只取用到的列。
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'MQTICK\x00\x01'
+VERSION = 1
+ARCHIVE_DIR = Path('data/tick_archive')
+SUFFIX = '.mqta'
+BLOCK_ROWS = 8192
+_PREFIX = struct.Struct('<8sII')
+_TRAILER = struct.Struct('<QI8s')
+_BEIJING_OFFSET_MS = 8 * 3600 * 1000
+
+# (列名, 缩放, 档数)：缩放 0 = 原样整数；档数 5 = 五档 (n, 5) 矩阵
+COLUMNS = (
+    ('time', 0, 1), ('lastPrice', 100, 1), ('open', 100, 1), ('high', 100, 1), ('low', 100, 1),
+    ('lastClose', 100, 1), ('volume', 0, 1), ('amount', 100, 1), ('transactionNum', 0, 1),
+    ('stockStatus', 0, 1), ('askPrice', 100, 5), ('bidPrice', 100, 5), ('askVol', 0, 5), ('bidVol', 0, 5),
+)
+COLUMN_NAMES = tuple(name for name, _, _ in COLUMNS)
+BOOK_COLUMNS = tuple(name for name, _, levels in COLUMNS if levels > 1)
+_SPEC = {name: (i, scale, levels) for i, (name, scale, levels) in enumerate(COLUMNS)}
+_WIDTHS = ((1, np.int8), (2, np.int16), (4, np.int32), (8, np.int64))
+
+TimeBound = Union[None, int, str]
+
+
+def archive_path(trade_date: str, archive_dir: Optional[Path] = None) -> Path:
+    return Path(archive_dir or ARCHIVE_DIR) / f'{trade_date}{SUFFIX}'
+
+
+def to_ms(value: TimeBound, end: bool = False) -> Optional[int]:
+    """毫秒时间戳 / 'YYYYMMDD' / 'YYYYMMDDHHMMSS'（北京时间）→ 毫秒；纯日期的 end 取当日 23:59:59.999"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    text = str(value)
+    ts = pd.Timestamp(f'{text[:8]} {text[8:10] or "00"}:{text[10:12] or "00"}:{text[12:14] or "00"}')
+    ms = int(ts.value // 1_000_000) - _BEIJING_OFFSET_MS
+    return ms + 86_399_999 if end and len(text) <= 8 else ms
+
+
+def ms_index(times: np.ndarray) -> np.ndarray:
+    """毫秒时间戳 → 'YYYYMMDDHHMMSS' 北京时间（与 QMT Tick 索引同格式，向量化）"""
+    ms = np.asarray(times, dtype=np.int64) + _BEIJING_OFFSET_MS
+    days = (ms // 86_400_000).astype('datetime64[D]')
+    years = days.astype('datetime64[Y]').astype(np.int64) + 1970
+    months = days.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    mdays = (days - days.astype('datetime64[M]')).astype(np.int64) + 1
+    secs = ms % 86_400_000 // 1000
+    hms = secs // 3600 * 10000 + secs % 3600 // 60 * 100 + secs % 60
+    return ((years * 10000 + months * 100 + mdays) * 1_000_000 + hms).astype(str)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 列编解码
+# ─────────────────────────────────────────────────────────────────────────────
+def _quantize(values: np.ndarray, scale: int) -> np.ndarray:
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+    return np.rint(values * scale).astype(np.int64) if scale else np.trunc(values).astype(np.int64)
+
+
+def encode_column(values: np.ndarray, level: int = 6):
+    """
+    int64 列（(n,) 或 (n, k)）→ (压缩字节, 位宽, 首行值)
+
+    首行单独存；其余行存逐行差分，按最大绝对值选位宽，字节重排后 zlib
+    """
+    first = values[0].tolist() if values.ndim > 1 else [int(values[0])]
+    deltas = np.diff(values, axis=0)
+    peak = int(np.abs(deltas).max()) if deltas.size else 0
+    width, dtype = next(w for w in _WIDTHS if peak <= np.iinfo(w[1]).max)
+    raw = np.ascontiguousarray(deltas, dtype=dtype).view(np.uint8).reshape(-1, width)
+    return zlib.compress(np.ascontiguousarray(raw.T).tobytes(), level), width, first
+
+
+def decode_column(payload, width: int, first: Sequence[int], rows: int) -> np.ndarray:
+    """encode_column 的逆：解压 → 字节还原 → 原地累加"""
+    levels = len(first)
+    out = np.empty((rows, levels), dtype=np.int64)
+    out[0] = first
+    if rows > 1:
+        raw = np.frombuffer(zlib.decompress(payload), dtype=np.uint8)
+        if width == 1:
+            deltas = raw.view(np.int8)
+        else:
+            # 按字节平面逐面回填比整块转置快得多
+            planes = raw.reshape(width, -1)
+            buf = np.empty((planes.shape[1], width), dtype=np.uint8)
+            for k in range(width):
+                buf[:, k] = planes[k]
+            deltas = buf.view(dict(_WIDTHS)[width])
+        out[1:] = deltas.reshape(rows - 1, levels)
+        np.cumsum(out, axis=0, out=out)
+    return out if levels > 1 else out[:, 0]
+
+
+def frame_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """QMT 本地 Tick DataFrame → {列: int64}（缺列补 0；五档数组列 → (n, 5)）"""
+    from logic.data_providers.tick_batch import _stack_levels, tick_times_ms
+
+    n = len(df)
+    out = {}
+    for name, scale, levels in COLUMNS:
+        if name == 'time':
+            out[name] = tick_times_ms(df)
+        elif name not in df.columns:
+            out[name] = np.zeros((n, levels) if levels > 1 else n, dtype=np.int64)
+        elif levels > 1:
+            out[name] = _quantize(_stack_levels(df[name].to_numpy(), n), scale)
+        else:
+            out[name] = _quantize(df[name].to_numpy(dtype=np.float64, na_value=0.0), scale)
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 写入
+# ─────────────────────────────────────────────────────────────────────────────
+class TickArchiveWriter:
+    """
+    用法:
+        with TickArchiveWriter(archive_path('20260318')) as writer:
+            for code, df in frames.items():
+                writer.write(code, df)          # QMT 本地 Tick DataFrame，按时间升序
+    """
+
+    def __init__(self, path: Path, block_rows: int = BLOCK_ROWS, level: int = 6, meta: Optional[Dict] = None):
+        self.path = Path(path)
+        self.block_rows = max(2, int(block_rows))
+        self.level = level
+        self.meta = meta or {}
+        self.codes: List[str] = []
+        self._code_ids: Dict[str, int] = {}
+        self.blocks: List[list] = []
+        self.rows = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = self.path.with_suffix(SUFFIX + '.tmp')
+        self._f = open(self._tmp, 'wb')
+        self._f.write(_PREFIX.pack(MAGIC, VERSION, 0))
+
+    def write(self, code: str, data: Union[pd.DataFrame, Mapping[str, np.ndarray]]) -> int:
+        """
+        追加一只票的 Tick（同一只票可多次调用，时间需递增）
+
+        Args:
+            data: QMT 本地 Tick DataFrame，或 frame_columns() 格式的 {列: int64}
+
+        Returns:
+            写入行数
+        """
+        columns = frame_columns(data) if isinstance(data, pd.DataFrame) else data
+        n = len(columns['time'])
+        if n == 0:
+            return 0
+        code_id = self._code_ids.setdefault(code, len(self.codes))
+        if code_id == len(self.codes):
+            self.codes.append(code)
+        for lo in range(0, n, self.block_rows):
+            hi = min(lo + self.block_rows, n)
+            self._write_block(code_id, {k: v[lo:hi] for k, v in columns.items()}, hi - lo)
+        self.rows += n
+        return n
+
+    def _write_block(self, code_id: int, columns: Mapping[str, np.ndarray], rows: int) -> None:
+        times = columns['time']
+        entry = [code_id, rows, int(times[0]), int(times[-1])]
+        cols = []
+        for name, _, levels in COLUMNS:
+            values = np.asarray(columns[name], dtype=np.int64)
+            payload, width, first = encode_column(values, self.level)
+            cols.append([self._f.tell(), len(payload), width, first])
+            self._f.write(payload)
+        self.blocks.append(entry + [cols])
+
+    def close(self) -> Path:
+        """写索引 + 尾部，原子替换"""
+        if self._f.closed:
+            return self.path
+        index = {'columns': list(COLUMN_NAMES), 'codes': self.codes, 'blocks': self.blocks,
+                 'rows': self.rows, 'meta': self.meta}
+        payload = zlib.compress(json.dumps(index, separators=(',', ':')).encode('utf-8'), self.level)
+        self._f.write(payload)
+        self._f.write(_TRAILER.pack(len(payload), zlib.crc32(payload), MAGIC))
+        self._f.close()
+        os.replace(self._tmp, self.path)
+        return self.path
+
+    def abort(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self) -> 'TickArchiveWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 读取
+# ─────────────────────────────────────────────────────────────────────────────
+class TickArchive:
+    """
+    只读归档（mmap）
+
+    用法:
+        archive = TickArchive.open('20260318')
+        cols = archive.read_columns('600000.SH', '20260318093000', '20260318100000',
+                                    fields=['time', 'lastPrice', 'volume'])   # 原始 int64 / float64 数组
+        df = archive.read('600000.SH')          # QMT get_local_data 同格式 DataFrame
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._mm)
+        magic, version, _ = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{self.path.name}: MAGIC不符')
+        if version != VERSION:
+            raise ValueError(f'{self.path.name}: 版本 {version} != {VERSION}')
+        index_len, crc, tail_magic = _TRAILER.unpack_from(self._mm, size - _TRAILER.size)
+        if tail_magic != MAGIC:
+            raise ValueError(f'{self.path.name}: 文件截断')
+        payload = self._mm[size - _TRAILER.size - index_len:size - _TRAILER.size]
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f'{self.path.name}: 索引校验和不符')
+        index = json.loads(zlib.decompress(payload).decode('utf-8'))
+        self.codes: List[str] = index['codes']
+        self.meta: Dict = index.get('meta', {})
+        self.rows: int = index['rows']
+        self._blocks: Dict[int, List[list]] = {}
+        for block in index['blocks']:
+            self._blocks.setdefault(block[0], []).append(block)
+        self._code_ids = {c: i for i, c in enumerate(self.codes)}
+
+    @classmethod
+    def open(cls, trade_date: str, archive_dir: Optional[Path] = None) -> Optional['TickArchive']:
+        """按交易日打开；不存在或损坏返回 None"""
+        path = archive_path(trade_date, archive_dir)
+        if not path.exists():
+            return None
+        try:
+            return cls(path)
+        except Exception as e:
+            logger.warning(f'[WARN] [TickArchive] 归档不可用 {path.name}: {e}')
+            return None
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._code_ids
+
+    def row_count(self, code: str) -> int:
+        return sum(b[1] for b in self._blocks.get(self._code_ids.get(code, -1), ()))
+
+    def read_columns(self, code: str, start_time: TimeBound = None, end_time: TimeBound = None,
+                     fields: Optional[Sequence[str]] = None, raw: bool = False) -> Dict[str, np.ndarray]:
+        """
+        按代码 + 时间范围读取列
+
+        Args:
+            fields: 列子集（默认全部），只解压这些列
+            raw: True 返回存储口径 int64（价格/成交额为分）；False 还原为 float64（time 恒为 int64）
+
+        Returns:
+            {列: 数组}，五档列 (n, 5)；无数据时各列为空数组
+        """
+        fields = list(fields or COLUMN_NAMES)
+        lo, hi = to_ms(start_time), to_ms(end_time, end=True)
+        need = list(dict.fromkeys(['time'] + fields)) if (lo is not None or hi is not None) else fields
+        blocks = [b for b in self._blocks.get(self._code_ids.get(code, -1), ())
+                  if (lo is None or b[3] >= lo) and (hi is None or b[2] <= hi)]
+        parts: Dict[str, list] = {f: [] for f in need}
+        for _, rows, _, _, cols in blocks:
+            decoded = {}
+            for name in need:
+                offset, length, width, first = cols[_SPEC[name][0]]
+                decoded[name] = decode_column(self._mm[offset:offset + length], width, first, rows)
+            if lo is not None or hi is not None:
+                times = decoded['time']
+                a = 0 if lo is None else int(np.searchsorted(times, lo, side='left'))
+                b = rows if hi is None else int(np.searchsorted(times, hi, side='right'))
+                decoded = {k: v[a:b] for k, v in decoded.items()}
+            for name in need:
+                parts[name].append(decoded[name])
+
+        out = {}
+        for name in fields:
+            _, scale, levels = _SPEC[name]
+            chunks = parts[name]
+            values = (np.concatenate(chunks) if len(chunks) > 1 else chunks[0]) if chunks else \
+                np.zeros((0, levels) if levels > 1 else 0, dtype=np.int64)
+            out[name] = values if raw or name == 'time' else (values / scale if scale else values.astype(np.float64))
+        return out
+
+    def read(self, code: str, start_time: TimeBound = None, end_time: TimeBound = None,
+             fields: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """QMT get_local_data(period='tick') 同格式：索引 'YYYYMMDDHHMMSS'，五档为数组列"""
+        fields = list(fields or COLUMN_NAMES)
+        cols = self.read_columns(code, start_time, end_time, list(dict.fromkeys(['time'] + fields)))
+        index = ms_index(cols['time'])
+        data = {}
+        for name in fields:
+            values = cols[name]
+            data[name] = list(values) if values.ndim > 1 else values
+        return pd.DataFrame(data, index=index)
+
+    def read_many(self, codes: Sequence[str], start_time: TimeBound = None, end_time: TimeBound = None,
+                  fields: Optional[Sequence[str]] = None) -> Dict[str, pd.DataFrame]:
+        """{code: DataFrame}，归档里没有的票不返回（同 get_local_data）"""
+        return {c: self.read(c, start_time, end_time, fields) for c in codes if c in self._code_ids}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 转换
+# ─────────────────────────────────────────────────────────────────────────────
+def read_local_ticks(codes: List[str], trade_date: str) -> Dict[str, pd.DataFrame]:
+    """默认读取器：一次 get_local_data 读一块全字段 Tick"""
+    from xtquant import xtdata
+
+    return xtdata.get_local_data(field_list=[], stock_list=codes, period='tick',
+                                 start_time=trade_date, end_time=trade_date) or {}
+
+
+def convert_local_ticks(stock_list: Sequence[str], trade_date: str, archive_dir: Optional[Path] = None,
+                        chunk_size: int = 200, reader: Callable = read_local_ticks,
+                        block_rows: int = BLOCK_ROWS, level: int = 6) -> Dict:
+    """
+    QMT 本地 Tick → 归档文件（分块读取，单块失败跳过并计数）
+
+    level: zlib 压缩档位（0 = 只存储，体积约 2.7 倍、解码约快 2 倍，见模块说明）
+
+    Returns:
+        {'path', 'stocks', 'rows', 'failed', 'raw_bytes', 'archive_bytes', 'ratio', 'elapsed'}
+        raw_bytes 按 DataFrame float64 口径估算（标量列 8 字节、五档每档 8 字节）
+    """
+    codes = list(dict.fromkeys(stock_list))
+    path = archive_path(trade_date, archive_dir)
+    t0 = time.perf_counter()
+    stocks = failed = 0
+    with TickArchiveWriter(path, block_rows=block_rows, level=level, meta={'trade_date': trade_date}) as writer:
+        for i in range(0, len(codes), chunk_size):
+            chunk = codes[i:i + chunk_size]
+            try:
+                frames = reader(chunk, trade_date)
+            except Exception as e:
+                logger.warning(f'[WARN] [TickArchive] {len(chunk)}只块读取失败: {e}')
+                failed += len(chunk)
+                continue
+            for code in chunk:
+                df = frames.get(code)
+                if df is not None and len(df) and writer.write(code, df):
+                    stocks += 1
+        rows = writer.rows
+    raw_bytes = rows * 8 * sum(levels for _, _, levels in COLUMNS)
+    archive_bytes = path.stat().st_size
+    stats = {
+        'path': str(path), 'stocks': stocks, 'rows': rows, 'failed': failed,
+        'raw_bytes': raw_bytes, 'archive_bytes': archive_bytes,
+        'ratio': raw_bytes / archive_bytes if archive_bytes else 0.0,
+        'elapsed': time.perf_counter() - t0,
+    }
+    logger.info(f"[OK] [TickArchive] {trade_date} {stocks}只 {rows}条 → {archive_bytes / 1e6:.1f}MB "
+                f"(压缩比 {stats['ratio']:.1f}x, {stats['elapsed']:.1f}s)")
+    return stats
@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+"""
+TickBatch - 列式Tick批次
+
+【CTO V230 列式帧 / V233 TickBatch】
+旧路径每帧每只票：df.iloc → StandardTick → to_qmt_dict()，
+500只热池每帧上千次对象/字典分配；StandardTick 五档是 list，depth_ratio 每次访问重算。
+
+TickBatch 是固定 schema 的 numpy 列（标量列 (n,)，五档价/量矩阵 (n, 5)），标的按稳定索引对齐：
+  - 实盘: get_full_tick 原始字典 → 按字段整列填充，不再构造 StandardTick
+  - 回放: 本地Tick DataFrame → 整列切片（含五档数组列）
+  - depth_ratio 等派生列每批只算一次
+
+旧调用方两种兼容视图：
+  - rows() / row(code): __slots__ 行视图 TickRow，属性名与 StandardTick 相同
+  - as_qmt_dicts(): 惰性 {code: dict}，只有被访问的票才物化成 to_qmt_dict() 同口径的 dict
+
+量纲与 StandardTick 完全一致：volume_shares/bid_vols/ask_vols 为股，amount_yuan 为元。
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.1
+"""
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from logic.data_providers.standard_tick import StandardTick
+
+# to_qmt_dict() 的键顺序（视图物化时保持一致）
+QMT_KEYS = (
+    ('lastPrice', 'volume', 'amount', 'lastClose', 'preClose',
+     'open', 'high', 'low', 'limitUp', 'limitDown')
+    + tuple(f'bidPrice{i}' for i in range(1, 6))
+    + tuple(f'askPrice{i}' for i in range(1, 6))
+    + tuple(f'bidVol{i}' for i in range(1, 6))
+    + tuple(f'askVol{i}' for i in range(1, 6))
+    + ('depthRatio',)
+)
+
+SCALAR_FIELDS = ('last_price', 'amount_yuan', 'open_price', 'high_price',
+                 'low_price', 'prev_close', 'limit_up', 'limit_down')
+BOOK_FIELDS = ('bid_prices', 'ask_prices', 'bid_vols', 'ask_vols')
+
+_BEIJING_OFFSET = timedelta(hours=8)
+_EPOCH = datetime(1970, 1, 1)
+
+
+def format_ms(ms: int) -> str:
+    """毫秒时间戳 → 北京时间 'YYYYMMDDHHMMSS'（与QMT Tick索引同格式）"""
+    return (_EPOCH + timedelta(milliseconds=int(ms)) + _BEIJING_OFFSET).strftime('%Y%m%d%H%M%S')
+
+
+def tick_times_ms(df) -> np.ndarray:
+    """本地Tick DataFrame → 毫秒时间戳数组（优先 time 列，否则解析 'YYYYMMDDHHMMSS' 北京时间索引）"""
+    if 'time' in df.columns:
+        return df['time'].to_numpy(dtype=np.int64)
+    idx = pd.to_datetime(df.index.astype(str).str[:14], format='%Y%m%d%H%M%S')
+    return (idx - _BEIJING_OFFSET).asi8 // 1_000_000
+
+
+_EMPTY: dict = {}
+
+# (TickBatch 列名, QMT 键)，prev_close / volume 单独处理
+_QMT_SCALARS = (('last_price', 'lastPrice'), ('amount_yuan', 'amount'), ('open_price', 'open'),
+                ('high_price', 'high'), ('low_price', 'low'),
+                ('limit_up', 'limitUp'), ('limit_down', 'limitDown'))
+
+
+def _qmt_book_lots(ticks: List[dict], side: str) -> np.ndarray:
+    """【CTO V225】bidVol/askVol 可能是数组，也可能是独立字段 → (n, 5) 手"""
+    out = np.zeros((len(ticks), 5), dtype=np.float64)
+    key = f'{side}Vol'
+    keys = [f'{key}{k}' for k in range(1, 6)]
+    for i, t in enumerate(ticks):
+        if t is _EMPTY:
+            continue
+        arr = t.get(key, [])
+        if isinstance(arr, (list, tuple)) and len(arr) >= 5:
+            out[i] = [v or 0 for v in arr[:5]]
+        else:
+            out[i] = [t.get(k, 0) or 0.0 for k in keys]
+    return out
+
+
+def _stack_levels(values: np.ndarray, n: int) -> np.ndarray:
+    """五档数组列（每行一个长度>=5的序列）→ (n, 5) 矩阵，缺失行补0"""
+    try:
+        matrix = np.asarray(np.stack(values), dtype=np.float64)[:, :5]
+        if matrix.shape == (n, 5):
+            return np.nan_to_num(matrix)
+    except (ValueError, TypeError):
+        pass
+    out = np.zeros((n, 5), dtype=np.float64)
+    for i, v in enumerate(values):
+        if v is not None and len(v):
+            m = min(len(v), 5)
+            out[i, :m] = v[:m]
+    return np.nan_to_num(out)
+
+
+class TickBatch:
+    """
+    单帧列式Tick批次
+
+    - codes / index: 稳定标的顺序与 {code: 行号}
+    - valid: 该行是否有数据（无Tick的票保留行位，valid=False）
+    - 标量列 shape=(n,)，五档列 shape=(n, 5)
+    """
+
+    __slots__ = ('codes', 'index', 'time', 'times', 'valid', 'volume_shares',
+                 'last_price', 'amount_yuan', 'open_price', 'high_price',
+                 'low_price', 'prev_close', 'limit_up', 'limit_down',
+                 'bid_prices', 'ask_prices', 'bid_vols', 'ask_vols',
+                 '_depth_ratio', '_qmt_rows')
+
+    def __init__(self, codes: Sequence[str], time: Any = None):
+        n = len(codes)
+        self.codes: List[str] = list(codes)
+        self.index: Dict[str, int] = {c: i for i, c in enumerate(self.codes)}
+        self.time = time
+        self.times: Optional[np.ndarray] = None  # 逐行毫秒时间戳（本地Tick序列才有）
+        self.valid = np.zeros(n, dtype=bool)
+        self.volume_shares = np.zeros(n, dtype=np.int64)
+        for name in SCALAR_FIELDS:
+            setattr(self, name, np.zeros(n, dtype=np.float64))
+        self.bid_prices = np.zeros((n, 5), dtype=np.float64)
+        self.ask_prices = np.zeros((n, 5), dtype=np.float64)
+        self.bid_vols = np.zeros((n, 5), dtype=np.int64)
+        self.ask_vols = np.zeros((n, 5), dtype=np.int64)
+        self._depth_ratio = None
+        self._qmt_rows = None
+
+    def __len__(self) -> int:
+        return int(self.valid.sum())
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 构造
+    # ─────────────────────────────────────────────────────────────────────────
+    @classmethod
+    def from_qmt_ticks(cls, codes: Sequence[str], raw_ticks: Dict[str, dict],
+                       time: Any = None) -> 'TickBatch':
+        """
+        get_full_tick 原始字典 → 列式批次（口径同 StandardTick.from_qmt_tick）
+
+        按字段整列构造（每个字段一次 np.fromiter），不逐票创建对象。
+
+        Args:
+            codes: 标的顺序（决定行号）
+            raw_ticks: {code: QMT tick dict}，volume/五档量单位为手
+        """
+        batch = cls(codes, time=time)
+        if not raw_ticks:
+            return batch
+        n = len(batch.codes)
+        get = raw_ticks.get
+        ticks = [get(code) or _EMPTY for code in batch.codes]
+
+        def column(key: str) -> np.ndarray:
+            return np.fromiter((t.get(key, 0) or 0.0 for t in ticks), dtype=np.float64, count=n)
+
+        batch.valid = np.fromiter((t is not _EMPTY for t in ticks), dtype=bool, count=n)
+        for name, key in _QMT_SCALARS:
+            setattr(batch, name, column(key))
+        batch.prev_close = np.fromiter(
+            (t.get('lastClose', 0) or t.get('preClose', 0) or 0.0 for t in ticks), dtype=np.float64, count=n)
+        for k in range(5):
+            batch.bid_prices[:, k] = column(f'bidPrice{k + 1}')
+            batch.ask_prices[:, k] = column(f'askPrice{k + 1}')
+
+        # 【V185量纲铁律】手 ×100 → 股，int() 截断口径
+        batch.volume_shares = np.trunc(column('volume') * 100).astype(np.int64)
+        batch.bid_vols = np.trunc(_qmt_book_lots(ticks, 'bid') * 100).astype(np.int64)
+        batch.ask_vols = np.trunc(_qmt_book_lots(ticks, 'ask') * 100).astype(np.int64)
+        return batch
+
+    @classmethod
+    def from_local_ticks(cls, code, df: pd.DataFrame) -> 'TickBatch':
+        """
+        本地Tick DataFrame → 列式批次（整列切片，无逐行 iloc）
+
+        Args:
+            code: 股票代码（单票时间序列）或与 df 行对齐的代码序列
+            df: QMT本地Tick，列 time/lastPrice/open/high/low/lastClose/volume/amount，
+                可含五档数组列 bidPrice/askPrice/bidVol/askVol
+
+        量纲口径同 StandardTick.from_local_tick：volume 视为股；
+        五档量为QMT手，×100 转股。
+        """
+        n = len(df)
+        codes = [code] * n if isinstance(code, str) else list(code)
+        batch = cls(codes)
+        if n == 0:
+            return batch
+        batch.valid[:] = True
+        batch.times = tick_times_ms(df)
+
+        def column(*candidates) -> np.ndarray:
+            for c in candidates:
+                if c in df.columns:
+                    return np.nan_to_num(df[c].to_numpy(dtype=np.float64, na_value=0.0))
+            return np.zeros(n)
+
+        batch.last_price = column('price', 'lastPrice')
+        batch.prev_close = column('prev_close', 'lastClose')
+        batch.volume_shares = np.trunc(column('volume', 'vol')).astype(np.int64)
+        batch.amount_yuan = column('amount', 'amt')
+        batch.open_price = column('open')
+        batch.high_price = column('high')
+        batch.low_price = column('low')
+        for name, key, scale in (('bid_prices', 'bidPrice', 0), ('ask_prices', 'askPrice', 0),
+                                 ('bid_vols', 'bidVol', 100), ('ask_vols', 'askVol', 100)):
+            if key not in df.columns:
+                continue
+            matrix = _stack_levels(df[key].to_numpy(), n)
+            if scale:
+                setattr(batch, name, np.trunc(matrix * scale).astype(np.int64))
+            else:
+                setattr(batch, name, matrix)
+        return batch
+
+    @classmethod
+    def from_standard_ticks(cls, codes: Sequence[str], ticks: Dict[str, StandardTick],
+                            time: Any = None) -> 'TickBatch':
+        """{code: StandardTick} → 列式批次（适配器未实现列式构造时的兜底）"""
+        batch = cls(codes, time=time)
+        for i, code in enumerate(batch.codes):
+            t = ticks.get(code) if ticks else None
+            if t is None:
+                continue
+            batch.valid[i] = True
+            batch.volume_shares[i] = t.volume_shares
+            for name in SCALAR_FIELDS:
+                getattr(batch, name)[i] = getattr(t, name)
+            for name in BOOK_FIELDS:
+                values = (getattr(t, name) or [])[:5]
+                getattr(batch, name)[i, :len(values)] = values
+            if batch.time is None:
+                batch.time = t.time
+        return batch
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 派生列（每批只算一次）
+    # ─────────────────────────────────────────────────────────────────────────
+    @property
+    def depth_ratio(self) -> np.ndarray:
+        """【CTO V219】ln((Σbid + 1) / (Σask + 1))，整批向量化"""
+        if self._depth_ratio is None:
+            total_bid = self.bid_vols.sum(axis=1).astype(np.float64)
+            total_ask = self.ask_vols.sum(axis=1).astype(np.float64)
+            self._depth_ratio = np.log((total_bid + 1.0) / (total_ask + 1.0))
+        return self._depth_ratio
+
+    def qmt_rows(self) -> List[list]:
+        """按 QMT_KEYS 排列的整批数值矩阵（Python float 列表），视图物化用"""
+        if self._qmt_rows is None:
+            n = len(self.codes)
+            bid_lots = np.where(self.bid_vols != 0, self.bid_vols / 100.0, 0.0)
+            ask_lots = np.where(self.ask_vols != 0, self.ask_vols / 100.0, 0.0)
+            matrix = np.empty((n, len(QMT_KEYS)), dtype=np.float64)
+            matrix[:, 0] = self.last_price
+            matrix[:, 1] = self.volume_shares / 100.0
+            matrix[:, 2] = self.amount_yuan
+            matrix[:, 3] = self.prev_close
+            matrix[:, 4] = self.prev_close
+            matrix[:, 5] = self.open_price
+            matrix[:, 6] = self.high_price
+            matrix[:, 7] = self.low_price
+            matrix[:, 8] = self.limit_up
+            matrix[:, 9] = self.limit_down
+            matrix[:, 10:15] = self.bid_prices
+            matrix[:, 15:20] = self.ask_prices
+            matrix[:, 20:25] = bid_lots
+            matrix[:, 25:30] = ask_lots
+            matrix[:, 30] = self.depth_ratio
+            self._qmt_rows = matrix.tolist()
+        return self._qmt_rows
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 旧接口兼容
+    # ─────────────────────────────────────────────────────────────────────────
+    def qmt_dict(self, code: str) -> Optional[dict]:
+        """单票物化为 to_qmt_dict() 同口径字典，无数据返回 None"""
+        i = self.index.get(code)
+        if i is None or not self.valid[i]:
+            return None
+        return dict(zip(QMT_KEYS, self.qmt_rows()[i]))
+
+    def row_time(self, i: int) -> Any:
+        """第 i 行时间：逐行时间戳优先（'YYYYMMDDHHMMSS'），否则为批次时间"""
+        if self.times is not None:
+            return format_ms(self.times[i])
+        return self.time
+
+    def row(self, code: str) -> Optional['TickRow']:
+        """单票行视图，无数据返回 None（时间序列批次取该票最后一行）"""
+        i = self.index.get(code)
+        if i is None or not self.valid[i]:
+            return None
+        return TickRow(self, i)
+
+    def rows(self) -> Dict[str, 'TickRow']:
+        """{code: TickRow}，替代 {code: StandardTick}"""
+        return {self.codes[i]: TickRow(self, i) for i in np.flatnonzero(self.valid)}
+
+    def __iter__(self) -> Iterator['TickRow']:
+        return (TickRow(self, i) for i in np.flatnonzero(self.valid))
+
+    def as_qmt_dicts(self) -> 'QmtDictView':
+        """{code: qmt_dict} 惰性视图，替代 {code: tick.to_qmt_dict()}"""
+        return QmtDictView(self)
+
+    def to_standard_ticks(self) -> Dict[str, StandardTick]:
+        """物化为 {code: StandardTick}（仅供仍需要对象的旧调用方）"""
+        result = {}
+        for i in np.flatnonzero(self.valid):
+            result[self.codes[i]] = StandardTick(
+                code=self.codes[i],
+                time=self.row_time(i),
+                last_price=float(self.last_price[i]),
+                volume_shares=int(self.volume_shares[i]),
+                amount_yuan=float(self.amount_yuan[i]),
+                bid_prices=self.bid_prices[i].tolist(),
+                ask_prices=self.ask_prices[i].tolist(),
+                bid_vols=self.bid_vols[i].tolist(),
+                ask_vols=self.ask_vols[i].tolist(),
+                open_price=float(self.open_price[i]),
+                high_price=float(self.high_price[i]),
+                low_price=float(self.low_price[i]),
+                prev_close=float(self.prev_close[i]),
+                limit_up=float(self.limit_up[i]),
+                limit_down=float(self.limit_down[i]),
+            )
+        return result
+
+
+class TickRow:
+    """
+    TickBatch 单行只读视图（__slots__，只持有批次引用和行号）
+
+    属性名与 StandardTick 相同，引擎代码可无感知替换；
+    标量按需从列中取值，depth_ratio 取批次缓存列。
+    """
+
+    __slots__ = ('_batch', '_i')
+
+    def __init__(self, batch: TickBatch, i: int):
+        self._batch = batch
+        self._i = i
+
+    @property
+    def code(self) -> str:
+        return self._batch.codes[self._i]
+
+    @property
+    def time(self) -> Any:
+        return self._batch.row_time(self._i)
+
+    @property
+    def volume_shares(self) -> int:
+        return int(self._batch.volume_shares[self._i])
+
+    @property
+    def bid_prices(self) -> List[float]:
+        return self._batch.bid_prices[self._i].tolist()
+
+    @property
+    def ask_prices(self) -> List[float]:
+        return self._batch.ask_prices[self._i].tolist()
+
+    @property
+    def bid_vols(self) -> List[int]:
+        return self._batch.bid_vols[self._i].tolist()
+
+    @property
+    def ask_vols(self) -> List[int]:
+        return self._batch.ask_vols[self._i].tolist()
+
+    @property
+    def extra(self) -> Dict[str, Any]:
+        return {}
+
+    @property
+    def depth_ratio(self) -> float:
+        """【CTO V219】取批次一次性计算的深度比列"""
+        return float(self._batch.depth_ratio[self._i])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """同 StandardTick.to_dict()"""
+        return {
+            'code': self.code,
+            'time': self.time,
+            'last_price': self.last_price,
+            'volume_shares': self.volume_shares,
+            'amount_yuan': self.amount_yuan,
+            'bid_prices': self.bid_prices,
+            'ask_prices': self.ask_prices,
+            'bid_vols': self.bid_vols,
+            'ask_vols': self.ask_vols,
+            'open_price': self.open_price,
+            'high_price': self.high_price,
+            'low_price': self.low_price,
+            'prev_close': self.prev_close,
+            'limit_up': self.limit_up,
+            'limit_down': self.limit_down,
+            'extra': self.extra
+        }
+
+    def to_qmt_dict(self) -> Dict[str, Any]:
+        """同 StandardTick.to_qmt_dict()，数值取自批次矩阵"""
+        return dict(zip(QMT_KEYS, self._batch.qmt_rows()[self._i]))
+
+    def __repr__(self) -> str:
+        return f"TickRow(code={self.code!r}, last_price={self.last_price}, volume_shares={self.volume_shares})"
+
+
+def _scalar_property(name: str) -> property:
+    def getter(self) -> float:
+        return float(getattr(self._batch, name)[self._i])
+    return property(getter)
+
+
+for _name in SCALAR_FIELDS:
+    setattr(TickRow, _name, _scalar_property(_name))
+del _name
+
+
+class QmtDictView(Mapping):
+    """
+    TickBatch 的只读 {code: dict} 视图
+
+    首次访问某票时才物化字典并缓存；只含 valid 行，
+    因此 len/in/items 与旧版 {code: tick.to_qmt_dict()} 行为一致。
+    """
+
+    __slots__ = ('_batch', '_cache')
+
+    def __init__(self, batch: TickBatch):
+        self._batch = batch
+        self._cache: Dict[str, dict] = {}
+
+    @property
+    def batch(self) -> TickBatch:
+        return self._batch
+
+    def __getitem__(self, code: str) -> dict:
+        d = self._cache.get(code)
+        if d is None:
+            d = self._batch.qmt_dict(code)
+            if d is None:
+                raise KeyError(code)
+            self._cache[code] = d
+        return d
+
+    def __contains__(self, code) -> bool:
+        i = self._batch.index.get(code)
+        return i is not None and bool(self._batch.valid[i])
+
+    def __iter__(self) -> Iterator[str]:
+        codes = self._batch.codes
+        return (codes[i] for i in np.flatnonzero(self._batch.valid))
+
+    def __len__(self) -> int:
+        return len(self._batch)
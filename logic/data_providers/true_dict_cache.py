@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+TrueDictCache - TrueDictionary 日缓存（版本化列式二进制，可内存映射）
+
+【CTO V233 日缓存】
+旧方案：data/cache/true_dict_avg_vol_{date}.json 只存 avg_volume / float_volume / up_stop，
+        ATR / MA / 昨收 / 换手输入每次启动重算，换日即全量重建。
+
+新方案：data/cache/true_dict_{date}.tdc 单文件
+  - 布局: MAGIC(8) | VERSION(u32) | 头长度(u32) | 头JSON | 64字节对齐的数组区
+  - 头JSON记录交易日、元数据，以及每个数组的 dtype / shape / offset / crc32
+  - 读取时 np.memmap 直接映射各列，毫秒级；写入先写临时文件再 os.replace，原子落盘
+  - 完整性: MAGIC / 版本 / 交易日（过期） / 文件长度（截断） / crc32（损坏）逐项校验，
+    任一不过即视为未命中
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import json
+import logging
+import os
+import struct
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'TDCACHE\x00'
+VERSION = 2  # V2: 列与 TrueDictionary._FIELDS 一一对应（MA 拆为 has_ma/ma5/ma10/ma20/ma_close）
+_ALIGN = 64
+_PREFIX = struct.Struct('<8sII')
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class TrueDictCache:
+    """
+    单交易日缓存文件
+
+    用法:
+        cache = TrueDictCache('20260318')
+        cache.save({'codes': codes, 'float_volume': fv, ...}, meta={'stock_count': n})
+        arrays = cache.load()          # None 表示未命中/校验失败
+    """
+
+    def __init__(self, trade_date: str, cache_dir: Optional[Path] = None, prefix: str = 'true_dict'):
+        self.trade_date = trade_date
+        self.cache_dir = Path(cache_dir) if cache_dir else Path('data/cache')
+        self.prefix = prefix
+        self.meta: Dict = {}
+
+    @property
+    def path(self) -> Path:
+        return self.cache_dir / f"{self.prefix}_{self.trade_date}.tdc"
+
+    @classmethod
+    def dates(cls, cache_dir: Optional[Path] = None, prefix: str = 'true_dict') -> list:
+        """目录下该前缀已落盘的交易日（降序）"""
+        cache_dir = Path(cache_dir) if cache_dir else Path('data/cache')
+        found = (p.stem[len(prefix) + 1:] for p in cache_dir.glob(f'{prefix}_*.tdc'))
+        return sorted((d for d in found if d.isdigit() and len(d) == 8), reverse=True)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 写入
+    # ─────────────────────────────────────────────────────────────────────────
+    def save(self, arrays: Dict[str, np.ndarray], meta: Optional[Dict] = None) -> Path:
+        """原子落盘（临时文件 + os.replace）"""
+        arrays = {name: np.ascontiguousarray(arr) for name, arr in arrays.items()}
+        specs = {}
+        offset = 0
+        for name, arr in arrays.items():
+            specs[name] = {
+                'dtype': arr.dtype.str,
+                'shape': list(arr.shape),
+                'offset': offset,
+                'crc32': zlib.crc32(arr.tobytes()),
+            }
+            offset = _aligned(offset + arr.nbytes)
+
+        header = {
+            'trade_date': self.trade_date,
+            'created_at': datetime.now().isoformat(),
+            'meta': meta or {},
+            'arrays': specs,
+            'data_bytes': offset,
+        }
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        data_start = _aligned(_PREFIX.size + len(header_bytes))
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tdc.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(_PREFIX.pack(MAGIC, VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for name, arr in arrays.items():
+                f.seek(data_start + specs[name]['offset'])
+                f.write(arr.tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp, self.path)
+        self.meta = header['meta']
+        return self.path
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 读取
+    # ─────────────────────────────────────────────────────────────────────────
+    def load(self, verify: bool = True, mmap: bool = True) -> Optional[Dict[str, np.ndarray]]:
+        """
+        读取并校验
+
+        Args:
+            verify: 是否逐列校验 crc32
+            mmap: True 返回只读 memmap，False 读入内存
+
+        Returns:
+            {name: ndarray}，未命中或校验失败返回 None
+        """
+        path = self.path
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'rb') as f:
+                magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+                if magic != MAGIC:
+                    return self._reject('MAGIC不符')
+                if version != VERSION:
+                    return self._reject(f'版本 {version} != {VERSION}')
+                header = json.loads(f.read(header_len).decode('utf-8'))
+        except Exception as e:
+            return self._reject(f'文件头损坏: {e}')
+
+        if header.get('trade_date') != self.trade_date:
+            return self._reject(f"交易日 {header.get('trade_date')} != {self.trade_date}")
+        data_start = _aligned(_PREFIX.size + header_len)
+        if path.stat().st_size < data_start + header['data_bytes']:
+            return self._reject('文件截断')
+
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            dtype, shape = np.dtype(spec['dtype']), tuple(spec['shape'])
+            if int(np.prod(shape)) == 0:
+                arr = np.zeros(shape, dtype=dtype)
+            elif mmap:
+                arr = np.memmap(path, dtype=dtype, mode='r', offset=data_start + spec['offset'], shape=shape)
+            else:
+                arr = np.fromfile(path, dtype=dtype, count=int(np.prod(shape)),
+                                  offset=data_start + spec['offset']).reshape(shape)
+            if verify and zlib.crc32(arr.tobytes()) != spec['crc32']:
+                return self._reject(f'{name} 校验和不符')
+            arrays[name] = arr
+
+        self.meta = header.get('meta', {})
+        return arrays
+
+    def _reject(self, reason: str) -> None:
+        logger.warning(f"[WARN] [TrueDictCache] 丢弃缓存 {self.path.name}: {reason}")
+        return None
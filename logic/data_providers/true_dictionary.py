@@ -20,13 +20,15 @@ import os
 import sys
 import time
 import logging
-import json
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from logic.data_providers.rolling_indicators import RollingIndicators
+from logic.data_providers.symbol_table import ColumnStore
+
 # 【CTO修复】导入交易日历工具，禁止在量化系统中使用timedelta推算交易日
 try:
     from logic.utils.calendar_utils import (
@@ -63,6 +65,26 @@ class TrueDictionary:
     _instance = None
     _initialized = False
     
+    # 【CTO V233 日缓存】缓存目录
+    CACHE_DIR = Path("data/cache")
+    
+    # 【CTO V233 合约主表】无落盘主表时，名单达到此规模才值得全市场刷新（否则逐只查）
+    MASTER_FETCH_MIN_CODES = 500
+    
+    # 【CTO V233 数组化字典】静态字段按代码驻留id存为稠密列（NaN=缺失），日缓存按列原样落盘
+    _FIELDS = (
+        'float_volume',      # 流通股本(股)
+        'up_stop_price',     # 涨停价
+        'down_stop_price',   # 跌停价
+        'avg_volume_5d',     # 5日平均成交量(手)
+        'avg_turnover_5d',   # 5日平均换手率(%)
+        'atr_20d',           # 20日ATR
+        'prev_close',        # 前收盘价
+        'has_ma',            # MA有效标记(1.0/NaN)
+        'ma5', 'ma10', 'ma20', 'ma_close',
+    )
+    _MA_COLUMNS = {'ma5': 'ma5', 'ma10': 'ma10', 'ma20': 'ma20', 'close': 'ma_close'}
+    
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -79,25 +101,18 @@ class TrueDictionary:
         if TrueDictionary._initialized:
             return
         
-        # QMT数据 - 本地C++接口获取
-        self._float_volume: Dict[str, int] = {}  # 流通股本(股)
-        self._up_stop_price: Dict[str, float] = {}  # 涨停价
-        self._down_stop_price: Dict[str, float] = {}  # 跌停价
-        self._avg_volume_5d: Dict[str, float] = {}  # 5日平均成交量(QMT本地计算)
-        self._avg_turnover_5d: Dict[str, float] = {}  # 5日平均换手率(市值平替法计算)
-        
-        # 【CTO第三维趋势网】MA均线数据缓存 - 盘前装弹时计算
-        self._ma_data: Dict[str, Dict] = {}  # {stock_code: {'ma5': float, 'ma10': float, 'ma20': float}}
-        
-        # 【CTO ATR股性突变雷达】20日ATR数据缓存 - 盘前装弹时计算
-        self._atr_20d_map: Dict[str, float] = {}  # {stock_code: atr_20d_value}
-        
-        # 【CTO修复】前收盘价缓存 - ATR计算需要
-        self._prev_close_cache: Dict[str, float] = {}  # {stock_code: prev_close}
+        # 【CTO V233 数组化字典】QMT静态数据 / 5日均量 / 换手 / MA / ATR / 昨收
+        # 全部按代码驻留id存为稠密列，替代原先每字段一个 {code: value} 字典
+        self._store = ColumnStore(self._FIELDS)
         
         # 板块映射 - 本地配置或QMT数据
         self._sector_map: Dict[str, List[str]] = {}  # 股票->板块列表
         
+        # 【CTO V233】日K面板（批量装弹底座，随日缓存落盘供次日滚动）
+        self._daily_panel = None
+        # 【CTO V233 增量指标】滚动窗口状态（逐日推进，O(股票数)）
+        self._rolling = None
+        
         # 元数据
         self._metadata = {
             'qmt_warmup_time': None,
@@ -136,63 +151,27 @@ class TrueDictionary:
             logger.info(f"📦 [TrueDictionary] 当日数据已装弹,跳过")
             return self._get_warmup_stats()
         
-        # 【CTO缓存革命】Step 0: 尝试从硬盘缓存加载5日均量
-        cache_dir = Path("data/cache")
-        cache_file = cache_dir / f"true_dict_avg_vol_{today}.json"
-        
-        if not force and cache_file.exists():
-            try:
-                logger.info(f"[FAST] [CTO缓存命中] 从硬盘加载 {cache_file}...")
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cached_data = json.load(f)
-                
-                # 【CTO缓存毒化告警】校验缓存有效性
-                cached_float_count = len(cached_data.get('float_volume', {}))
-                expected_count = len(stock_list)
-                if cached_float_count < expected_count * 0.5:
-                    # 缓存数量严重不足（<50%），判定为投毒缓存，强制重新装弹
-                    logger.error(f"[WARN] [CTO缓存毒化告警] 缓存只有{cached_float_count}只，期望{expected_count}只，丢弃烂缓存重新装弹！")
-                    # 备份证据
-                    import shutil
-                    poisoned_file = cache_file.with_suffix('.json.poisoned')
-                    shutil.move(str(cache_file), str(poisoned_file))
-                    logger.info(f"[CLEANUP] 投毒缓存已备份到: {poisoned_file}")
-                    # 不return，继续往下走正常装弹流程
-                else:
-                    # 缓存健康，正常加载
-                    self._avg_volume_5d = cached_data.get('avg_volume_5d', {})
-                    self._float_volume = cached_data.get('float_volume', {})
-                    self._up_stop_price = cached_data.get('up_stop_price', {})
-                    
-                    self._metadata['cache_date'] = today
-                    self._metadata['data_source'] = 'QMT本地100% + 硬盘缓存'
-                    
-                    logger.info(f"[OK] [CTO缓存命中] 0毫秒装弹完成! 5日均量:{len(self._avg_volume_5d)}只, 流通股本:{len(self._float_volume)}只")
-                    return {
-                        'qmt': {'success': len(self._float_volume), 'failed': 0, 'note': 'from_cache'},
-                        'avg_volume': {'success': len(self._avg_volume_5d), 'failed': 0, 'note': 'from_cache'},
-                        'integrity': {'is_ready': True, 'missing_rate': 0},
-                        'total_stocks': len(stock_list),
-                        'ready_for_trading': True,
-                        'cache_hit': True
-                    }
-            except Exception as e:
-                logger.warning(f"[WARN] [CTO缓存] 加载缓存失败: {e}, 重新计算...")
+        # 【CTO V233 日缓存】Step 0: 版本化二进制缓存命中则毫秒级装弹
+        if not force:
+            cached = self._load_day_cache(today, stock_list)
+            if cached is not None:
+                return cached
         
         print(f"🚀 [TrueDictionary-CTO防弹衣] 启动盘前装弹,目标{len(stock_list)}只股票")
         logger.info(f"🚀 [TrueDictionary-CTO防弹衣] 启动盘前装弹,目标{len(stock_list)}只股票")
         
-        # Step 1: QMT本地极速读取 (C++接口, <100ms) - 只调用get_instrument_detail
-        qmt_result = self._warmup_qmt_data(stock_list)
+        warmup_start = time.perf_counter()
         
-        # 【CTO全息克隆修复】：启用5日均量计算（单点查询安全！）
-        avg_volume_result = self._warmup_avg_volume_from_qmt(stock_list, target_date=target_date)
-        
-        # 【CTO修复】启用ATR预热（传递target_date）
-        atr_result = self._warmup_atr_data(stock_list, target_date=target_date)
+        # Step 1: QMT本地极速读取 (C++接口, <100ms) - 只调用get_instrument_detail
+        qmt_result = self._warmup_qmt_data(stock_list, trade_date=today)
         
-        # MA暂时禁用（CTO防爆）
-        ma_result = {'source': 'disabled', 'success': 0, 'failed': len(stock_list), 'note': 'CTO防爆：暂时禁用'}
+        # 【CTO V233 批量装弹】5日均量 / MA / ATR / 昨收 一次日K面板向量化派生
+        # 原逐只三遍 get_local_data 已合并；MA 随批量化恢复启用
+        # 【CTO V233 增量滚动】有更早的日缓存面板时只读缓存日之后的新K线
+        # 回测逐日推进时直接沿用内存中上一日面板，不回读硬盘
+        base = None if force else self._memory_base_panel(today) or self._find_base_panel(today)
+        panel_result = self._warmup_daily_panel(stock_list, target_date=target_date, base=base)
+        avg_volume_result = panel_result['avg_volume']
         
         # Step 5: 数据完整性检查（只检查FloatVolume）
         integrity_check = self._check_data_integrity(stock_list)
@@ -200,276 +179,262 @@ class TrueDictionary:
         self._metadata['cache_date'] = today
         self._metadata['data_source'] = 'QMT本地100%'
         
+        timing = {
+            'instrument_ms': qmt_result.get('elapsed_ms', 0.0),
+            **panel_result['timing'],
+            'total_ms': (time.perf_counter() - warmup_start) * 1000
+        }
         stats = {
             'qmt': qmt_result,
             'avg_volume': avg_volume_result,
+            'ma': panel_result['ma'],
+            'atr': panel_result['atr'],
             'integrity': integrity_check,
             'total_stocks': len(stock_list),
-            'ready_for_trading': True  # 宽松模式，允许继续
+            'ready_for_trading': True,  # 宽松模式，允许继续
+            'timing': timing
         }
         
         print(f"[OK] [TrueDictionary] CTO防弹衣装弹完成! (FloatVolume: {qmt_result['success']}只)")
         logger.info(f"[OK] [TrueDictionary] CTO防弹衣装弹完成! (FloatVolume: {qmt_result['success']}只)")
+        logger.info(f"[STATS] [TrueDictionary] 装弹耗时: 合约 {timing['instrument_ms']:.0f}ms | "
+                    f"日K读取 {timing['panel_read_ms']:.0f}ms | 向量化派生 {timing['derive_ms']:.0f}ms | "
+                    f"合计 {timing['total_ms']:.0f}ms")
         
-        # 【CTO缓存革命】保存到硬盘缓存
-        try:
-            cache_dir = Path("data/cache")
-            cache_dir.mkdir(parents=True, exist_ok=True)
-            cache_file = cache_dir / f"true_dict_avg_vol_{today}.json"
-            
-            cache_data = {
-                'avg_volume_5d': self._avg_volume_5d,
-                'float_volume': self._float_volume,
-                'up_stop_price': self._up_stop_price,
-                'cache_date': today,
-                'cached_at': datetime.now().isoformat()
-            }
-            
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False)
-            
-            logger.info(f"💾 [CTO缓存] 数据已持久化至 {cache_file}")
-            stats['cache_saved'] = True
-        except Exception as e:
-            logger.warning(f"[WARN] [CTO缓存] 保存缓存失败: {e}")
-            stats['cache_saved'] = False
+        # 【CTO V233 日缓存】全部字段 + 日K面板落盘，供次日滚动
+        stats['cache_saved'] = self._save_day_cache(today)
         
         return stats
     
     
-    def _warmup_avg_volume_from_qmt(self, stock_list: List[str], target_date: str = None) -> Dict:
+    def _warmup_daily_panel(self, stock_list: List[str], target_date: str = None,
+                            base: Optional[Tuple[str, 'DailyPanel']] = None) -> Dict:
         """
-        CTO强制规范: 从QMT本地日K数据计算5日均量
+        【CTO V233 批量装弹】一次读取日K面板，向量化派生 5日均量 / MA / ATR_20D / 昨收
+
+        替代旧的逐只 _warmup_avg_volume_from_qmt / _warmup_ma_data / _warmup_atr_data，
+        窗口与口径不变：
+        - 5日均量: 22个交易日窗口内最近5行 volume 均值（手）
+        - MA5/10/20: 30个交易日窗口
+        - ATR_20D: 25个交易日窗口内 (High-Low)/Pre_Close 均值，昨收 = 最后一行收盘
         
-        使用QMT本地数据替代外网API：
-        1. 读取最近5个交易日的日K线数据
-        2. 计算volume的5日移动平均
+        【CTO V233 增量指标】派生走 RollingIndicators：内存中有 base 日的滚动状态时
+        只推进新K线（逐日回测 O(股票数)），否则由面板冷启动，结果与整窗重算一致
         
         Args:
             stock_list: 股票代码列表
             target_date: 目标日期(格式'YYYYMMDD')，用于回测时指定历史日期
-        
+            base: (缓存日, 缓存日面板)，给出时只读缓存日之后的新K线滚动
+                  （缓存面板整行缺K线的票整窗重读）
+            
         Returns:
-            Dict: 计算结果统计
+            Dict: {'avg_volume': ..., 'ma': ..., 'atr': ..., 'timing': {...}}
         """
-        start = time.perf_counter()
+        total = len(stock_list)
+        failed_all = {'source': 'QMT本地', 'success': 0, 'failed': total}
+        
+        # 【CTO时空锁死】：回测模式必须基于target_date往前推算！
+        if not target_date:
+            logger.error("[X] [CTO铁血令] 日K面板装弹必须传入target_date！禁止使用datetime.now()！")
+            return {'avg_volume': dict(failed_all), 'ma': dict(failed_all), 'atr': dict(failed_all),
+                    'timing': {'panel_read_ms': 0.0, 'derive_ms': 0.0}}
+        
+        def window_start(n_days: int, fallback_days: int) -> str:
+            if CALENDAR_UTILS_AVAILABLE:
+                return get_nth_previous_trading_day(target_date, n_days)
+            return (datetime.strptime(target_date, '%Y%m%d') - timedelta(days=fallback_days)).strftime('%Y%m%d')
         
-        print(f"[STATS] [QMT本地] 计算5日均量...")
-        logger.info(f"[STATS] [QMT本地] 开始计算5日均量,目标{len(stock_list)}只股票")
+        avg_start = window_start(22, 30)
+        ma_start = window_start(30, 60)
+        atr_start = window_start(25, 45)
+        panel_start = min(avg_start, ma_start, atr_start)
+        logger.info(f"[CTO时空锁死] 日K面板周期: {panel_start} ~ {target_date}")
         
+        start = time.perf_counter()
         try:
-            from xtquant import xtdata
-            
-            success = 0
-            failed = 0
-            
-            # 【CTO时空锁死】：回测模式必须基于target_date往前推算！
-            # 【CTO防爆】：禁止调用get_trading_dates，会导致BSON崩溃！
-            # 原因：get_trading_dates内部触发了QMT C++层的批量数据加载
-            if not target_date:
-                logger.error("[X] [CTO铁血令] 回测模式必须传入target_date！禁止使用datetime.now()！")
-                return {'success': 0, 'failed': len(stock_list)}
-            
-            # 【CTO时空锁死】：必须基于目标回测日期往前推算！
-            end_date = target_date
-            # 【CTO宪法合规】使用日历工具替代timedelta，22个交易日约等于30自然日
-            start_date = get_nth_previous_trading_day(target_date, 22) if CALENDAR_UTILS_AVAILABLE else (datetime.strptime(target_date, '%Y%m%d') - timedelta(days=30)).strftime('%Y%m%d')
-            logger.info(f"[CTO时空锁死] 5日均量计算周期: {start_date} ~ {end_date}")
-            
-            # 【CTO单点爆破】：一只一只查！防爆！防C++崩溃！
-            all_data = {}
-            missing_stocks = []  # 【CTO V24】记录缺失数据的股票
-            logger.info(f"📦 [CTO单点爆破] 单只获取日K数据计算5日均量...")
-            
-            for stock in stock_list:
-                try:
-                    single_data = xtdata.get_local_data(
-                        field_list=['time', 'volume'],
-                        stock_list=[stock],
-                        period='1d',
-                        start_time=start_date,
-                        end_time=end_date
-                    )
-                    if single_data and stock in single_data and single_data[stock] is not None and len(single_data[stock]) > 0:
-                        all_data[stock] = single_data[stock]
-                    else:
-                        missing_stocks.append(stock)  # 【CTO V24】记录缺失
-                except Exception as e:
-                    missing_stocks.append(stock)  # 【CTO V24】异常也记录
-                    continue
-            
-            # 【CTO V33终极净身令】删除阻塞式下载循环！
-            # 问题根因：download_history_data在QMT限流时会无限挂起
-            # 修复：缺失数据直接跳过，不阻塞实盘引擎！
-            if missing_stocks:
-                logger.warning(f'[WARN] [防空警报] {len(missing_stocks)}只股票本地K线缺失！')
-                logger.warning(f'🚫 为防止实盘引擎被网络卡死，系统拒绝现场下载，这些股票将被物理隔离。')
-                logger.warning(f'[TIP] 请在盘后运行：python tools/smart_download.py 补充弹药！')
-                # 不下载！缺失的票在后续df is None判断中自然会被过滤掉
-            
-            # 【调试日志】检查all_data返回状态
-            logger.info(f"[调试] xtdata.get_local_data返回: type={type(all_data)}, "
-                       f"is_none={all_data is None}, "
-                       f"len={len(all_data) if all_data else 0}, "
-                       f"stock_list_len={len(stock_list)}")
-            
-            if all_data:
-                # 【调试日志】打印第一只股票的数据结构
-                sample_keys = list(all_data.keys())[:3]
-                for idx, sample_key in enumerate(sample_keys):
-                    sample_df = all_data[sample_key]
-                    logger.info(f"[调试] 样本股票[{idx}] {sample_key}: "
-                               f"df_type={type(sample_df)}, "
-                               f"is_none={sample_df is None}, "
-                               f"len={len(sample_df) if sample_df is not None else 'N/A'}, "
-                               f"columns={sample_df.columns.tolist() if hasattr(sample_df, 'columns') else 'N/A'}")
-                
-                for stock_code, df in all_data.items():
-                    # 【Bug修复】原代码要求len(df)>=5过于严格，导致春节等假期后数据不足时全部失败
-                    # 【CTO V24节假日防爆】：使用.tail(5)确保只取最近5个交易日！
-                    # 哪怕中间跨了春节/国庆，tail(5)只取最后5行（即最近5个交易日）
-                    if df is not None and len(df) >= 1:
-                        # 【CTO V24修复】精确取最近5个交易日的均值！
-                        # 原逻辑用所有数据均值，会稀释最新信号！
-                        n_days = min(5, len(df))  # 数据不足5天时用全部
-                        avg_volume = df['volume'].tail(n_days).mean()  # 【CTO V24】精确5日！
-                        # 【CTO铁血清洗】：绝不允许NaN或Inf进入系统缓存！
-                        if pd.isna(avg_volume) or np.isinf(avg_volume):
-                            avg_volume = 0.0
-                        if avg_volume > 0:
-                            self._avg_volume_5d[stock_code] = float(avg_volume)
-                            success += 1
-                        else:
-                            # 【调试日志】volume计算失败
-                            logger.debug(f"[调试-失败] {stock_code}: volume_mean={avg_volume}")
-                            failed += 1
-                    else:
-                        # 【调试日志】df为None或长度不足
-                        logger.debug(f"[调试-失败] {stock_code}: df_is_none={df is None}, "
-                                    f"df_len={len(df) if df is not None else 0}")
-                        failed += 1
+            from logic.data_providers.daily_panel import DailyPanel
+            if base is not None:
+                since, base_panel = base
+                panel = base_panel.roll_forward(stock_list, since, panel_start, target_date)
+                logger.info(f"[FAST] [CTO增量滚动] 基于 {since} 缓存面板，仅读取新K线")
             else:
-                logger.error(f"[调试-致命] xtdata.get_local_data返回None或空字典!")
-                failed = len(stock_list)
-            
-            elapsed = (time.perf_counter() - start) * 1000
-            self._metadata['avg_volume_warmup_time'] = elapsed  # 已更名
-            
-            print(f"[OK] [QMT本地] 5日均量计算完成: {success}只成功, {failed}只失败, 耗时{elapsed:.0f}ms")
-            logger.info(f"[OK] [QMT本地-5日均量] {success}只成功,耗时{elapsed:.1f}ms")
-            
-            return {
-                'source': 'QMT本地日K数据',
-                'success': success,
-                'failed': failed,
-                'elapsed_ms': elapsed,
-                'note': 'CTO强制：一把梭哈，不分批，0外网请求'
-            }
-            
+                panel = DailyPanel.read(stock_list, panel_start, target_date)
         except Exception as e:
-            logger.error(f"[CRITICAL] [QMT本地-5日均量] 计算失败: {e}")
-            print(f"[CRITICAL] [QMT本地-5日均量] 计算失败: {e}")
-            return {'source': 'QMT本地', 'success': 0, 'failed': len(stock_list), 'error': str(e)}
-    
-    def _warmup_ma_data(self, stock_list: List[str], target_date: str = None) -> Dict:
-        """
-        【CTO第三维趋势网】计算MA5/MA10/MA20均线数据
+            logger.error(f"[CRITICAL] [QMT本地-日K面板] 读取失败: {e}")
+            print(f"[CRITICAL] [QMT本地-日K面板] 读取失败: {e}")
+            self._fill_default_atr(self._store.intern(stock_list))
+            err = dict(failed_all, error=str(e))
+            return {'avg_volume': err, 'ma': dict(err), 'atr': dict(err),
+                    'timing': {'panel_read_ms': (time.perf_counter() - start) * 1000, 'derive_ms': 0.0}}
+        read_ms = (time.perf_counter() - start) * 1000
+        self._daily_panel = panel
+        
+        # 【CTO V33终极净身令】缺失数据直接跳过，不现场下载！
+        missing = int((panel.window_counts(panel_start) == 0).sum())
+        if missing:
+            logger.warning(f'[WARN] [防空警报] {missing}只股票本地K线缺失！')
+            logger.warning(f'[TIP] 请在盘后运行：python tools/smart_download.py 补充弹药！')
         
-        使用QMT本地日K数据计算均线，用于盘后回放的趋势过滤
-        
-        Args:
-            stock_list: 股票代码列表
-            target_date: 目标日期(格式'YYYYMMDD')，用于回测时指定历史日期
-        """
         start = time.perf_counter()
+        # 【CTO V233 增量指标】上一日滚动状态在内存则只推进新K线，否则由面板冷启动
+        starts = {'avg': avg_start, 'ma': ma_start, 'atr': atr_start}
+        rolling = self._rolling
+        if base is not None and rolling is not None and rolling.trade_date == base[0]:
+            rolling = rolling.roll_to(panel, base[0], starts, target_date)
+        else:
+            rolling = RollingIndicators.from_panel(panel, starts, target_date)
+        self._rolling = rolling
+        
+        store = self._store
+        ids = store.intern(panel.codes)
+        
+        # 5日均量（手）—【CTO铁血清洗】NaN/Inf 绝不进入缓存
+        avg_volume = rolling.avg_volume()
+        avg_ok = np.isfinite(avg_volume) & (avg_volume > 0)
+        store.set('avg_volume_5d', ids[avg_ok], avg_volume[avg_ok])
+        
+        # MA均线
+        ma = rolling.moving_averages()
+        ma_ok = ma['valid']
+        store.set('has_ma', ids[ma_ok], 1.0)
+        for key, col in self._MA_COLUMNS.items():
+            store.set(col, ids[ma_ok], ma[key][ma_ok])
+        
+        # ATR_20D + 昨收
+        atr = rolling.atr()
+        atr_ok = atr['valid']
+        store.set('atr_20d', ids[atr_ok], atr['atr'][atr_ok])
+        store.set('prev_close', ids[atr_ok], atr['prev_close'][atr_ok])
+        # 【CTO修复】为所有股票设置默认ATR值(0.05 = 5%日波动)
+        self._fill_default_atr(ids)
+        
+        # 5日换手率（成交额市值法，口径同 get_avg_turnover_5d），需流通股本先装弹
+        float_volume = store.get('float_volume', ids, 0.0)
+        turnover = rolling.avg_turnover(float_volume)
+        turnover_ok = np.isfinite(turnover)
+        store.set('avg_turnover_5d', ids[turnover_ok], turnover[turnover_ok])
+        derive_ms = (time.perf_counter() - start) * 1000
+        
+        avg_success = int(avg_ok.sum())
+        ma_success = int(ma['valid'].sum())
+        atr_success = int(atr['valid'].sum())
+        self._metadata['avg_volume_warmup_time'] = read_ms + derive_ms
+        
+        print(f"[OK] [QMT本地] 日K面板装弹完成: 5日均量{avg_success}只, MA{ma_success}只, ATR{atr_success}只, "
+              f"读取{read_ms:.0f}ms + 派生{derive_ms:.0f}ms")
+        logger.info(f"[OK] [QMT本地-日K面板] {len(ids)}只 × {panel.width}日, 读取{read_ms:.1f}ms, 派生{derive_ms:.1f}ms")
+        
+        # 【CTO修正】如果使用默认值的超过50%，必须报严重警告
+        if atr_success < total * 0.5:
+            logger.error(f"[X] [数据断层致命告警] {total - atr_success} 只股票丢失真实日K！被迫启用 0.05 盲狙默认值！这极度危险！")
+        
+        def result(success: int) -> Dict:
+            return {'source': 'QMT本地日K面板', 'success': success, 'failed': total - success}
         
-        print(f"[STATS] [QMT本地] 计算MA均线数据...")
-        logger.info(f"[STATS] [QMT本地] 开始计算MA5/MA10/MA20,目标{len(stock_list)}只股票")
-        
+        return {
+            'avg_volume': result(avg_success),
+            'ma': result(ma_success),
+            'atr': result(atr_success),
+            'timing': {'panel_read_ms': read_ms, 'derive_ms': derive_ms}
+        }
+    
+    def _fill_default_atr(self, ids: np.ndarray):
+        """尚无ATR的股票补默认值 0.05（已有值保留）"""
+        missing = np.isnan(self._store.get('atr_20d', ids, np.nan))
+        self._store.set('atr_20d', ids[missing], 0.05)
+    
+    # ============================================================
+    # 【CTO V233 日缓存】版本化二进制缓存 + 增量滚动
+    # ============================================================
+    
+    def _save_day_cache(self, today: str) -> bool:
+        """全部字段 + 日K面板按代码对齐成列，原子落盘"""
         try:
-            from xtquant import xtdata
-            
-            success = 0
-            failed = 0
-            
-            # 【CTO时空锁死】：回测模式必须基于target_date往前推算！
-            # 【CTO防爆】：禁止调用get_trading_dates，会导致BSON崩溃！
-            if not target_date:
-                logger.error("[X] [CTO铁血令] MA预热必须传入target_date！禁止使用datetime.now()！")
-                return {'success': 0, 'failed': len(stock_list)}
-            
-            # 【CTO时空锁死】：必须基于目标回测日期往前推算！
-            end_date = target_date
-            # 【CTO宪法合规】使用日历工具替代timedelta，30个交易日约等于60自然日
-            start_date = get_nth_previous_trading_day(target_date, 30) if CALENDAR_UTILS_AVAILABLE else (datetime.strptime(target_date, '%Y%m%d') - timedelta(days=60)).strftime('%Y%m%d')
-            logger.info(f"[CTO时空锁死] MA均线计算周期: {start_date} ~ {end_date}")
-            
-            # 【CTO单点爆破】：一只一只查！防爆！防C++崩溃！
-            all_data = {}
-            logger.info(f"📦 [CTO单点爆破] 单只获取MA数据...")
-            
-            for stock in stock_list:
-                try:
-                    single_data = xtdata.get_local_data(
-                        field_list=['time', 'close'],
-                        stock_list=[stock],
-                        period='1d',
-                        start_time=start_date,
-                        end_time=end_date
-                    )
-                    if single_data and stock in single_data:
-                        all_data[stock] = single_data[stock]
-                except Exception as e:
-                    # 有毒的票直接跳过！
-                    continue
-            
-            # 【调试】检查返回数据
-            logger.info(f"[MA调试] get_local_data返回: type={type(all_data)}, is_none={all_data is None}")
-            if all_data:
-                sample_keys = list(all_data.keys())[:3]
-                for key in sample_keys:
-                    df = all_data[key]
-                    logger.info(f"[MA调试] 样本{key}: df_type={type(df)}, is_none={df is None}, len={len(df) if df is not None else 0}")
-                    if df is not None and len(df) > 0:
-                        logger.info(f"[MA调试] 样本{key} columns: {df.columns.tolist() if hasattr(df, 'columns') else 'no columns'}")
-            
-            if all_data:
-                for stock_code, df in all_data.items():
-                    if df is not None and len(df) >= 5:  # 放宽到至少5天数据
-                        # 计算MA5/MA10/MA20（根据可用数据）
-                        closes = df['close'].values if 'close' in df.columns else df.values.flatten()
-                        ma5 = closes[-5:].mean()
-                        ma10 = closes[-10:].mean() if len(closes) >= 10 else ma5
-                        ma20 = closes[-20:].mean() if len(closes) >= 20 else ma10
-                        
-                        self._ma_data[stock_code] = {
-                            'ma5': float(ma5),
-                            'ma10': float(ma10),
-                            'ma20': float(ma20),
-                            'close': float(closes[-1])  # 最新收盘价
-                        }
-                        success += 1
-                    else:
-                        failed += 1
-            else:
-                failed = len(stock_list)
-            
-            elapsed = (time.perf_counter() - start) * 1000
-            
-            print(f"[OK] [QMT本地] MA均线计算完成: {success}只成功, {failed}只失败, 耗时{elapsed:.0f}ms")
-            logger.info(f"[OK] [QMT本地-MA均线] {success}只成功,耗时{elapsed:.1f}ms")
-            
-            return {
-                'source': 'QMT本地日K数据',
-                'success': success,
-                'failed': failed,
-                'elapsed_ms': elapsed
-            }
-            
+            from logic.data_providers.true_dict_cache import TrueDictCache
+            
+            panel = self._daily_panel
+            if panel is not None:
+                self._store.intern(panel.codes)
+            codes = list(self._store.codes)
+            n = len(codes)
+            
+            arrays = {'codes': np.array(codes, dtype='U16')}
+            arrays.update({f: self._store.column(f) for f in self._FIELDS})
+            if panel is not None:
+                arrays.update(panel.select(codes).to_arrays())
+            
+            cache = TrueDictCache(today, cache_dir=self.CACHE_DIR)
+            cache.save(arrays, meta={'sectors': self._sector_map, 'stock_count': n})
+            logger.info(f"💾 [CTO缓存] 数据已持久化至 {cache.path}")
+            return True
         except Exception as e:
-            logger.error(f"[CRITICAL] [QMT本地-MA均线] 计算失败: {e}")
-            print(f"[CRITICAL] [QMT本地-MA均线] 计算失败: {e}")
-            return {'source': 'QMT本地', 'success': 0, 'failed': len(stock_list), 'error': str(e)}
+            logger.warning(f"[WARN] [CTO缓存] 保存缓存失败: {e}")
+            return False
+    
+    def _load_day_cache(self, today: str, stock_list: List[str]) -> Optional[Dict]:
+        """日缓存命中则装弹并返回统计，未命中/校验失败/投毒返回 None"""
+        from logic.data_providers.true_dict_cache import TrueDictCache
+        from logic.data_providers.daily_panel import DailyPanel
+        
+        start = time.perf_counter()
+        cache = TrueDictCache(today, cache_dir=self.CACHE_DIR)
+        arrays = cache.load()
+        if arrays is None:
+            return None
+        
+        # 【CTO缓存毒化告警】校验缓存有效性
+        cached_float_count = int(np.isfinite(arrays['float_volume']).sum())
+        expected_count = len(stock_list)
+        if cached_float_count < expected_count * 0.5:
+            logger.error(f"[WARN] [CTO缓存毒化告警] 缓存只有{cached_float_count}只，期望{expected_count}只，丢弃烂缓存重新装弹！")
+            poisoned_file = cache.path.with_suffix('.tdc.poisoned')
+            arrays = None  # 释放 memmap 句柄后再移动文件
+            os.replace(cache.path, poisoned_file)
+            logger.info(f"[CLEANUP] 投毒缓存已备份到: {poisoned_file}")
+            return None
+        
+        codes = arrays['codes'].tolist()
+        self._store.load_columns(codes, arrays)
+        self._sector_map = cache.meta.get('sectors', {})
+        self._daily_panel = DailyPanel.from_arrays(arrays, codes) if 'panel_dates' in arrays else None
+        
+        self._metadata['cache_date'] = today
+        self._metadata['data_source'] = 'QMT本地100% + 硬盘缓存'
+        elapsed = (time.perf_counter() - start) * 1000
+        
+        count = self._store.count
+        logger.info(f"[OK] [CTO缓存命中] {elapsed:.1f}ms装弹完成! 5日均量:{count('avg_volume_5d')}只, "
+                    f"流通股本:{count('float_volume')}只, ATR:{count('atr_20d')}只, MA:{count('has_ma')}只")
+        return {
+            'qmt': {'success': count('float_volume'), 'failed': 0, 'note': 'from_cache'},
+            'avg_volume': {'success': count('avg_volume_5d'), 'failed': 0, 'note': 'from_cache'},
+            'integrity': {'is_ready': True, 'missing_rate': 0},
+            'total_stocks': len(stock_list),
+            'ready_for_trading': True,
+            'cache_hit': True,
+            'timing': {'cache_load_ms': elapsed, 'total_ms': elapsed}
+        }
+    
+    def _memory_base_panel(self, today: str) -> Optional[Tuple[str, 'DailyPanel']]:
+        """内存中已装弹的更早交易日面板（回测逐日推进）"""
+        cache_date = self._metadata['cache_date']
+        if self._daily_panel is not None and cache_date and cache_date < today:
+            return cache_date, self._daily_panel
+        return None
+    
+    def _find_base_panel(self, today: str) -> Optional[Tuple[str, 'DailyPanel']]:
+        """找 today 之前最近一份可用日缓存的面板，供增量滚动"""
+        from logic.data_providers.true_dict_cache import TrueDictCache
+        from logic.data_providers.daily_panel import DailyPanel
+        
+        for date in TrueDictCache.dates(self.CACHE_DIR):
+            if date >= today:
+                continue
+            arrays = TrueDictCache(date, cache_dir=self.CACHE_DIR).load()
+            if arrays is not None and 'panel_dates' in arrays and arrays['panel_dates'].size:
+                return date, DailyPanel.from_arrays(arrays, arrays['codes'].tolist())
+            break
+        return None
     
     def get_ma_data(self, stock_code: str) -> Optional[Dict]:
         """
@@ -478,144 +443,11 @@ class TrueDictionary:
         Returns:
             Dict: {'ma5': float, 'ma10': float, 'ma20': float, 'close': float} 或 None
         """
-        return self._ma_data.get(stock_code)
+        i = self._store.symbols.id_of(stock_code)
+        if i < 0 or not self._store.has('has_ma', stock_code):
+            return None
+        return {key: float(self._store.column(col)[i]) for key, col in self._MA_COLUMNS.items()}
     
-    def _warmup_atr_data(self, stock_list: List[str], target_date: str = None) -> Dict:
-        """
-        【CTO ATR股性突变雷达】计算20日ATR数据
-        
-        ATR公式: (High - Low) / Pre_Close 的20日滑动平均值
-        用于检测股性突变，识别异常波动股票
-        
-        Args:
-            stock_list: 股票代码列表
-            target_date: 目标日期(格式'YYYYMMDD')，用于回测时指定历史日期
-            
-        Returns:
-            Dict: 计算结果统计
-        """
-        start = time.perf_counter()
-        
-        print(f"[STATS] [QMT本地] 计算ATR_20D股性雷达...")
-        logger.info(f"[STATS] [QMT本地] 开始计算ATR_20D,目标{len(stock_list)}只股票")
-        
-        try:
-            from xtquant import xtdata
-            
-            success = 0
-            failed = 0
-            
-            # 【CTO时空锁死】：回测模式必须基于target_date往前推算！
-            # 【CTO防爆】：禁止调用get_trading_dates，会导致BSON崩溃！
-            if not target_date:
-                logger.error("[X] [CTO铁血令] ATR预热必须传入target_date！禁止使用datetime.now()！")
-                return {'success': 0, 'failed': len(stock_list)}
-            
-            # 【CTO时空锁死】：必须基于目标回测日期往前推算！
-            end_date = target_date
-            # 【CTO宪法合规】使用日历工具替代timedelta，25个交易日约等于45自然日
-            start_date = get_nth_previous_trading_day(target_date, 25) if CALENDAR_UTILS_AVAILABLE else (datetime.strptime(target_date, '%Y%m%d') - timedelta(days=45)).strftime('%Y%m%d')
-            logger.info(f"[CTO时空锁死] ATR计算周期: {start_date} ~ {end_date}")
-            
-            # 【CTO单点爆破】：一只一只查！防爆！防C++崩溃！
-            all_data = {}
-            logger.info(f"📦 [CTO单点爆破] 单只获取ATR数据...")
-            
-            for stock in stock_list:
-                try:
-                    single_data = xtdata.get_local_data(
-                        field_list=['time', 'high', 'low', 'close', 'open'],
-                        stock_list=[stock],
-                        period='1d',
-                        start_time=start_date,
-                        end_time=end_date
-                    )
-                    if single_data and stock in single_data:
-                        all_data[stock] = single_data[stock]
-                except Exception as e:
-                    # 有毒的票直接跳过！
-                    continue
-            
-            if all_data:
-                for stock_code, df in all_data.items():
-                    if df is not None and len(df) >= 5:  # 至少5天数据才计算
-                        try:
-                            # 【Bug修复】QMT返回的数据可能没有pre_close列
-                            # 需要从close列计算前一日收盘价
-                            df = df.copy()
-                            
-                            # 检查是否有pre_close列
-                            if 'pre_close' not in df.columns:
-                                # 尝试从close列推导前一日收盘价
-                                if 'close' in df.columns:
-                                    df['pre_close'] = df['close'].shift(1)
-                                    # 第一行的pre_close用开盘价替代（如果有）或使用close
-                                    if 'open' in df.columns:
-                                        df.loc[df.index[0], 'pre_close'] = df.loc[df.index[0], 'open']
-                                    else:
-                                        df.loc[df.index[0], 'pre_close'] = df.loc[df.index[0], 'close']
-                                else:
-                                    # 无法计算，跳过
-                                    failed += 1
-                                    continue
-                            
-                            # 计算每日 (High - Low) / Pre_Close
-                            # 注意: pre_close可能为0或NaN,需要处理
-                            df['tr'] = (df['high'] - df['low']) / df['pre_close'].replace(0, float('nan'))
-                            
-                            # 过滤掉无效值
-                            valid_tr = df['tr'].dropna()
-                            
-                            if len(valid_tr) >= 5:  # 至少5个有效数据点
-                                # 计算20日ATR(如果数据不足20天,使用所有可用数据)
-                                atr_20d = valid_tr.mean()
-                                
-                                if pd.notna(atr_20d) and atr_20d > 0:
-                                    self._atr_20d_map[stock_code] = float(atr_20d)
-                                    # 【CTO修复】同时保存prev_close
-                                    self._prev_close_cache[stock_code] = float(df['close'].iloc[-1])
-                                    success += 1
-                                else:
-                                    failed += 1
-                            else:
-                                failed += 1
-                        except Exception as e:
-                            logger.debug(f"ATR计算失败 {stock_code}: {e}")
-                            failed += 1
-                    else:
-                        failed += 1
-            else:
-                failed = len(stock_list)
-                logger.error(f"[ATR调试-致命] xtdata.get_local_data返回None或空字典!")
-            
-            # 【CTO修复】为所有股票设置默认ATR值(0.05 = 5%日波动)
-            # 确保即使QMT数据缺失,系统也能继续运行
-            for stock_code in stock_list:
-                if stock_code not in self._atr_20d_map:
-                    self._atr_20d_map[stock_code] = 0.05  # 默认5%日波动
-            
-            elapsed = (time.perf_counter() - start) * 1000
-            
-            # 【CTO修正】如果使用默认值的超过50%，必须报严重警告
-            if success < len(stock_list) * 0.5:
-                logger.error(f"[X] [数据断层致命告警] {len(stock_list)-success} 只股票丢失真实日K！被迫启用 0.05 盲狙默认值！这极度危险！")
-                print(f"[X] [QMT本地] ATR_20D计算: {success}只真实数据, {len(stock_list)-success}只使用默认值(极度危险！)")
-            else:
-                logger.info(f"[OK] [QMT本地] ATR_20D计算完成: {success}只成功,{len(stock_list)-success}只使用默认值,耗时{elapsed:.1f}ms")
-                print(f"[QMT本地] ATR_20D计算完成: {success}只成功, {len(stock_list)-success}只使用默认值")
-            
-            return {
-                'source': 'QMT本地日K数据',
-                'success': success,
-                'failed': failed,
-                'elapsed_ms': elapsed
-            }
-            
-        except Exception as e:
-            logger.error(f"[CRITICAL] [QMT本地-ATR_20D] 计算失败: {e}")
-            print(f"[CRITICAL] [QMT本地-ATR_20D] 计算失败: {e}")
-            return {'source': 'QMT本地', 'success': 0, 'failed': len(stock_list), 'error': str(e)}
-
     def get_atr_20d(self, stock_code: str) -> float:
         """
         【CTO ATR股性突变雷达】获取股票的20日ATR值
@@ -629,7 +461,7 @@ class TrueDictionary:
         Returns:
             float: 20日ATR值,查不到返回默认值0.05 (表示5%的日波动)
         """
-        return self._atr_20d_map.get(stock_code, 0.05)
+        return self._store.get_one('atr_20d', stock_code, 0.05)
     
     def get_prev_close(self, stock_code: str) -> Optional[float]:
         """
@@ -641,9 +473,9 @@ class TrueDictionary:
         Returns:
             float: 前收盘价，查不到返回None
         """
-        return self._prev_close_cache.get(stock_code)
+        return self._store.get_one('prev_close', stock_code, None)
 
-    def _warmup_qmt_data(self, stock_list: List[str]) -> Dict:
+    def _warmup_qmt_data(self, stock_list: List[str], trade_date: str = None) -> Dict:
         """
         QMT本地C++接口读取 - 极速(<100ms)
         
@@ -651,6 +483,11 @@ class TrueDictionary:
         - FloatVolume: 流通股本
         - UpStopPrice: 涨停价  
         - DownStopPrice: 跌停价
+        
+        【CTO V233 合约主表】优先整列取自 InstrumentMaster，主表没有（或股本缺失）的票才逐只查询。
+        已落盘的主表直接读；没有时只在名单够大（≥MASTER_FETCH_MIN_CODES）才全市场刷新，
+        且只有当日主表才落盘——合约详情是当前快照，不能存成历史日期的主表。
+        success 只统计拿到有限流通股本的票。
         """
         start = time.perf_counter()
         
@@ -659,8 +496,29 @@ class TrueDictionary:
             
             success = 0
             failed = 0
+            ids = self._store.intern(stock_list)
+            float_volume = np.full(len(ids), np.nan)
+            up_stop = np.full(len(ids), np.nan)
+            down_stop = np.full(len(ids), np.nan)
+            
+            pending = range(len(stock_list))
+            if trade_date:
+                try:
+                    master = self._resolve_instrument_master(trade_date, len(stock_list))
+                    if master is not None:
+                        rows = master.ids(stock_list)
+                        hit = rows >= 0
+                        float_volume[hit] = np.floor(master.float_volume[rows[hit]])
+                        up_stop[hit] = master.up_stop_price[rows[hit]]
+                        down_stop[hit] = master.down_stop_price[rows[hit]]
+                        ok = np.isfinite(float_volume)
+                        success += int(ok.sum())
+                        pending = np.flatnonzero(~ok)
+                except Exception as e:
+                    logger.warning(f"[WARN] [QMT装弹] 合约主表不可用，逐只读取: {e}")
             
-            for stock_code in stock_list:
+            for k in pending:
+                stock_code = stock_list[k]
                 try:
                     # CTO规范: 使用QMT最底层C++接口
                     detail = xtdata.get_instrument_detail(stock_code, True)
@@ -672,16 +530,17 @@ class TrueDictionary:
                             # QMT的FloatVolume单位是万股，需要×10000转换为股
                             # 如果值大于1亿，说明已经是股单位（新版本QMT可能已修复）
                             fv_shares = int(fv_raw) if fv_raw > 1e8 else int(fv_raw * 10000)
-                            self._float_volume[stock_code] = fv_shares
+                            float_volume[k] = fv_shares
                         
                         # 提取涨停价/跌停价
                         up = detail.get('UpStopPrice', 0) if hasattr(detail, 'get') else getattr(detail, 'UpStopPrice', 0)
                         down = detail.get('DownStopPrice', 0) if hasattr(detail, 'get') else getattr(detail, 'DownStopPrice', 0)
                         if up:
-                            self._up_stop_price[stock_code] = float(up)
+                            up_stop[k] = float(up)
                         if down:
-                            self._down_stop_price[stock_code] = float(down)
-                        
+                            down_stop[k] = float(down)
+                    
+                    if np.isfinite(float_volume[k]):
                         success += 1
                     else:
                         failed += 1
@@ -691,6 +550,11 @@ class TrueDictionary:
                     if failed <= 3:  # 只记录前3个错误
                         logger.debug(f"QMT读取失败 {stock_code}: {e}")
             
+            for field, values in (('float_volume', float_volume), ('up_stop_price', up_stop),
+                                  ('down_stop_price', down_stop)):
+                ok = ~np.isnan(values)
+                self._store.set(field, ids[ok], values[ok])
+            
             elapsed = (time.perf_counter() - start) * 1000
             self._metadata['qmt_warmup_time'] = elapsed
             
@@ -709,6 +573,21 @@ class TrueDictionary:
             logger.error(f"[CRITICAL] [QMT装弹失败] {e}")
             return {'source': 'QMT', 'success': 0, 'failed': len(stock_list), 'error': str(e)}
     
+    def _resolve_instrument_master(self, trade_date: str, n_codes: int):
+        """
+        【CTO V233 合约主表】取装弹用主表
+
+        已落盘的当日主表直接读；否则名单不足 MASTER_FETCH_MIN_CODES 只返回 None（逐只查更快）。
+        当日刷新并落盘；历史日期只在内存里用当前快照，不落盘冒充历史主表。
+        """
+        from logic.data_providers.instrument_master import InstrumentMaster
+        master = InstrumentMaster.load(trade_date)
+        if master is not None or n_codes < self.MASTER_FETCH_MIN_CODES:
+            return master
+        if trade_date == datetime.now().strftime('%Y%m%d'):
+            return InstrumentMaster.get(trade_date)
+        return InstrumentMaster.fetch(trade_date)
+    
     def _check_data_integrity(self, stock_list: List[str]) -> Dict:
         """
         数据完整性检查 - CTO强制规范
@@ -721,10 +600,11 @@ class TrueDictionary:
         total = len(stock_list)
         
         # 检查FloatVolume(QMT核心数据) - 必须存在
-        missing_float = sum(1 for s in stock_list if s not in self._float_volume)
+        ids = self._store.ids(stock_list)
+        missing_float = int(np.isnan(self._store.get('float_volume', ids, np.nan)).sum())
         
         # 检查5日均量(核心数据) - CTO强制：必须存在！
-        missing_avg = sum(1 for s in stock_list if s not in self._avg_volume_5d)
+        missing_avg = int(np.isnan(self._store.get('avg_volume_5d', ids, np.nan)).sum())
         
         # CTO强制：两项核心数据都必须检查
         # 缺失率取两者最大值
@@ -761,15 +641,15 @@ class TrueDictionary:
         
         【CTO修复】强制转换为float，防止类型爆炸
         """
-        return float(self._float_volume.get(stock_code, 0))
+        return self._store.get_one('float_volume', stock_code, 0.0)
     
     def get_up_stop_price(self, stock_code: str) -> float:
         """获取涨停价 - O(1)内存查询"""
-        return self._up_stop_price.get(stock_code, 0.0)
+        return self._store.get_one('up_stop_price', stock_code, 0.0)
     
     def get_down_stop_price(self, stock_code: str) -> float:
         """获取跌停价 - O(1)内存查询"""
-        return self._down_stop_price.get(stock_code, 0.0)
+        return self._store.get_one('down_stop_price', stock_code, 0.0)
     
     def get_avg_volume_5d(self, stock_code: str) -> float:
         """获取5日平均成交量 - O(1)内存查询
@@ -781,12 +661,44 @@ class TrueDictionary:
         
         【CTO铁血令】强制转换为float，防止类型爆炸
         """
-        try:
-            val = self._avg_volume_5d.get(stock_code, 0.0)
-            return float(val) if val is not None else 0.0
-        except (ValueError, TypeError):
-            return 0.0
-    
+        return self._store.get_one('avg_volume_5d', stock_code, 0.0)
+
+    # ============================================================
+    # 【CTO V233 数组化字典】盘中批量查询 - ids 一次 gather，结果与输入逐位对齐
+    # ============================================================
+
+    def get_symbol_ids(self, stock_codes) -> np.ndarray:
+        """代码 → 驻留id（未装弹的代码为 -1），全市场扫描时每批只换算一次"""
+        return self._store.ids(stock_codes)
+
+    def get_field_batch(self, field: str, ids: np.ndarray, default: float = 0.0) -> np.ndarray:
+        """按 ids 批量取任一字段，缺失/未装弹取 default"""
+        return self._store.get(field, ids, default)
+
+    def get_float_volume_batch(self, ids: np.ndarray) -> np.ndarray:
+        """批量流通股本(股)，缺失为0（同 get_float_volume）"""
+        return self._store.get('float_volume', ids, 0.0)
+
+    def get_up_stop_price_batch(self, ids: np.ndarray) -> np.ndarray:
+        """批量涨停价，缺失为0"""
+        return self._store.get('up_stop_price', ids, 0.0)
+
+    def get_down_stop_price_batch(self, ids: np.ndarray) -> np.ndarray:
+        """批量跌停价，缺失为0"""
+        return self._store.get('down_stop_price', ids, 0.0)
+
+    def get_avg_volume_5d_batch(self, ids: np.ndarray) -> np.ndarray:
+        """批量5日平均成交量(手)，缺失为0（同 get_avg_volume_5d）"""
+        return self._store.get('avg_volume_5d', ids, 0.0)
+
+    def get_atr_20d_batch(self, ids: np.ndarray) -> np.ndarray:
+        """批量20日ATR，缺失为默认值0.05（同 get_atr_20d）"""
+        return self._store.get('atr_20d', ids, 0.05)
+
+    def field_count(self, field: str) -> int:
+        """字段已装弹的股票数"""
+        return self._store.count(field)
+
     def build_static_cache(
         self,
         stock_list: List[str],
@@ -897,9 +809,9 @@ class TrueDictionary:
         """
         try:
             # 优先从缓存读取
-            val = self._avg_turnover_5d.get(stock_code)
+            val = self._store.get_one('avg_turnover_5d', stock_code, None)
             if val is not None:
-                return float(val)
+                return val
             
             # 缓存未命中，实时计算
             if not target_date:
@@ -943,7 +855,7 @@ class TrueDictionary:
                 return 0.0
             
             # 缓存结果
-            self._avg_turnover_5d[stock_code] = float(avg_turnover)
+            self._store.set_one('avg_turnover_5d', stock_code, float(avg_turnover))
             
             return float(avg_turnover)
             
@@ -962,9 +874,9 @@ class TrueDictionary:
     def _get_warmup_stats(self) -> Dict:
         """获取装弹统计"""
         return {
-            'qmt_cached': len(self._float_volume),
-            'up_stop_cached': len(self._up_stop_price),
-            'avg_volume_cached': len(self._avg_volume_5d),
+            'qmt_cached': self._store.count('float_volume'),
+            'up_stop_cached': self._store.count('up_stop_price'),
+            'avg_volume_cached': self._store.count('avg_volume_5d'),
             'sector_cached': len(self._sector_map),
             'cache_date': self._metadata['cache_date'],
             'data_source': self._metadata['data_source'],
@@ -977,19 +889,19 @@ class TrueDictionary:
         if self._metadata['cache_date'] != today:
             return False
         
-        integrity = self._check_data_integrity(list(self._float_volume.keys()))
+        integrity = self._check_data_integrity(self._store.codes_with('float_volume'))
         return integrity['is_ready']
     
     def get_stats(self) -> Dict:
         """获取完整统计"""
         return {
             'qmt': {
-                'float_volume': len(self._float_volume),
-                'up_stop_price': len(self._up_stop_price),
+                'float_volume': self._store.count('float_volume'),
+                'up_stop_price': self._store.count('up_stop_price'),
                 'warmup_ms': self._metadata['qmt_warmup_time']
             },
             'avg_volume': {
-                'avg_volume_5d': len(self._avg_volume_5d),
+                'avg_volume_5d': self._store.count('avg_volume_5d'),
                 'warmup_ms': self._metadata['avg_volume_warmup_time']
             },
             'cache_date': self._metadata['cache_date'],
@@ -4,10 +4,13 @@
 UniverseBuilder - 回测候选股票池构建器
 
 《三漏斗架构》
-  漏斗1 (静态过滤):  ST/北交所/科创板剔除  → 零 get_local_data 调用
-  漏斗２ (日K量价):   逐只 get_local_data(period='1d')  → 量/均价过滤
+  漏斗1 (静态过滤):  ST/北交所/科创板剔除  → 读当日 InstrumentMaster 主表，零逐只调用
+  漏斗２ (日K量价):   一次读取60日日K面板，逐闸门布尔掩码 → 量/均价过滤
   漏斗３ (MA趋势):    MA5>MA10>MA20 多头排列           → 可选，右侧追涨用
 
+【CTO V233 候选池缓存】历史交易日建池结果按漏斗参数哈希落盘（universe_cache），
+build() 先查缓存；区间回测可先 precompute_universes(dates) 一次读日K批量建池
+
 【API 变更 V3.2.0】
 build() 返回值: tuple[list[str], dict[str, float]]
   - list[str]:        通过粗筛的股票代码（与 V3.1 一致）
@@ -39,6 +42,10 @@ except ImportError:
 
 from logic.utils.calendar_utils import get_nth_previous_trading_day
 
+# 近7日无日K的票超过此数视为本地日K缺失（防空警报）；此时建池结果不落盘，补数后重建
+MISSING_ALARM = 100
+
+
 def _load_bson_blacklist() -> set[str]:
     """
     尝试加载BSON黑名单。
@@ -81,12 +88,21 @@ class UniverseBuilder:
     def __init__(
         self,
         target_date: str,
+        use_cache: bool = True,
+        cache_dir=None,
     ):
         self.target_date        = target_date
         self._blacklist         = _load_bson_blacklist()
         self._stats: dict       = {}
         # 【新增】存储全市场量比分布，供动态阈值计算
         self._volume_ratios: dict[str, float] = {}
+        # 【CTO V233 向量化漏斗】漏斗2/3共用日K面板 + 逐闸门剔除计数
+        self._panel = None
+        self._gate_counts: dict[str, dict[str, int]] = {}
+        # 【CTO V233 合约主表】漏斗1读到的当日主表；区间预计算时漏斗2流通股本直接取主表
+        self._master = None
+        self._fv_from_master = False
+        self._missing = 0
 
         from logic.core.config_manager import get_config_manager
         cfg = get_config_manager()
@@ -95,10 +111,18 @@ class UniverseBuilder:
         self.min_price            = cfg.get('stock_filter.min_price',            3.0)
         self.max_price            = cfg.get('stock_filter.max_price',            300.0)
 
-    def build(self) -> tuple[list[str], dict[str, float]]:
+        # 【CTO V233 候选池缓存】只有已收盘的历史交易日走缓存
+        from logic.data_providers.universe_cache import UniverseCache, funnel_key, is_cacheable
+        self.use_cache = use_cache and is_cacheable(target_date)
+        self.cache = UniverseCache(funnel_key(self.min_avg_amount, self._blacklist), cache_dir)
+
+    def build(self, refresh: bool = False) -> tuple[list[str], dict[str, float]]:
         """
         构建候选股票池 + 返回全市场量比分布。
 
+        Args:
+            refresh: 跳过缓存查找强制重建（结果仍落盘）
+
         Returns:
             tuple[list[str], dict[str, float]]:
                 - list[str]: 通过粗筛的股票代码列表
@@ -112,6 +136,16 @@ class UniverseBuilder:
         """
         t0 = time.perf_counter()
 
+        if self.use_cache and not refresh:
+            hit = self.cache.load(self.target_date)
+            if hit is not None:
+                final_pool, self._volume_ratios, stats = hit
+                self._stats = dict(stats, cache_hit=True,
+                                   elapsed_ms=round((time.perf_counter() - t0) * 1000, 1))
+                logger.info(f'[FAST] [UniverseBuilder] 缓存命中 {self.target_date}: '
+                            f'{len(final_pool)}只候选 (key={self.cache.key})')
+                return final_pool, self._volume_ratios
+
         step1 = self._funnel1_static()
         logger.info(f'[漏斗１-静态] 通过: {len(step1)}只')
 
@@ -140,272 +174,144 @@ class UniverseBuilder:
             'final_pool':     len(final_pool),
             'blacklist_size': len(self._blacklist),
             'volume_ratios_collected': len(self._volume_ratios),
+            'gate_rejections': self._gate_counts,
             'elapsed_ms':     round(elapsed_ms, 1),
         }
         logger.info(f'[UniverseBuilder] 完成: {len(final_pool)}只候选 | '
                     f'耗时: {elapsed_ms:.0f}ms')
+        # 漏斗1为空（取不到主表）、面板不可用或日K大面积缺失时不落盘，避免把失败结果缓存下来
+        if self.use_cache and step1 and self._panel is not None and self._missing <= MISSING_ALARM:
+            try:
+                self.cache.save(self.target_date, final_pool, self._volume_ratios, self._stats)
+            except Exception as e:
+                logger.warning(f'[WARN] [UniverseBuilder] 候选池缓存落盘失败: {e}')
         return final_pool, self._volume_ratios
 
     def _funnel1_static(self) -> list[str]:
         """
         第一漏斗：静态过滤（ST/北交所/科创板/BSON黑名单）。
         同时将所有被过滤的股票记录为 volume_ratio=0.0，保证样本量。
+
+        【CTO V233 合约主表】名称/ST 判定读当日 InstrumentMaster（每日一次批量刷新后落盘），
+        不再逐只 get_instrument_detail；四道过滤按原优先级做 numpy 掩码。
+        区间预计算会预先注入 self._master（按日读落盘主表），此处不再刷新。
         """
         try:
-            from xtquant import xtdata
+            from logic.data_providers.instrument_master import InstrumentMaster
+            master = self._master or InstrumentMaster.get(self.target_date)
         except ImportError:
             logger.error('[X] [漏斗１] xtquant未安装')
             return []
-
-        try:
-            all_stocks = xtdata.get_stock_list_in_sector('沪深A股')
         except Exception as e:
             logger.error(f'[X] [漏斗１] 获取全市场列表失败: {e}')
             return []
+        self._master = master
+
+        import numpy as np
 
-        result = []
-        cnt = {'blacklist': 0, 'bj': 0, 'kcb': 0, 'st': 0}
-
-        for stock in all_stocks:
-            code = stock.split('.')[0]
-            filtered = False
-
-            if stock in self._blacklist:
-                cnt['blacklist'] += 1
-                filtered = True
-
-            elif code[:2] in ('43', '83', '87', '88'):
-                cnt['bj'] += 1
-                filtered = True
-
-            elif code.startswith('688'):
-                cnt['kcb'] += 1
-                filtered = True
-
-            else:
-                try:
-                    detail = xtdata.get_instrument_detail(stock, False)
-                    if detail:
-                        name = (
-                            detail.get('InstrumentName', '')
-                            if hasattr(detail, 'get')
-                            else getattr(detail, 'InstrumentName', '')
-                        )
-                        name_upper = name.upper()
-                        if 'ST' in name_upper or '退' in name or '摘' in name:
-                            cnt['st'] += 1
-                            filtered = True
-                except Exception:
-                    pass
-
-            if filtered:
-                # 【新增】被过滤的股票记录0.0，保证样本量
-                self._volume_ratios[stock] = 0.0
-            else:
-                result.append(stock)
+        remaining = np.ones(len(master), dtype=bool)
+        cnt = {}
+        for gate, mask in (('blacklist', master.member_mask(self._blacklist)),
+                           ('bj', master.bj_mask()),
+                           ('kcb', master.kcb_mask()),
+                           ('st', master.is_st)):
+            hit = remaining & mask
+            cnt[gate] = int(hit.sum())
+            remaining &= ~hit
+        self._gate_counts['funnel1'] = cnt
+
+        codes = master.codes.tolist()
+        result = [codes[i] for i in np.flatnonzero(remaining)]
+        # 【新增】被过滤的股票记录0.0，保证样本量
+        for i in np.flatnonzero(~remaining):
+            self._volume_ratios[codes[i]] = 0.0
 
         logger.info(
-            f'[漏斗１] 全市场{len(all_stocks)}只 '
+            f'[漏斗１] 全市场{len(codes)}只 '
             f'→ 黑名单:{cnt["blacklist"]} 北交所:{cnt["bj"]} '
             f'科创板:{cnt["kcb"]} ST:{cnt["st"]} '
             f'→ 剩余: {len(result)}只'
         )
         return result
 
+    def _read_panel(self, stock_list: list[str]):
+        """
+        【CTO V233 向量化漏斗】一次分块读取漏斗2/3共用的60日日K面板（股票 × 交易日）
+        xtquant 未安装返回 None
+        """
+        if self._panel is not None:
+            return self._panel
+        try:
+            from logic.data_providers.daily_panel import DailyPanel
+            start_date = get_nth_previous_trading_day(self.target_date, 60)
+            self._panel = DailyPanel.read(stock_list, start_date, self.target_date)
+        except ImportError:
+            return None
+        return self._panel
+
     def _funnel2_daily_kline(self, stock_list: list[str]) -> list[str]:
         """
         第二漏斗：日K量价过滤（均额/价格/换手率）。
         【新增】同时计算每只股票的 volume_ratio = today_volume / avg_volume_5d。
-        【CTO V25】实装自愈下载：本地没数据就当场下载！
-        【CTO V26优化】减少sleep时间，批量检查后统一下载
+
+        【CTO V233 向量化漏斗】面板上逐闸门布尔掩码（universe_funnels.funnel2），
+        口径同原逐只实现：
+          - avg_volume_5d / avg_amount_5d 只取历史5日、排除今日（CTO V9.5 Issue#1/#2铁律）
+          - 基础卫生 → 价格区间 → 5日均额 → 量比>=2.0 → 当日换手>=2.0%
+          - 无流通股本的票跳过量比/换手判定（CTO V137 换手率降级为辅助防线）
         """
-        try:
-            from xtquant import xtdata
-        except ImportError:
+        panel = self._read_panel(stock_list)
+        if panel is None:
             logger.error('[X] [漏斗２] xtquant未安装，跳过')
             return stock_list
+        panel = panel.select(stock_list)
 
-        end_date   = self.target_date
-        start_date = get_nth_previous_trading_day(self.target_date, 7)
+        import numpy as np
+        from logic.data_providers.universe_funnels import funnel2
 
-        passed       = []
-        cnt_nodata   = 0
-        cnt_volume   = 0
-        cnt_price    = 0
-        cnt_turnover = 0
-        cnt_autoheal = 0  # 【CTO V25】自愈下载计数
-
-        # 【CTO V26优化】第一步：批量检查所有股票数据
-        # 单独获取比批量更快（QMT接口特性）
-        all_data = {}
-        missing_stocks = []
-        
-        # 【CTO V78 BSON免疫】分批获取，防止C++底层内存泄漏或BSON超载
-        all_data = {}
-        missing_stocks = []
-        chunk_size = 500
-        
-        for i in range(0, len(stock_list), chunk_size):
-            chunk = stock_list[i:i + chunk_size]
-            try:
-                data = xtdata.get_local_data(
-                    field_list=['open', 'high', 'low', 'close', 'volume', 'amount'],
-                    stock_list=chunk,
-                    period='1d',
-                    start_time=start_date,
-                    end_time=end_date
-                )
-                if data:
-                    for stock in chunk:
-                        # 【CTO V73】只要有数据（>=1天）就算有效！
-                        if stock in data and data[stock] is not None and len(data[stock]) >= 1:
-                            all_data[stock] = data[stock]
-                        else:
-                            missing_stocks.append(stock)
-                else:
-                    missing_stocks.extend(chunk)
-            except Exception as e:
-                logger.error(f'[漏斗2] 批量获取失败: {e}')
-                missing_stocks.extend(chunk)
+        start_date = get_nth_previous_trading_day(self.target_date, 7)
 
         # 【CTO V73修复】只有真正缺失的才报警，且阈值设为>100才报警（避免噪音）
         # 很多股票（停牌、次新、ST等）本身就不会有完整数据，这是正常的业务过滤
-        if missing_stocks and len(missing_stocks) > 100:
-            logger.warning(f'[WARN] [防空警报] 发现 {len(missing_stocks)} 只股票日K数据缺失！')
+        missing = int((panel.window_counts(start_date) == 0).sum()) if panel.width else len(stock_list)
+        self._missing = missing
+        if missing > MISSING_ALARM:
+            logger.warning(f'[WARN] [防空警报] 发现 {missing} 只股票日K数据缺失！')
             logger.warning(f'🚫 为防止实盘引擎被网络卡死，系统拒绝现场下载，这些股票将被物理隔离。')
             logger.warning(f'[TIP] 请在盘后运行：python tools/smart_download.py 补充弹药！')
-        elif missing_stocks:
+        elif missing:
             # 少量缺失是正常的（次新/停牌），只记录debug
-            logger.debug(f'[数据检查] {len(missing_stocks)} 只股票数据不足，已跳过（次新/停牌属正常情况）')
+            logger.debug(f'[数据检查] {missing} 只股票数据不足，已跳过（次新/停牌属正常情况）')
 
-        # 【CTO V26优化】第三步：使用已获取的数据进行过滤
-        import pandas as pd
-        import numpy as np
-        
         # 【CTO V137】换手率预热改为可选（已降级为辅助防线）
         # 由于QMT FloatVolume是当前值，历史换手率存在"时空错乱谬误"
         # 换手率只用于"防极端死水"，阈值降至2%
-        float_volume_cache = {}
-        try:
-            from logic.data_providers.true_dictionary import get_true_dictionary
-            true_dict = get_true_dictionary()
-            # 批量预热流通股本
-            true_dict.warmup(stock_list, target_date=self.target_date, force=False)
-            # 构建快查缓存
-            for s in stock_list:
-                float_volume_cache[s] = true_dict.get_float_volume(s)
-            logger.info(f'[漏斗2] TrueDictionary预热完成，流通股本覆盖率: {sum(1 for v in float_volume_cache.values() if v > 0)}/{len(stock_list)}')
-        except Exception as e:
-            logger.warning(f'[漏斗2] TrueDictionary预热失败: {e}，换手率过滤将降级')
-
-        for stock in stock_list:
-            df = all_data.get(stock)
-            
-            if df is None or len(df) < 1:
-                cnt_nodata += 1
-                self._volume_ratios[stock] = 0.0
-                continue
-
-            # 【新增】计算 volume_ratio = 今日成交量 / 历史5日均量
-            # 【CTO V9.5 Issue#1铁律】avg_volume_5d 必须排除今日，否则今日放量会污染均值
-            # 修复前：iloc[-n:] 包含今日，量比被压低约30%
-            # 修复后：iloc[-hist_n-1:-1] 只取历史5天，排除今日
-            hist_n = min(5, len(df) - 1)  # 历史天数，排除今日(-1)
-            if hist_n > 0:
-                today_volume = float(df['volume'].iloc[-1])  # 单位: 手
-                avg_volume_5d = df['volume'].iloc[-hist_n - 1:-1].mean()  # 单位: 手（仅历史）
-                if avg_volume_5d > 0 and not (pd.isna(today_volume) or np.isinf(today_volume)):
-                    volume_ratio = today_volume / avg_volume_5d  # 单位: 手/手 = 无量纲
-                    self._volume_ratios[stock] = float(volume_ratio)
-                else:
-                    self._volume_ratios[stock] = 0.0
-            else:
-                # 数据只有1行，无历史可算，量比设1.0（兜底）
-                today_volume = float(df['volume'].iloc[-1]) if len(df) > 0 else 0.0
-                self._volume_ratios[stock] = 1.0 if today_volume > 0 else 0.0
-
-            # 【CTO V129 游资四维共振漏斗】全部条件满足才能进！
-            # 条件1: 5日均额>1.5亿
-            # 条件2: 5日均换手>5%
-            # 条件3: 当日换手>5%
-            # 条件4: 量比92分位数（在watchlist装载时执行）
-            
-            last_close = float(df['close'].iloc[-1])
-            today_volume = float(df['volume'].iloc[-1])
-            today_amount = float(df['amount'].iloc[-1])
-            
-            # 基础卫生检查
-            if last_close <= 0 or today_volume <= 0:
-                cnt_nodata += 1
-                continue
-            
-            if not (2.0 <= last_close <= 500.0):
-                cnt_price += 1
-                continue
-            
-            # 【CTO V9.5 Issue#2铁律】与修改点A保持一致，avg_volume_5d/avg_amount_5d 排除今日
-            # 单位: avg_amount_5d=元（历史5日）, avg_volume_5d=手（历史5日）
-            _hist_n = min(5, len(df) - 1)
-            if _hist_n > 0:
-                avg_amount_5d = df['amount'].iloc[-_hist_n - 1:-1].mean()
-                avg_volume_5d = df['volume'].iloc[-_hist_n - 1:-1].mean()
-                avg_amount_5d = avg_amount_5d if not pd.isna(avg_amount_5d) else 0
-                avg_volume_5d = avg_volume_5d if not pd.isna(avg_volume_5d) else 0
-            else:
-                # 只有1行数据时，用今日值兜底
-                avg_amount_5d = float(df['amount'].iloc[-1]) if len(df) > 0 else 0
-                avg_volume_5d = float(df['volume'].iloc[-1]) if len(df) > 0 else 0
-            
-            # 【条件1】五日成交均额大于1.5亿
-            if avg_amount_5d < self.min_avg_amount:
-                cnt_volume += 1
-                continue
-            
-            # 【条件2+3】换手率计算（使用预热的缓存）
-            float_volume_shares = float_volume_cache.get(stock, 0)
-            
-            if float_volume_shares <= 0:
-                # 无流通股本数据，跳过换手过滤但记录警告
-                passed.append(stock)
-                continue
-            
-            # 换手率计算：QMT volume单位是手，需×100转股
-            # today_volume单位=手，float_volume_shares单位=股
-            today_turnover_pct = (today_volume * 100 / float_volume_shares) * 100 if float_volume_shares > 0 else 0
-            avg_turnover_5d_pct = (avg_volume_5d * 100 / float_volume_shares) * 100 if float_volume_shares > 0 else 0
-            
-            # 【CTO V137 纯正物理防线】(摒弃除权造假，重归金额与量比)
-            # 致命发现：QMT FloatVolume是当前值，用历史成交量除以当前股本会导致"时空错乱谬误"！
-            # 中间有"10转10"送股的股票，历史换手率会被腰斩！
-            # 因此废止双轨制，回归"金额+量比"纯物理学防线！
-
-            # 【第二道锁：动能爆发力】今日量比必须 >= 2.0倍（P50=1.94x）
-            # 这是最可靠的物理指标，不受除权影响！
-            # 【CTO V9.5 Issue#2】此处 avg_volume_5d 来自修改点B，已排除今日
-            # 单位: 手/手 = 无量纲，与 self._volume_ratios 口径一致
-            volume_ratio = today_volume / avg_volume_5d if avg_volume_5d > 0 else 0
-            if volume_ratio < 2.0:
-                cnt_turnover += 1
-                continue
-            
-            # 【第三道锁：换手率降级为辅助防线】
-            # 既然历史换手率不准，那就把换手率阈值降维成【防极端死水过滤器】
-            # 只需验证今日换手率 > 2.0%，足以排除极度死水
-            # 注：这部分工作交给盘中Tick级的Momentum算子去解决
-            if today_turnover_pct < 2.0:
-                cnt_turnover += 1
-                continue
-            
-            passed.append(stock)
-
-        # 【CTO V25】自愈下载统计日志
-        if cnt_autoheal > 0:
-            logger.info(f'[AUTO-HEAL] 漏斗2自愈下载: {cnt_autoheal}只股票补齐日K数据')
-        
+        float_volume = np.zeros(len(stock_list))
+        if self._fv_from_master and self._master is not None:
+            # 区间预计算：与 TrueDictionary 主表装弹同口径（向下取整，缺失记0）
+            rows = self._master.ids(stock_list)
+            hit = rows >= 0
+            float_volume[hit] = np.nan_to_num(np.floor(self._master.float_volume[rows[hit]]), nan=0.0)
+        else:
+            try:
+                from logic.data_providers.true_dictionary import get_true_dictionary
+                true_dict = get_true_dictionary()
+                # 批量预热流通股本
+                true_dict.warmup(stock_list, target_date=self.target_date, force=False)
+                float_volume = true_dict.get_float_volume_batch(true_dict.get_symbol_ids(stock_list))
+                logger.info(f'[漏斗2] TrueDictionary预热完成，流通股本覆盖率: {int((float_volume > 0).sum())}/{len(stock_list)}')
+            except Exception as e:
+                logger.warning(f'[漏斗2] TrueDictionary预热失败: {e}，换手率过滤将降级')
+
+        passed_mask, volume_ratio, cnt = funnel2(panel, start_date, float_volume, self.min_avg_amount)
+        self._volume_ratios.update(zip(stock_list, volume_ratio.tolist()))
+        self._gate_counts['funnel2'] = cnt
+        passed = [stock_list[i] for i in np.flatnonzero(passed_mask)]
+
         logger.info(
             f'[漏斗２] 输入:{len(stock_list)}只 '
-            f'→ 无数据:{cnt_nodata} 量不足:{cnt_volume} '
-            f'价格越界:{cnt_price} 换手不足:{cnt_turnover} '
+            f'→ 无数据:{cnt["nodata"]} 量不足:{cnt["amount"]} '
+            f'价格越界:{cnt["price"]} 量比不足:{cnt["volume_ratio"]} 换手不足:{cnt["turnover"]} '
             f'→ 通过: {len(passed)}只'
         )
         return passed
@@ -417,96 +323,28 @@ class UniverseBuilder:
         物理意义：寻找上方抛压真空的标的。计算现价距离过去60日高点的空间差。
         - space_gap <= 15%: 上方套牢盘可控，放行
         - space_gap > 15%: 深水区诈尸，一票否决
+        - K线不足20根直接否决，不足60根阈值收紧到10%（【CTO P0修复】绝不允许把今天当最高点）
+        
+        【CTO V233 向量化漏斗】复用漏斗2读取的60日面板，universe_funnels.funnel3 掩码判定
         
         注意：此漏斗不影响 self._volume_ratios
         """
-        try:
-            from xtquant import xtdata
-        except ImportError:
+        panel = self._read_panel(stock_list)
+        if panel is None:
             logger.warning('[漏斗３] xtquant未安装，跳过空间差过滤')
             return stock_list
 
-        start_date = get_nth_previous_trading_day(self.target_date, 60)
-        
-        # 批量获取60日数据（优化：一次性获取所有股票）
-        try:
-            history_data = xtdata.get_local_data(
-                field_list=['high', 'close'],
-                stock_list=stock_list,
-                period='1d',
-                start_time=start_date,
-                end_time=self.target_date
-            )
-        except Exception as e:
-            logger.warning(f'[漏斗３] 批量获取失败，退回逐只查询: {e}')
-            history_data = None
+        import numpy as np
+        from logic.data_providers.universe_funnels import funnel3
 
-        passed     = []
-        cnt_fail   = 0
-        cnt_nodata = 0
-        
-        for stock in stock_list:
-            try:
-                if history_data and stock in history_data:
-                    df = history_data[stock]
-                else:
-                    # 退回逐只查询
-                    data = xtdata.get_local_data(
-                        field_list=['high', 'close'],
-                        stock_list=[stock],
-                        period='1d',
-                        start_time=start_date,
-                        end_time=self.target_date
-                    )
-                    if not data or stock not in data:
-                        cnt_nodata += 1
-                        continue
-                    df = data[stock]
-                
-                if df is None or len(df) < 10:
-                    cnt_nodata += 1
-                    continue
-
-                # 【CTO P0修复】数据不足时给予惩罚性空间差！
-                # 绝不允许把今天当最高点！
-                if len(df) < 20:
-                    # 数据不足20天，定性为深水区诈尸，直接否决！
-                    space_gap_pct = 0.50
-                    cnt_fail += 1
-                    continue
-                elif len(df) < 60:
-                    # 数据不足60天但>=20天，用可用数据计算但给予额外惩罚
-                    high_60d = float(df['high'].max())
-                    current_close = float(df.iloc[-1]['close'])
-                    if high_60d <= 0:
-                        cnt_nodata += 1
-                        continue
-                    space_gap_pct = (high_60d - current_close) / high_60d
-                    # 额外惩罚：数据不足时空间差阈值更严格（10%而非15%）
-                    threshold = 0.10
-                else:
-                    # 数据充足（>=60天），正常计算
-                    high_60d = float(df['high'].max())
-                    current_close = float(df.iloc[-1]['close'])
-                    if high_60d <= 0:
-                        cnt_nodata += 1
-                        continue
-                    space_gap_pct = (high_60d - current_close) / high_60d
-                    threshold = 0.15
-                
-                # 【CTO核心阈值】距离前高 <= 阈值 才放行
-                if space_gap_pct <= threshold:
-                    passed.append(stock)
-                else:
-                    cnt_fail += 1
-
-            except Exception:
-                cnt_nodata += 1
-                continue
+        start_date = get_nth_previous_trading_day(self.target_date, 60)
+        passed_mask, cnt = funnel3(panel.select(stock_list), start_date)
+        self._gate_counts['funnel3'] = cnt
+        passed = [stock_list[i] for i in np.flatnonzero(passed_mask)]
 
         logger.info(
             f'[漏斗３-空间差] 输入:{len(stock_list)}只 '
-            f'→ 深水区:{cnt_fail} 无数据:{cnt_nodata} '
+            f'→ 深水区:{cnt["space_gap"] + cnt["short_history"]} 无数据:{cnt["nodata"]} '
             f'→ 通过: {len(passed)}只'
         )
         return passed
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+UniverseCache - 按交易日落盘的候选池成员表 + 区间预计算
+
+【CTO V233 候选池缓存】
+旧方案：TimeMachineEngine 连续回测 / main.py scan、replay 每个交易日现场 new 一个
+        UniverseBuilder 跑三漏斗；同一区间回测重跑几遍，底池就重建几遍。
+
+新方案：
+  - 每个交易日的建池结果（最终底池 + 全市场量比分布 + 漏斗统计）存为
+    data/cache/universe/universe_{key}_{date}.tdc（复用 TrueDictCache 二进制格式）
+  - key = 漏斗参数哈希（5日均额下限 / 价格区间 / 量比 / 换手 / 黑名单 / 口径版本），
+    任一参数变化自动换 key，旧结果不会被误用
+  - UniverseBuilder.build() 先查缓存，命中直接返回；未命中建完落盘
+  - precompute_universes(dates)：一次读取覆盖整个区间的日K面板，
+    逐日 DailyPanel.until(date) 切出当日视角跑漏斗2/3，整段区间只读一遍日K；
+    主表按日读落盘（当日 → 最近一份更早的），都没有时整段只批量刷新一次
+  - 日K大面积缺失（universe_builder.MISSING_ALARM）时不落盘，补数后自然重建
+
+只缓存历史交易日（target_date < 今天）：盘中/盘前当日日K未收定，结果不可复用。
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from logic.data_providers.true_dict_cache import TrueDictCache
+from logic.data_providers import universe_funnels
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'universe'
+VERSION = 1  # 漏斗口径版本：漏斗实现变更时递增，使旧成员表整体失效
+
+
+def funnel_key(min_avg_amount: float, blacklist: Iterable[str]) -> str:
+    """漏斗参数哈希（12位十六进制）"""
+    params = {
+        'version': VERSION,
+        'min_avg_amount': float(min_avg_amount),
+        'price_range': list(universe_funnels.PRICE_RANGE),
+        'min_volume_ratio': universe_funnels.MIN_VOLUME_RATIO,
+        'min_turnover_pct': universe_funnels.MIN_TURNOVER_PCT,
+        'blacklist': sorted(blacklist),
+    }
+    raw = json.dumps(params, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()[:12]
+
+
+def is_cacheable(trade_date: str) -> bool:
+    """只有已收盘的历史交易日可缓存"""
+    return trade_date < datetime.now().strftime('%Y%m%d')
+
+
+class UniverseCache:
+    """
+    单组漏斗参数下的逐日成员表
+
+    用法:
+        cache = UniverseCache(funnel_key(min_avg_amount, blacklist))
+        hit = cache.load('20260318')      # None 表示未命中
+        cache.save('20260318', pool, volume_ratios, stats)
+    """
+
+    CACHE_DIR = Path('data/cache/universe')
+
+    def __init__(self, key: str, cache_dir: Optional[Path] = None):
+        self.key = key
+        self.cache_dir = Path(cache_dir) if cache_dir else self.CACHE_DIR
+        self.prefix = f'{PREFIX}_{key}'
+
+    def _file(self, trade_date: str) -> TrueDictCache:
+        return TrueDictCache(trade_date, cache_dir=self.cache_dir, prefix=self.prefix)
+
+    def has(self, trade_date: str) -> bool:
+        return self._file(trade_date).exists()
+
+    def dates(self) -> List[str]:
+        return TrueDictCache.dates(self.cache_dir, self.prefix)
+
+    def save(self, trade_date: str, pool: Sequence[str], volume_ratios: Dict[str, float],
+             stats: Optional[Dict] = None) -> Path:
+        arrays = {
+            'pool': np.array(list(pool), dtype='U16'),
+            'ratio_codes': np.array(list(volume_ratios), dtype='U16'),
+            'ratios': np.array(list(volume_ratios.values()), dtype=np.float64),
+        }
+        return self._file(trade_date).save(arrays, meta={'key': self.key, 'stats': stats or {}})
+
+    def load(self, trade_date: str) -> Optional[Tuple[List[str], Dict[str, float], Dict]]:
+        """命中返回 (底池, 量比分布, 建池统计)"""
+        cache = self._file(trade_date)
+        arrays = cache.load(mmap=False)
+        if arrays is None or any(name not in arrays for name in ('pool', 'ratio_codes', 'ratios')):
+            return None
+        ratios = dict(zip(arrays['ratio_codes'].tolist(), arrays['ratios'].tolist()))
+        return arrays['pool'].tolist(), ratios, cache.meta.get('stats', {})
+
+
+def precompute_universes(dates: Sequence[str], cache_dir: Optional[Path] = None,
+                         force: bool = False) -> Dict[str, int]:
+    """
+    区间预计算：一次读取整段日K面板，逐日建池落盘
+
+    Args:
+        dates: 交易日列表 (YYYYMMDD)
+        cache_dir: 成员表目录（默认 data/cache/universe）
+        force: 已有缓存也重建
+
+    Returns:
+        {date: 底池数量}（含缓存已命中的日期；漏斗1无数据的日期不落盘、不返回）
+    """
+    from logic.data_providers.universe_builder import UniverseBuilder
+    from logic.data_providers.daily_panel import DailyPanel
+    from logic.utils.calendar_utils import get_nth_previous_trading_day
+
+    dates = sorted(d for d in dict.fromkeys(dates) if is_cacheable(d))
+    if not dates:
+        return {}
+    t0 = time.perf_counter()
+    result: Dict[str, int] = {}
+
+    # 1. 已缓存的日期直接跳过
+    pending = []
+    for date in dates:
+        builder = UniverseBuilder(target_date=date, cache_dir=cache_dir)
+        hit = None if force else builder.cache.load(date)
+        if hit is not None:
+            result[date] = len(hit[0])
+        else:
+            pending.append(builder)
+    if not pending:
+        logger.info(f'[FAST] [UniverseCache] {len(dates)}个交易日全部命中缓存')
+        return result
+
+    # 2. 漏斗1取各日静态池并集：主表读落盘（当日或最近一份更早的），都没有才刷新一次
+    from logic.data_providers.instrument_master import InstrumentMaster
+    shared = None
+    static = {}
+    for builder in pending:
+        date = builder.target_date
+        master = InstrumentMaster.load(date) or InstrumentMaster.latest_before(date)
+        if master is None:
+            try:
+                shared = shared or InstrumentMaster.get(datetime.now().strftime('%Y%m%d'))
+            except Exception as e:
+                logger.error(f'[X] [UniverseCache] 合约主表获取失败: {e}')
+                return result
+            master = shared
+        builder._master = master
+        static[date] = builder._funnel1_static()
+    union = list(dict.fromkeys(c for codes in static.values() for c in codes))
+    if not union:
+        logger.warning('[WARN] [UniverseCache] 漏斗1全部为空，跳过预计算')
+        return result
+
+    # 3. 整段区间只读一遍日K
+    first, last = pending[0].target_date, pending[-1].target_date
+    try:
+        panel = DailyPanel.read(union, get_nth_previous_trading_day(first, 60), last)
+    except ImportError:
+        logger.error('[X] [UniverseCache] xtquant未安装，无法预计算')
+        return result
+
+    # 4. 逐日切出当日视角，走 build()（漏斗1复用已注入的主表）
+    for builder in pending:
+        date = builder.target_date
+        if not static[date]:
+            continue
+        start_date = get_nth_previous_trading_day(date, 60)
+        builder._panel = panel.until(date).trim(start_date)
+        builder._fv_from_master = True
+        pool, _ = builder.build(refresh=True)
+        result[date] = len(pool)
+
+    logger.info(f'[OK] [UniverseCache] 预计算 {len(pending)}/{len(dates)}个交易日 '
+                f'| 面板 {len(union)}只 × {panel.width}列 '
+                f'| 耗时 {(time.perf_counter() - t0):.1f}s')
+    return result
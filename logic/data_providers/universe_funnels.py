@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+UniverseFunnels - 三漏斗 漏斗2/漏斗3 的纯数组实现
+
+【CTO V233 向量化漏斗】
+旧方案：UniverseBuilder 漏斗2 分块读日K后逐只 pandas iloc 算量比/均额/换手，
+        漏斗3 再逐只算60日空间差，全市场建池是数秒级 Python 循环。
+
+新方案：输入 DailyPanel（右对齐 股票 × 交易日 面板），每道闸门一个布尔掩码：
+  漏斗2: 无数据 → 价格区间 → 5日均额 → 量比 → 当日换手
+  漏斗3: 无数据 → 空间差（K线根数 <20 否决，<60 阈值10%，否则15%）
+  每道闸门只统计前序闸门放行的票，给出逐闸门剔除计数
+
+口径逐项对齐原逐只实现（含 NaN 比较恒为 False 的放行行为），
+窗口 = 日期 >= 窗口起点 的后缀，与原 get_local_data(start_time=起点) 行集合一致。
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+PRICE_RANGE = (2.0, 500.0)
+MIN_VOLUME_RATIO = 2.0
+MIN_TURNOVER_PCT = 2.0
+
+
+def _hist_mean(values: np.ndarray, hist_n: np.ndarray) -> np.ndarray:
+    """右对齐面板上每行"今日之前 hist_n 行"的 NaN 跳过均值（全缺失为 NaN）"""
+    width = values.shape[1]
+    cols = np.arange(width)[None, :]
+    mask = (cols >= (width - 1 - hist_n)[:, None]) & (cols < width - 1) & ~np.isnan(values)
+    total = np.where(mask, values, 0.0).sum(axis=1)
+    count = mask.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def _last(values: np.ndarray) -> np.ndarray:
+    return values[:, -1] if values.shape[1] else np.full(values.shape[0], np.nan)
+
+
+def funnel2(panel, start_date: str, float_volume: np.ndarray,
+            min_avg_amount: float) -> Tuple[np.ndarray, np.ndarray, Dict[str, int]]:
+    """
+    漏斗2：日K量价过滤
+
+    Args:
+        panel: DailyPanel（至少含 start_date 起的窗口）
+        start_date: 窗口起点（target_date 前第7个交易日）
+        float_volume: 与 panel.codes 对齐的流通股本(股)，无数据为0
+        min_avg_amount: 5日均额下限(元)
+
+    Returns:
+        (通过掩码, 量比, 逐闸门剔除计数)
+        量比口径同 self._volume_ratios：无数据为0，仅1根K线时今日有量为1.0
+    """
+    n = len(panel.codes)
+    n_w = panel.window_counts(start_date) if panel.width else np.zeros(n, dtype=np.int64)
+    volume, amount, close = (panel.values[f] for f in ('volume', 'amount', 'close'))
+    today_volume, today_amount, last_close = _last(volume), _last(amount), _last(close)
+    hist_n = np.minimum(5, n_w - 1)
+    has_hist = hist_n > 0
+    fv = np.asarray(float_volume, dtype=np.float64)
+
+    # 历史5日均量/均额（排除今日）；只有1根K线时用今日值兜底
+    hist_volume = _hist_mean(volume, np.maximum(hist_n, 0)) if panel.width else np.full(n, np.nan)
+    hist_amount = _hist_mean(amount, np.maximum(hist_n, 0)) if panel.width else np.full(n, np.nan)
+    avg_volume = np.where(has_hist, np.nan_to_num(hist_volume, nan=0.0), today_volume)
+    avg_amount = np.where(has_hist, np.nan_to_num(hist_amount, nan=0.0), today_amount)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio_ok = (hist_volume > 0) & np.isfinite(today_volume)
+        volume_ratio = np.where(
+            has_hist,
+            np.where(ratio_ok, today_volume / hist_volume, 0.0),
+            np.where(today_volume > 0, 1.0, 0.0),
+        )
+        volume_ratio = np.where(n_w > 0, volume_ratio, 0.0)
+        gate_ratio = np.where(avg_volume > 0, today_volume / avg_volume, 0.0)
+        turnover_pct = np.where(fv > 0, today_volume * 100 / fv * 100, 0.0)
+
+    has_fv = ~(fv <= 0)   # 无流通股本(<=0)跳过量比/换手判定
+    gates = (
+        ('nodata', (n_w < 1) | (last_close <= 0) | (today_volume <= 0)),
+        ('price', ~((PRICE_RANGE[0] <= last_close) & (last_close <= PRICE_RANGE[1]))),
+        ('amount', avg_amount < min_avg_amount),
+        ('volume_ratio', has_fv & (gate_ratio < MIN_VOLUME_RATIO)),
+        ('turnover', has_fv & (turnover_pct < MIN_TURNOVER_PCT)),
+    )
+    passed, counts = _apply_gates(n, gates)
+    return passed, volume_ratio, counts
+
+
+def funnel3(panel, start_date: str) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    漏斗3：60日空间差排雷
+
+    Args:
+        panel: DailyPanel（行 = 待判定的票）
+        start_date: 窗口起点（target_date 前第60个交易日）
+
+    Returns:
+        (通过掩码, 逐闸门剔除计数)
+    """
+    n = len(panel.codes)
+    if not panel.width:
+        return np.zeros(n, dtype=bool), {'nodata': n, 'short_history': 0, 'space_gap': 0}
+    n_w = panel.window_counts(start_date)
+    high = np.where(panel.dates >= int(start_date), panel.values['high'], np.nan)
+    has_high = ~np.isnan(high).all(axis=1)
+    high_max = np.full(n, np.nan)
+    high_max[has_high] = np.nanmax(high[has_high], axis=1)
+    last_close = _last(panel.values['close'])
+    threshold = np.where(n_w < 60, 0.10, 0.15)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        space_gap = (high_max - last_close) / high_max
+
+    gates = (
+        ('nodata', n_w < 10),
+        ('short_history', n_w < 20),
+        ('nodata_high', high_max <= 0),
+        ('space_gap', ~(space_gap <= threshold)),
+    )
+    passed, counts = _apply_gates(n, gates)
+    counts['nodata'] += counts.pop('nodata_high')
+    return passed, counts
+
+
+def _apply_gates(n: int, gates) -> Tuple[np.ndarray, Dict[str, int]]:
+    """依次应用闸门：每道只对前序放行的票计数"""
+    alive = np.ones(n, dtype=bool)
+    counts = {}
+    for name, reject in gates:
+        hit = alive & reject
+        counts[name] = int(hit.sum())
+        alive &= ~hit
+    return alive, counts
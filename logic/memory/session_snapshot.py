@@ -8,7 +8,21 @@ SessionSnapshot - 盘中 Session 快照引擎
 - 每 30 秒后台自动快照一次（daemon线程，不阻塞主循环）
 - 重启时自动检测同日快照并恢复 9 个关键状态
 - 原子写入（写tmp → rename），防止崩溃损坏快照
-- 仅序列化可JSON化的状态，Tick历史队列不序列化（太大且可从实时流重建）
+- 仅序列化可JSON化的状态，Tick历史队列由 WarmRestartStore 单独以二进制持久化
+
+【V1.1 增量快照】
+- 主循环在帧边界调用 capture_frame(engine)，只交出与上一帧相比变化的
+  不可变增量（L1累加器按票比对，其余状态按段比对），后台线程不再读引擎
+- 各段先取廉价版本键（对象身份 + 原始标量），键未变的段不构建也不比对；
+  L1累加器写版本未变时整帧跳过拷贝
+- L1累加器按下标拷进两块预分配缓冲（本帧/上帧交替复用），整列比对出变化的下标，
+  已见过的票不再逐帧重建字典/数组；只有下标布局变化时才重取代码表
+- 后台线程把增量以 长度前缀+pickle 的紧凑二进制追加到 session_YYYYMMDD.delta
+- 每 SNAPSHOT_INTERVAL 秒把合并后的全量状态压实为 JSON 并清空增量日志
+- load() = 全量JSON + 重放增量日志（delta_seq 之后的记录）
+- get_stall_metrics() 统计帧线程停顿时间（目标 < 1ms）
+- 滚动窗口（tick_history/volume_history/L1）由 WarmRestartStore 定期持久化，
+  restore_to_engine 第9步热重启并用本地Tick补缺
 
 接入方式（main.py live_cmd）：
     session_snap = SessionSnapshot(trade_date)
@@ -19,13 +33,23 @@ SessionSnapshot - 盘中 Session 快照引擎
 
 Author: CTO
 Date: 2026-03-16
-Version: V1.0
+Version: V1.1
 """
 import json
+import pickle
+import queue
+import struct
 import threading
+import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from logic.core.l1_flow import L1FlowAccumulator
+from logic.memory.warm_restart import WarmRestartStore
 
 import logging
 logger = logging.getLogger(__name__)
@@ -36,9 +60,14 @@ class SessionSnapshot:
     盘中 Session 快照引擎
 
     快照文件路径: data/session_snapshots/session_YYYYMMDD.json
+    增量日志路径: data/session_snapshots/session_YYYYMMDD.delta
     """
     SNAPSHOT_DIR = Path("data/session_snapshots")
-    SNAPSHOT_INTERVAL = 30  # 秒
+    SNAPSHOT_INTERVAL = 30  # 秒（全量压实间隔）
+    STALL_BUDGET_MS = 1.0   # 帧线程停顿预算
+    _RECORD_HEADER = struct.Struct('<I')  # 增量记录长度前缀
+    # 按段整体比对的状态（体积小，变化即整段替换）
+    _SECTION_KEYS = ('brain_state', 'exec_state', 'opportunity_pool', 'highest_scores', 'watchlist')
 
     def __init__(self, trade_date: str):
         """
@@ -48,10 +77,38 @@ class SessionSnapshot:
         self.trade_date = trade_date
         self.SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
         self._snapshot_file = self.SNAPSHOT_DIR / f"session_{trade_date}.json"
+        self._delta_file = self.SNAPSHOT_DIR / f"session_{trade_date}.delta"
         self._lock = threading.RLock()
         self._stop_event = threading.Event()
         self._bg_thread: Optional[threading.Thread] = None
 
+        # ── 帧线程侧：上一帧已移交的状态（仅用于比对，不跨线程修改） ──────
+        self._seq = 0
+        self._last_sections: Dict[str, Any] = {}
+        self._last_versions: Dict[str, Any] = {}
+        self._last_l1: Dict[str, Tuple[float, float, float]] = {}
+        # L1 数组化累加器：本帧/上帧 (3, cap) 缓冲交替复用，下标→代码表随布局版本更新
+        self._l1_buf = np.empty((3, L1FlowAccumulator._INITIAL_CAPACITY))
+        self._l1_prev = np.empty((3, L1FlowAccumulator._INITIAL_CAPACITY))
+        self._l1_slots: List[Optional[str]] = []
+        self._l1_layout = -1
+        self._l1_stamp: Optional[Tuple[int, int]] = None  # (累加器身份, 写版本)，未变则跳过拷贝
+        self._delta_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+        # ── 写线程侧：合并后的全量状态 ─────────────────────────────────────
+        self._merged: Optional[Dict[str, Any]] = None
+        self._merged_seq = 0
+
+        # ── 停顿指标 ───────────────────────────────────────────────────────
+        self._stall_samples: deque = deque(maxlen=1024)
+        self._stall_stats = {
+            'frames': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0, 'over_budget': 0,
+        }
+        self._io_stats = {'delta_records': 0, 'delta_bytes': 0, 'compactions': 0}
+
+        # ── 滚动窗口热重启 ─────────────────────────────────────────────────
+        self.windows = WarmRestartStore(trade_date, snapshot_dir=self.SNAPSHOT_DIR)
+
     # ─────────────────────────────────────────────────────────────────────────
     # 核心：从引擎提取可序列化状态
     # ─────────────────────────────────────────────────────────────────────────
@@ -60,41 +117,97 @@ class SessionSnapshot:
         从 LiveTradingEngine 实例提取快照
 
         不序列化：
-        - tick_history / volume_history（Tick队列，重启后从实时流重建）
+        - tick_history / volume_history（Tick队列，由 WarmRestartStore 二进制持久化）
         - candidate_pool 的 tick_history 子字段（同上）
         - qmt_manager 实例（不可序列化）
         """
-        # ── decision_brain 持仓状态 ───────────────────────────────────────────
-        brain_state = {}
-        if getattr(engine, 'decision_brain', None):
-            db = engine.decision_brain
-            brain_state = {
-                'current_position': db.current_position,
-                'entry_price': db.entry_price,
-                'entry_score': db.entry_score,
-                'held_stock_code': db.held_stock_code,
-                'entry_time': db.entry_time.isoformat() if db.entry_time else None,
-            }
-
-        # ── execution_manager 资金状态 ────────────────────────────────────────
-        exec_state = {}
-        if getattr(engine, 'execution_manager', None):
-            em = engine.execution_manager
-            exec_state = {
-                'current_capital': getattr(em, 'current_capital', 0),
-                'initial_capital': getattr(em, 'initial_capital', 100000.0),
-                'total_pnl': getattr(em, 'total_pnl', 0),
-                'positions': {
-                    k: {
-                        'stock_code': k,
-                        'entry_price': getattr(v, 'entry_price', 0),
-                        'shares': getattr(v, 'shares', 0),
-                    }
-                    for k, v in getattr(em, 'positions', {}).items()
-                },
-            }
-
-        # ── opportunity_pool 摘要（不含 Tick 历史） ───────────────────────────
+        snapshot = self._collect_meta(engine)
+        snapshot.update(self._collect_sections(engine))
+        snapshot['l1_inflow_accumulator'] = {
+            k: {'inflow': v[0], 'last_amount': v[1], 'last_price': v[2]}
+            for k, v in self._collect_l1(engine).items()
+        }
+        return snapshot
+
+    def _collect_meta(self, engine) -> Dict[str, Any]:
+        """每帧必变的标量状态"""
+        return {
+            'trade_date': self.trade_date,
+            'snapshot_time': datetime.now().isoformat(),
+            'engine_mode': getattr(engine, 'mode', 'live'),
+            'market_total_inflow_cache': float(getattr(engine, 'market_total_inflow_cache', 1000000.0)),
+            'global_tick_frame': int(getattr(engine, 'global_tick_frame', 0)),
+        }
+
+    def _collect_sections(self, engine, keys: Sequence[str] = _SECTION_KEYS) -> Dict[str, Any]:
+        """按段提取的小体积状态（持仓/资金/机会池/战报/watchlist），只构建 keys 指定的段"""
+        return {key: getattr(self, f'_collect_{key}')(engine) for key in keys}
+
+    @staticmethod
+    def _section_versions(engine) -> Dict[str, Any]:
+        """
+        各段的廉价版本键：对象身份 + 段内原始标量，不做格式化、不建字典
+
+        键与上次移交时相同即视为该段未脏，capture_frame 不再构建/比对该段。
+        watchlist 只看 (身份, 长度)：引擎只整体替换或 append/extend，不原地改写元素。
+        """
+        db = getattr(engine, 'decision_brain', None)
+        em = getattr(engine, 'execution_manager', None)
+        watchlist = getattr(engine, 'watchlist', [])
+        return {
+            'brain_state': db and (id(db), db.current_position, db.entry_price, db.entry_score,
+                                   db.held_stock_code, db.entry_time),
+            'exec_state': em and (
+                id(em), getattr(em, 'current_capital', 0), getattr(em, 'initial_capital', 100000.0),
+                getattr(em, 'total_pnl', 0),
+                tuple((k, id(v), getattr(v, 'entry_price', 0), getattr(v, 'shares', 0))
+                      for k, v in getattr(em, 'positions', {}).items()),
+            ),
+            'opportunity_pool': tuple(
+                (code, id(t), getattr(t, 'final_score', 0), getattr(t, 'current_price', 0), getattr(t, 'state', None))
+                for code, t in getattr(engine, 'opportunity_pool', {}).items()
+            ),
+            'highest_scores': tuple(
+                (code, id(v), tuple(v.values()) if isinstance(v, dict) else None)
+                for code, v in getattr(engine, 'highest_scores', {}).items()
+            ),
+            'watchlist': (id(watchlist), len(watchlist)),
+        }
+
+    def _collect_brain_state(self, engine) -> Dict[str, Any]:
+        """decision_brain 持仓状态"""
+        if not getattr(engine, 'decision_brain', None):
+            return {}
+        db = engine.decision_brain
+        return {
+            'current_position': db.current_position,
+            'entry_price': db.entry_price,
+            'entry_score': db.entry_score,
+            'held_stock_code': db.held_stock_code,
+            'entry_time': db.entry_time.isoformat() if db.entry_time else None,
+        }
+
+    def _collect_exec_state(self, engine) -> Dict[str, Any]:
+        """execution_manager 资金状态"""
+        if not getattr(engine, 'execution_manager', None):
+            return {}
+        em = engine.execution_manager
+        return {
+            'current_capital': getattr(em, 'current_capital', 0),
+            'initial_capital': getattr(em, 'initial_capital', 100000.0),
+            'total_pnl': getattr(em, 'total_pnl', 0),
+            'positions': {
+                k: {
+                    'stock_code': k,
+                    'entry_price': getattr(v, 'entry_price', 0),
+                    'shares': getattr(v, 'shares', 0),
+                }
+                for k, v in getattr(em, 'positions', {}).items()
+            },
+        }
+
+    def _collect_opportunity_pool(self, engine) -> Dict[str, Any]:
+        """opportunity_pool 摘要（不含 Tick 历史）"""
         oppo_summary = {}
         for code, t in getattr(engine, 'opportunity_pool', {}).items():
             try:
@@ -106,20 +219,10 @@ class SessionSnapshot:
                 }
             except Exception:
                 pass
+        return oppo_summary
 
-        # ── L1 资金流向累加器 ─────────────────────────────────────────────────
-        l1_state = {}
-        for k, v in getattr(engine, 'l1_inflow_accumulator', {}).items():
-            try:
-                l1_state[k] = {
-                    'inflow': float(v.get('inflow', 0)),
-                    'last_amount': float(v.get('last_amount', 0)),
-                    'last_price': float(v.get('last_price', 0)),
-                }
-            except Exception:
-                pass
-
-        # ── 今日战报最高分记录 ────────────────────────────────────────────────
+    def _collect_highest_scores(self, engine) -> Dict[str, Any]:
+        """今日战报最高分记录"""
         highest_scores = {}
         for code, v in getattr(engine, 'highest_scores', {}).items():
             try:
@@ -130,21 +233,260 @@ class SessionSnapshot:
                 }
             except Exception:
                 pass
+        return highest_scores
+
+    def _collect_watchlist(self, engine) -> List[str]:
+        return list(getattr(engine, 'watchlist', []))
 
+    def _collect_l1(self, engine) -> Dict[str, Tuple[float, float, float]]:
+        """L1 资金流向累加器 → {code: (inflow, last_amount, last_price)}"""
+        l1_state = {}
+        for k, v in getattr(engine, 'l1_inflow_accumulator', {}).items():
+            try:
+                l1_state[k] = (
+                    float(v.get('inflow', 0)),
+                    float(v.get('last_amount', 0)),
+                    float(v.get('last_price', 0)),
+                )
+            except Exception:
+                pass
+        return l1_state
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 帧边界增量移交（主循环线程调用，必须足够轻）
+    # ─────────────────────────────────────────────────────────────────────────
+    def capture_frame(self, engine) -> Dict[str, Any]:
+        """
+        在帧边界提取与上一帧相比变化的不可变增量并交给写线程。
+
+        帧线程只做比对和入队，序列化与磁盘IO全部在写线程完成。
+        首帧移交全量（full=True），写线程以此为合并基线。
+
+        Returns:
+            本帧移交的增量记录
+        """
+        t0 = time.perf_counter()
+
+        self._seq += 1
+        record: Dict[str, Any] = {'seq': self._seq, 'meta': self._collect_meta(engine)}
+        full = self._seq == 1
+        if full:
+            record['full'] = True
+
+        # 只构建版本键变化（脏）的段；构建后仍按值比对，身份变了但内容相同不落盘
+        versions = self._section_versions(engine)
+        last_versions = self._last_versions
+        dirty = [k for k in self._SECTION_KEYS if full or k not in last_versions or last_versions[k] != versions[k]]
+        self._last_versions = versions
+        sections = {}
+        for key, value in self._collect_sections(engine, dirty).items():
+            if full or self._last_sections.get(key) != value:
+                sections[key] = value
+                self._last_sections[key] = value
+        if sections:
+            record['sections'] = sections
+
+        acc = getattr(engine, 'l1_inflow_accumulator', None)
+        if isinstance(acc, L1FlowAccumulator):
+            # 写版本在拷贝前读取：拷贝期间的新写入只会让下一帧多拷一次，不会漏
+            stamp = (id(acc), acc.version)
+            if full or stamp != self._l1_stamp:
+                l1_changed, removed = self._diff_l1_buffers(acc, full)
+                self._l1_stamp = stamp
+            else:
+                l1_changed, removed = {}, []
+        else:
+            l1_changed, removed = self._diff_l1_dict(engine)
+        if l1_changed:
+            record['l1'] = l1_changed
+        if removed:
+            record['l1_removed'] = removed
+
+        self._delta_queue.put(record)
+
+        # 滚动窗口按 WINDOW_INTERVAL 浅拷贝移交，编码在写线程
+        windows = self.windows.maybe_capture(engine)
+        if windows is not None:
+            self._delta_queue.put({'windows': windows})
+
+        stall_ms = (time.perf_counter() - t0) * 1000.0
+        stats = self._stall_stats
+        stats['frames'] += 1
+        stats['total_ms'] += stall_ms
+        stats['last_ms'] = stall_ms
+        if stall_ms > stats['max_ms']:
+            stats['max_ms'] = stall_ms
+        if stall_ms > self.STALL_BUDGET_MS:
+            stats['over_budget'] += 1
+        self._stall_samples.append(stall_ms)
+        return record
+
+    def _diff_l1_buffers(self, acc: L1FlowAccumulator, full: bool):
+        """数组化累加器：拷进复用缓冲后与上帧缓冲整列比对，只物化变化的票"""
+        cur, n, layout, codes = acc.copy_into(self._l1_buf, self._l1_layout)
+        prev = self._l1_prev
+        if prev.shape[1] < cur.shape[1]:
+            grown = np.empty_like(cur)
+            grown[:, :prev.shape[1]] = prev
+            prev = grown
+        old_slots = self._l1_slots
+        relaid = codes is not None
+        if not relaid:
+            codes = old_slots
+        if full:
+            changed = range(n)
+        else:
+            k = min(n, len(old_slots))
+            diff = (cur[:, :k] != prev[:, :k]).any(axis=0)
+            if relaid:
+                diff |= np.fromiter((codes[i] != old_slots[i] for i in range(k)), dtype=bool, count=k)
+            changed = np.flatnonzero(diff).tolist() + list(range(k, n))
+        l1_changed = {
+            codes[i]: (float(cur[0, i]), float(cur[1, i]), float(cur[2, i]))
+            for i in changed if codes[i] is not None
+        }
+        removed = []
+        if relaid and not full:
+            live = set(codes)
+            removed = [c for c in old_slots if c is not None and c not in live]
+        # 本帧缓冲转为上帧，上帧缓冲留作下一帧写入（不分配）
+        self._l1_prev, self._l1_buf = cur, prev
+        self._l1_slots, self._l1_layout = codes, layout
+        return l1_changed, removed
+
+    def _diff_l1_dict(self, engine):
+        """嵌套字典累加器（旧格式/测试替身）：逐票比对"""
+        l1_changed = {}
+        last_l1 = self._last_l1
+        for k, v in self._collect_l1(engine).items():
+            if last_l1.get(k) != v:
+                l1_changed[k] = v
+                last_l1[k] = v
+        removed = list(last_l1.keys() - getattr(engine, 'l1_inflow_accumulator', {}).keys())
+        for k in removed:
+            del last_l1[k]
+        return l1_changed, removed
+
+    def get_stall_metrics(self) -> Dict[str, Any]:
+        """帧线程停顿指标（毫秒）及增量写入统计"""
+        stats = self._stall_stats
+        frames = stats['frames']
+        samples = sorted(self._stall_samples)
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] if samples else 0.0
         return {
-            'trade_date': self.trade_date,
-            'snapshot_time': datetime.now().isoformat(),
-            'engine_mode': getattr(engine, 'mode', 'live'),
-            'brain_state': brain_state,
-            'exec_state': exec_state,
-            'opportunity_pool': oppo_summary,
-            'l1_inflow_accumulator': l1_state,
-            'highest_scores': highest_scores,
-            'market_total_inflow_cache': float(getattr(engine, 'market_total_inflow_cache', 1000000.0)),
-            'global_tick_frame': int(getattr(engine, 'global_tick_frame', 0)),
-            'watchlist': list(getattr(engine, 'watchlist', [])),
+            'frames': frames,
+            'avg_ms': stats['total_ms'] / frames if frames else 0.0,
+            'p99_ms': p99,
+            'max_ms': stats['max_ms'],
+            'last_ms': stats['last_ms'],
+            'over_budget': stats['over_budget'],
+            'pending': self._delta_queue.qsize(),
+            **self._io_stats,
         }
 
+    # ─────────────────────────────────────────────────────────────────────────
+    # 增量合并（写线程 / load 共用）
+    # ─────────────────────────────────────────────────────────────────────────
+    @staticmethod
+    def _apply_record(state: Optional[Dict[str, Any]], record: Dict[str, Any]) -> Dict[str, Any]:
+        """把一条增量记录合并进 JSON 结构的全量状态"""
+        if state is None or record.get('full'):
+            state = {'l1_inflow_accumulator': {}}
+        state.update(record.get('meta', {}))
+        state.update(record.get('sections', {}))
+        l1 = state.setdefault('l1_inflow_accumulator', {})
+        for k, v in record.get('l1', {}).items():
+            l1[k] = {'inflow': v[0], 'last_amount': v[1], 'last_price': v[2]}
+        for k in record.get('l1_removed', ()):
+            l1.pop(k, None)
+        state['delta_seq'] = record['seq']
+        return state
+
+    def _read_delta_records(self):
+        """逐条读取增量日志，遇到崩溃截断的尾部记录即停止"""
+        if not self._delta_file.exists():
+            return
+        header = self._RECORD_HEADER
+        with open(self._delta_file, 'rb') as f:
+            while True:
+                head = f.read(header.size)
+                if len(head) < header.size:
+                    return
+                (length,) = header.unpack(head)
+                payload = f.read(length)
+                if len(payload) < length:
+                    logger.warning("[SessionSnapshot] 增量日志尾部不完整，已忽略")
+                    return
+                try:
+                    yield pickle.loads(payload)
+                except Exception as e:
+                    logger.warning(f"[SessionSnapshot] 增量记录损坏，停止重放: {e}")
+                    return
+
+    def _append_records(self, records) -> None:
+        """写线程：把一批增量追加到日志"""
+        header = self._RECORD_HEADER
+        chunks = []
+        for record in records:
+            payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+            chunks.append(header.pack(len(payload)))
+            chunks.append(payload)
+        blob = b''.join(chunks)
+        with self._lock:
+            with open(self._delta_file, 'ab') as f:
+                f.write(blob)
+                f.flush()
+        self._io_stats['delta_records'] += len(records)
+        self._io_stats['delta_bytes'] += len(blob)
+
+    def _write_full(self, data: Dict[str, Any]) -> None:
+        """全量状态原子写入 JSON"""
+        tmp = self._snapshot_file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        tmp.replace(self._snapshot_file)
+
+    def compact(self) -> bool:
+        """写线程：合并状态压实为全量 JSON，并清空增量日志"""
+        if self._merged is None:
+            return False
+        with self._lock:
+            try:
+                self._write_full(self._merged)
+                self._delta_file.unlink(missing_ok=True)
+                self._merged_seq = self._merged.get('delta_seq', 0)
+                self._io_stats['compactions'] += 1
+                logger.debug(f"[SessionSnapshot] 快照已压实: {self._snapshot_file.name} "
+                             f"(seq={self._merged_seq})")
+                return True
+            except Exception as e:
+                logger.warning(f"[SessionSnapshot] 快照压实失败: {e}")
+                return False
+
+    def _drain_queue(self, timeout: Optional[float]) -> int:
+        """写线程：取出队列内全部增量，合并并追加到日志"""
+        records = []
+        try:
+            records.append(self._delta_queue.get(timeout=timeout) if timeout else
+                           self._delta_queue.get_nowait())
+            while True:
+                records.append(self._delta_queue.get_nowait())
+        except queue.Empty:
+            pass
+        windows = [r['windows'] for r in records if 'windows' in r]
+        records = [r for r in records if 'windows' not in r]
+        if windows:
+            self.windows.write(windows[-1])
+        if not records:
+            return 0
+        for record in records:
+            self._merged = self._apply_record(self._merged, record)
+        try:
+            self._append_records(records)
+        except Exception as e:
+            logger.warning(f"[SessionSnapshot] 增量写入失败: {e}")
+        return len(records)
+
     # ─────────────────────────────────────────────────────────────────────────
     # 写入
     # ─────────────────────────────────────────────────────────────────────────
@@ -153,10 +495,9 @@ class SessionSnapshot:
         with self._lock:
             try:
                 data = self.build_snapshot(engine)
-                tmp = self._snapshot_file.with_suffix('.tmp')
-                with open(tmp, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                tmp.replace(self._snapshot_file)
+                # 全量直接从引擎读取，比任何已移交的增量都新
+                data['delta_seq'] = self._seq
+                self._write_full(data)
                 logger.debug(f"[SessionSnapshot] 快照已保存: {self._snapshot_file.name}")
                 return True
             except Exception as e:
@@ -167,12 +508,23 @@ class SessionSnapshot:
     # 读取恢复
     # ─────────────────────────────────────────────────────────────────────────
     def load(self) -> Optional[Dict[str, Any]]:
-        """重启时调用，读取同日快照。无快照或日期不符返回 None"""
-        if not self._snapshot_file.exists():
-            return None
+        """重启时调用，读取同日快照（全量JSON + 增量日志）。无快照或日期不符返回 None"""
         try:
-            with open(self._snapshot_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = None
+            if self._snapshot_file.exists():
+                with open(self._snapshot_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            base_seq = data.get('delta_seq', 0) if data else 0
+            replayed = 0
+            for record in self._read_delta_records():
+                if data is not None and record.get('seq', 0) <= base_seq:
+                    continue
+                data = self._apply_record(data, record)
+                replayed += 1
+            if data is None:
+                return None
+            if replayed:
+                logger.info(f"[SessionSnapshot] 已重放 {replayed} 条增量记录")
             if data.get('trade_date') != self.trade_date:
                 logger.info(f"[SessionSnapshot] 快照日期 {data.get('trade_date')} != 今日 {self.trade_date}，忽略")
                 return None
@@ -214,7 +566,9 @@ class SessionSnapshot:
         # 3. 恢复 L1 资金流向累加器
         l1_state = snapshot.get('l1_inflow_accumulator', {})
         if l1_state:
-            engine.l1_inflow_accumulator = l1_state
+            # 原地替换内容，保留引擎的 L1FlowAccumulator 实例
+            engine.l1_inflow_accumulator.clear()
+            engine.l1_inflow_accumulator.update(l1_state)
             logger.info(f"[SessionSnapshot]   [OK] L1资金流向累加器恢复: {len(l1_state)} 只票")
 
         # 4. 恢复宏观资金虹吸缓存
@@ -255,6 +609,12 @@ class SessionSnapshot:
             if restored_count > 0:
                 logger.info(f"[SessionSnapshot]   [OK] 机会池恢复: {restored_count} 只票")
 
+        # 9. 滚动窗口热重启：tick_history/volume_history/L1 还原 + 本地Tick补缺
+        try:
+            self.windows.warm_restart(engine)
+        except Exception as e:
+            logger.warning(f"[SessionSnapshot] 滚动窗口热重启失败，窗口将从实时流重建: {e}")
+
         logger.info(f"[SessionSnapshot] 🚀 Session 恢复完成 "
                     f"(快照时间: {snapshot.get('snapshot_time', '未知')})")
 
@@ -262,35 +622,74 @@ class SessionSnapshot:
     # 后台自动快照线程
     # ─────────────────────────────────────────────────────────────────────────
     def start_auto_snapshot(self, engine):
-        """启动后台线程，每 SNAPSHOT_INTERVAL 秒自动快照一次"""
+        """
+        启动后台写线程
+
+        - 引擎在帧边界调用 capture_frame 后：写线程追加增量，每 SNAPSHOT_INTERVAL 秒压实
+        - 主循环尚未开始出帧（如盘前）：退化为每 SNAPSHOT_INTERVAL 秒全量 save
+        """
         if self._bg_thread and self._bg_thread.is_alive():
             return  # 防止重复启动
 
-        def _worker():
-            while not self._stop_event.wait(timeout=self.SNAPSHOT_INTERVAL):
-                self.save(engine)
+        # 先把磁盘上已有的 全量+增量 压实，本实例的 seq 从 1 重新开始
+        with self._lock:
+            existing = self.load()
+            if existing:
+                existing['delta_seq'] = 0
+                self._write_full(existing)
+            self._delta_file.unlink(missing_ok=True)
+
+        if hasattr(engine, 'session_snapshot'):
+            engine.session_snapshot = self
 
+        def _worker():
+            next_compact = time.monotonic() + self.SNAPSHOT_INTERVAL
+            while not self._stop_event.is_set():
+                self._drain_queue(timeout=0.5)
+                if time.monotonic() < next_compact:
+                    continue
+                next_compact = time.monotonic() + self.SNAPSHOT_INTERVAL
+                if self._merged is not None:
+                    if self._merged.get('delta_seq', 0) > self._merged_seq:
+                        self.compact()
+                elif self._seq == 0:
+                    self.save(engine)
+            # 退出前落盘剩余增量
+            self._drain_queue(timeout=None)
+            self.compact()
+
+        self._stop_event.clear()
         self._bg_thread = threading.Thread(
             target=_worker,
             daemon=True,
             name="SessionSnapshotWorker"
         )
         self._bg_thread.start()
-        logger.info(f"[SessionSnapshot] 后台自动快照已启动 (间隔 {self.SNAPSHOT_INTERVAL}s) → "
+        logger.info(f"[SessionSnapshot] 后台自动快照已启动 (压实间隔 {self.SNAPSHOT_INTERVAL}s) → "
                     f"{self._snapshot_file.name}")
 
     def stop_auto_snapshot(self, engine=None):
         """停止后台线程，并强制写入最终快照"""
         self._stop_event.set()
+        if self._bg_thread and self._bg_thread.is_alive():
+            self._bg_thread.join(timeout=5.0)
         if engine is not None:
             self.save(engine)
+            with self._lock:
+                self._delta_file.unlink(missing_ok=True)
+            self.windows.write(self.windows.capture(engine))
             logger.info("[SessionSnapshot] 最终快照已写入")
+        if self._stall_stats['frames']:
+            m = self.get_stall_metrics()
+            logger.info(f"[SessionSnapshot] 帧停顿: avg={m['avg_ms']:.3f}ms p99={m['p99_ms']:.3f}ms "
+                        f"max={m['max_ms']:.3f}ms 超预算={m['over_budget']}/{m['frames']} "
+                        f"| 增量 {m['delta_records']}条/{m['delta_bytes']}B 压实 {m['compactions']}次")
 
     # ─────────────────────────────────────────────────────────────────────────
     # 工具方法
     # ─────────────────────────────────────────────────────────────────────────
     def snapshot_exists(self) -> bool:
-        return self._snapshot_file.exists()
+        return self._snapshot_file.exists() or self._delta_file.exists()
 
     def snapshot_info(self) -> Optional[Dict]:
         """返回快照摘要（不恢复），用于启动时显示状态"""
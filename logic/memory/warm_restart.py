@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+WarmRestartStore - 盘中滚动窗口热重启
+
+解决问题：SessionSnapshot 不保存 tick_history / volume_history，
+重启后微观轨迹窗口（3分钟）与 L1 累加器要从零重攒，打分失真。
+
+设计原则：
+- 主循环帧边界每 WINDOW_INTERVAL 秒浅拷贝一次窗口（只复制引用，不编码）
+- 编码与写盘在 SessionSnapshot 写线程完成：array('d') 列式打包 + zlib 压缩
+- 文件头带魔数/版本/保存时刻，读取时校验交易日
+- 重启恢复：窗口 + L1累加器 还原到保存时刻，
+  再用本地Tick补齐 保存时刻 → 当前时刻 的缺口（逐笔重放 _calculate_l1_inflow）
+
+时间约定：所有时间戳为北京时间的 naive 秒数（与 QMT tick 'time' 毫秒 + 8h 对齐）
+
+文件路径: data/session_snapshots/windows_YYYYMMDD.bin
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import pickle
+import struct
+import time
+import zlib
+from array import array
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import logging
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+_BEIJING_OFFSET_S = 8 * 3600
+
+
+def _to_ts(dt: Optional[datetime]) -> float:
+    """naive 北京时间 → 秒"""
+    if dt is None:
+        return 0.0
+    return (dt - _EPOCH).total_seconds()
+
+
+def _from_ts(ts: float) -> datetime:
+    """秒 → naive 北京时间"""
+    return _EPOCH + timedelta(seconds=ts)
+
+
+class WarmRestartStore:
+    """
+    滚动窗口持久化与热重启
+    """
+    SNAPSHOT_DIR = Path("data/session_snapshots")
+    WINDOW_INTERVAL = 10  # 秒
+    MAGIC = b'MQWR'
+    VERSION = 1
+    _HEADER = struct.Struct('<4sHd')  # 魔数 / 版本 / 保存时刻
+
+    # TickSnapshot 字段顺序（列式打包）
+    _TRACKER_FIELDS = ('timestamp', 'price', 'amount', 'volume', 'high', 'low', 'open')
+
+    def __init__(self, trade_date: str, snapshot_dir: Optional[Path] = None):
+        """
+        Args:
+            trade_date: 交易日 YYYYMMDD
+            snapshot_dir: 存放目录（默认与 SessionSnapshot 相同）
+        """
+        self.trade_date = trade_date
+        snapshot_dir = Path(snapshot_dir) if snapshot_dir else self.SNAPSHOT_DIR
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+        self._window_file = snapshot_dir / f"windows_{trade_date}.bin"
+        self._next_capture = 0.0
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 帧线程：浅拷贝窗口
+    # ─────────────────────────────────────────────────────────────────────────
+    def capture(self, engine) -> Dict[str, Any]:
+        """
+        浅拷贝引擎的滚动窗口（帧线程调用）
+
+        deque 内元素（dict / TickSnapshot）入队后不再修改，复制引用即可。
+        """
+        now = engine.get_current_time() if hasattr(engine, 'get_current_time') else datetime.now()
+        trackers = {}
+        for code, t in getattr(engine, 'candidate_pool', {}).items():
+            if t.tick_history:
+                trackers[code] = (t.state.value, t.enter_time, list(t.tick_history))
+        return {
+            'saved_at': now,
+            'tick_history': {k: list(v) for k, v in getattr(engine, 'tick_history', {}).items()},
+            'volume_history': {k: list(v) for k, v in getattr(engine, 'volume_history', {}).items()},
+            'trackers': trackers,
+            'l1': {
+                k: (float(v.get('inflow', 0)), float(v.get('last_amount', 0)), float(v.get('last_price', 0)))
+                for k, v in getattr(engine, 'l1_inflow_accumulator', {}).items()
+            },
+        }
+
+    def maybe_capture(self, engine) -> Optional[Dict[str, Any]]:
+        """到达 WINDOW_INTERVAL 才拷贝，否则返回 None"""
+        now = time.monotonic()
+        if now < self._next_capture:
+            return None
+        self._next_capture = now + self.WINDOW_INTERVAL
+        return self.capture(engine)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 写线程：列式编码 + 原子写入
+    # ─────────────────────────────────────────────────────────────────────────
+    def _encode(self, windows: Dict[str, Any]) -> Dict[str, Any]:
+        tick_history = {}
+        for code, items in windows['tick_history'].items():
+            if not items:
+                continue
+            tick_history[code] = (
+                array('d', (_to_ts(d.get('timestamp')) for d in items)).tobytes(),
+                array('d', (float(d.get('price', 0) or 0) for d in items)).tobytes(),
+                array('d', (float(d.get('volume', 0) or 0) for d in items)).tobytes(),
+            )
+
+        volume_history = {
+            code: array('d', (float(v or 0) for v in items)).tobytes()
+            for code, items in windows['volume_history'].items() if items
+        }
+
+        trackers = {}
+        for code, (state, enter_time, history) in windows['trackers'].items():
+            flat = array('d')
+            for s in history:
+                flat.extend((_to_ts(s.timestamp), s.price, s.amount, s.volume, s.high, s.low, s.open))
+            trackers[code] = (state, _to_ts(enter_time), flat.tobytes())
+
+        return {
+            'trade_date': self.trade_date,
+            'tick_history': tick_history,
+            'volume_history': volume_history,
+            'trackers': trackers,
+            'l1': windows['l1'],
+        }
+
+    def write(self, windows: Dict[str, Any]) -> bool:
+        """编码并原子写入窗口文件（写线程调用）"""
+        try:
+            payload = zlib.compress(
+                pickle.dumps(self._encode(windows), protocol=pickle.HIGHEST_PROTOCOL), 1
+            )
+            header = self._HEADER.pack(self.MAGIC, self.VERSION, _to_ts(windows['saved_at']))
+            tmp = self._window_file.with_suffix('.tmp')
+            with open(tmp, 'wb') as f:
+                f.write(header)
+                f.write(payload)
+            tmp.replace(self._window_file)
+            logger.debug(f"[WarmRestart] 窗口已保存: {self._window_file.name} ({len(payload)}B)")
+            return True
+        except Exception as e:
+            logger.warning(f"[WarmRestart] 窗口写入失败: {e}")
+            return False
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 读取恢复
+    # ─────────────────────────────────────────────────────────────────────────
+    def load(self) -> Optional[Dict[str, Any]]:
+        """读取同日窗口文件。无文件/版本不符/日期不符返回 None"""
+        if not self._window_file.exists():
+            return None
+        try:
+            with open(self._window_file, 'rb') as f:
+                raw = f.read()
+            magic, version, saved_ts = self._HEADER.unpack_from(raw)
+            if magic != self.MAGIC or version != self.VERSION:
+                logger.warning(f"[WarmRestart] 窗口文件格式不符 ({magic!r} v{version})，忽略")
+                return None
+            data = pickle.loads(zlib.decompress(raw[self._HEADER.size:]))
+            if data.get('trade_date') != self.trade_date:
+                logger.info(f"[WarmRestart] 窗口日期 {data.get('trade_date')} != 今日 {self.trade_date}，忽略")
+                return None
+            data['saved_at'] = _from_ts(saved_ts)
+            return data
+        except Exception as e:
+            logger.warning(f"[WarmRestart] 窗口读取失败: {e}")
+            return None
+
+    def restore_to_engine(self, engine, data: Dict[str, Any]) -> int:
+        """
+        将窗口与 L1 累加器还原到保存时刻
+
+        Returns:
+            恢复的票数
+        """
+        maxlen = getattr(engine, '_TICK_HISTORY_MAXLEN', 60)
+        for code, (ts_b, price_b, vol_b) in data.get('tick_history', {}).items():
+            ts, prices, vols = array('d'), array('d'), array('d')
+            ts.frombytes(ts_b)
+            prices.frombytes(price_b)
+            vols.frombytes(vol_b)
+            engine.tick_history[code] = deque(
+                ({'price': p, 'timestamp': _from_ts(t), 'volume': v} for t, p, v in zip(ts, prices, vols)),
+                maxlen=maxlen,
+            )
+        for code, vol_b in data.get('volume_history', {}).items():
+            vols = array('d')
+            vols.frombytes(vol_b)
+            engine.volume_history[code] = deque(vols, maxlen=maxlen)
+
+        trackers = data.get('trackers', {})
+        if trackers and hasattr(engine, 'candidate_pool'):
+            from tasks.run_live_trading_engine import StockTracker, StockState, TickSnapshot
+            width = len(self._TRACKER_FIELDS)
+            for code, (state, enter_ts, flat_b) in trackers.items():
+                flat = array('d')
+                flat.frombytes(flat_b)
+                tracker = engine.candidate_pool.get(code)
+                if tracker is None:
+                    tracker = StockTracker(stock_code=code, state=StockState(state),
+                                           enter_time=_from_ts(enter_ts))
+                    engine.candidate_pool[code] = tracker
+                tracker.tick_history.clear()
+                for i in range(0, len(flat), width):
+                    tracker.tick_history.append(TickSnapshot(
+                        timestamp=_from_ts(flat[i]), price=flat[i + 1], amount=flat[i + 2],
+                        volume=flat[i + 3], high=flat[i + 4], low=flat[i + 5], open=flat[i + 6],
+                    ))
+                if tracker.tick_history:
+                    tracker.current_price = tracker.tick_history[-1].price
+                    tracker.current_amount = tracker.tick_history[-1].amount
+
+        l1 = data.get('l1', {})
+        if l1 and hasattr(engine, 'l1_inflow_accumulator'):
+            engine.l1_inflow_accumulator.clear()
+            engine.l1_inflow_accumulator.update({
+                k: {'inflow': v[0], 'last_amount': v[1], 'last_price': v[2]} for k, v in l1.items()
+            })
+        return len(data.get('tick_history', {}))
+
+    def gap_fill(self, engine, since: datetime, until: Optional[datetime] = None) -> int:
+        """
+        用本地Tick补齐 since → until 的窗口与 L1 累加器缺口
+
+        逐笔按时间顺序重放，与主循环的喂数顺序一致。
+
+        Returns:
+            重放的Tick笔数
+        """
+        codes = set(getattr(engine, 'watchlist', []) or []) | set(getattr(engine, 'tick_history', {}))
+        if not codes:
+            return 0
+        if until is None:
+            until = engine.get_current_time() if hasattr(engine, 'get_current_time') else datetime.now()
+        since_ms = (_to_ts(since) - _BEIJING_OFFSET_S) * 1000.0
+        until_ms = (_to_ts(until) - _BEIJING_OFFSET_S) * 1000.0
+
+        try:
+            from xtquant import xtdata
+            local = xtdata.get_local_data(
+                field_list=['time', 'lastPrice', 'open', 'high', 'low', 'lastClose',
+                            'volume', 'amount', 'askVol', 'bidVol'],
+                stock_list=sorted(codes),
+                period='tick',
+                start_time=since.strftime('%Y%m%d%H%M%S'),
+                end_time=until.strftime('%Y%m%d%H%M%S'),
+            )
+        except Exception as e:
+            logger.warning(f"[WarmRestart] 本地Tick读取失败，跳过补缺: {e}")
+            return 0
+
+        maxlen = getattr(engine, '_TICK_HISTORY_MAXLEN', 60)
+        replayed = 0
+        for code, df in (local or {}).items():
+            if df is None or len(df) == 0 or 'time' not in df.columns:
+                continue
+            df = df[(df['time'] > since_ms) & (df['time'] <= until_ms)]
+            if len(df) == 0:
+                continue
+            tracker = getattr(engine, 'candidate_pool', {}).get(code)
+            hist = engine.tick_history.setdefault(code, deque(maxlen=maxlen))
+            vol_hist = engine.volume_history.setdefault(code, deque(maxlen=maxlen))
+            for row in df.to_dict('records'):
+                price = float(row.get('lastPrice', 0) or 0)
+                if price <= 0:
+                    continue
+                ts = _from_ts(float(row['time']) / 1000.0 + _BEIJING_OFFSET_S)
+                volume = float(row.get('volume', 0) or 0)
+                amount = float(row.get('amount', 0) or 0)
+                high = float(row.get('high', price) or price)
+                low = float(row.get('low', price) or price)
+                # 盘口量为 ndarray 时转 list，与实时 tick 的鸭子类型判断保持一致
+                for side in ('askVol', 'bidVol'):
+                    if side in row and not isinstance(row[side], list):
+                        row[side] = list(row[side]) if row[side] is not None else []
+                engine._calculate_l1_inflow(
+                    code, amount, price, float(row.get('lastClose', 0) or 0), high, low, row
+                )
+                hist.append({'price': price, 'timestamp': ts, 'volume': volume})
+                vol_hist.append(volume)
+                if tracker is not None:
+                    from tasks.run_live_trading_engine import TickSnapshot
+                    tracker.tick_history.append(TickSnapshot(
+                        timestamp=ts, price=price, amount=amount, volume=volume,
+                        high=high, low=low, open=float(row.get('open', price) or price),
+                    ))
+                    tracker.current_price = price
+                    tracker.current_amount = amount
+                replayed += 1
+        return replayed
+
+    def warm_restart(self, engine) -> bool:
+        """读取 → 还原 → 本地Tick补缺，一步完成热重启"""
+        data = self.load()
+        if not data:
+            return False
+        t0 = time.perf_counter()
+        restored = self.restore_to_engine(engine, data)
+        replayed = self.gap_fill(engine, data['saved_at'])
+        logger.info(f"[WarmRestart] [OK] 滚动窗口恢复 {restored} 只票 "
+                    f"(保存于 {data['saved_at']:%H:%M:%S})，本地Tick补缺 {replayed} 笔，"
+                    f"耗时 {time.perf_counter() - t0:.2f}s")
+        return True
+
+    def exists(self) -> bool:
+        return self._window_file.exists()
@@ -190,7 +190,7 @@ class KineticCoreEngine:
         change_pct: float,
         volume_ratio: float,
         turnover_rate_per_min: float,
-        market_volume_ratios: list[float] | None = None,
+        market_volume_ratios=None,
         mode: str = 'live'
     ) -> float:
         """
@@ -205,9 +205,9 @@ class KineticCoreEngine:
             change_pct: 涨跌幅百分比（如5.0表示涨5%）
             volume_ratio: 量比（当前成交量/5日均量）
             turnover_rate_per_min: 每分钟换手率（百分比）
-            market_volume_ratios: 【Option B】当日全市场各股有效量比列表，
-                                  传入时动态计算分位数阈值；None时fallback到
-                                  fixed_threshold=3.0（向后兼容）
+            market_volume_ratios: 【Option B】当日全市场各股有效量比列表或全市场
+                                  QuantileSketch，传入时动态计算分位数阈值；
+                                  None时fallback到fixed_threshold=3.0（向后兼容）
             mode: 'live'=实盘(95th), 'backtest'=回测(88th)，
                   回测灵敏度扫描用 temporary_override 覆盖 backtest_percentile
         
@@ -250,7 +250,7 @@ class KineticCoreEngine:
     
     def _get_volume_ratio_threshold(
         self,
-        market_volume_ratios: list[float] | None = None,
+        market_volume_ratios=None,
         mode: str = 'live'
     ) -> float:
         """
@@ -260,8 +260,10 @@ class KineticCoreEngine:
         每次调用时直接读取 ConfigManager（不缓存），
         temporary_override 自动生效，无需 engine.reload_config()。
 
+        【CTO V233 流式分位数】显式传入全市场 QuantileSketch 时只剩 O(1) 的分位数查询。
+
         Args:
-            market_volume_ratios: 当日全市场各股有效量比列表。
+            market_volume_ratios: 当日全市场各股有效量比列表或 QuantileSketch。
                                   None 或长度不足时 fallback 到 fixed_threshold=3.0。
             mode: 'live'=实盘(95th分位), 'backtest'=回测(88th分位,可override)
 
@@ -269,7 +271,7 @@ class KineticCoreEngine:
             float: 量比过滤阈值（动态计算或fixed_threshold兜底）
         """
         return self._config.compute_volume_ratio_threshold(
-            market_volume_ratios or [],
+            market_volume_ratios if market_volume_ratios is not None else [],
             mode=mode
         )
     
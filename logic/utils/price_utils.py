@@ -7,12 +7,18 @@ CTO V46 时空折叠器 + 竞价MFE考核
 
 核心功能：
 1. extract_snapshot_at_time: 统一时间切片提取（Live/Scan两端对齐）
+   get_indexed_snapshot: 按日快照索引取切片（Scan不再读全天Tick）
 2. check_auction_validity: 竞价MFE物理探针（剔除布朗运动，不看涨跌幅）
+   check_auction_validity_batch / calculate_auction_mfe_batch: 全市场向量化版（口径逐项一致）
 """
 
+import numpy as np
 import pandas as pd
 from typing import Optional, Union
 
+_BEIJING_OFFSET_MS = 8 * 3600 * 1000
+_snapshot_indexes: dict = {}  # {trade_date: SnapshotIndex}
+
 
 def extract_snapshot_at_time(
     tick_data: Union[dict, pd.DataFrame],
@@ -55,24 +61,62 @@ def extract_snapshot_at_time(
         if tick_data.empty:
             return None
         try:
-            df = tick_data.copy()
-            # QMT tick的time字段格式：HHMMSS 或 HHMMSSmmm（毫秒）
-            # 统一提取前6位作为HHMMSS
-            if 'time' in df.columns:
-                df['time_str'] = df['time'].astype(str).str.zfill(9).str[:6]
-                slice_df = df[df['time_str'] <= target_time_str]
-                if slice_df.empty:
-                    return None
-                return slice_df.iloc[-1].to_dict()
-            else:
+            if 'time' not in tick_data.columns:
                 # 没有time字段，取最后一行
-                return df.iloc[-1].to_dict()
+                return tick_data.iloc[-1].to_dict()
+            # 【CTO V230】不复制整表、不逐行转字符串：time 列直接换算成 HHMMSS 整数比较
+            hhmmss = _tick_hhmmss(tick_data['time'])
+            hit = np.flatnonzero(hhmmss <= int(target_time_str))
+            if len(hit) == 0:
+                return None
+            return tick_data.iloc[hit[-1]].to_dict()
         except Exception:
             return None
     
     return None
 
 
+def _tick_hhmmss(time_col: pd.Series) -> np.ndarray:
+    """
+    Tick time 列 → HHMMSS 整数数组
+    
+    - 毫秒时间戳（QMT本地Tick）：换算北京时间当日时分秒
+    - HHMMSS / HHMMSSmmm：与旧版 zfill(9)[:6] 口径一致（取前6位）
+    """
+    if time_col.dtype == object:
+        return time_col.astype(str).str.zfill(9).str[:6].astype(np.int64).to_numpy()
+    t = time_col.to_numpy(dtype=np.int64)
+    if len(t) and t.max() > 10 ** 11:
+        sec = ((t + _BEIJING_OFFSET_MS) % 86_400_000) // 1000
+        return (sec // 3600) * 10000 + (sec % 3600 // 60) * 100 + sec % 60
+    return t // 1000
+
+
+def get_indexed_snapshot(
+    stock_code: str,
+    trade_date: str,
+    target_time_str: str = "092505"
+) -> Optional[dict]:
+    """
+    【CTO V230】从按日快照索引取时刻切片（Scan模式免读全天Tick）
+    
+    target_time_str 必须是 SnapshotIndex.INSTANTS 中的时刻（092505/093000/094500/100000/150005），
+    首次访问会为该票补建索引。
+    
+    示例:
+        snapshot = get_indexed_snapshot('000001.SZ', '20260318', "092505")
+        if check_auction_validity(snapshot, float_volume):
+            pass
+    """
+    index = _snapshot_indexes.get(trade_date)
+    if index is None:
+        from logic.data_providers.snapshot_index import SnapshotIndex
+        index = _snapshot_indexes[trade_date] = SnapshotIndex(trade_date)
+    if stock_code not in index:
+        index.ensure([stock_code])
+    return index.get(stock_code, target_time_str)
+
+
 def check_auction_validity(
     snapshot_dict: Optional[dict],
     float_volume_shares: float,
@@ -199,3 +243,71 @@ def calculate_auction_mfe(
         return 0.0
     
     return amplitude_pct / inflow_ratio
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 【CTO V233 竞价列式表】全市场向量化版（与单票版逐项同口径，供 AuctionTable 使用）
+# ─────────────────────────────────────────────────────────────────────────────
+def _float_cap(float_volume_shares: np.ndarray, pre_close: np.ndarray) -> np.ndarray:
+    """流通市值（含万股BUG修复：<1000万视为万股）"""
+    fv = np.asarray(float_volume_shares, dtype=np.float64)
+    fv = np.where((fv > 0) & (fv < 10_000_000), fv * 10000, fv)
+    return fv * pre_close
+
+
+def calculate_auction_mfe_batch(
+    auction_price: np.ndarray,
+    auction_amount: np.ndarray,
+    pre_close: np.ndarray,
+    float_volume_shares: np.ndarray
+) -> np.ndarray:
+    """
+    calculate_auction_mfe 的向量化版：(n,) 数组进，(n,) MFE 出，无效为0.0
+    """
+    price = np.nan_to_num(np.asarray(auction_price, dtype=np.float64))
+    amount = np.nan_to_num(np.asarray(auction_amount, dtype=np.float64))
+    pre = np.nan_to_num(np.asarray(pre_close, dtype=np.float64))
+    cap = np.nan_to_num(_float_cap(np.nan_to_num(float_volume_shares), pre))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inflow = np.where(cap > 0, amount / cap, 0.0)
+        mfe = (price - pre) / pre / inflow
+    ok = (pre > 0) & (price > 0) & (inflow > 0)
+    return np.where(ok, mfe, 0.0)
+
+
+def check_auction_validity_batch(
+    auction_price: np.ndarray,
+    auction_amount: np.ndarray,
+    pre_close: np.ndarray,
+    auction_high: np.ndarray,
+    auction_low: np.ndarray,
+    float_volume_shares: np.ndarray,
+    min_auction_amount: float = 1_000_000.0
+) -> np.ndarray:
+    """
+    check_auction_validity 的向量化版：返回 (n,) bool，True = 通过
+
+    口径同单票版：昨收缺失时以竞价价代替；最高/最低缺失(0)时取竞价价
+    """
+    price = np.nan_to_num(np.asarray(auction_price, dtype=np.float64))
+    amount = np.nan_to_num(np.asarray(auction_amount, dtype=np.float64))
+    pre = np.nan_to_num(np.asarray(pre_close, dtype=np.float64))
+    pre = np.where(pre > 0, pre, price)
+    high = np.nan_to_num(np.asarray(auction_high, dtype=np.float64))
+    low = np.nan_to_num(np.asarray(auction_low, dtype=np.float64))
+    high = np.where(high != 0, high, price)
+    low = np.where(low != 0, low, price)
+    fv = np.nan_to_num(np.asarray(float_volume_shares, dtype=np.float64))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        amplitude = np.where(pre > 0, (price - pre) / pre, 0.0)
+        cap = _float_cap(fv, pre)
+        inflow = np.where(cap > 0, amount / cap, 0.0)
+        mfe = np.where(inflow > 0, amplitude / inflow, 0.0)
+
+    ok = (price > 0) & (pre > 0) & (amount >= min_auction_amount)
+    ok &= ~((high == low) & (np.abs(amplitude) >= 0.09))          # 一字死板
+    ok &= (fv > 0) & (cap > 0) & (inflow > 0)
+    ok &= ~((amplitude < 0) & (mfe < -50.0))                      # 放量暴跌无承接
+    ok &= ~((amplitude > 0) & (mfe < 5.0))                        # 滞涨诱多
+    return ok
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+【CTO V233 流式分位数】全市场量比分位数草图
+
+动态量比阈值原先每次调用都对全市场量比列表做 np.percentile（O(n log n) 排序），
+打分热路径里同一帧被反复重算。本模块把一帧的全市场量比只摄入一次，落入对数等宽
+固定桶直方图，之后任意分位数查询只在固定 B 个桶的累计计数上二分（与样本量 n 无关），
+同帧重复查询直接命中缓存。
+
+误差界（写死在结构里，单测验证）：
+  桶在对数轴上等宽，相邻桶边界比值 γ = 10^(1/bins_per_decade)，
+  返回桶的几何中点，故对落在 [lo, hi] 内的任意次序统计量 x：
+      |估计值 / x - 1| ≤ √γ - 1          (默认 512桶/十倍程 → ≤ 0.225%)
+  插值分位数是两个相邻次序统计量的凸组合，同样满足该界。
+  超出 [lo, hi] 的值被夹到首/末桶，只保证不越出实际 min/max。
+
+用法约束：
+  草图只由调用方显式构建并传入 compute_volume_ratio_threshold()，截面必须是全市场
+  量比；模块不持有任何全局帧，不传草图的调用方行为与原先完全一致（fixed_threshold）。
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+
+import math
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    对数固定桶分位数草图（一帧一摄入，查询与 n 无关）
+
+    用法:
+        sketch = QuantileSketch().ingest(market_ratios)
+        p95 = sketch.quantile(0.95)      # 与 np.percentile(valid, 95) 相对误差 ≤ sketch.relative_error
+    """
+
+    def __init__(self, lo: float = 1e-3, hi: float = 1e4, bins_per_decade: int = 512):
+        if not (0 < lo < hi) or bins_per_decade <= 0:
+            raise ValueError(f"非法草图参数: lo={lo}, hi={hi}, bins_per_decade={bins_per_decade}")
+        self.lo = float(lo)
+        self.hi = float(hi)
+        self.bins_per_decade = int(bins_per_decade)
+        self._log_lo = math.log(self.lo)
+        self._scale = self.bins_per_decade / math.log(10.0)       # 每单位 ln 的桶数
+        self.n_bins = int(math.ceil(math.log10(self.hi / self.lo) * self.bins_per_decade))
+        # 各桶几何中点（查询时直接取表）
+        self._mid = np.exp(self._log_lo + (np.arange(self.n_bins) + 0.5) / self._scale)
+        self._cdf = np.zeros(self.n_bins, dtype=np.int64)
+        self._cache: Dict[float, float] = {}
+        self.count = 0
+        self.min = math.nan
+        self.max = math.nan
+        self.frame_id = None
+
+    @property
+    def relative_error(self) -> float:
+        """[lo, hi] 内任意分位数的最大相对误差 √γ - 1"""
+        return 10.0 ** (0.5 / self.bins_per_decade) - 1.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def ingest(self, values: Iterable[float], frame_id=None) -> 'QuantileSketch':
+        """
+        摄入一帧全市场量比（替换上一帧，不累加）
+
+        只保留有限正值（停牌/未开盘的 0、NaN 剔除，与 compute_volume_ratio_threshold 口径一致）。
+
+        Returns:
+            self，便于链式调用
+        """
+        arr = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=np.float64).ravel()
+        arr = arr[np.isfinite(arr) & (arr > 0)]
+        self._cache = {}
+        self.frame_id = frame_id
+        self.count = int(arr.size)
+        if not self.count:
+            self._cdf = np.zeros(self.n_bins, dtype=np.int64)
+            self.min = self.max = math.nan
+            return self
+        idx = np.floor((np.log(arr) - self._log_lo) * self._scale).astype(np.int64)
+        np.clip(idx, 0, self.n_bins - 1, out=idx)
+        self._cdf = np.cumsum(np.bincount(idx, minlength=self.n_bins))
+        self.min = float(arr.min())
+        self.max = float(arr.max())
+        return self
+
+    def _order_stat(self, k: int) -> float:
+        """第 k 个（0 起）次序统计量的估计：首尾取精确 min/max，其余取所在桶几何中点并夹到 [min, max]"""
+        if k <= 0:
+            return self.min
+        if k >= self.count - 1:
+            return self.max
+        b = int(np.searchsorted(self._cdf, k, side='right'))
+        return min(max(float(self._mid[b]), self.min), self.max)
+
+    def quantile(self, p: float) -> float:
+        """
+        p 分位数（0~1，线性插值口径同 numpy.percentile 默认）
+
+        Returns:
+            分位数估计；空草图返回 NaN
+        """
+        if not self.count:
+            return math.nan
+        p = min(max(float(p), 0.0), 1.0)
+        hit = self._cache.get(p)
+        if hit is not None:
+            return hit
+        pos = p * (self.count - 1)
+        lower = int(pos)
+        frac = pos - lower
+        value = self._order_stat(lower)
+        if frac > 0:
+            value = value * (1 - frac) + self._order_stat(min(lower + 1, self.count - 1)) * frac
+        self._cache[p] = value
+        return value
+
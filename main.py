@@ -17,6 +17,7 @@
     # 扫描
     python main.py scan --date 20260105 --mode premarket
     python main.py scan --mode intraday
+    python main.py scan --start-date 20260201 --end-date 20260228 --workers 4
     
     # 分析
     python main.py analyze --stock 300986.SZ --start-date 20251231 --end-date 20260105
@@ -24,6 +25,7 @@
     # 数据管理
     python main.py download --date 20260105
     python main.py verify --date 20260105
+    python main.py archive --date 20260105
     
     # 监控
     python main.py monitor --mode event
@@ -81,6 +83,10 @@ if sys.platform == 'win32':
 PROJECT_ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+# 【CTO V233 仿真行情】数据源=fake 时让 import xtquant 解析到 sim 包（必须在业务模块 import 之前）
+from sim import install_if_configured
+install_if_configured()
+
 # 导入logger
 try:
     from logic.utils.logger import get_logger
@@ -276,25 +282,35 @@ def assert_data_readiness(date: str, stock_list: list):
     if not valid_stocks:
         valid_stocks = stock_list[:5]  # 如果代表股不在池子里，随便抽5只
         
+    # 【CTO V233 覆盖清单】抽样票（≤5只，一次批量读）读回的真实行数照实登记进清单；
+    # 成交额>0 是就绪规则而不是覆盖事实，清单不存成交额，故单独判定
+    from logic.data_providers.coverage_manifest import get_coverage_manifest
+    manifest = get_coverage_manifest('1d')
     daily_data = xtdata.get_local_data(
-        field_list=['close', 'amount'],
+        field_list=['time', 'close', 'amount'],
         stock_list=valid_stocks,
         period='1d',
         start_time=date,
         end_time=date
-    )
+    ) or {}
+    manifest.record_frames({s: daily_data.get(s) for s in valid_stocks}, dates=[date])
+    manifest.flush()
     
     missing_count = 0
     for stock in valid_stocks:
-        if stock not in daily_data or daily_data[stock].empty:
+        df = daily_data.get(stock)
+        if df is None or df.empty:
             missing_count += 1
         else:
             try:
-                amount = float(daily_data[stock].iloc[-1].get('amount', 0))
+                amount = float(df.iloc[-1].get('amount', 0))
                 if amount <= 0:
                     missing_count += 1
             except Exception:
                 missing_count += 1
+    
+    pool_covered = int(manifest.covered(stock_list, [date]).sum()) if stock_list else 0
+    click.echo(f"   日K覆盖(清单): {pool_covered}/{len(stock_list)} 只")
             
     if missing_count > 0:
         error_msg = f"❌ [致命错误] 本地 QMT 缺少 {date} 的日K结算数据！系统拒绝在致盲状态下启动打分！"
@@ -414,8 +430,22 @@ def replay_cmd(ctx, date, pure):
 @cli.command(name='scan')
 @click.option('--date', '-d', callback=validate_date,
               help='交易日期 (YYYYMMDD格式，默认最近交易日)')
+@click.option('--intraday', is_flag=True, default=False,
+              help='全日Tick时间压缩回放（逐帧走实盘雷达主循环）')
+@click.option('--speed', type=float, default=0.0,
+              help='全日回放倍速，0=不限速（仅--intraday）')
+@click.option('--start-date', callback=validate_date,
+              help='多日扫描开始日期 (YYYYMMDD)，与--end-date同用')
+@click.option('--end-date', callback=validate_date,
+              help='多日扫描结束日期 (YYYYMMDD)')
+@click.option('--workers', '-w', type=int, default=1,
+              help='多日扫描并行进程数 (默认: 1)')
+@click.option('--top-n', type=int, default=10,
+              help='多日扫描每日保留名次 (默认: 10)')
+@click.option('--output', '-o', default='data/scan_results',
+              help='多日扫描合并表输出目录 (默认: data/scan_results)')
 @click.pass_context
-def scan_cmd(ctx, date):
+def scan_cmd(ctx, date, intraday, speed, start_date, end_date, workers, top_n, output):
     """
     📊 [CTO V58] Tick级定格沙盘 - 绝对同质同源架构
     
@@ -428,7 +458,17 @@ def scan_cmd(ctx, date):
         \b
         python main.py scan
         python main.py scan --date 20260306
+        python main.py scan --date 20260306 --intraday --speed 20
+        python main.py scan --start-date 20260201 --end-date 20260228 --workers 4
     """
+    # 【CTO V233】多日并行：日期按进程扇出，各日Top-N合并为一张表
+    if start_date or end_date:
+        if not (start_date and end_date):
+            click.echo(click.style("❌ 错误: --start-date 与 --end-date 必须同时指定", fg='red'))
+            ctx.exit(1)
+        _scan_date_range(ctx, start_date, end_date, workers, top_n, output)
+        return
+    
     from logic.utils.calendar_utils import get_latest_completed_trading_day
     from tasks.run_live_trading_engine import LiveTradingEngine
     from logic.data_providers.mock_qmt_adapter import MockQmtAdapter
@@ -448,13 +488,11 @@ def scan_cmd(ctx, date):
         
         # 【P0修复】使用LiveTradingEngine的run_historical_stream
         click.echo("\n📦 Step 2: 启动LiveTradingEngine...")
-        engine = LiveTradingEngine(qmt_manager=mock_adapter, mode='scan')
+        engine = LiveTradingEngine(qmt_manager=mock_adapter, mode='scan', target_date=target_date)
         click.echo(f"   ✅ Engine就绪 (mode=scan)")
         
         # 【P0修复】构建tick_stream（收盘最后一笔tick）
         click.echo("\n📦 Step 3: 构建Tick流...")
-        tick_stream = []
-        from xtquant import xtdata
         base_pool = mock_adapter.watchlist if hasattr(mock_adapter, 'watchlist') and mock_adapter.watchlist else []
         if not base_pool:
             # 如果没有watchlist，从UniverseBuilder获取
@@ -464,44 +502,29 @@ def scan_cmd(ctx, date):
         
         click.echo(f"   底池规模: {len(base_pool)} 只")
         
+        # 【CTO V231】全日回放：k路归并全局时钟，逐帧驱动实盘雷达主循环
+        if intraday:
+            from logic.backtest.intraday_replay import IntradayReplay
+            replay = IntradayReplay(engine.tick_adapter, speed=speed)
+            loaded = replay.load(base_pool)
+            click.echo(f"   全日Tick: {loaded} 只 | 全局时钟 {replay.total_frames} 帧 | "
+                       f"倍速: {'不限速' if speed <= 0 else f'{speed:g}x'}")
+            engine.watchlist = list(replay.adapter.loaded_codes)
+            stats = engine.run_intraday_replay(replay)
+            if stats:
+                click.echo(click.style(
+                    f"\n✅ 全日回放完成: {stats['frames']} 帧 / {stats['ticks']} 笔Tick | "
+                    f"耗时 {stats['elapsed_s']:.1f}s | {stats['frames_per_s']:.0f} 帧/s", fg='green'))
+            return
+        
         # 【CTO V74宪法】不得日K兜底，缺失即补充！
         # Tick数据包含盘中净流入、资金流向、盘口等关键信息
         # 日线无法伪造Tick，没有真实Tick必须物理剔除！
-        for stock in base_pool:
-            try:
-                # 只使用真实Tick数据
-                tick_data = xtdata.get_local_data(
-                    field_list=[], 
-                    stock_list=[stock], 
-                    period='tick',
-                    start_time=f"{target_date}092500", 
-                    end_time=f"{target_date}150000"
-                )
-                
-                if tick_data and stock in tick_data:
-                    df = tick_data[stock]
-                    if df is not None and not (hasattr(df, 'empty') and df.empty) and len(df) > 0:
-                        # 取最后一笔Tick作为收盘快照
-                        row = df.iloc[-1]
-                        tick = {
-                            'stock_code': stock,
-                            'datetime': f"{target_date}150000",
-                            'price': float(row.get('lastPrice', row.get('price', 0))),
-                            'open': float(row.get('open', 0)),
-                            'high': float(row.get('high', 0)),
-                            'low': float(row.get('low', 0)),
-                            'volume': int(row.get('volume', 0)),
-                            'amount': float(row.get('amount', 0)),
-                            'lastClose': float(row.get('lastClose', row.get('preClose', 0))),
-                            'askPrice1': float(row.get('askPrice1', 0)),
-                            'bidPrice1': float(row.get('bidPrice1', 0)),
-                        }
-                        # 只有有效Tick才加入
-                        if tick['amount'] > 0 and tick['price'] > 0:
-                            tick_stream.append(tick)
-                # 无Tick则直接跳过，绝不用日线兜底！
-            except Exception:
-                continue
+        # 【CTO V230】收盘快照走按日快照索引：已建索引的票只读KB级文件，缺的票才读Tick补建
+        # 【CTO V233】与多日并行扫描共用同一构造函数
+        from logic.backtest.multi_date_scan import build_close_tick_stream, load_auction_table
+        tick_stream, built = build_close_tick_stream(target_date, base_pool)
+        click.echo(f"   快照索引: 本次新建 {built} 只")
         
         # 【CTO V74】统计缺失并提示用户补充
         missing_tick_count = len(base_pool) - len(tick_stream)
@@ -518,6 +541,7 @@ def scan_cmd(ctx, date):
         # 【P0修复】调用run_historical_stream直线喷射引擎
         click.echo("\n📦 Step 4: 启动直线喷射引擎...")
         engine.watchlist = base_pool  # 【CTO 补天】强制将粗筛底池注入引擎的供弹带！
+        engine.auction_table = load_auction_table(target_date, base_pool)  # 【CTO V233】竞价审计与实盘同源
         engine.run_historical_stream(tick_stream)
         
         click.echo(click.style("\n✅ 沙盘扫描完成", fg='green'))
@@ -531,6 +555,44 @@ def scan_cmd(ctx, date):
         ctx.exit(1)
 
 
+def _scan_date_range(ctx, start_date, end_date, workers, top_n, output):
+    """【CTO V233】多日期并行定格沙盘，合并各日Top-N输出到一张表"""
+    from logic.utils.calendar_utils import get_trading_days_between
+    from logic.backtest.multi_date_scan import run_multi_date_scan
+
+    dates = get_trading_days_between(start_date, end_date)
+    click.echo(click.style(f"\n🔍 启动【多日并行定格沙盘】", fg='cyan', bold=True))
+    click.echo(f"📅 区间: {start_date} ~ {end_date} | 交易日 {len(dates)} 个 | 进程 {workers}")
+    if not dates:
+        click.echo(click.style("❌ 区间内无交易日", fg='red'))
+        ctx.exit(1)
+
+    # 【CTO V233 候选池缓存】主进程一次读日K预建全区间底池，各工作进程建池直接命中缓存
+    try:
+        from logic.data_providers.universe_cache import precompute_universes
+        precompute_universes(dates)
+    except Exception as e:
+        click.echo(click.style(f"⚠️ 候选池区间预计算失败，退回逐日粗筛: {e}", fg='yellow'))
+
+    try:
+        table, summary = run_multi_date_scan(dates, workers=workers, top_n=top_n)
+    except KeyboardInterrupt:
+        click.echo(click.style("\n⚠️ 用户中断扫描", fg='yellow'))
+        ctx.exit(130)
+
+    for s in summary:
+        status = '✅' if s['status'] == 'success' else '❌'
+        click.echo(f"   {status} {s['date']} | 底池 {s['pool']} | 有效Tick {s['ticks']} | "
+                   f"达标 {s['targets']} | {s['elapsed_s']:.1f}s" + (f" | {s['error']}" if s['error'] else ''))
+
+    output_path = Path(output) / f'scan_{start_date}_{end_date}.csv'
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(output_path, encoding='utf-8-sig')
+    ok = sum(1 for s in summary if s['status'] == 'success')
+    click.echo(click.style(f"\n✅ 多日扫描完成: {ok}/{len(summary)} 个交易日 | {len(table)} 行", fg='green'))
+    click.echo(f"💾 合并表已保存: {output_path}")
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 分析命令
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -697,39 +759,31 @@ def download_cmd(ctx, date, data_type, universe, workers):
             from logic.data_providers.universe_builder import UniverseBuilder
             
             builder = UniverseBuilder(target_date=date)
-            stock_list = builder.build()
+            stock_list, _ = builder.build()
             click.echo(f"📊 粗筛获取到 {len(stock_list)} 只股票")
         
-        # 执行下载 - 使用QmtDataManager
-        from logic.data_providers.qmt_manager import QmtDataManager
-        import time
+        # 执行下载 - 使用QmtDataManager（全局单例）
+        from logic.data_providers.qmt_manager import get_qmt_manager
         
-        manager = QmtDataManager()
+        manager = get_qmt_manager()
         
         if stock_list:
             click.echo(f"开始下载 {len(stock_list)} 只股票的Tick数据...")
             
-            # 【CTO V38修复】废除[:200]一刀切！改用batch_size循环+冷却机制
-            batch_size = 200
-            results = {}
-            total_batches = (len(stock_list) + batch_size - 1) // batch_size
+            # 【CTO V233 并发下载】--workers 真正生效：有界线程池并发批量下载 + 退避重试，
+            # 废除200只一批串行 + 批间固定 sleep
+            def _progress(s):
+                click.echo(f"   进度 {s.done}/{s.total} | {s.stocks_per_sec:.1f}只/s "
+                           f"{s.records_per_sec:.0f}条/s | 失败 {s.failed} 重试 {s.retries} | ETA {s.eta:.0f}s")
             
-            for i in range(0, len(stock_list), batch_size):
-                batch = stock_list[i:i + batch_size]
-                batch_num = i // batch_size + 1
-                click.echo(f"正在下载第 {batch_num}/{total_batches} 批 ({len(batch)}只)...")
-                
-                batch_res = manager.download_tick_data(
-                    stock_list=batch,
-                    trade_date=date,
-                    use_vip=True,
-                    check_existing=True
-                )
-                results.update(batch_res)
-                
-                # 批次间休息2秒，防止QMT服务端把我们踢下线
-                if i + batch_size < len(stock_list):
-                    time.sleep(2.0)
+            results = manager.download_tick_data(
+                stock_list=stock_list,
+                trade_date=date,
+                use_vip=True,
+                check_existing=True,
+                workers=workers,
+                on_progress=_progress,
+            )
             
             success = sum(1 for r in results.values() if r.success)
             failed = sum(1 for r in results.values() if not r.success)
@@ -765,8 +819,10 @@ def download_cmd(ctx, date, data_type, universe, workers):
               default='all',
               help='验证类型 (默认: all)')
 @click.option('--fix', is_flag=True, help='自动修复缺失数据')
+@click.option('--workers', '-w', type=int, default=None,
+              help='Tick内容校验进程数 (默认: CPU核数)')
 @click.pass_context
-def verify_cmd(ctx, date, verify_type, fix):
+def verify_cmd(ctx, date, verify_type, fix, workers):
     """
     数据完整性验证
     
@@ -786,21 +842,33 @@ def verify_cmd(ctx, date, verify_type, fix):
     click.echo(f"🔧 自动修复: {'是' if fix else '否'}")
     
     try:
-        from logic.qmt_health_check import QMTHealthCheck
+        # 【CTO V233 并行校验】存在性走覆盖清单，Tick 内容不变量多进程体检
+        from xtquant import xtdata
+        from logic.data_providers.qmt_manager import get_qmt_manager
+        from logic.data_providers.integrity_verifier import CHECKS
         
-        checker = QMTHealthCheck()
+        manager = get_qmt_manager()
+        periods = {'tick': ['tick'], 'kline': ['1d', '1m'], 'all': ['1d', '1m', 'tick']}[verify_type]
+        all_stocks = xtdata.get_stock_list_in_sector('沪深A股')
+        reports = manager.verify_data_integrity(all_stocks, date, check_periods=periods,
+                                                deep='tick' in periods, processes=workers)
         
-        # 执行验证
-        result = checker.verify_date(date, verify_type)
+        missing = [(s, p) for s, r in reports.items() for p in r.missing_periods]
+        anomalies = {s: r.failed_checks for s, r in reports.items() if r.failed_checks}
         
         click.echo(f"\n📊 验证结果:")
-        click.echo(f"  状态: {'✅ 通过' if result.get('valid') else '❌ 失败'}")
-        click.echo(f"  缺失股票数: {len(result.get('missing', []))}")
-        click.echo(f"  异常股票数: {len(result.get('anomalies', []))}")
+        click.echo(f"  状态: {'✅ 通过' if not missing and not anomalies else '❌ 失败'}")
+        click.echo(f"  缺失股票数: {len({s for s, _ in missing})}")
+        click.echo(f"  异常股票数: {len(anomalies)}")
+        if 'tick' in periods:
+            for name in CHECKS[1:]:
+                count = sum(1 for checks in anomalies.values() if name in checks)
+                click.echo(f"    {name:<18} {count}")
         
-        if fix and not result.get('valid'):
+        if fix and missing:
             click.echo("\n🔧 开始修复...")
-            fixed = checker.fix_missing(date, result.get('missing', []))
+            results = manager.supplement_missing_data(missing, trade_date=date)
+            fixed = sum(1 for r in results.values() if r.success)
             click.echo(f"  已修复: {fixed} 只股票")
         
         click.echo(click.style("\n✅ 验证完成", fg='green'))
@@ -811,6 +879,51 @@ def verify_cmd(ctx, date, verify_type, fix):
         ctx.exit(1)
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# 归档命令
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@cli.command(name='archive')
+@click.option('--date', '-d', callback=validate_date,
+              help='交易日期 (YYYYMMDD，默认今天)')
+@click.option('--output', '-o', default='data/tick_archive',
+              help='归档目录 (默认: data/tick_archive)')
+@click.option('--level', type=click.IntRange(0, 9), default=6,
+              help='zlib压缩档位 (默认6；0=只存储，体积更大、解码约快2倍)')
+@click.pass_context
+def archive_cmd(ctx, date, output, level):
+    """
+    QMT本地Tick → 紧凑归档（长周期研究用）
+
+    示例:
+        \b
+        python main.py archive --date 20260105
+    """
+    date = date or datetime.now().strftime('%Y%m%d')
+
+    click.echo(click.style(f"\n🗜️ Tick归档", fg='green', bold=True))
+    click.echo(f"📅 日期: {date}")
+
+    try:
+        from xtquant import xtdata
+        from logic.data_providers.tick_archive import convert_local_ticks
+
+        all_stocks = xtdata.get_stock_list_in_sector('沪深A股')
+        stats = convert_local_ticks(all_stocks, date, archive_dir=Path(output), level=level)
+
+        click.echo(f"\n📊 归档结果:")
+        click.echo(f"  文件: {stats['path']}")
+        click.echo(f"  股票: {stats['stocks']} 只 / {stats['rows']} 条 (读取失败 {stats['failed']} 只)")
+        click.echo(f"  大小: {stats['archive_bytes'] / 1e6:.1f}MB (压缩比 {stats['ratio']:.1f}x)")
+        click.echo(f"  耗时: {stats['elapsed']:.1f}s")
+        click.echo(click.style("\n✅ 归档完成", fg='green'))
+
+    except Exception as e:
+        logger.error(f"❌ 归档失败: {e}", exc_info=True)
+        click.echo(click.style(f"\n❌ 归档失败: {e}", fg='red'))
+        ctx.exit(1)
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 监控命令
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+sim - 无 QMT 环境下的仿真行情包
+
+【CTO V233 仿真行情】
+业务代码直接 `from xtquant import xtdata`（多数在模块导入期），Linux 上没有 xtquant
+就什么都跑不起来。install() 把 sim/ 插到 sys.path 最前，让 `import xtquant`
+解析到 sim/xtquant（转发到 FakeXtData 单例），业务代码零改动。
+
+选择方式（优先级从高到低）：
+    环境变量 MYQUANT_DATA_SOURCE=fake|qmt
+    config/strategy_params.json → qmt_data_source.mode
+仿真参数：qmt_data_source.fake_market
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import json
+import logging
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SIM_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SIM_DIR.parent
+CONFIG_PATH = PROJECT_ROOT / 'config' / 'strategy_params.json'
+ENV_KEY = 'MYQUANT_DATA_SOURCE'
+
+_MARKET_KEYS = ('n_symbols', 'seed', 'start', 'end', 'tick_interval', 'limit_up_rate', 'st_rate',
+                'halt_rate', 'new_listing_rate')
+_fake = None
+_lock = threading.Lock()
+
+
+def load_config() -> Dict:
+    """读取 qmt_data_source 段（缺失返回空）"""
+    try:
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f).get('qmt_data_source', {}) or {}
+    except Exception as e:
+        logger.debug(f'[sim] 读取配置失败: {e}')
+        return {}
+
+
+def data_source() -> str:
+    return (os.environ.get(ENV_KEY) or load_config().get('mode') or 'qmt').lower()
+
+
+def get_fake_xtdata():
+    """按 fake_market 配置构造的 FakeXtData 单例（首次调用时生成行情）"""
+    global _fake
+    with _lock:
+        if _fake is None:
+            from sim.fake_xtdata import FakeXtData, SimClock
+            from sim.market import SyntheticMarket
+
+            cfg = load_config().get('fake_market', {}) or {}
+            market = SyntheticMarket(**{k: cfg[k] for k in _MARKET_KEYS if cfg.get(k) is not None})
+            clock = SimClock(cfg.get('clock_date'), cfg.get('clock_start'), cfg.get('clock_speed', 1.0))
+            _fake = FakeXtData(market, latency=cfg.get('latency', 0.0), jitter=cfg.get('jitter', 0.0),
+                               fault_rate=cfg.get('fault_rate', 0.0), local=cfg.get('local', 'all'),
+                               download_lag=cfg.get('download_lag', 0.0), clock=clock)
+            logger.info(f'[OK] [sim] 仿真行情就绪: {len(market.codes)}只 × {len(market.calendar)}日 '
+                        f'交易日={clock.trade_date}')
+        return _fake
+
+
+def set_fake_xtdata(fake) -> None:
+    """替换单例（测试 / 压测脚本自定义参数用）"""
+    global _fake
+    with _lock:
+        _fake = fake
+
+
+def install() -> None:
+    """让后续 `import xtquant` 解析到仿真包（子进程经 PYTHONPATH 继承）"""
+    if 'xtquant' in sys.modules and not str(getattr(sys.modules['xtquant'], '__file__', '')).startswith(str(SIM_DIR)):
+        logger.warning('[WARN] [sim] 真实 xtquant 已导入，仿真包不生效')
+        return
+    if str(SIM_DIR) not in sys.path:
+        sys.path.insert(0, str(SIM_DIR))
+    paths = os.environ.get('PYTHONPATH', '').split(os.pathsep)
+    if str(SIM_DIR) not in paths:
+        os.environ['PYTHONPATH'] = os.pathsep.join([str(SIM_DIR)] + [p for p in paths if p])
+    logger.info('[OK] [sim] xtquant → 仿真行情')
+
+
+def install_if_configured() -> Optional[str]:
+    """数据源为 fake 时 install()；返回生效的数据源"""
+    source = data_source()
+    if source == 'fake':
+        install()
+    return source
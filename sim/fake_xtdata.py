@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+FakeXtData - xtquant.xtdata 接口的本地仿真实现
+
+【CTO V233 仿真行情】
+覆盖本仓库用到的全部 xtdata 接口（签名与返回格式同 QMT）：
+    connect / get_markets / set_token / set_vip_license / run
+    get_stock_list_in_sector / get_trading_calendar / get_trading_dates
+    get_instrument_detail / get_instrument_detail_list
+    get_local_data / get_market_data_ex（tick / 1m / 1d）
+    download_history_data / download_history_data2
+    get_full_tick / subscribe_quote / subscribe_whole_quote / unsubscribe_quote
+
+可调参数：
+    latency / jitter     每次 I/O 调用的延迟（秒）与抖动比例
+    fault_rate           I/O 调用随机抛 RuntimeError 的概率（故障注入）
+    local                'all' = 全部数据已在本地；'download' = 下载后才可读（压测下载链路）
+    download_lag         download_history_data 返回后数据延迟落盘的秒数（模拟异步落盘）
+    clock                SimClock：决定 get_full_tick / 订阅推送的"当前时刻"
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import itertools
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from sim.market import SyntheticMarket, date_ms, _hms_ms
+
+logger = logging.getLogger(__name__)
+
+SECTORS = {
+    '沪深A股': lambda c: True,
+    '上证A股': lambda c: c.endswith('.SH'), 'SH': lambda c: c.endswith('.SH'),
+    '深证A股': lambda c: c.endswith('.SZ'), 'SZ': lambda c: c.endswith('.SZ'),
+    '创业板': lambda c: c.startswith('300'), '科创板': lambda c: c.startswith('688'),
+}
+
+
+class SimClock:
+    """
+    仿真时钟：start 为空时取墙钟的时分秒；给出 start（HHMMSS）时从该时刻起按 speed 倍速走
+    trade_date 为空时取日历里 <= 今天的最后一个交易日
+    """
+
+    def __init__(self, trade_date: Optional[str] = None, start: Optional[str] = None, speed: float = 1.0):
+        self.trade_date = trade_date
+        self.start = start
+        self.speed = speed
+        self._t0 = time.perf_counter()
+
+    def bind(self, calendar: Sequence[str]) -> None:
+        if self.trade_date is None:
+            today = datetime.now().strftime('%Y%m%d')
+            past = [d for d in calendar if d <= today]
+            self.trade_date = past[-1] if past else calendar[0]
+
+    def now_ms(self) -> int:
+        base = date_ms(self.trade_date)
+        if self.start is None:
+            now = datetime.now()
+            return base + ((now.hour * 60 + now.minute) * 60 + now.second) * 1000 + now.microsecond // 1000
+        return base + _hms_ms(self.start) + int((time.perf_counter() - self._t0) * self.speed * 1000)
+
+
+def _parse_bound(value: str, end: bool = False) -> str:
+    """start_time/end_time：'' / YYYYMMDD / YYYYMMDDHHMMSS → 14位（纯日期的 end 取当日 23:59:59）"""
+    value = str(value or '')
+    if not value:
+        return '99999999999999' if end else '00000000000000'
+    if len(value) == 8:
+        return value + ('235959' if end else '000000')
+    return value[:14]
+
+
+class FakeXtData:
+    """
+    用法:
+        xt = FakeXtData(SyntheticMarket(n_symbols=500), latency=0.002, local='download', download_lag=0.05)
+        xt.download_history_data('600001.SH', 'tick', '20260318', '20260318')
+        xt.get_local_data([], ['600001.SH'], 'tick', '20260318', '20260318')
+    """
+
+    def __init__(
+        self,
+        market: SyntheticMarket,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        fault_rate: float = 0.0,
+        local: str = 'all',
+        download_lag: float = 0.0,
+        clock: Optional[SimClock] = None,
+        push_interval: Optional[float] = None,
+        seed: int = 0,
+    ):
+        self.market = market
+        self.latency = latency
+        self.jitter = jitter
+        self.fault_rate = fault_rate
+        self.local = local
+        self.download_lag = download_lag
+        self.clock = clock or SimClock()
+        self.clock.bind(market.calendar)
+        self.push_interval = push_interval or market.tick_interval
+        self.enable_hello = True
+        self.calls: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._landed: Dict[tuple, float] = {}          # (code, period, date) → 可读时刻
+        self._subs: Dict[int, tuple] = {}
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pusher: Optional[threading.Thread] = None
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 延迟 / 故障注入
+    # ─────────────────────────────────────────────────────────────────────────
+    def _io(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            fail = self.fault_rate > 0 and self._rng.random() < self.fault_rate
+            delay = self.latency * (1 + self.jitter * (2 * self._rng.random() - 1)) if self.latency else 0.0
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise RuntimeError(f'[FakeXtData] 注入故障: {name}')
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 连接 / 元数据
+    # ─────────────────────────────────────────────────────────────────────────
+    def connect(self, ip: str = '', port: Optional[int] = None, remember_if_success: bool = True):
+        return self
+
+    def get_markets(self) -> Dict[str, str]:
+        return {'SH': '上交所', 'SZ': '深交所'}
+
+    def set_token(self, token: str = '') -> None:
+        pass
+
+    def set_vip_license(self, *args, **kwargs) -> None:
+        pass
+
+    def run(self) -> None:
+        """同 xtdata.run：阻塞当前线程维持推送"""
+        threading.Event().wait()
+
+    def get_stock_list_in_sector(self, sector_name: str, real_timetag=-1) -> List[str]:
+        rule = SECTORS.get(sector_name)
+        return [c for c in self.market.codes if rule(c)] if rule else []
+
+    def get_trading_calendar(self, market: str, start_time: str = '', end_time: str = '') -> List[str]:
+        lo, hi = str(start_time or '')[:8] or '0', str(end_time or '')[:8] or '99999999'
+        return [d for d in self.market.calendar if lo <= d <= hi]
+
+    def get_trading_dates(self, market: str, start_time: str = '', end_time: str = '', count: int = -1) -> List[int]:
+        dates = [date_ms(d) for d in self.get_trading_calendar(market, start_time, end_time)]
+        return dates[-count:] if count and count > 0 else dates
+
+    def get_instrument_detail(self, stock_code: str, iscomplete: bool = False) -> Optional[Dict]:
+        return self.market.instrument_detail(stock_code, self.clock.trade_date)
+
+    def get_instrument_detail_list(self, stock_list: Sequence[str], iscomplete: bool = False) -> Dict[str, Dict]:
+        return {c: self.market.instrument_detail(c, self.clock.trade_date) for c in stock_list}
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 历史数据
+    # ─────────────────────────────────────────────────────────────────────────
+    def _dates(self, start_time: str, end_time: str) -> List[str]:
+        lo, hi = _parse_bound(start_time)[:8], _parse_bound(end_time, end=True)[:8]
+        return [d for d in self.market.calendar if lo <= d <= hi]
+
+    def _is_local(self, code: str, period: str, date: str, now: float) -> bool:
+        if self.local == 'all':
+            return True
+        ready = self._landed.get((code, period, date))
+        return ready is not None and ready <= now
+
+    def _frame(self, code: str, period: str, start_time: str, end_time: str) -> pd.DataFrame:
+        lo, hi = _parse_bound(start_time), _parse_bound(end_time, end=True)
+        now = time.perf_counter()
+        if period == '1d':
+            df = self.market.daily(code)
+            keep = (df.index >= lo[:8]) & (df.index <= hi[:8])
+            if self.local != 'all':
+                keep &= np.array([self._is_local(code, period, d, now) for d in df.index], dtype=bool)
+            return df[keep]
+        if period not in ('tick', '1m'):
+            return pd.DataFrame()
+        frames = []
+        for date in self._dates(start_time, end_time):
+            if not self._is_local(code, period, date, now):
+                continue
+            df = self.market.ticks(code, date) if period == 'tick' else self.market.minute_bars(code, date)
+            if not df.empty:
+                frames.append(df)
+        if not frames:
+            return pd.DataFrame()
+        df = frames[0] if len(frames) == 1 else pd.concat(frames)
+        if period == 'tick':
+            df = df.copy()
+            df.index = pd.Index([pd.Timestamp(t + 8 * 3600 * 1000, unit='ms').strftime('%Y%m%d%H%M%S')
+                                 for t in df['time'].to_numpy()])
+        return df[(df.index >= lo) & (df.index <= hi)]
+
+    def get_local_data(self, field_list: Sequence[str] = (), stock_list: Sequence[str] = (), period: str = '1d',
+                       start_time: str = '', end_time: str = '', count: int = -1, dividend_type: str = 'none',
+                       fill_data: bool = True, data_dir: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        self._io('get_local_data')
+        out = {}
+        for code in stock_list:
+            if code not in self.market.index:
+                continue
+            df = self._frame(code, period, start_time, end_time)
+            if count is not None and count > 0:
+                df = df.iloc[-count:]
+            if field_list and not df.empty:
+                df = df[[f for f in field_list if f in df.columns]]
+            out[code] = df
+        return out
+
+    get_market_data_ex = get_local_data
+
+    def download_history_data(self, stock_code: str, period: str, start_time: str = '', end_time: str = '',
+                              incrementally=None) -> None:
+        self._io('download_history_data')
+        self._land([stock_code], period, start_time, end_time)
+
+    def download_history_data2(self, stock_list: Sequence[str], period: str, start_time: str = '',
+                               end_time: str = '', callback: Optional[Callable] = None, incrementally=None) -> None:
+        self._io('download_history_data2')
+        self._land(stock_list, period, start_time, end_time)
+        if callback is not None:
+            callback({'finished': len(stock_list), 'total': len(stock_list)})
+
+    def _land(self, codes: Sequence[str], period: str, start_time: str, end_time: str) -> None:
+        if self.local == 'all':
+            return
+        ready = time.perf_counter() + self.download_lag
+        dates = self._dates(start_time, end_time)
+        with self._lock:
+            for code in codes:
+                if code in self.market.index:
+                    for date in dates:
+                        self._landed.setdefault((code, period, date), ready)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 实时
+    # ─────────────────────────────────────────────────────────────────────────
+    def get_full_tick(self, code_list: Sequence[str]) -> Dict[str, Dict]:
+        self._io('get_full_tick')
+        return self.market.snapshot(code_list, self.clock.now_ms())
+
+    def subscribe_quote(self, stock_code: str, period: str = '1d', start_time: str = '', end_time: str = '',
+                        count: int = 0, callback: Optional[Callable] = None) -> int:
+        return self._subscribe([stock_code], callback, whole=False)
+
+    def subscribe_whole_quote(self, code_list: Sequence[str], callback: Optional[Callable] = None) -> int:
+        return self._subscribe(list(code_list), callback, whole=True)
+
+    def unsubscribe_quote(self, seq: int) -> None:
+        with self._lock:
+            self._subs.pop(seq, None)
+
+    def _subscribe(self, codes: List[str], callback: Optional[Callable], whole: bool) -> int:
+        seq = next(self._seq)
+        with self._lock:
+            self._subs[seq] = (codes, callback, whole)
+            if callback is not None and self._pusher is None:
+                self._pusher = threading.Thread(target=self._push_loop, name='fake-xtdata-push', daemon=True)
+                self._pusher.start()
+        return seq
+
+    def _push_loop(self) -> None:
+        """按 push_interval 把当前时刻快照推给回调（whole: {code: dict}；单票: {code: [dict]}）"""
+        while True:
+            time.sleep(self.push_interval / max(self.clock.speed, 1e-9) if self.clock.start else self.push_interval)
+            with self._lock:
+                subs = [s for s in self._subs.values() if s[1] is not None]
+            now = self.clock.now_ms()
+            for codes, callback, whole in subs:
+                snaps = self.market.snapshot(codes, now)
+                try:
+                    callback(snaps if whole else {c: [t] for c, t in snaps.items()})
+                except Exception as e:
+                    logger.warning(f'[WARN] [FakeXtData] 推送回调异常: {e}')
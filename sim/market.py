@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""
+SyntheticMarket - 参数化仿真A股市场（仿真 xtdata 的数据源）
+
+【CTO V233 仿真行情】
+按 (seed, 代码, 交易日) 确定性生成，同一参数任何机器、任何进程生成的数据逐位一致：
+  - 合约：主板/创业板/科创板混合代码，ST、次新、流通股本、涨跌停价
+  - 日K：按板块涨跌幅限制截断的随机游走，含涨停事件、停牌（当日无K线）、次新上市前无K线
+  - Tick：09:15-09:25 集合竞价 + 09:25 撮合 + 连续竞价 3 秒快照；
+          价格为开盘→收盘布朗桥（涨停日在封板时刻钉死涨停价），累计量额 U 形分布且收盘对齐日K，
+          五档盘口（涨停时卖盘为空）
+  - 1m：由 Tick 聚合
+
+只依赖 numpy / pandas，不导入 logic 任何模块（仿真 xtquant 须先于 logic 装载）。
+
+Author: CTO
+Date: 2026-03-18
+Version: V1.0
+"""
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+_BEIJING_OFFSET_MS = 8 * 3600 * 1000
+
+# 板块构成：(代码前缀, 交易所, 占比)
+BOARDS = (('600', 'SH', 0.22), ('601', 'SH', 0.08), ('603', 'SH', 0.10), ('000', 'SZ', 0.12),
+          ('002', 'SZ', 0.22), ('300', 'SZ', 0.18), ('688', 'SH', 0.08))
+
+TICK_FIELDS = ('time', 'lastPrice', 'open', 'high', 'low', 'lastClose', 'amount', 'volume',
+               'pvolume', 'stockStatus', 'transactionNum', 'askPrice', 'bidPrice', 'askVol', 'bidVol')
+DAILY_FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume', 'amount', 'settelementPrice',
+                'openInterest', 'preClose', 'suspendFlag')
+
+
+def _hms_ms(hms: str) -> int:
+    h, m, s = int(hms[:2]), int(hms[2:4]), int(hms[4:6])
+    return ((h * 60 + m) * 60 + s) * 1000
+
+
+def date_ms(date: str) -> int:
+    """YYYYMMDD 北京时间 0 点 → UTC 毫秒"""
+    return int(np.datetime64(f'{date[:4]}-{date[4:6]}-{date[6:8]}', 'ms').astype(np.int64)) - _BEIJING_OFFSET_MS
+
+
+def _tick_offsets(interval: int) -> Tuple[np.ndarray, int]:
+    """当日 Tick 时刻（距北京 0 点毫秒）与集合竞价行数"""
+    step = interval * 1000
+    auction = np.arange(_hms_ms('091500'), _hms_ms('092500'), step)
+    match = np.array([_hms_ms('092500')])
+    am = np.arange(_hms_ms('093000'), _hms_ms('113000') + 1, step)
+    pm = np.arange(_hms_ms('130000'), _hms_ms('150000') + 1, step)
+    return np.concatenate([auction, match, am, pm]).astype(np.int64), len(auction)
+
+
+def _round2(x):
+    return np.round(np.asarray(x, dtype=np.float64) + 1e-9, 2)
+
+
+class SyntheticMarket:
+    """
+    用法:
+        market = SyntheticMarket(n_symbols=5000, start='20250102')
+        market.codes / market.calendar
+        market.daily('600000.SH')             # 全部交易日日K DataFrame（索引 YYYYMMDD）
+        market.ticks('600000.SH', '20260318') # 当日 Tick DataFrame
+        market.snapshot(codes, now_ms)        # get_full_tick 同格式
+    """
+
+    def __init__(
+        self,
+        n_symbols: int = 5000,
+        seed: int = 42,
+        start: str = '20250102',
+        end: Optional[str] = None,
+        tick_interval: int = 3,
+        limit_up_rate: float = 0.03,
+        st_rate: float = 0.03,
+        halt_rate: float = 0.005,
+        new_listing_rate: float = 0.02,
+        tick_cache: int = 256,
+    ):
+        self.n_symbols = int(n_symbols)
+        self.seed = int(seed)
+        self.tick_interval = int(tick_interval)
+        self.limit_up_rate = limit_up_rate
+        self.halt_rate = halt_rate
+        end = end or datetime.now().strftime('%Y%m%d')
+        self.calendar: List[str] = pd.bdate_range(start, end).strftime('%Y%m%d').tolist()
+        self._day_index = {d: i for i, d in enumerate(self.calendar)}
+        self._offsets, self._n_auction = _tick_offsets(self.tick_interval)
+        self._tick_cache: 'OrderedDict[Tuple[str, str], pd.DataFrame]' = OrderedDict()
+        self._tick_cache_size = tick_cache
+        self._build_instruments(st_rate, new_listing_rate)
+        self._build_daily()
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 合约
+    # ─────────────────────────────────────────────────────────────────────────
+    def _build_instruments(self, st_rate: float, new_listing_rate: float) -> None:
+        rng = np.random.default_rng(self.seed)
+        n = self.n_symbols
+        weights = np.array([w for _, _, w in BOARDS])
+        counts = np.floor(weights / weights.sum() * n).astype(int)
+        counts[0] += n - counts.sum()
+        codes = []
+        for (prefix, exchange, _), k in zip(BOARDS, counts):
+            width = 6 - len(prefix)
+            codes += [f'{prefix}{j:0{width}d}.{exchange}' for j in range(1, k + 1)]
+        self.codes: List[str] = codes
+        self.index: Dict[str, int] = {c: i for i, c in enumerate(codes)}
+
+        self.is_st = rng.random(n) < st_rate
+        self.names = [f'{"ST" if st else ""}仿真{c[:6]}' for c, st in zip(codes, self.is_st)]
+        growth = np.array([c.startswith(('300', '688')) for c in codes])
+        self.limit_pct = np.where(growth, 0.20, np.where(self.is_st, 0.05, 0.10))
+        self.float_volume = np.round(np.exp(rng.normal(np.log(3e8), 1.0, n)), -4)
+        self.total_volume = np.round(self.float_volume * rng.uniform(1.0, 1.6, n), -4)
+        self.base_price = _round2(np.clip(np.exp(rng.normal(np.log(12), 0.7, n)), 2.0, 300.0))
+        self.volatility = rng.uniform(0.012, 0.035, n) * np.where(growth, 1.4, 1.0)
+        self.turnover = np.exp(rng.normal(np.log(0.02), 0.6, n))
+        # 次新：上市日落在日历内，之前无数据
+        listing = np.zeros(n, dtype=np.int64)
+        fresh = rng.random(n) < new_listing_rate
+        listing[fresh] = rng.integers(0, len(self.calendar), fresh.sum())
+        self.listing_day = listing
+        self.open_date = np.array([int(self.calendar[d]) if f else 20100104
+                                   for d, f in zip(listing, fresh)], dtype=np.int64)
+
+    def instrument_detail(self, code: str, trade_date: Optional[str] = None) -> Optional[Dict]:
+        """get_instrument_detail 同格式（FloatVolume/TotalVolume 单位：股）"""
+        i = self.index.get(code)
+        if i is None:
+            return None
+        j = self._day_index.get(trade_date or self.calendar[-1], len(self.calendar) - 1)
+        pre = float(self.pre_close[i, j])
+        return {
+            'ExchangeID': code[-2:], 'InstrumentID': code[:6], 'InstrumentName': self.names[i],
+            'OpenDate': str(self.open_date[i]), 'ExpireDate': '99999999',
+            'PreClose': pre, 'UpStopPrice': float(self.up_stop[i, j]), 'DownStopPrice': float(self.down_stop[i, j]),
+            'FloatVolume': float(self.float_volume[i]), 'TotalVolume': float(self.total_volume[i]),
+            'PriceTick': 0.01, 'VolumeMultiple': 1, 'IsTrading': True,
+        }
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 日K（全市场 × 全日历一次生成）
+    # ─────────────────────────────────────────────────────────────────────────
+    def _build_daily(self) -> None:
+        rng = np.random.default_rng(self.seed + 1)
+        n, d = self.n_symbols, len(self.calendar)
+        shape = (n, d)
+        vol = self.volatility[:, None]
+        limit = self.limit_pct[:, None]
+        ret = np.clip(rng.standard_normal(shape) * vol + 0.0003, -limit, limit)
+        limit_up = rng.random(shape) < self.limit_up_rate
+        ret[limit_up] = limit.repeat(d, axis=1)[limit_up]
+        open_ret = np.clip(rng.standard_normal(shape) * vol / 3, -limit, limit)
+        wick_hi = np.abs(rng.standard_normal(shape)) * vol / 2
+        wick_lo = np.abs(rng.standard_normal(shape)) * vol / 2
+        turnover = self.turnover[:, None] * np.exp(rng.normal(0, 0.4, shape)) * np.where(limit_up, 1.5, 1.0)
+        self.halted = (rng.random(shape) < self.halt_rate) | (np.arange(d)[None, :] < self.listing_day[:, None])
+
+        pre = np.empty(shape)
+        close = np.empty(shape)
+        price = self.base_price.copy()
+        for j in range(d):
+            pre[:, j] = price
+            up, down = _round2(price * (1 + self.limit_pct)), _round2(price * (1 - self.limit_pct))
+            c = np.clip(_round2(price * (1 + ret[:, j])), down, up)
+            c = np.where(limit_up[:, j], up, c)
+            price = np.where(self.halted[:, j], price, c)
+            close[:, j] = price
+        self.pre_close = pre
+        self.up_stop = _round2(pre * (1 + limit))
+        self.down_stop = _round2(pre * (1 - limit))
+        self.close = close
+        self.limit_up_day = (close >= self.up_stop) & ~self.halted
+        self.open = np.clip(_round2(pre * (1 + open_ret)), self.down_stop, self.up_stop)
+        self.high = np.clip(_round2(np.maximum(self.open, close) * (1 + wick_hi)), None, self.up_stop)
+        self.high = np.maximum(self.high, np.maximum(self.open, close))
+        self.low = np.clip(_round2(np.minimum(self.open, close) * (1 - wick_lo)), self.down_stop, None)
+        self.low = np.minimum(self.low, np.minimum(self.open, close))
+        # 成交量（手）/ 额（元）
+        self.volume = np.floor(self.float_volume[:, None] * turnover / 100)
+        vwap = (self.open + self.high + self.low + close) / 4
+        self.amount = np.round(self.volume * 100 * vwap, 2)
+        for arr in (self.open, self.high, self.low, self.volume, self.amount):
+            arr[self.halted] = 0.0
+
+    def trading(self, code: str, date: str) -> bool:
+        i, j = self.index.get(code), self._day_index.get(date)
+        return i is not None and j is not None and not self.halted[i, j]
+
+    def daily(self, code: str) -> pd.DataFrame:
+        """该票全部交易日日K（停牌/上市前无行），索引 YYYYMMDD，volume 单位手"""
+        i = self.index.get(code)
+        if i is None:
+            return pd.DataFrame(columns=list(DAILY_FIELDS))
+        keep = ~self.halted[i]
+        dates = np.array(self.calendar)[keep]
+        return pd.DataFrame({
+            'time': np.array([date_ms(x) for x in dates], dtype=np.int64),
+            'open': self.open[i, keep], 'high': self.high[i, keep], 'low': self.low[i, keep],
+            'close': self.close[i, keep], 'volume': self.volume[i, keep], 'amount': self.amount[i, keep],
+            'settelementPrice': 0.0, 'openInterest': 0, 'preClose': self.pre_close[i, keep],
+            'suspendFlag': 0,
+        }, index=pd.Index(dates))
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Tick / 1m
+    # ─────────────────────────────────────────────────────────────────────────
+    def ticks(self, code: str, date: str) -> pd.DataFrame:
+        """当日 Tick（停牌/非交易日为空表），与日K收盘价、成交量、成交额对齐"""
+        key = (code, date)
+        cached = self._tick_cache.get(key)
+        if cached is not None:
+            self._tick_cache.move_to_end(key)
+            return cached
+        df = self._gen_ticks(code, date)
+        self._tick_cache[key] = df
+        if len(self._tick_cache) > self._tick_cache_size:
+            self._tick_cache.popitem(last=False)
+        return df
+
+    def _gen_ticks(self, code: str, date: str) -> pd.DataFrame:
+        if not self.trading(code, date):
+            return pd.DataFrame(columns=list(TICK_FIELDS))
+        i, j = self.index[code], self._day_index[date]
+        rng = np.random.default_rng([self.seed, i, j])
+        pre, o, h, l, c = (float(a[i, j]) for a in (self.pre_close, self.open, self.high, self.low, self.close))
+        up, down = float(self.up_stop[i, j]), float(self.down_stop[i, j])
+        na, total = self._n_auction, len(self._offsets)
+        n = total - na - 1                      # 连续竞价行数
+
+        # 价格：开→收布朗桥，拉伸到 [low, high]；涨停日封板后钉死
+        steps = rng.standard_normal(n)
+        walk = np.concatenate([[0.0], np.cumsum(steps[1:])])
+        t = np.linspace(0, 1, n)
+        bridge = walk - t * walk[-1]
+        seal = n
+        if self.limit_up_day[i, j]:
+            seal = int(rng.integers(n // 10, n - 1))
+            t_seal = np.linspace(0, 1, seal)
+            bridge = np.concatenate([bridge[:seal] - t_seal * bridge[seal - 1], np.zeros(n - seal)])
+            base = np.concatenate([o + (c - o) * t_seal, np.full(n - seal, c)])
+        else:
+            base = o + (c - o) * t
+        span = max(h - l, 0.01)
+        scale = span / max(np.ptp(bridge), 1e-9) * 0.8
+        price = np.clip(_round2(base + bridge * scale), l, h)
+        price[0], price[-1] = o, c
+        if n > 4 and seal == n:
+            price[rng.integers(1, n - 1)] = h
+            price[rng.integers(1, n - 1)] = l
+        price[seal:] = c
+
+        # 量：U 形强度 × 噪声，集合竞价约 3%
+        vol_total, amt_total = float(self.volume[i, j]), float(self.amount[i, j])
+        auction_vol = np.floor(vol_total * 0.03)
+        intensity = (1.0 + 2.5 * (t - 0.5) ** 2 * 4) * rng.gamma(2.0, 0.5, n)
+        cum = np.floor(auction_vol + np.cumsum(intensity) / intensity.sum() * (vol_total - auction_vol))
+        cum[-1] = vol_total
+        incr = np.diff(np.concatenate([[auction_vol], cum]))
+        amt = auction_vol * 100 * o + np.concatenate([[0.0], np.cumsum(incr * 100 * price)])
+        amt *= amt_total / amt[-1] if amt[-1] > 0 else 1.0
+
+        # 拼上集合竞价段（未撮合：价 0 量 0）与 09:25 撮合行
+        last = np.concatenate([np.zeros(na), [o], price])
+        volume = np.concatenate([np.zeros(na), [auction_vol], cum])
+        amount = np.maximum.accumulate(np.round(np.concatenate([np.zeros(na), amt]), 2))
+        traded = last > 0
+        high = np.where(traded, np.maximum.accumulate(np.where(traded, last, 0)), 0)
+        low = np.where(traded, np.minimum.accumulate(np.where(traded, last, np.inf)), 0)
+        opened = np.where(traded, o, 0)
+
+        # 五档：bid1 = 最新价，ask1 = +1分；涨停卖盘空、跌停买盘空
+        ref = np.where(traded, last, pre)
+        levels = np.arange(5) * 0.01
+        bid = np.clip(_round2(ref[:, None] - levels), down, up)
+        ask = _round2(ref[:, None] + 0.01 + levels)
+        ask[ask > up + 1e-9] = 0.0
+        bid_vol = rng.integers(5, 800, (total, 5)).astype(np.float64)
+        ask_vol = np.where(ask > 0, rng.integers(5, 800, (total, 5)), 0).astype(np.float64)
+        sealed = ref >= up - 1e-9
+        bid_vol[sealed, 0] *= 50
+
+        times = date_ms(date) + self._offsets
+        return pd.DataFrame({
+            'time': times, 'lastPrice': last, 'open': opened, 'high': high, 'low': low,
+            'lastClose': pre, 'amount': amount, 'volume': volume, 'pvolume': volume * 100,
+            'stockStatus': np.where(traded, 3, 2), 'transactionNum': np.floor(volume / 7),
+            'askPrice': list(ask), 'bidPrice': list(bid), 'askVol': list(ask_vol), 'bidVol': list(bid_vol),
+        })
+
+    def minute_bars(self, code: str, date: str) -> pd.DataFrame:
+        """当日 1m（由 Tick 聚合，标签为分钟结束时刻，09:30 首笔并入 09:31）"""
+        ticks = self.ticks(code, date)
+        cols = ['time', 'open', 'high', 'low', 'close', 'volume', 'amount', 'preClose']
+        if ticks.empty:
+            return pd.DataFrame(columns=cols)
+        base = date_ms(date)
+        t = ticks['time'].to_numpy() - base
+        cont = t >= _hms_ms('093000')
+        label = np.ceil(t[cont] / 60000).astype(np.int64) * 60000
+        label = np.maximum(label, _hms_ms('093100'))
+        label = np.where(label == _hms_ms('130000'), _hms_ms('130100'), label)
+        g = pd.DataFrame({'label': label, 'p': ticks['lastPrice'].to_numpy()[cont],
+                          'v': ticks['volume'].to_numpy()[cont], 'a': ticks['amount'].to_numpy()[cont]})
+        agg = g.groupby('label').agg(open=('p', 'first'), high=('p', 'max'), low=('p', 'min'),
+                                     close=('p', 'last'), cv=('v', 'last'), ca=('a', 'last'))
+        prev_v = float(ticks['volume'].to_numpy()[~cont][-1]) if (~cont).any() else 0.0
+        prev_a = float(ticks['amount'].to_numpy()[~cont][-1]) if (~cont).any() else 0.0
+        bars = pd.DataFrame({
+            'time': agg.index.to_numpy() + base, 'open': agg['open'].to_numpy(), 'high': agg['high'].to_numpy(),
+            'low': agg['low'].to_numpy(), 'close': agg['close'].to_numpy(),
+            'volume': np.diff(np.concatenate([[prev_v], agg['cv'].to_numpy()])),
+            'amount': np.diff(np.concatenate([[prev_a], agg['ca'].to_numpy()])),
+            'preClose': float(ticks['lastClose'].iloc[0]),
+        })
+        bars.index = pd.Index([
+            pd.Timestamp(x, unit='ms', tz='Asia/Shanghai').strftime('%Y%m%d%H%M%S') for x in bars['time']])
+        return bars
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 实时快照
+    # ─────────────────────────────────────────────────────────────────────────
+    def snapshot(self, codes: Sequence[str], now_ms: int) -> Dict[str, Dict]:
+        """now_ms 时刻的 get_full_tick 快照（盘前为昨收静态快照；停牌/未知代码不返回）"""
+        date = pd.Timestamp(now_ms + _BEIJING_OFFSET_MS, unit='ms').strftime('%Y%m%d')
+        out = {}
+        for code in codes:
+            ticks = self.ticks(code, date)
+            if ticks.empty:
+                continue
+            k = int(np.searchsorted(ticks['time'].to_numpy(), now_ms, side='right')) - 1
+            row = ticks.iloc[max(k, 0)]
+            snap = {f: row[f].item() for f in TICK_FIELDS if f not in ('askPrice', 'bidPrice', 'askVol', 'bidVol')}
+            for f in ('askPrice', 'bidPrice', 'askVol', 'bidVol'):
+                snap[f] = [float(x) for x in row[f]]
+            if k < 0:
+                snap.update(lastPrice=0.0, volume=0.0, amount=0.0, pvolume=0.0, open=0.0, high=0.0, low=0.0,
+                            time=int(ticks['time'].iloc[0]))
+            snap['time'] = int(snap['time'])
+            snap['timetag'] = pd.Timestamp(snap['time'] + _BEIJING_OFFSET_MS, unit='ms').strftime('%Y%m%d %H:%M:%S')
+            out[code] = snap
+        return out
+
+    def checksum(self) -> int:
+        """日K全量 crc32（跨进程/机器确定性自检）"""
+        return zlib.crc32(np.ascontiguousarray(self.close).tobytes())
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+仿真 xtquant 包（sim.install() 后 `import xtquant` 解析到这里）
+
+Author: CTO
+Date: 2026-03-18
+"""
+__version__ = 'sim'
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+仿真 xtquant.xtdata：模块级属性全部转发到 sim.get_fake_xtdata() 单例
+
+Author: CTO
+Date: 2026-03-18
+"""
+import sys
+from pathlib import Path
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+
+enable_hello = True
+
+
+def __getattr__(name):
+    if name.startswith('__'):
+        raise AttributeError(name)
+    from sim import get_fake_xtdata
+
+    return getattr(get_fake_xtdata(), name)
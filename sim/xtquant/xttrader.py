@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+仿真 xtquant.xttrader：仿真环境不下单，connect 恒返回 -1（同交易端未登录）
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+
+class XtQuantTraderCallback:
+    pass
+
+
+class XtQuantTrader:
+    def __init__(self, path: str = '', session: int = 0, *args, **kwargs):
+        self.path = path
+        self.session = session
+
+    def register_callback(self, callback) -> None:
+        pass
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def connect(self) -> int:
+        return -1
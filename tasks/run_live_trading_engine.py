@@ -212,6 +212,7 @@ class LiveTradingEngine:
         # event_bus参数保留仅为向后兼容，内部已不使用（大道至简重构）
         self.event_bus = None
         self.watchlist = []
+        self.auction_table = None  # 【CTO V233】09:25 竞价列式表（AuctionTable）
         self.running = False
         self.volume_percentile = volume_percentile
         
@@ -242,8 +243,9 @@ class LiveTradingEngine:
         
         # 【CTO V87 L1真实微积分】Tick差分流入累加器状态机
         # 废除power_ratio估算，使用真实的delta_amount和delta_price计算流入
-        # {stock_code: {'inflow': float, 'last_amount': float, 'last_price': float}}
-        self.l1_inflow_accumulator: Dict[str, Dict[str, float]] = {}
+        # 数组化线程安全实现，兼容 {stock_code: {'inflow', 'last_amount', 'last_price'}} 读取接口
+        from logic.core.l1_flow import L1FlowAccumulator
+        self.l1_inflow_accumulator: L1FlowAccumulator = L1FlowAccumulator()
         
         # 【CTO V46架构大一统】持仓管理 - 使用ExitManager统一止损逻辑
         # positions: {stock_code: ExitManager实例}
@@ -292,6 +294,12 @@ class LiveTradingEngine:
         # 假设系统3秒推一个Tick，3分钟=60帧。彻底消灭datetime.now()时间流速精神分裂！
         self.global_tick_frame: int = 0
         
+        # 【V1.1增量快照】由 SessionSnapshot.start_auto_snapshot 注入，主循环帧边界移交增量
+        self.session_snapshot = None
+        
+        # 【CTO V231全日回放】由 run_intraday_replay 注入，主循环每圈开头推进回放时钟
+        self._replay = None
+        
         # 【CTO V53时间沙盒】统一时间获取入口
         # - Live模式：返回系统当前时间
         # - Scan模式：返回模拟时间（由Tick时间戳驱动）
@@ -376,7 +384,8 @@ class LiveTradingEngine:
         
         # 【P0修复】动态粗筛补充状态变量
         self._last_universe_refresh_time: Optional[datetime] = None
-        self._universe_refresh_interval_min: int = 15
+        self._universe_refresh_interval_min: int = 1
+        self._live_universe = None  # LiveUniverseMaintainer，启动/盘前由 _prepare_live_universe 构建
         
         # ==================== 【CTO V213 数据防腐层】TickAdapter依赖注入 ====================
         # 根据mode注入不同的Adapter，斩断主引擎与xtdata的直接耦合
@@ -430,6 +439,8 @@ class LiveTradingEngine:
             
         Returns:
             {stock_code: tick_dict} QMT原生格式字典
+            【CTO V230】实际返回 TickBatch 的惰性只读视图，
+            只有被访问的票才物化成 to_qmt_dict() 同口径的 dict
         """
         result = {}
         
@@ -439,15 +450,12 @@ class LiveTradingEngine:
             return result
         
         try:
-            standard_ticks = self.tick_adapter.get_ticks(stock_codes)
-            if standard_ticks:
-                # 【CTO V214】使用to_qmt_dict()返回完整QMT兼容格式
-                for code, tick in standard_ticks.items():
-                    result[code] = tick.to_qmt_dict()
+            # 【CTO V230】列式帧，不再逐票构造StandardTick和字典
+            return self.tick_adapter.get_frame(stock_codes).as_qmt_dicts()
         except Exception as e:
             # 【CTO V215】Adapter失败时记录错误，返回空字典
             # 绝不偷偷绕过防腐层！
-            logger.error(f"[TickAdapter] get_ticks失败: {e}")
+            logger.error(f"[TickAdapter] get_frame失败: {e}")
         
         return result
     
@@ -754,9 +762,8 @@ class LiveTradingEngine:
         2. L2上帝视角(十档)和L1刺刀模式(五档)自动降级
         3. 三次方失衡算子(Imbalance^3)放大深层盘口意图
         
-        [WARN] [ARCHITECTURE WARNING] l1_inflow_accumulator 是有状态字典，挂载在实例上
-        当前为单线程串行安全，若引入多线程必须替换为 threading.local() 或对象池
-        禁止在未做线程隔离的情况下并发调用此方法
+        状态由 L1FlowAccumulator 持有（数组化、写操作加锁、snapshot() 并发读），
+        整批更新请用 self.l1_inflow_accumulator.update_from_ticks()
         
         Args:
             stock_code: 股票代码
@@ -770,71 +777,9 @@ class LiveTradingEngine:
         Returns:
             真实净流入估算值
         """
-        # 初始化该股票的累加器
-        if stock_code not in self.l1_inflow_accumulator:
-            self.l1_inflow_accumulator[stock_code] = {
-                'inflow': 0.0,
-                'last_amount': current_amount,
-                'last_price': current_price
-            }
-            # 首次调用：无历史数据，回退到power_ratio估算作为初始值
-            price_range = tick_high - tick_low
-            if price_range > 0 and pre_close > 0:
-                power_ratio = (current_price - pre_close) / price_range
-                power_ratio = max(-1.0, min(power_ratio, 1.0))
-            else:
-                power_ratio = 1.0 if current_price > pre_close else -1.0
-            initial_inflow = current_amount * power_ratio * 0.5
-            self.l1_inflow_accumulator[stock_code]['inflow'] = initial_inflow
-            return initial_inflow
-        
-        acc = self.l1_inflow_accumulator[stock_code]
-        last_amount = acc['last_amount']
-        last_price = acc['last_price']
-        
-        # 计算真实增量
-        delta_amount = current_amount - last_amount
-        delta_price = current_price - last_price
-        
-        if delta_amount > 0:  # 有新成交
-            if delta_price > 0:
-                # 向上吃单，绝对做多
-                acc['inflow'] += delta_amount
-            elif delta_price < 0:
-                # 向下砸盘，绝对做空
-                acc['inflow'] -= delta_amount
-            else:
-                # === 价格僵持段：L2/L1 自适应盘口重力推断 ===
-                imbalance = 0.0
-                if tick:
-                    ask_list = tick.get('askVol', [])
-                    bid_list = tick.get('bidVol', [])
-                    
-                    # 动态嗅探：鸭子类型降级 (Duck Typing Degradation)
-                    if isinstance(ask_list, list) and len(ask_list) >= 10:
-                        # 👑 【L2 上帝视角】十档重力场全解析
-                        total_ask = sum(ask_list[:10])
-                        total_bid = sum(bid_list[:10])
-                    else:
-                        # ⚔️ 【L1 刺刀模式】无缝降级至五档推断
-                        total_ask = sum([tick.get(f'askVol{i}', 0) for i in range(1, 6)]) if not ask_list else sum(ask_list[:5])
-                        total_bid = sum([tick.get(f'bidVol{i}', 0) for i in range(1, 6)]) if not bid_list else sum(bid_list[:5])
-
-                    if total_bid + total_ask > 0:
-                        # 引入盘口引力非线性偏置 (Imbalance^3)
-                        # 过滤噪音，将主力真实的深层压单/托单意图指数级放大！
-                        imbalance = (total_bid - total_ask) / (total_bid + total_ask)
-                        directional_force = imbalance ** 3 if imbalance > 0 else -((-imbalance) ** 3)
-                        acc['inflow'] += delta_amount * directional_force
-                # 如果没有tick数据，使用价格位置推断
-                elif pre_close > 0:
-                    price_position = (current_price - pre_close) / pre_close
-                    direction = max(-1.0, min(1.0, price_position * 10))
-                    acc['inflow'] += delta_amount * direction
-
-        acc['last_amount'] = current_amount
-        acc['last_price'] = current_price
-        return acc['inflow']
+        return self.l1_inflow_accumulator.update(
+            stock_code, current_amount, current_price, pre_close, tick_high, tick_low, tick
+        )
     
     def _reset_l1_accumulator(self, stock_code: str = None):
         """
@@ -880,7 +825,7 @@ class LiveTradingEngine:
     
     def _maybe_refresh_universe(self, current_time: datetime):
         """
-        【P0修复】动态粗筛补充 - 每15分钟重扫全市场
+        【P0修复】动态粗筛补充 - 每分钟增量重评估全市场
 
         解决问题：09:30一次性建立粗筛池后，下午新出现动能的票
         无法进入candidate_pool，导致14:27仅剩72只的断崖现象。
@@ -888,8 +833,11 @@ class LiveTradingEngine:
         设计原则：
         - 只新增，不重置：已在candidate/opportunity/eliminated的票保持原状态
         - 宽进标准：只要有量有价格动能就进候选池
-        - 每15分钟执行一次，不阻塞主循环（O(n)扫描，约100ms）
+        - 静态漏斗输入（ST/均量/均额/60日高）在启动/盘前由 _prepare_live_universe 计算一次，
+          主循环只用全推Tick表向量化重评估日内条件，按成员增量补充（毫秒级）
         """
+        if self._live_universe is None:
+            return
         if self._last_universe_refresh_time is None:
             self._last_universe_refresh_time = current_time
             return
@@ -899,14 +847,13 @@ class LiveTradingEngine:
             return
 
         try:
-            from logic.data_providers.universe_builder import UniverseBuilder
-            # 【CTO V206】修复mode传参Bug：UniverseBuilder.__init__不接受mode参数
-            new_pool, _ = UniverseBuilder(
-                target_date=self.target_date
-            ).build()
+            maintainer = self._live_universe
+            # 实盘直接读全推Tick表；回放/扫描经由 tick_adapter 获取当前帧
+            ticks = None if self.mode == 'live' else self.get_tick_snapshot(maintainer.codes)
+            delta = maintainer.refresh(ticks)
 
             new_count = 0
-            for code in new_pool:
+            for code in delta.added:
                 if (code not in self.candidate_pool and
                         code not in self.opportunity_pool and
                         code not in self.eliminated_pool):
@@ -920,9 +867,11 @@ class LiveTradingEngine:
             if new_count > 0:
                 logger.info(
                     f"🔄 [动态补充] 粗筛池新增 {new_count} 只票 "
-                    f"(候选池: {len(self.candidate_pool)} | "
+                    f"(粗筛成员: {delta.size} | 移出: {len(delta.removed)} | "
+                    f"候选池: {len(self.candidate_pool)} | "
                     f"机会池: {len(self.opportunity_pool)} | "
-                    f"剔除池: {len(self.eliminated_pool)})"
+                    f"剔除池: {len(self.eliminated_pool)} | "
+                    f"耗时: {delta.elapsed_ms:.1f}ms)"
                 )
 
             self._last_universe_refresh_time = current_time
@@ -931,6 +880,64 @@ class LiveTradingEngine:
             logger.warning(f"[WARN] 动态补充粗筛池失败: {e}")
             self._last_universe_refresh_time = current_time  # 失败也更新时间，避免死循环
 
+    def _prepare_live_universe(self):
+        """
+        【P0修复】启动/盘前构建增量粗筛池的静态输入（日K分块读取，秒级）
+
+        只在进入雷达主循环之前调用，主循环里 _maybe_refresh_universe 只做 refresh()，
+        不会在盘中第一次刷新时卡住一帧。准备失败只告警，盘中不再补充候选池。
+        """
+        if self._live_universe is not None:
+            return
+        try:
+            from logic.data_providers.live_universe import LiveUniverseMaintainer
+            maintainer = LiveUniverseMaintainer(target_date=self.target_date)
+            if not maintainer.prepare():
+                logger.warning("[WARN] [LiveUniverse] 静态输入准备失败，盘中不做增量粗筛")
+                return
+            self._live_universe = maintainer
+        except Exception as e:
+            logger.warning(f"[WARN] [LiveUniverse] 静态输入准备异常: {e}")
+
+    def run_intraday_replay(self, replay):
+        """
+        【CTO V231】全日Tick时间压缩回放
+        
+        与 run_historical_stream 只喂收盘一帧不同，这里逐帧驱动真正的
+        _run_radar_main_loop（与实盘同一条代码路径），时钟由 IntradayReplay 推进。
+        
+        Args:
+            replay: IntradayReplay（已 load 全日Tick）
+            
+        Returns:
+            dict: 回放进度与吞吐统计（未能启动时为 None）
+        """
+        if self.mode != 'scan':
+            logger.warning("[WARN] 全日回放仅适用于Scan模式")
+            return
+        if not self.watchlist:
+            self.watchlist = list(replay.adapter.loaded_codes)
+        if not self.watchlist:
+            logger.warning("[WARN] 回放标的为空！")
+            return
+        if not replay.total_frames:
+            logger.warning("[WARN] 回放时钟为空（无本地Tick）")
+            return
+        
+        self._replay = replay
+        self.running = True
+        self.enable_dynamic_radar = True
+        try:
+            # 先把模拟时间对到回放日，TrueDictionary 按回放日预热
+            self.set_mock_time(datetime.strptime(replay.adapter.target_date, '%Y%m%d').replace(hour=9, minute=30))
+            self._warmup_true_dictionary()
+            self._prepare_live_universe()
+            self._run_radar_main_loop()
+        finally:
+            self._replay = None
+            self.running = False
+        return replay.get_stats()
+    
     def run_historical_stream(self, tick_stream: list):
         """
         【CTO V61 绝对同源版】Scan模式专属引擎
@@ -1196,6 +1203,8 @@ class LiveTradingEngine:
                         'price_momentum': debug_metrics.get('price_momentum', 0.0),
                         # 【CTO V225】盘口深度比 - 从防腐层已清洗的字典中获取
                         'depth_ratio': depth_ratio_val,
+                        # 【CTO V233 竞价列式表】竞价MFE/高开/考核，与实盘 09:25 同口径
+                        **self._auction_audit(stock_code),
                     }
                     current_top_targets.append(target_entry)
                     
@@ -1482,6 +1491,7 @@ class LiveTradingEngine:
             print("[FAST] Step 2: 预热TrueDictionary（必须在快照筛选之前！）...")
             logger.info("[FAST] Step 2: 预热TrueDictionary（必须在快照筛选之前！）...")
             self._warmup_true_dictionary()
+            self._prepare_live_universe()
             print("[FAST] Step 2: 预热完成")
             
             # Step 3: 执行第三斩（开盘快照筛选），筛选强势股
@@ -1621,10 +1631,36 @@ class LiveTradingEngine:
         
         原逻辑：过滤低开/无量/一字板等，破坏SSOT。
         新逻辑：直接return，让打分引擎自然淘汰。
+
+        【CTO V233 竞价列式表】09:25 只做一次整帧采集：TickBatch → AuctionTable，
+        竞价额/占流通市值/高开幅度/MFE 全市场向量化算好挂在 self.auction_table 并落盘，
+        雷达打分结果经 _auction_audit 挂竞价审计字段；扫描/回测经 AuctionTable.get
+        读同一份口径。依旧不切除任何票。
         """
         logger.info("[SSOT] 竞价快照过滤已关闭，维持UniverseBuilder原始底池。")
+        try:
+            from logic.data_providers.auction_table import AuctionTable
+
+            codes = self.watchlist
+            if not codes:
+                from xtquant import xtdata
+                codes = xtdata.get_stock_list_in_sector('沪深A股')
+            if not codes or self.tick_adapter is None:
+                return
+            trade_date = self.get_current_time().strftime('%Y%m%d')
+            self.auction_table = AuctionTable.from_tick_batch(trade_date, self.tick_adapter.get_frame(codes))
+            self.auction_table.save()
+            logger.info(f"[OK] [AuctionTable] {self.auction_table.summary()}")
+        except Exception as e:
+            logger.warning(f"[WARN] [AuctionTable] 竞价表采集失败: {e}")
         return
 
+    def _auction_audit(self, stock_code: str) -> dict:
+        """打分结果挂载的竞价审计字段（无竞价表时为空，不影响打分）"""
+        if self.auction_table is None:
+            return {}
+        return self.auction_table.audit(stock_code)
+
     def _fallback_premarket_scan(self):
         """
         【CTO修复】回退方案：使用QMTEventAdapter快照获取基础股票池
@@ -1663,6 +1699,9 @@ class LiveTradingEngine:
         
         # 预热TrueDictionary（获取涨停价/流通盘等静态数据，唯一真理源！）
         self._warmup_true_dictionary()
+        
+        # 增量粗筛池静态输入同在盘前准备，盘中只刷新
+        self._prepare_live_universe()
     
     def _warmup_true_dictionary(self):
         """预热TrueDictionary - 获取涨停价等静态数据 - CTO加固：容错机制"""
@@ -1682,8 +1721,8 @@ class LiveTradingEngine:
             result = true_dict.warmup(warmup_stocks, target_date=target_date)
             
             if result['integrity']['is_ready']:
-                atr_count = len(true_dict._atr_20d_map) if hasattr(true_dict, '_atr_20d_map') else 0
-                prev_close_count = len(true_dict._prev_close_cache) if hasattr(true_dict, '_prev_close_cache') else 0
+                atr_count = true_dict.field_count('atr_20d')
+                prev_close_count = true_dict.field_count('prev_close')
                 logger.info(
                     f"[OK] TrueDictionary装弹完成: "
                     f"涨停价{result['qmt'].get('success', 0)}只, "
@@ -1918,8 +1957,8 @@ class LiveTradingEngine:
         for i in range(0, len(self.watchlist), batch_size):
             batch = self.watchlist[i:i+batch_size]
             try:
-                # 【CTO V7】盘中才需订阅，非交易日/盘后跳过
-                if is_trading and not is_after_hours_init:
+                # 【CTO V7】盘中才需订阅，非交易日/盘后/回放跳过
+                if is_trading and not is_after_hours_init and self._replay is None:
                     xtdata.subscribe_whole_quote(batch)
                 # 轻碰一下接口，建立内存通道即可
                 self.get_tick_snapshot(batch)
@@ -1943,11 +1982,16 @@ class LiveTradingEngine:
                 # 【CTO V39战役三】统一时间流 - Tick帧计数！
                 self.global_tick_frame += 1
                 
+                # 【CTO V231全日回放】推进回放时钟并对齐模拟时间
+                if self._replay is not None and not self._replay.step(self):
+                    logger.info("[STOP] 全日回放结束")
+                    break
+                
                 # 检查交易时间
                 now = self.get_current_time()
                 current_time = now.time()
                 
-                # 【P0修复】动态粗筛补充 - 每15分钟重扫全市场
+                # 【P0修复】动态粗筛补充 - 每分钟增量重评估全市场
                 self._maybe_refresh_universe(now)
                 
                 # 【CTO V5】午休期间：保持挂起，显示缓存
@@ -2040,7 +2084,11 @@ class LiveTradingEngine:
                                 mid_minutes = max(5, (now - now.replace(hour=9, minute=30, second=0)).total_seconds() / 60)
                                 
                                 # 【CTO V185 量纲注释】vol和avg_volume_5d单位都是手，量比计算正确
-                                mid_df['avg_v_5d'] = mid_df['code'].map(lambda x: true_dict.get_avg_volume_5d(x)).replace(0, pd.NA)
+                                # 【CTO V233 数组化字典】整列一次 gather，替代逐行 map(lambda)
+                                mid_ids = true_dict.get_symbol_ids(mid_df['code'])
+                                mid_df['avg_v_5d'] = pd.Series(
+                                    true_dict.get_avg_volume_5d_batch(mid_ids), index=mid_df.index
+                                ).replace(0, pd.NA)
                                 mid_df['vr'] = (mid_df['vol'] / mid_minutes * 240) / mid_df['avg_v_5d']
                                 mid_df['chg'] = (mid_df['p'] - mid_df['pre_c']) / mid_df['pre_c'] * 100
                                 
@@ -2173,6 +2221,12 @@ class LiveTradingEngine:
                 market_total_inflow = 0.0
                 first_pass_inflow_cache = {}  # 缓存每只股票的净流入
                 
+                # 【CTO V93 L2/L1智能微积分】价格僵持时使用盘口重力推断
+                # 整个观察池一次性向量化更新 Tick 差分状态机
+                batch_inflows = self.l1_inflow_accumulator.update_from_ticks(
+                    {code: all_ticks.get(code) for code in self.watchlist}
+                )
+                
                 for stock_code in self.watchlist:
                     tick = all_ticks.get(stock_code)
                     if not tick:
@@ -2181,15 +2235,8 @@ class LiveTradingEngine:
                     current_price = tick.get('lastPrice', 0)
                     pre_close = tick.get('lastClose', 0)
                     current_amount = tick.get('amount', 0)  # 今日累计成交额（元）
-                    tick_high = tick.get('high', current_price)
-                    tick_low = tick.get('low', current_price)
                     
-                    # 【CTO V93 L2/L1智能微积分】价格僵持时使用盘口重力推断
-                    # 使用Tick差分状态机计算真实净流入
-                    net_inflow_est = self._calculate_l1_inflow(
-                        stock_code, float(current_amount), float(current_price), 
-                        float(pre_close), float(tick_high), float(tick_low), tick
-                    )
+                    net_inflow_est = batch_inflows[stock_code]
                     
                     # 【CTO V180.1】删除手工累加器代码块！
                     # 原代码在_calculate_l1_inflow后又手动操作accumulator，覆盖了智能算子结果
@@ -2573,6 +2620,8 @@ class LiveTradingEngine:
                                 'velocity': debug_metrics.get('velocity', 0.0),
                                 # 【CTO V210-T2】致命修复：添加price_momentum
                                 'price_momentum': debug_metrics.get('price_momentum', 0.0),
+                                # 【CTO V233 竞价列式表】读 09:25 采集的 self.auction_table
+                                **self._auction_audit(stock_code),
                             })
                     except Exception:
                         continue
@@ -2713,8 +2762,13 @@ class LiveTradingEngine:
                 # 战地收尸
                 self._update_daily_battle_report(current_top_targets)
                 
+                # 【V1.1增量快照】帧边界移交不可变增量（序列化/IO在后台写线程）
+                if self.session_snapshot is not None:
+                    self.session_snapshot.capture_frame(self)
+                
                 # 【CTO V31物理阻断】非交易日或盘后，渲染一次即为定格，严禁陷入死循环空转！
-                if is_after_hours or not is_trading:
+                # 【CTO V231】回放时由回放时钟决定终点（盘后一帧仍定格退出）
+                if is_after_hours or (not is_trading and self._replay is None):
                     logger.info("[STOP] 盘后定格投影完毕，系统安全挂起。")
                     self.running = False  # 斩断死循环
                     self._skip_final_report = True  # 【CTO V32】跳过stop中的战报打印，避免重复
@@ -3275,12 +3329,12 @@ class LiveTradingEngine:
             from logic.data_providers.true_dictionary import get_true_dictionary
             true_dict = get_true_dictionary()
             
-            df['up_stop_price'] = df['stock_code'].map(
-                lambda x: true_dict.get_up_stop_price(x) if true_dict else 0.0
-            )
+            # 【CTO V233 数组化字典】代码一次换算为驻留id，各字段整列 gather
+            ids = true_dict.get_symbol_ids(df['stock_code'])
+            df['up_stop_price'] = true_dict.get_up_stop_price_batch(ids)
             
             # 5日均量数据
-            df['avg_volume_5d'] = df['stock_code'].map(true_dict.get_avg_volume_5d)
+            df['avg_volume_5d'] = true_dict.get_avg_volume_5d_batch(ids)
             
             # ?? CTO裁决修复：引入时间进度加权，防止盘中量比失真
             # 量比 = 估算全天成交量 / 5日平均成交量
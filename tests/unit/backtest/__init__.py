@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+回测/回放层单元测试初始化
+"""
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+IntradayReplay 单元测试
+
+测试全局事件时钟归并、逐帧推进与倍速节拍
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.backtest.intraday_replay import IntradayReplay
+from logic.data_providers.tick_adapters import MockTickAdapter
+
+# 2026-03-18 09:30:00 北京时间（毫秒）
+T0 = 1773797400000
+
+
+def _ticks(offsets_s, price=10.0):
+    n = len(offsets_s)
+    return pd.DataFrame({
+        'time': [T0 + int(s * 1000) for s in offsets_s],
+        'lastPrice': [price + 0.01 * i for i in range(n)],
+        'volume': list(range(100, 100 * (n + 1), 100)),
+        'amount': [1e4 * (i + 1) for i in range(n)],
+        'open': [price] * n, 'high': [price + 0.01 * i for i in range(n)], 'low': [price] * n,
+        'lastClose': [price] * n,
+    })
+
+
+class _FakeEngine:
+    def __init__(self):
+        self.times = []
+
+    def set_mock_time(self, t):
+        self.times.append(t)
+
+
+class TestIntradayReplay(unittest.TestCase):
+    """全日回放时钟"""
+
+    def _adapter(self, frames):
+        adapter = MockTickAdapter(target_date='20260318')
+        adapter.load_frames(frames)
+        return adapter
+
+    def test_merged_clock_counts_events(self):
+        """k路归并：帧为时间并集，每帧记录到达笔数"""
+        adapter = self._adapter({
+            'A': _ticks([0, 3, 6]),
+            'B': _ticks([0, 1, 6]),
+            'C': _ticks([6]),
+        })
+        self.assertEqual(adapter.frame_count, 4)
+        self.assertEqual(adapter._frame_events.tolist(), [2, 1, 1, 3])
+
+    def test_step_drives_engine_clock(self):
+        """逐帧推进并对齐引擎模拟时间，结束返回False"""
+        adapter = self._adapter({'A': _ticks([0, 3, 6]), 'B': _ticks([0, 1, 6])})
+        replay = IntradayReplay(adapter)
+        engine = _FakeEngine()
+        while replay.step(engine):
+            pass
+        self.assertEqual(engine.times[0], datetime(2026, 3, 18, 9, 30, 0))
+        self.assertEqual(engine.times[-1], datetime(2026, 3, 18, 9, 30, 6))
+        self.assertEqual(len(engine.times), 4)
+        stats = replay.get_stats()
+        self.assertEqual(stats['frames'], 4)
+        self.assertEqual(stats['ticks'], 6)
+        self.assertAlmostEqual(stats['progress'], 1.0)
+
+    def test_start_time_seeks(self):
+        """start_time 跳过更早的帧"""
+        adapter = self._adapter({'A': _ticks([0, 3, 6])})
+        replay = IntradayReplay(adapter, start_time='093002')
+        engine = _FakeEngine()
+        while replay.step(engine):
+            pass
+        self.assertEqual(engine.times[0], datetime(2026, 3, 18, 9, 30, 3))
+        self.assertEqual(len(engine.times), 2)
+
+    def test_speed_paces_and_caps_gaps(self):
+        """倍速节拍：长空窗按 MAX_GAP_S 封顶"""
+        # 0s → 2s → 2h后（午休式空窗）
+        adapter = self._adapter({'A': _ticks([0, 2, 7200])})
+        replay = IntradayReplay(adapter, speed=100.0)
+        replay.MAX_GAP_S = 5.0
+        engine = _FakeEngine()
+        t0 = time.perf_counter()
+        while replay.step(engine):
+            pass
+        elapsed = time.perf_counter() - t0
+        # 2s/100 + 5s/100 = 70ms，远小于不封顶的 72s
+        self.assertGreaterEqual(elapsed, 0.065)
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+MultiDateScan 单元测试
+
+测试多日结果合并为 (date, rank) 索引表、失败日隔离、进程扇出与串行结果一致，以及竞价表挂载
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.backtest import multi_date_scan
+from logic.backtest.multi_date_scan import merge_results, run_multi_date_scan
+
+
+def fake_scan(target_date):
+    """按日期确定性生成榜单（模块级函数，可被 spawn 子进程导入）"""
+    if target_date.endswith('13'):
+        raise RuntimeError('no data')
+    seed = int(target_date[-2:])
+    targets = [
+        {'code': f'{600000 + seed * 10 + k:06d}.SH', 'score': 90.0 - k * 5 - seed * 0.1,
+         'price': 10.0 + k, 'trigger_type': None}
+        for k in range(4)
+    ]
+    return {'date': target_date, 'pool': 100 + seed, 'ticks': 90 + seed,
+            'targets': targets, 'status': 'success', 'elapsed_s': 0.0}
+
+
+class TestMergeResults(unittest.TestCase):
+    """合并表"""
+
+    def test_index_and_top_n(self):
+        """日期升序、名次从1开始，每日截断 top_n，固定列在前"""
+        results = [fake_scan('20260312'), fake_scan('20260310')]
+        table = merge_results(results, top_n=3)
+        self.assertEqual(table.index.names, ['date', 'rank'])
+        self.assertEqual(list(table.index.get_level_values('date').unique()), ['20260310', '20260312'])
+        self.assertEqual(list(table.loc['20260310'].index), [1, 2, 3])
+        self.assertEqual(table.loc[('20260312', 1), 'code'], '600120.SH')
+        self.assertEqual(list(table.columns[:3]), ['code', 'score', 'price'])
+        self.assertIn('trigger_type', table.columns)
+
+    def test_empty(self):
+        """无达标标的返回空表但保留索引结构"""
+        table = merge_results([{'date': '20260310', 'targets': []}])
+        self.assertTrue(table.empty)
+        self.assertEqual(table.index.names, ['date', 'rank'])
+
+
+class TestRunMultiDateScan(unittest.TestCase):
+    """调度"""
+
+    DATES = ['20260312', '20260310', '20260311', '20260310']
+
+    def test_serial_dedupes_dates(self):
+        """串行模式日期去重排序，摘要逐日对应"""
+        table, summary = run_multi_date_scan(self.DATES, workers=1, top_n=2, scan_fn=fake_scan)
+        self.assertEqual([s['date'] for s in summary], ['20260310', '20260311', '20260312'])
+        self.assertEqual(len(table), 6)
+        self.assertTrue(all(s['status'] == 'success' for s in summary))
+
+    def test_failed_date_isolated(self):
+        """单日异常只标记该日失败，不影响其他日"""
+        def scan_fn(date):
+            try:
+                return fake_scan(date)
+            except RuntimeError as e:
+                return {'date': date, 'targets': [], 'status': 'failed', 'error': str(e)}
+
+        table, summary = run_multi_date_scan(['20260312', '20260313'], workers=1, scan_fn=scan_fn)
+        status = {s['date']: s['status'] for s in summary}
+        self.assertEqual(status, {'20260312': 'success', '20260313': 'failed'})
+        self.assertEqual(list(table.index.get_level_values('date').unique()), ['20260312'])
+
+    def test_process_pool_matches_serial(self):
+        """多进程结果与串行逐日结果完全一致"""
+        serial, _ = run_multi_date_scan(self.DATES, workers=1, scan_fn=fake_scan)
+        parallel, summary = run_multi_date_scan(self.DATES, workers=2, scan_fn=fake_scan)
+        self.assertTrue(parallel.equals(serial))
+        self.assertEqual(len(summary), 3)
+
+    def test_reset_process_state(self):
+        """每日开跑前清空 TrueDictionary / ConfigManager 单例与快照索引缓存"""
+        from logic.data_providers import true_dictionary
+        from logic.core import config_manager
+        from logic.utils import price_utils
+
+        first = true_dictionary.get_true_dictionary()
+        price_utils._snapshot_indexes['20260105'] = object()
+        multi_date_scan._reset_process_state()
+        self.assertIsNone(config_manager._config_manager)
+        self.assertEqual(price_utils._snapshot_indexes, {})
+        self.assertIsNot(true_dictionary.get_true_dictionary(), first)
+
+    def test_load_auction_table(self):
+        """扫描挂载当日竞价表；取不到时返回 None（只影响审计字段）"""
+        from logic.data_providers.auction_table import AuctionTable
+
+        table = AuctionTable('20260318', ['000001.SZ'], {'price': [10.5], 'pre_close': [10.0]})
+        with mock.patch.object(AuctionTable, 'get', return_value=table) as get:
+            self.assertIs(multi_date_scan.load_auction_table('20260318', ['000001.SZ']), table)
+        get.assert_called_once_with('20260318', ['000001.SZ'])
+        with mock.patch.object(AuctionTable, 'get', side_effect=OSError('no data')):
+            self.assertIsNone(multi_date_scan.load_auction_table('20260318', ['000001.SZ']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+L1FlowAccumulator 单元测试
+
+以原 _calculate_l1_inflow 嵌套字典实现为基准，验证单票/批量接口逐位一致，
+以及 Mapping 兼容、写版本、序列化与并发读
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import pickle
+import random
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.core.l1_flow import L1FlowAccumulator, book_totals
+
+
+def _reference_l1_inflow(acc_map, stock_code, current_amount, current_price,
+                         pre_close, tick_high, tick_low, tick=None):
+    """原 LiveTradingEngine._calculate_l1_inflow（嵌套字典版）"""
+    if stock_code not in acc_map:
+        acc_map[stock_code] = {'inflow': 0.0, 'last_amount': current_amount, 'last_price': current_price}
+        price_range = tick_high - tick_low
+        if price_range > 0 and pre_close > 0:
+            power_ratio = (current_price - pre_close) / price_range
+            power_ratio = max(-1.0, min(power_ratio, 1.0))
+        else:
+            power_ratio = 1.0 if current_price > pre_close else -1.0
+        initial_inflow = current_amount * power_ratio * 0.5
+        acc_map[stock_code]['inflow'] = initial_inflow
+        return initial_inflow
+
+    acc = acc_map[stock_code]
+    delta_amount = current_amount - acc['last_amount']
+    delta_price = current_price - acc['last_price']
+    if delta_amount > 0:
+        if delta_price > 0:
+            acc['inflow'] += delta_amount
+        elif delta_price < 0:
+            acc['inflow'] -= delta_amount
+        else:
+            if tick:
+                ask_list = tick.get('askVol', [])
+                bid_list = tick.get('bidVol', [])
+                if isinstance(ask_list, list) and len(ask_list) >= 10:
+                    total_ask = sum(ask_list[:10])
+                    total_bid = sum(bid_list[:10])
+                else:
+                    total_ask = sum([tick.get(f'askVol{i}', 0) for i in range(1, 6)]) if not ask_list else sum(ask_list[:5])
+                    total_bid = sum([tick.get(f'bidVol{i}', 0) for i in range(1, 6)]) if not bid_list else sum(bid_list[:5])
+                if total_bid + total_ask > 0:
+                    imbalance = (total_bid - total_ask) / (total_bid + total_ask)
+                    directional_force = imbalance ** 3 if imbalance > 0 else -((-imbalance) ** 3)
+                    acc['inflow'] += delta_amount * directional_force
+            elif pre_close > 0:
+                price_position = (current_price - pre_close) / pre_close
+                direction = max(-1.0, min(1.0, price_position * 10))
+                acc['inflow'] += delta_amount * direction
+    acc['last_amount'] = current_amount
+    acc['last_price'] = current_price
+    return acc['inflow']
+
+
+def _session(n_stocks=40, n_frames=200, seed=7):
+    """合成一段会话：价格常僵持，盘口混用十档/五档/逐档键格式"""
+    rng = random.Random(seed)
+    codes = [f'{i:06d}.SZ' for i in range(n_stocks)]
+    state = {c: [10.0 + rng.random() * 20, 0.0] for c in codes}
+    frames = []
+    for _ in range(n_frames):
+        frame = {}
+        for j, c in enumerate(codes):
+            if rng.random() < 0.1:
+                continue
+            price, amount = state[c]
+            r = rng.random()
+            if r < 0.3:
+                price = round(price + 0.01, 2)
+            elif r < 0.6:
+                price = round(price - 0.01, 2)
+            amount += rng.choice([0.0, rng.random() * 1e6])
+            state[c] = [price, amount]
+            tick = {'lastPrice': price, 'lastClose': 15.0 if j % 7 else 0.0, 'amount': amount,
+                    'high': price + rng.random(), 'low': price - rng.random() * (j % 3)}
+            fmt = j % 3
+            if fmt == 0:
+                tick['askVol'] = [rng.randint(0, 500) for _ in range(10)]
+                tick['bidVol'] = [rng.randint(0, 500) for _ in range(10)]
+            elif fmt == 1:
+                tick['askVol'] = [rng.randint(0, 500) for _ in range(5)]
+                tick['bidVol'] = [rng.randint(0, 500) for _ in range(5)]
+            else:
+                for k in range(1, 6):
+                    tick[f'askVol{k}'] = rng.randint(0, 500)
+                    tick[f'bidVol{k}'] = rng.randint(0, 500)
+            frame[c] = tick
+        frames.append(frame)
+    return frames
+
+
+def _args(tick):
+    p = float(tick.get('lastPrice', 0))
+    return (float(tick.get('amount', 0)), p, float(tick.get('lastClose', 0)),
+            float(tick.get('high', p)), float(tick.get('low', p)))
+
+
+class TestL1FlowEquivalence(unittest.TestCase):
+    """与原累加器逐位一致"""
+
+    def setUp(self):
+        self.frames = _session()
+
+    def test_scalar_matches_reference(self):
+        ref, acc = {}, L1FlowAccumulator()
+        for frame in self.frames:
+            for code, tick in frame.items():
+                expected = _reference_l1_inflow(ref, code, *_args(tick), tick)
+                self.assertEqual(acc.update(code, *_args(tick), tick), expected)
+        self.assertEqual({k: dict(v) for k, v in acc.items()}, ref)
+
+    def test_batch_matches_reference(self):
+        ref, acc = {}, L1FlowAccumulator()
+        for frame in self.frames:
+            expected = {c: _reference_l1_inflow(ref, c, *_args(t), t) for c, t in frame.items()}
+            self.assertEqual(acc.update_from_ticks(frame), expected)
+        self.assertEqual({k: dict(v) for k, v in acc.items()}, ref)
+
+    def test_batch_without_tick_uses_price_position(self):
+        """无Tick（has_book=False）时走价格位置推断"""
+        ref, acc = {}, L1FlowAccumulator()
+        for amount in (1e6, 2e6, 3e6):
+            expected = _reference_l1_inflow(ref, 'A', amount, 10.5, 10.0, 10.6, 9.9, None)
+            result = acc.update_batch(['A'], [amount], [10.5], [10.0], [10.6], [9.9])
+            self.assertEqual(float(result[0]), expected)
+
+
+class TestL1FlowMapping(unittest.TestCase):
+    """Mapping 兼容、序列化与并发读"""
+
+    def test_mapping_interface(self):
+        acc = L1FlowAccumulator()
+        acc['A'] = {'inflow': 1.0, 'last_amount': 2.0, 'last_price': 3.0}
+        acc['B'] = (4.0, 5.0, 6.0)
+        self.assertIn('A', acc)
+        self.assertEqual(len(acc), 2)
+        self.assertEqual(acc['B']['last_price'], 6.0)
+        del acc['A']
+        self.assertNotIn('A', acc)
+        acc['C'] = (7.0, 8.0, 9.0)   # 复用空闲下标
+        self.assertEqual(acc.snapshot(), {'B': (4.0, 5.0, 6.0), 'C': (7.0, 8.0, 9.0)})
+        acc.clear()
+        self.assertEqual(len(acc), 0)
+
+    def test_write_version(self):
+        """任何写操作递增写版本，只读不变"""
+        acc = L1FlowAccumulator()
+        seen = [acc.version]
+        for write in (lambda: acc.update('A', 1e6, 10.0, 9.5, 10.2, 9.4),
+                      lambda: acc.update_batch(['A', 'B'], [2e6, 1e6], [10.1, 9.0], [9.5, 9.5], [10.2, 9.6], [9.4, 8.9]),
+                      lambda: acc.__setitem__('C', (1.0, 2.0, 3.0)),
+                      lambda: acc.__delitem__('C'),
+                      acc.clear):
+            write()
+            self.assertGreater(acc.version, seen[-1])
+            seen.append(acc.version)
+        acc.snapshot()
+        acc.items()
+        self.assertEqual(acc.version, seen[-1])
+
+    def test_grow_and_pickle(self):
+        acc = L1FlowAccumulator()
+        for i in range(1000):
+            acc.update(f'{i:06d}', 1e6 + i, 10.0, 9.5, 10.2, 9.4)
+        clone = pickle.loads(pickle.dumps(acc))
+        self.assertEqual(clone.to_state(), acc.to_state())
+        self.assertEqual(len(clone), 1000)
+
+    def test_book_totals(self):
+        self.assertIsNone(book_totals({}))
+        self.assertEqual(book_totals({'askVol': [1] * 10, 'bidVol': [2] * 10}), (20.0, 10.0))
+        self.assertEqual(book_totals({'askVol1': 3, 'bidVol2': 4}), (4.0, 3.0))
+
+    def test_concurrent_snapshot_reads(self):
+        """写线程批量更新时，读线程拿到的快照始终完整"""
+        acc = L1FlowAccumulator()
+        codes = [f'{i:06d}' for i in range(300)]
+        stop = threading.Event()
+        errors = []
+
+        def reader():
+            while not stop.is_set():
+                snap = acc.snapshot()
+                if snap and len(snap) != len(codes):
+                    errors.append(len(snap))
+
+        acc.update_batch(codes, [1.0] * 300, [10.0] * 300, [9.0] * 300, [11.0] * 300, [9.0] * 300)
+        t = threading.Thread(target=reader)
+        t.start()
+        for k in range(200):
+            acc.update_batch(codes, [2.0 + k] * 300, [10.0 + k % 2] * 300, [9.0] * 300,
+                             [11.0] * 300, [9.0] * 300)
+        stop.set()
+        t.join()
+        self.assertEqual(errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+QuantileSketch 单元测试
+
+验证对数固定桶草图与 np.percentile 的相对误差不超过文档界 √γ-1（重尾量比分布、
+小样本、重复值）、非正值剔除、动态量比阈值草图路径与列表路径同口径（含数据不足
+兜底与 temporary_override 生效），以及引擎不传草图时保持 fixed_threshold
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.core.config_manager import get_config_manager
+from logic.strategies.kinetic_core_engine import KineticCoreEngine
+from logic.utils.quantile_sketch import QuantileSketch
+
+PS = (0.0, 0.01, 0.25, 0.5, 0.88, 0.9, 0.92, 0.95, 0.99, 1.0)
+
+
+def _market_ratios(n=5000, seed=0):
+    """对数正态主体 + 少量爆量尾巴 + 停牌 0 值，贴近全市场量比分布"""
+    rng = np.random.default_rng(seed)
+    ratios = rng.lognormal(0.0, 0.8, n)
+    ratios[: n // 50] *= rng.uniform(5, 50, n // 50)
+    ratios[-n // 100:] = 0.0
+    return ratios
+
+
+class TestQuantileSketch(unittest.TestCase):
+    """流式分位数草图误差界"""
+
+    def _assert_within_bound(self, values, sketch):
+        valid = values[values > 0]
+        bound = sketch.relative_error * (1 + 1e-9)
+        for p in PS:
+            exact = float(np.percentile(valid, p * 100))
+            self.assertLessEqual(abs(sketch.quantile(p) / exact - 1), bound, msg=f'p={p}')
+
+    def test_error_bound_vs_numpy(self):
+        for seed in range(5):
+            values = _market_ratios(seed=seed)
+            self._assert_within_bound(values, QuantileSketch().ingest(values))
+        self.assertLess(QuantileSketch().relative_error, 0.0023)
+
+    def test_small_and_duplicate_samples(self):
+        """小样本 / 大量重复值 / 单值仍在界内，端点夹到实际 min/max"""
+        coarse = QuantileSketch(bins_per_decade=32)
+        for values in (np.array([1.7]), np.array([2.0, 2.0, 2.0, 9.5]),
+                       np.repeat([0.5, 1.0, 3.0], [400, 300, 300]), np.linspace(0.01, 800, 37)):
+            self._assert_within_bound(values, coarse.ingest(values))
+            self.assertEqual((coarse.quantile(0), coarse.quantile(1)), (values.min(), values.max()))
+
+    def test_filters_invalid_and_empty(self):
+        sketch = QuantileSketch().ingest([0.0, -1.0, np.nan, np.inf, 2.0, 4.0])
+        self.assertEqual(len(sketch), 2)
+        self.assertTrue(np.isnan(QuantileSketch().ingest([]).quantile(0.5)))
+
+    def test_threshold_sketch_matches_list_path(self):
+        """动态阈值：草图路径与 np.percentile 列表路径同口径，override 与兜底照常生效"""
+        cfg = get_config_manager()
+        values = _market_ratios(seed=7) * 3
+        sketch = QuantileSketch().ingest(values)
+        for mode in ('live', 'backtest'):
+            exact = cfg.compute_volume_ratio_threshold(list(values), mode=mode)
+            approx = cfg.compute_volume_ratio_threshold(sketch, mode=mode)
+            self.assertLessEqual(abs(approx / exact - 1), sketch.relative_error * (1 + 1e-9))
+        with cfg.temporary_override({'volume_ratio_filter.backtest_percentile': 0.99}):
+            self.assertAlmostEqual(cfg.compute_volume_ratio_threshold(sketch, mode='backtest'),
+                                   max(sketch.quantile(0.99), 3.0))
+        fallback = float(cfg.get('volume_ratio_filter.fixed_threshold', 3.0))
+        self.assertEqual(cfg.compute_volume_ratio_threshold(QuantileSketch().ingest(values[:10])), fallback)
+
+    def test_engine_threshold_needs_explicit_sketch(self):
+        """引擎不传量比时恒为 fixed_threshold（无隐式全局帧），显式传草图才走动态阈值"""
+        engine = KineticCoreEngine()
+        cfg = get_config_manager()
+        fallback = float(cfg.get('volume_ratio_filter.fixed_threshold', 3.0))
+        sketch = QuantileSketch().ingest(_market_ratios(seed=3) * 4)
+        self.assertEqual(engine._get_volume_ratio_threshold(), fallback)
+        self.assertEqual(engine._get_volume_ratio_threshold(sketch, mode='live'),
+                         cfg.compute_volume_ratio_threshold(sketch, mode='live'))
+        self.assertGreater(engine._get_volume_ratio_threshold(sketch, mode='live'), fallback)
+        self.assertEqual(engine._get_volume_ratio_threshold(), fallback)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+数据提供层单元测试初始化
+"""
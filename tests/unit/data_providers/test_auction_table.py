@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+AuctionTable 单元测试
+
+验证向量化竞价MFE/考核与单票版逐只一致（含昨收缺失、一字板、万股口径等边界）、
+实盘 TickBatch 与快照 dict 两个入口同口径、历史 CSV 导入、落盘往返、排序
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.auction_table import AuctionTable
+from logic.data_providers.tick_batch import TickBatch
+from logic.utils.price_utils import calculate_auction_mfe, check_auction_validity
+
+DATE = '20260318'
+CSV = PROJECT_ROOT / 'data' / 'auction' / 'auction_tick_live_20260305.csv'
+
+
+def _random_snapshots(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    pre = np.round(rng.uniform(3, 80, n), 2)
+    price = np.round(pre * (1 + rng.normal(0, 0.03, n)), 2)
+    snaps = {}
+    for i in range(n):
+        snaps[f'{i:06d}.SZ'] = {
+            'lastPrice': float(price[i]), 'open': float(price[i]),
+            'high': float(price[i] * (1 + (i % 3 == 0) * 0.005)), 'low': float(price[i]),
+            'lastClose': float(pre[i]) if i % 17 else 0.0,
+            'amount': float(rng.choice([0, 5e5, 2e6, 3e7, 4e8])), 'volume': float(rng.integers(0, 50000)),
+            'bidVol': [float(rng.integers(0, 900))] + [0.0] * 4, 'askVol': [float(rng.integers(0, 900))] + [0.0] * 4,
+        }
+    snaps['000001.SZ'].update(lastPrice=11.0, high=11.0, low=11.0, lastClose=10.0, amount=5e7)    # 一字板
+    fv = rng.choice([0.0, 5e6, 2e8, 1.5e9], n)        # 含 <1000万 的万股口径
+    return snaps, fv
+
+
+class TestAuctionTable(unittest.TestCase):
+    """竞价列式表"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_batch_matches_scalar(self):
+        """向量化 MFE / 考核掩码与单票版逐只一致"""
+        snaps, fv = _random_snapshots()
+        table = AuctionTable.from_snapshots(DATE, snaps, float_volume=fv)
+        expected_mfe = [calculate_auction_mfe(snaps[c], fv[i]) for i, c in enumerate(table.codes)]
+        expected_ok = [check_auction_validity(snaps[c], fv[i]) for i, c in enumerate(table.codes)]
+        np.testing.assert_allclose(table.mfe, expected_mfe, rtol=1e-12)
+        self.assertEqual(table.valid_mask().tolist(), expected_ok)
+        self.assertGreater(sum(expected_ok), 0)
+        self.assertFalse(table.row('000001.SZ')['valid'])
+
+    def test_tick_batch_entry_matches_snapshots(self):
+        """实盘 TickBatch 入口与快照 dict 入口口径一致（量纲换回手）"""
+        snaps, fv = _random_snapshots(n=300, seed=1)
+        codes = list(snaps) + ['999999.SZ']            # 无 Tick 的票被剔除
+        batch = TickBatch.from_qmt_ticks(codes, snaps)
+        live = AuctionTable.from_tick_batch(DATE, batch, float_volume=np.append(fv, 1e9))
+        ref = AuctionTable.from_snapshots(DATE, snaps, float_volume=fv)
+        self.assertEqual(live.codes, ref.codes)
+        for name in ('price', 'pre_close', 'amount', 'volume', 'bid_vol1', 'float_volume'):
+            np.testing.assert_allclose(getattr(live, name), getattr(ref, name), err_msg=name)
+        np.testing.assert_allclose(live.mfe, ref.mfe)
+
+    def test_csv_import(self):
+        table = AuctionTable.from_csv(CSV, float_volume=None)
+        self.assertEqual(table.trade_date, '20260305')
+        self.assertGreater(len(table), 4000)
+        row = table.row('301373.SZ')
+        self.assertAlmostEqual(row['gap_pct'], 6.2688973997177975, places=9)
+        self.assertEqual(row['amount'], 1056811700)
+
+    def test_save_load_select_top(self):
+        snaps, fv = _random_snapshots(n=500, seed=2)
+        table = AuctionTable.from_snapshots(DATE, snaps, float_volume=fv)
+        table.save(self.tmp)
+        loaded = AuctionTable.load(DATE, self.tmp)
+        self.assertEqual(loaded.codes, table.codes)
+        np.testing.assert_array_equal(loaded.mfe, table.mfe)
+        top = loaded.top(10)
+        mfe = [loaded.row(c)['mfe'] for c in top]
+        self.assertEqual(mfe, sorted(mfe, reverse=True))
+        self.assertTrue(all(loaded.row(c)['valid'] for c in top))
+        sub = loaded.select([table.codes[3], 'missing.SZ'])
+        self.assertEqual(sub.price.tolist(), [table.price[3], 0.0])
+        self.assertEqual(AuctionTable.get(DATE, table.codes[:5], cache_dir=self.tmp).codes, table.codes[:5])
+
+    def test_audit_fields(self):
+        """打分结果挂载的审计字段与行视图一致；无竞价数据的票记未通过"""
+        snaps, fv = _random_snapshots(n=200, seed=3)
+        table = AuctionTable.from_snapshots(DATE, snaps, float_volume=fv)
+        code = table.top(1)[0]
+        row = table.row(code)
+        self.assertEqual(table.audit(code), {'auction_mfe': row['mfe'], 'auction_gap_pct': row['gap_pct'],
+                                             'auction_valid': True})
+        self.assertEqual(table.audit('missing.SZ'),
+                         {'auction_mfe': 0.0, 'auction_gap_pct': 0.0, 'auction_valid': False})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CoverageManifest 单元测试
+
+测试覆盖清单登记/落盘往返、批量缺口查询、多日读回按日归档与 0 行登记，
+以及探测与下载调度只对清单未覆盖的票发起本地读取
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.coverage_manifest import CoverageManifest, probe
+from logic.data_providers.download_scheduler import DownloadScheduler
+
+CODES = [f'{i:06d}.SZ' for i in range(200)]
+
+
+def _ms(date, hhmm='0930'):
+    return int(pd.Timestamp(f'{date} {hhmm}').tz_localize('Asia/Shanghai').value // 10**6)
+
+
+class FakeXtData:
+    """假 xtdata：记录每次 get_local_data 请求的票"""
+
+    def __init__(self, store):
+        self.store = store
+        self.reads = []
+
+    def get_local_data(self, field_list, stock_list, period, start_time='', end_time=''):
+        self.reads.append(list(stock_list))
+        return {c: pd.DataFrame({'time': np.arange(self.store.get(c, 0))}) for c in stock_list}
+
+    def download_history_data2(self, stock_list, period, start_time='', end_time=''):
+        for c in stock_list:
+            self.store[c] = 3000
+
+
+class TestCoverageManifest(unittest.TestCase):
+    """本地覆盖清单"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.manifest = CoverageManifest('tick', cache_dir=self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_roundtrip(self):
+        """登记 → 落盘 → 新实例重新装载，数值一致"""
+        times = np.array([_ms('20260318', '0930'), _ms('20260318', '1500')])
+        self.manifest.record('20260318', CODES[:3], [10, 0, 5], times[0], times[1], [111, 0, 222])
+        self.assertEqual(self.manifest.flush(), 1)
+
+        reloaded = CoverageManifest('tick', cache_dir=self.tmp)
+        self.assertEqual(reloaded.dates(), ['20260318'])
+        np.testing.assert_array_equal(reloaded.rows(CODES[:4], ['20260318'])[:, 0], [10, 0, 5, -1])
+        np.testing.assert_array_equal(reloaded.lookup(CODES[:3], ['20260318'], 'checksum')[:, 0],
+                                      [111, 0, 222])
+        self.assertEqual(reloaded.lookup(CODES[:1], ['20260318'], 'last_ts')[0, 0], times[1])
+
+    def test_bulk_queries(self):
+        """数千格子一次查询：已覆盖 / 无数据 / 未知三态"""
+        dates = ['20260316', '20260317', '20260318']
+        for j, date in enumerate(dates):
+            self.manifest.record(date, CODES[:150], np.where(np.arange(150) % 10 == j, 0, 100))
+        rows = self.manifest.rows(CODES, dates)
+        self.assertEqual(rows.shape, (200, 3))
+        self.assertTrue((rows[150:] == -1).all())
+        self.assertEqual(len(self.manifest.unknown(CODES, dates)), 50 * 3)
+        self.assertEqual(len(self.manifest.missing(CODES, dates)), 50 * 3 + 15 * 3)
+        self.assertIn((CODES[1], '20260317'), self.manifest.missing(CODES, dates))
+        self.assertTrue(self.manifest.covered(CODES, dates)[2, 0])
+
+    def test_record_frames_multi_day(self):
+        """多日读回按 bar 日期归档，请求日内读不到的登记为 0 行"""
+        days = ['20260316', '20260317', '20260318']
+        df = pd.DataFrame({'time': [_ms('20260316', '0931'), _ms('20260316', '0932'), _ms('20260318', '1000')]})
+        self.manifest.record_frames({CODES[0]: df, CODES[1]: None}, dates=days)
+        np.testing.assert_array_equal(self.manifest.rows(CODES[:2], days), [[2, 0, 1], [0, 0, 0]])
+        self.assertEqual(self.manifest.lookup(CODES[:1], ['20260318'], 'first_ts')[0, 0],
+                         _ms('20260318', '1000'))
+
+    def test_probe_reads_only_missing(self):
+        """探测只读未知或无数据的票；已覆盖的零读取"""
+        date = '20260318'
+        self.manifest.record(date, CODES[:100], 3000)
+        self.manifest.record(date, CODES[100:120], 0)
+        fake = FakeXtData({c: 3000 for c in CODES[100:110]})
+        probe(self.manifest, fake, CODES, date)
+        self.assertEqual(fake.reads, [CODES[100:]])
+        self.assertEqual(int(self.manifest.covered(CODES, [date]).sum()), 110)
+        self.assertEqual(self.manifest.unknown(CODES, [date]), [])
+
+        fake.reads.clear()
+        probe(self.manifest, fake, CODES[:100], date)
+        self.assertEqual(fake.reads, [])
+
+    def test_scheduler_skips_covered(self):
+        """调度器存在性检查走清单，只下载并读回清单缺口"""
+        date = '20260318'
+        self.manifest.record(date, CODES[:90], 3000)
+        fake = FakeXtData({})
+        sched = DownloadScheduler(fake, workers=1, batch_size=100, manifest=self.manifest)
+        results = sched.run(CODES[:100], 'tick', date, date)
+        self.assertTrue(all(r.success for r in results.values()))
+        self.assertEqual(sched.stats.skipped, 90)
+        self.assertEqual(fake.reads, [CODES[90:100], CODES[90:100]])
+        self.assertTrue(self.manifest.covered(CODES[:100], [date]).all())
+        self.assertEqual(self.manifest.dates(), [date])
+
+
+if __name__ == '__main__':
+    unittest.main()
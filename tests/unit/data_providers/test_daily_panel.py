@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+DailyPanel 单元测试
+
+测试右对齐日K面板的向量化派生与旧逐只 pandas 口径（5日均量 / MA / ATR / 换手）一致，
+以及增量滚动与整窗重读结果一致（含缓存日整行缺K线、补下载后重读）
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.daily_panel import DailyPanel, bar_dates
+
+DATES = pd.bdate_range('2026-02-02', periods=32).strftime('%Y%m%d').tolist()
+
+
+def _frame(dates, seed):
+    rng = np.random.default_rng(seed)
+    n = len(dates)
+    close = 10 + rng.standard_normal(n).cumsum() * 0.1
+    return pd.DataFrame({
+        'open': close + rng.uniform(-0.1, 0.1, n),
+        'high': close + rng.uniform(0.0, 0.3, n),
+        'low': close - rng.uniform(0.0, 0.3, n),
+        'close': close,
+        'volume': rng.uniform(1e3, 1e5, n),
+        'amount': rng.uniform(1e6, 1e8, n),
+    }, index=dates)
+
+
+def _window(df, start):
+    return df[df.index >= start]
+
+
+def _ref_avg_volume(df, start):
+    df = _window(df, start)
+    return df['volume'].tail(min(5, len(df))).mean() if len(df) else np.nan
+
+
+def _ref_turnover(df, start, fv):
+    df = _window(df, start)
+    rate = df['amount'] / (fv * df['close']) * 100
+    return rate.tail(5).mean()
+
+
+def _ref_ma(df, start):
+    df = _window(df, start)
+    if len(df) < 5:
+        return None
+    closes = df['close'].values
+    ma5 = closes[-5:].mean()
+    ma10 = closes[-10:].mean() if len(closes) >= 10 else ma5
+    ma20 = closes[-20:].mean() if len(closes) >= 20 else ma10
+    return ma5, ma10, ma20, closes[-1]
+
+
+def _ref_atr(df, start):
+    df = _window(df, start).copy()
+    if len(df) < 5:
+        return None
+    df['pre_close'] = df['close'].shift(1)
+    df.loc[df.index[0], 'pre_close'] = df.loc[df.index[0], 'open']
+    tr = ((df['high'] - df['low']) / df['pre_close'].replace(0, float('nan'))).dropna()
+    if len(tr) < 5 or not tr.mean() > 0:
+        return None
+    return tr.mean(), df['close'].iloc[-1]
+
+
+class TestDailyPanel(unittest.TestCase):
+    """向量化派生与逐只口径一致"""
+
+    def setUp(self):
+        suspended = _frame(DATES, 2).drop(index=DATES[20:27])       # 停牌一周
+        with_nan = _frame(DATES, 3)
+        with_nan.loc[DATES[-2], 'volume'] = np.nan
+        with_nan.loc[DATES[-8], 'close'] = np.nan
+        zero_pre = _frame(DATES, 5)
+        zero_pre.loc[DATES[-6], 'close'] = 0.0
+        self.frames = {
+            '000001.SZ': _frame(DATES, 1),
+            '000002.SZ': suspended,
+            '600000.SH': with_nan,
+            '300001.SZ': _frame(DATES[-4:], 4),                      # 新股
+            '600001.SH': zero_pre,
+        }
+        self.codes = list(self.frames) + ['688001.SH']               # 无数据
+        self.panel = DailyPanel.from_frames(self.codes, self.frames)
+        self.avg_start, self.ma_start, self.atr_start = DATES[-22], DATES[-30], DATES[-25]
+
+    def test_right_aligned(self):
+        """按行数右对齐，补齐位日期为0"""
+        self.assertEqual(self.panel.width, 32)
+        row = self.panel.index['300001.SZ']
+        self.assertEqual(self.panel.dates[row, :-4].sum(), 0)
+        self.assertEqual(self.panel.dates[row, -1], int(DATES[-1]))
+        self.assertTrue(np.isnan(self.panel.values['close'][self.panel.index['688001.SH']]).all())
+
+    def test_avg_volume_matches(self):
+        avg = self.panel.avg_volume(self.avg_start)
+        for code, df in self.frames.items():
+            self.assertAlmostEqual(avg[self.panel.index[code]], _ref_avg_volume(df, self.avg_start), msg=code)
+        self.assertTrue(np.isnan(avg[self.panel.index['688001.SH']]))
+
+    def test_moving_averages_match(self):
+        ma = self.panel.moving_averages(self.ma_start)
+        for code, df in self.frames.items():
+            i = self.panel.index[code]
+            expected = _ref_ma(df, self.ma_start)
+            self.assertEqual(bool(ma['valid'][i]), expected is not None, code)
+            if expected is None:
+                continue
+            actual = (ma['ma5'][i], ma['ma10'][i], ma['ma20'][i], ma['close'][i])
+            np.testing.assert_allclose(actual, expected, err_msg=code)
+
+    def test_atr_matches(self):
+        atr = self.panel.atr(self.atr_start)
+        for code, df in self.frames.items():
+            i = self.panel.index[code]
+            expected = _ref_atr(df, self.atr_start)
+            self.assertEqual(bool(atr['valid'][i]), expected is not None, code)
+            if expected is not None:
+                self.assertAlmostEqual(atr['atr'][i], expected[0], msg=code)
+                self.assertAlmostEqual(atr['prev_close'][i], expected[1], msg=code)
+        self.assertFalse(atr['valid'][self.panel.index['688001.SH']])
+
+    def test_avg_turnover_matches(self):
+        fv = np.array([5e8, 1e9, 2e8, 3e7, 4e8, 1e9])
+        turnover = self.panel.avg_turnover(self.avg_start, fv)
+        for code, df in self.frames.items():
+            i = self.panel.index[code]
+            self.assertAlmostEqual(turnover[i], _ref_turnover(df, self.avg_start, fv[i]), msg=code)
+        no_fv = self.panel.avg_turnover(self.avg_start, np.zeros(len(self.codes)))
+        self.assertTrue(np.isnan(no_fv).all())
+
+    def test_bar_dates_from_epoch_ms(self):
+        """time 列毫秒时间戳按北京时间取日期"""
+        ms = [1773763200000, 1773849600000]  # 2026-03-18 / 2026-03-19 00:00 北京时间
+        df = pd.DataFrame({'time': ms, 'close': [1.0, 2.0]}, index=['x', 'y'])
+        self.assertEqual(bar_dates(df).tolist(), [20260318, 20260319])
+
+
+class TestDailyPanelRollForward(unittest.TestCase):
+    """缓存日面板 + 新K线 与 整窗重读 派生一致"""
+
+    def test_roll_matches_full_read(self):
+        days = pd.bdate_range('2026-01-05', periods=40).strftime('%Y%m%d').tolist()
+        frames = {
+            '000001.SZ': _frame(days, 11),
+            '000002.SZ': _frame(days, 12).drop(index=days[30:38]),  # 跨越滚动日停牌
+            '600000.SH': _frame(days[:20], 13),                       # 早已退出窗口
+        }
+        codes = list(frames) + ['300001.SZ']
+        cache_day, today = days[-3], days[-1]
+        base_start, start = days[-3 - 30], days[-1 - 30]
+
+        def upto(df, lo, hi):
+            return df[(df.index >= lo) & (df.index <= hi)]
+
+        base = DailyPanel.from_frames(codes, {c: upto(df, base_start, cache_day) for c, df in frames.items()})
+        new_bars = {c: upto(df, cache_day, today) for c, df in frames.items()}
+        rolled = base.select(codes).append_bars(new_bars).trim(start)
+        full = DailyPanel.from_frames(codes, {c: upto(df, start, today) for c, df in frames.items()})
+
+        self.assertLessEqual(rolled.width, base.width + 2)
+        for window in (days[-1 - 22], days[-1 - 25], start):
+            np.testing.assert_array_equal(rolled.window_counts(window), full.window_counts(window))
+            np.testing.assert_allclose(rolled.avg_volume(window), full.avg_volume(window), equal_nan=True)
+            for key in ('atr', 'prev_close'):
+                np.testing.assert_allclose(rolled.atr(window)[key], full.atr(window)[key], equal_nan=True)
+        ma_r, ma_f = rolled.moving_averages(start), full.moving_averages(start)
+        np.testing.assert_array_equal(ma_r['valid'], ma_f['valid'])
+        for key in ('ma5', 'ma10', 'ma20'):
+            np.testing.assert_allclose(ma_r[key][ma_r['valid']], ma_f[key][ma_f['valid']])
+
+    def test_roll_rereads_empty_base_rows(self):
+        """缓存日整行为空（当时缺K线）的票滚动时整窗重读，与整窗重读一致"""
+        days = pd.bdate_range('2026-01-05', periods=40).strftime('%Y%m%d').tolist()
+        frames = {'000001.SZ': _frame(days, 21), '300001.SZ': _frame(days, 22)}
+        codes = list(frames) + ['688001.SH']
+        cache_day, today, start = days[-3], days[-1], days[-1 - 30]
+
+        def fetch(stock_list, lo, hi, chunk_size=None):
+            return {c: frames[c][(frames[c].index >= lo) & (frames[c].index <= hi)]
+                    for c in stock_list if c in frames}
+
+        base = DailyPanel.from_frames(codes, {'000001.SZ': fetch(['000001.SZ'], days[-3 - 30], cache_day)['000001.SZ']})
+        with mock.patch.object(DailyPanel, 'fetch_frames', side_effect=fetch) as fetch_frames:
+            rolled = base.roll_forward(codes, cache_day, start, today)
+        self.assertEqual(fetch_frames.call_args_list[0].args, (['000001.SZ'], cache_day, today))
+        self.assertEqual(fetch_frames.call_args_list[1].args[:3], (['300001.SZ', '688001.SH'], start, today))
+        full = DailyPanel.from_frames(codes, fetch(codes, start, today))
+        np.testing.assert_array_equal(rolled.window_counts(start), full.window_counts(start))
+        np.testing.assert_allclose(rolled.avg_volume(days[-1 - 22]), full.avg_volume(days[-1 - 22]), equal_nan=True)
+
+    def test_replace_rows_and_select(self):
+        """新进池票整窗重读后按代码并入"""
+        base = DailyPanel.from_frames(['A'], {'A': _frame(DATES[-5:], 1)})
+        fresh = DailyPanel.from_frames(['B'], {'B': _frame(DATES[-8:], 2)})
+        merged = base.select(['A', 'B']).replace_rows(fresh)
+        self.assertEqual(merged.width, 8)
+        self.assertEqual(merged.window_counts(DATES[0]).tolist(), [5, 8])
+        self.assertEqual(merged.last_dates().tolist(), [int(DATES[-1])] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+DownloadPipeline 单元测试
+
+用异步落盘的假 xtdata 驱动（投递立即返回，数据延迟若干毫秒才可读）：
+验证轮询判定完成、超时重投与未完成报告、覆盖清单跳过与缺口优先、在途背压
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.coverage_manifest import CoverageManifest
+from logic.data_providers.download_pipeline import DownloadItem, DownloadPipeline
+
+CODES = [f'{i:06d}.SZ' for i in range(60)]
+DATE = '20260318'
+
+
+class AsyncXtData:
+    """假 xtdata：download_history_data 立即返回，lag 秒后才落盘；never 票永不落盘；flaky 票首次投递抛异常"""
+
+    def __init__(self, lag=0.02, never=(), flaky=()):
+        self.lag = lag
+        self.never = set(never)
+        self.flaky = set(flaky)
+        self.land_at = {}
+        self.issued = []
+        self.max_pending = 0
+        self._lock = threading.Lock()
+
+    def download_history_data(self, stock_code, period, start_time='', end_time=''):
+        with self._lock:
+            self.issued.append(stock_code)
+            if stock_code in self.flaky:
+                self.flaky.discard(stock_code)
+                raise ConnectionError('限流')
+            if stock_code not in self.never:
+                self.land_at[(stock_code, end_time)] = time.perf_counter() + self.lag
+            now = time.perf_counter()
+            pending = sum(1 for t in self.land_at.values() if t > now)
+            self.max_pending = max(self.max_pending, pending)
+
+    def get_local_data(self, field_list, stock_list, period, start_time='', end_time=''):
+        now = time.perf_counter()
+        return {c: pd.DataFrame({'time': np.arange(3000 if self.land_at.get((c, end_time), np.inf) <= now else 0)})
+                for c in stock_list}
+
+
+def _pipeline(fake, **kw):
+    kw.setdefault('workers', 4)
+    kw.setdefault('poll_min', 0.005)
+    kw.setdefault('poll_max', 0.05)
+    kw.setdefault('progress_interval', 60.0)
+    return DownloadPipeline(fake, 'tick', **kw)
+
+
+class TestDownloadPipeline(unittest.TestCase):
+    """投递 / 轮询 / 验证流水线"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_all_land_without_fixed_wait(self):
+        """全部落盘：完成时间由落盘延迟决定，而不是固定等待"""
+        fake = AsyncXtData(lag=0.02)
+        report = _pipeline(fake).run((c, DATE, DATE) for c in CODES)
+        self.assertEqual((report.total, report.landed, len(report.incomplete)), (60, 60, 0))
+        self.assertEqual(report.rows, 60 * 3000)
+        self.assertEqual(report.results[DownloadItem(CODES[0], DATE, DATE)], 3000)
+        self.assertLess(report.elapsed, 1.0)
+        self.assertGreater(report.items_per_sec, 0)
+
+    def test_timeout_reissue_incomplete(self):
+        """永不落盘的票超时重投一次后记入未完成，清单保持未知（超时不等于确认无数据）"""
+        fake = AsyncXtData(never={CODES[1]})
+        manifest = CoverageManifest('tick', cache_dir=self.tmp)
+        report = _pipeline(fake, timeout=0.1, max_reissue=1, manifest=manifest).run(
+            (c, DATE, DATE) for c in CODES[:10])
+        self.assertEqual(list(report.incomplete), [DownloadItem(CODES[1], DATE, DATE)])
+        self.assertEqual(report.incomplete[DownloadItem(CODES[1], DATE, DATE)], '超时未落盘')
+        self.assertEqual(fake.issued.count(CODES[1]), 2)
+        self.assertEqual(report.reissued, 1)
+        np.testing.assert_array_equal(manifest.rows(CODES[:3], [DATE])[:, 0], [3000, -1, 3000])
+
+    def test_issue_error_reissued(self):
+        fake = AsyncXtData(flaky={CODES[2]})
+        report = _pipeline(fake).run((c, DATE, DATE) for c in CODES[:5])
+        self.assertEqual(report.landed, 5)
+        self.assertEqual(report.reissued, 1)
+
+    def test_manifest_priority(self):
+        """已覆盖跳过；清单未知的缺口先投，已知无数据的排最后"""
+        manifest = CoverageManifest('tick', cache_dir=self.tmp)
+        manifest.record(DATE, CODES[:20], 3000)
+        manifest.record(DATE, CODES[20:30], 0)
+        fake = AsyncXtData()
+        report = _pipeline(fake, workers=1, manifest=manifest).run((c, DATE, DATE) for c in CODES)
+        self.assertEqual(report.skipped, 20)
+        self.assertEqual(report.landed, 40)
+        self.assertEqual(fake.issued, CODES[30:] + CODES[20:30])
+        self.assertTrue(manifest.covered(CODES, [DATE]).all())
+
+    def test_inflight_bounded(self):
+        """在途（已投递未落盘）不超过 max_inflight"""
+        fake = AsyncXtData(lag=0.03)
+        report = _pipeline(fake, max_inflight=8).run((c, DATE, DATE) for c in CODES)
+        self.assertEqual(report.landed, 60)
+        self.assertLessEqual(fake.max_pending, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+DownloadScheduler 单元测试
+
+用带延迟、间歇失败、毒票、停牌空数据的假 xtdata 驱动：
+验证批量合并、有界并发、退避重试、毒票拆分隔离与进度统计
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.download_scheduler import DownloadScheduler
+
+CODES = [f'{i:06d}.SZ' for i in range(120)]
+
+
+class FakeXtData:
+    """假 xtdata：每次调用 latency 秒；前 flaky 次批量下载抛异常；poison 票必败；halted 票下载后仍为空"""
+
+    def __init__(self, latency=0.005, flaky=0, poison=(), halted=(), existing=(), batch_api=True):
+        self.latency = latency
+        self.flaky = flaky
+        self.poison = set(poison)
+        self.halted = set(halted)
+        self.store = {c: 3000 for c in existing}
+        self.calls = {'download': 0, 'download2': 0, 'read': 0}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        if not batch_api:
+            self.download_history_data2 = None
+
+    def _enter(self, kind):
+        with self._lock:
+            self.calls[kind] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+
+    def _leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _fill(self, codes):
+        for c in codes:
+            if c in self.poison:
+                raise RuntimeError(f'{c} 服务端拒绝')
+        for c in codes:
+            if c not in self.halted:
+                self.store[c] = 3000
+
+    def download_history_data2(self, stock_list, period, start_time='', end_time=''):
+        self._enter('download2')
+        try:
+            with self._lock:
+                fail = self.flaky > 0
+                self.flaky -= 1
+            if fail:
+                raise ConnectionError('限流')
+            self._fill(stock_list)
+        finally:
+            self._leave()
+
+    def download_history_data(self, stock_code, period, start_time='', end_time=''):
+        self._enter('download')
+        try:
+            self._fill([stock_code])
+        finally:
+            self._leave()
+
+    def get_local_data(self, field_list, stock_list, period, start_time='', end_time=''):
+        self._enter('read')
+        try:
+            return {c: pd.DataFrame({'time': range(self.store.get(c, 0))}) for c in stock_list}
+        finally:
+            self._leave()
+
+
+def _scheduler(fake, **kw):
+    kw.setdefault('workers', 4)
+    kw.setdefault('batch_size', 10)
+    kw.setdefault('backoff', 0.001)
+    return DownloadScheduler(fake, **kw)
+
+
+class TestDownloadScheduler(unittest.TestCase):
+    """并发批量下载调度"""
+
+    def test_batched_and_bounded(self):
+        """每批一次存在检查 + 一次下载 + 一次读回；并发不超过 workers"""
+        fake = FakeXtData(latency=0.01, existing=CODES[:5])
+        sched = _scheduler(fake)
+        results = sched.run(CODES, 'tick', '20260318', '20260318')
+        self.assertEqual(list(results), CODES)
+        self.assertTrue(all(r.success for r in results.values()))
+        self.assertEqual(results[CODES[0]].message, '已存在 (3000条)')
+        self.assertEqual([r.downloaded for r in results.values()], [False] * 5 + [True] * 115)
+        self.assertEqual(fake.calls, {'download': 0, 'download2': 12, 'read': 24})
+        self.assertLessEqual(fake.max_in_flight, 4)
+        self.assertGreater(fake.max_in_flight, 1)
+        s = sched.stats
+        self.assertEqual((s.total, s.skipped, s.success, s.failed), (120, 5, 115, 0))
+        self.assertEqual(s.records, 115 * 3000)
+
+    def test_retry_with_backoff(self):
+        """间歇失败按退避重试后全部成功"""
+        fake = FakeXtData(flaky=3)
+        sched = _scheduler(fake, workers=1, max_retries=3)
+        results = sched.run(CODES[:30], 'tick', '20260318', '20260318', check_existing=False)
+        self.assertTrue(all(r.success for r in results.values()))
+        self.assertEqual(sched.stats.retries, 3)
+
+    def test_poison_isolated(self):
+        """毒票让整批重试耗尽后拆分逐只，只有毒票失败；停牌票空数据记失败不重试"""
+        fake = FakeXtData(poison={CODES[3]}, halted={CODES[7]})
+        sched = _scheduler(fake, max_retries=1)
+        results = sched.run(CODES[:20], 'tick', '20260318', '20260318')
+        failed = sorted(c for c, r in results.items() if not r.success)
+        self.assertEqual(failed, [CODES[3], CODES[7]])
+        self.assertIn('服务端拒绝', results[CODES[3]].error)
+        self.assertIn('空数据', results[CODES[7]].message)
+        self.assertEqual(sched.stats.failed, 2)
+
+    def test_single_stock_api_fallback(self):
+        """无批量下载接口时批内逐只下载"""
+        fake = FakeXtData(batch_api=False)
+        results = _scheduler(fake).run(CODES[:25], '1d', '20260301', '20260318', check_existing=False)
+        self.assertTrue(all(r.success for r in results.values()))
+        self.assertEqual(fake.calls['download'], 25)
+
+    def test_progress_callback(self):
+        seen = []
+        fake = FakeXtData()
+        _scheduler(fake, progress_interval=0.0, on_progress=seen.append).run(
+            CODES[:40], 'tick', '20260318', '20260318')
+        self.assertEqual(seen[-1].done, 40)
+        self.assertGreater(seen[-1].stocks_per_sec, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+仿真行情（sim 包）单元测试
+
+验证合成行情自洽（Tick 收盘/累计量与日K对齐、累计值单调、涨停封板、五档）、
+xtdata 接口返回格式、download 模式与 DownloadPipeline 联动、故障注入、
+IntegrityVerifier 对合成 Tick 全通过、install() 后 `import xtquant` 解析到仿真包
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.download_pipeline import DownloadPipeline
+from logic.data_providers.integrity_verifier import FIELDS, IntegrityVerifier
+from sim.fake_xtdata import FakeXtData, SimClock
+from sim.market import SyntheticMarket
+
+DATE = '20260318'
+MARKET = SyntheticMarket(n_symbols=300, seed=7, start='20260302', end='20260320', limit_up_rate=0.08)
+
+
+def _fake(**kw):
+    kw.setdefault('clock', SimClock(DATE, '100000'))
+    return FakeXtData(MARKET, **kw)
+
+
+def _trading_codes(date=DATE, n=20):
+    return [c for c in MARKET.codes if MARKET.trading(c, date)][:n]
+
+
+class TestSyntheticMarket(unittest.TestCase):
+    """合成行情自洽"""
+
+    def test_deterministic(self):
+        again = SyntheticMarket(n_symbols=300, seed=7, start='20260302', end='20260320', limit_up_rate=0.08)
+        self.assertEqual(again.checksum(), MARKET.checksum())
+        self.assertEqual(again.codes, MARKET.codes)
+
+    def test_ticks_match_daily(self):
+        """Tick 最后一笔 = 日K收盘，累计量 = 日K成交量；时间/量/额单调"""
+        for code in _trading_codes(n=10):
+            ticks, daily = MARKET.ticks(code, DATE), MARKET.daily(code).loc[DATE]
+            self.assertAlmostEqual(ticks['lastPrice'].iloc[-1], daily['close'], places=2)
+            self.assertAlmostEqual(ticks['volume'].iloc[-1], daily['volume'])
+            for col in ('time', 'volume', 'amount'):
+                self.assertTrue((np.diff(ticks[col].to_numpy()) >= 0).all(), col)
+            self.assertTrue(all(len(levels) == 5 for levels in ticks['askPrice']))
+
+    def test_limit_up_pinned(self):
+        """涨停日收在涨停价，封板后卖一为空"""
+        i, j = map(int, np.argwhere(MARKET.limit_up_day)[0])
+        code, date = MARKET.codes[i], MARKET.calendar[j]
+        ticks = MARKET.ticks(code, date)
+        self.assertAlmostEqual(ticks['lastPrice'].iloc[-1], MARKET.up_stop[i, j], places=2)
+        self.assertEqual(ticks['askPrice'].iloc[-1][0], 0.0)
+
+
+class TestFakeXtData(unittest.TestCase):
+    """xtdata 接口仿真"""
+
+    def test_local_data_formats(self):
+        xt = _fake()
+        code = _trading_codes(n=1)[0]
+        ticks = xt.get_local_data([], [code], 'tick', DATE, DATE)[code]
+        self.assertEqual(ticks.index[-1], f'{DATE}150000')
+        daily = xt.get_local_data(['close'], [code], '1d', '20260316', DATE)[code]
+        self.assertEqual(list(daily.columns), ['close'])
+        self.assertEqual(list(daily.index), ['20260316', '20260317', DATE])
+        bars = xt.get_local_data([], [code], '1m', f'{DATE}093000', f'{DATE}100000')[code]
+        self.assertEqual((bars.index[0], bars.index[-1]), (f'{DATE}093100', f'{DATE}100000'))
+        self.assertEqual(xt.get_trading_calendar('SH', '20260316', DATE), ['20260316', '20260317', DATE])
+
+    def test_full_tick_at_clock(self):
+        xt = _fake()
+        codes = _trading_codes(n=5)
+        snaps = xt.get_full_tick(codes)
+        self.assertEqual(sorted(snaps), sorted(codes))
+        snap = snaps[codes[0]]
+        self.assertEqual(snap['timetag'], f'{DATE} 10:00:00')
+        self.assertIsInstance(snap['lastPrice'], float)
+        self.assertEqual(len(snap['bidPrice']), 5)
+
+    def test_download_mode_with_pipeline(self):
+        """download 模式：未下载读不到，DownloadPipeline 轮询到延迟落盘的数据"""
+        xt = _fake(local='download', download_lag=0.02)
+        codes = _trading_codes()
+        self.assertTrue(xt.get_local_data(FIELDS, codes[:1], 'tick', DATE, DATE)[codes[0]].empty)
+        report = DownloadPipeline(xt, 'tick', workers=4, poll_min=0.005, poll_max=0.05,
+                                  progress_interval=60.0).run((c, DATE, DATE) for c in codes)
+        self.assertEqual((report.landed, len(report.incomplete)), (len(codes), 0))
+        self.assertEqual(xt.calls['download_history_data'], len(codes))
+
+    def test_fault_injection(self):
+        xt = _fake(fault_rate=1.0)
+        with self.assertRaises(RuntimeError):
+            xt.get_full_tick(_trading_codes(n=1))
+
+    def test_integrity_verifier_passes(self):
+        xt = _fake()
+        codes = _trading_codes(n=40)
+        summary = IntegrityVerifier(processes=0, reader=lambda chunk, date: xt.get_local_data(
+            FIELDS, chunk, 'tick', date, date)).run(codes, DATE)
+        self.assertEqual(summary.failures, {})
+
+    def test_install_resolves_xtquant(self):
+        """install() 后子进程里 `from xtquant import xtdata` 转发到仿真单例"""
+        script = (
+            'import sim; sim.install()\n'
+            'from sim.market import SyntheticMarket\n'
+            'from sim.fake_xtdata import FakeXtData\n'
+            "sim.set_fake_xtdata(FakeXtData(SyntheticMarket(n_symbols=50, start='20260316', end='20260318')))\n"
+            'from xtquant import xtdata, xttrader\n'
+            "print(xtdata.__file__.startswith(str(sim.SIM_DIR)), len(xtdata.get_stock_list_in_sector('沪深A股')))\n"
+        )
+        env = {k: v for k, v in os.environ.items() if k != 'PYTHONPATH'}
+        out = subprocess.run([sys.executable, '-c', script], cwd=PROJECT_ROOT, env=env,
+                             capture_output=True, text=True, timeout=120)
+        self.assertEqual(out.returncode, 0, out.stderr)
+        self.assertEqual(out.stdout.split(), ['True', '50'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+InstrumentMaster 单元测试
+
+测试合约详情入表（ST/股本量纲/涨跌幅规则）、落盘往返、变更检测，
+漏斗1按主表掩码过滤与旧逐只判定一致，以及 TrueDictionary 装弹取主表的时机
+（小名单不刷全市场、历史日期不落盘、success 只计有限股本）
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.instrument_master import InstrumentMaster
+from logic.data_providers.true_dictionary import TrueDictionary
+
+CODES = ['000001.SZ', '600001.SH', '300750.SZ', '688981.SH', '830799.BJ', '000002.SZ', '002999.SZ']
+DETAILS = {
+    '000001.SZ': {'InstrumentName': '平安银行', 'OpenDate': '19910403', 'FloatVolume': 1940591.8198,
+                  'TotalVolume': 1940592.0, 'UpStopPrice': 12.1, 'DownStopPrice': 9.9},
+    '600001.SH': {'InstrumentName': '*ST邯钢', 'OpenDate': 19980122, 'FloatVolume': 2.5e9,
+                  'UpStopPrice': 3.15, 'DownStopPrice': 2.85},
+    '300750.SZ': {'InstrumentName': '宁德时代', 'FloatVolume': 3.9e5},
+    '688981.SH': {'InstrumentName': '中芯国际'},
+    '830799.BJ': {'InstrumentName': '艾融软件'},
+    '000002.SZ': {'InstrumentName': '万科退'},
+    '002999.SZ': None,
+}
+
+
+def _master(date='20260318', details=DETAILS, codes=CODES):
+    return InstrumentMaster.from_details(date, codes, details)
+
+
+class TestInstrumentMaster(unittest.TestCase):
+    """主表构建与查询"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_from_details(self):
+        m = _master()
+        self.assertEqual(m.is_st.tolist(), [False, True, False, False, False, True, False])
+        self.assertEqual(m.float_volume[0], 1940591.8198 * 10000)   # 万股 → 股
+        self.assertEqual(m.float_volume[1], 2.5e9)                  # 已是股
+        self.assertTrue(np.isnan(m.float_volume[6]))
+        self.assertEqual(m.open_date[:3].tolist(), [19910403, 19980122, 0])
+        self.assertEqual(m.limit_pct.tolist(), [0.10, 0.05, 0.20, 0.20, 0.30, 0.05, 0.10])
+        self.assertEqual(m.bj_mask().tolist(), [False] * 4 + [True, False, False])
+        self.assertEqual(m.kcb_mask().tolist(), [False] * 3 + [True] + [False] * 3)
+        self.assertEqual(m.ids(['300750.SZ', 'XXX']).tolist(), [2, -1])
+
+    def test_save_load_roundtrip(self):
+        m = _master()
+        m.save(self.tmp)
+        loaded = InstrumentMaster.load('20260318', self.tmp)
+        for name in InstrumentMaster.COLUMNS:
+            np.testing.assert_array_equal(getattr(loaded, name), getattr(m, name))
+        self.assertIsNone(InstrumentMaster.load('20260319', self.tmp))
+
+    def test_change_detection(self):
+        """次日刷新与旧表比对：新上市 / 退出 / 戴帽 / 摘帽 / 股本变动"""
+        _master('20260317').save(self.tmp)
+        details = dict(DETAILS)
+        details['000001.SZ'] = dict(DETAILS['000001.SZ'], InstrumentName='ST平安')
+        details['600001.SH'] = dict(DETAILS['600001.SH'], InstrumentName='邯郸钢铁', FloatVolume=2.6e9)
+        details['001388.SZ'] = {'InstrumentName': '新股'}
+        codes = [c for c in CODES if c != '830799.BJ'] + ['001388.SZ']
+        with mock.patch.object(InstrumentMaster, 'fetch', return_value=_master('20260318', details, codes)):
+            m = InstrumentMaster.get('20260318', self.tmp)
+        self.assertEqual(m.changes['base_date'], '20260317')
+        self.assertEqual(m.changes['listed'], ['001388.SZ'])
+        self.assertEqual(m.changes['removed'], ['830799.BJ'])
+        self.assertEqual(m.changes['st_added'], ['000001.SZ'])
+        self.assertEqual(m.changes['st_removed'], ['600001.SH'])
+        self.assertEqual(m.changes['float_changed'], ['600001.SH'])
+        # 同日再取只读文件
+        with mock.patch.object(InstrumentMaster, 'fetch', side_effect=AssertionError('should not fetch')):
+            again = InstrumentMaster.get('20260318', self.tmp)
+        self.assertEqual(again.changes['listed'], ['001388.SZ'])
+
+    def test_funnel1_masks(self):
+        """漏斗1：黑名单 > 北交所 > 科创板 > ST 优先级计数，被滤票量比记0"""
+        from logic.data_providers.universe_builder import UniverseBuilder
+
+        builder = UniverseBuilder('20260318')
+        builder._blacklist = {'600001.SH'}
+        with mock.patch.object(InstrumentMaster, 'get', return_value=_master()):
+            passed = builder._funnel1_static()
+        self.assertEqual(passed, ['000001.SZ', '300750.SZ', '002999.SZ'])
+        self.assertEqual(builder._volume_ratios,
+                         {'600001.SH': 0.0, '688981.SH': 0.0, '830799.BJ': 0.0, '000002.SZ': 0.0})
+
+
+class TestWarmupQmtData(unittest.TestCase):
+    """TrueDictionary._warmup_qmt_data 取主表"""
+
+    def setUp(self):
+        TrueDictionary._instance = None
+        TrueDictionary._initialized = False
+        self.td = TrueDictionary()
+        self.detail_calls = []
+
+        def get_instrument_detail(code, complete=True):
+            self.detail_calls.append(code)
+            return DETAILS.get(code)
+
+        xtdata = types.SimpleNamespace(get_instrument_detail=get_instrument_detail)
+        self.xt = mock.patch.dict(sys.modules, {'xtquant': types.SimpleNamespace(xtdata=xtdata)})
+        self.xt.start()
+
+    def tearDown(self):
+        self.xt.stop()
+        TrueDictionary._instance = None
+        TrueDictionary._initialized = False
+
+    def _warmup(self, codes, date, cached=None):
+        fetched = _master(date)
+        with mock.patch.object(InstrumentMaster, 'load', return_value=cached), \
+                mock.patch.object(InstrumentMaster, 'get', return_value=fetched) as get, \
+                mock.patch.object(InstrumentMaster, 'fetch', return_value=fetched) as fetch:
+            result = self.td._warmup_qmt_data(codes, trade_date=date)
+        return result, get, fetch
+
+    def test_small_list_skips_market_fetch(self):
+        """名单小且无落盘主表：逐只查，不刷全市场；无股本的票计失败"""
+        result, get, fetch = self._warmup(['000001.SZ', '688981.SH'], '20260105')
+        get.assert_not_called()
+        fetch.assert_not_called()
+        self.assertEqual(self.detail_calls, ['000001.SZ', '688981.SH'])
+        self.assertEqual((result['success'], result['failed']), (1, 1))
+
+    def test_large_list_history_not_persisted(self):
+        """历史日期大名单：内存刷新不落盘；当日才走 get（落盘）"""
+        with mock.patch.object(TrueDictionary, 'MASTER_FETCH_MIN_CODES', 2):
+            result, get, fetch = self._warmup(CODES, '20260105')
+            get.assert_not_called()
+            fetch.assert_called_once_with('20260105')
+            today = datetime.now().strftime('%Y%m%d')
+            _, get, fetch = self._warmup(CODES, today)
+            get.assert_called_once_with(today)
+            fetch.assert_not_called()
+        self.assertEqual(result['success'], 3)
+
+    def test_cached_master_counts_finite_only(self):
+        """落盘主表命中但股本为 NaN 的票转逐只查询，success 只计有限股本"""
+        result, get, fetch = self._warmup(CODES, '20260105', cached=_master('20260105'))
+        get.assert_not_called()
+        fetch.assert_not_called()
+        self.assertEqual(self.detail_calls, ['688981.SH', '830799.BJ', '000002.SZ', '002999.SZ'])
+        self.assertEqual((result['success'], result['failed']), (3, 4))
+        self.assertEqual(self.td.get_float_volume('000001.SZ'), int(1940591.8198 * 10000))
+
+
+if __name__ == '__main__':
+    unittest.main()
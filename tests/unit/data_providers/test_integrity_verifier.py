@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+IntegrityVerifier 单元测试
+
+用合成 Tick（3秒快照、累计量额、昨收±涨跌幅内）逐项注入坏数据：
+验证各不变量独立命中、多进程与单进程结果一致、汇总表计数与覆盖清单登记
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.coverage_manifest import CoverageManifest
+from logic.data_providers.integrity_verifier import CHECKS, IntegrityVerifier, check_ticks
+
+DATE = '20260318'
+
+
+def _session_times(date=DATE):
+    day = pd.Timestamp(date).tz_localize('Asia/Shanghai')
+    am = pd.date_range(day + pd.Timedelta('9h30min'), day + pd.Timedelta('11h30min'), freq='3s')
+    pm = pd.date_range(day + pd.Timedelta('13h'), day + pd.Timedelta('15h'), freq='3s')
+    return am.append(pm).as_unit('ms').asi8.astype(np.int64)
+
+
+def _ticks(seed=0, pre_close=10.0):
+    rng = np.random.default_rng(seed)
+    times = _session_times()
+    n = len(times)
+    price = np.clip(pre_close * (1 + rng.normal(0, 0.002, n).cumsum()), pre_close * 0.91, pre_close * 1.09).round(2)
+    lots = rng.integers(0, 50, n)
+    return pd.DataFrame({'time': times, 'lastPrice': price, 'volume': lots.cumsum().astype(float),
+                         'amount': (lots * price * 100).cumsum(), 'lastClose': pre_close})
+
+
+def _corrupt(kind):
+    df = _ticks(seed=100 + CHECKS.index(kind))
+    n = len(df)
+    if kind == 'time_monotonic':
+        df.loc[n // 2, 'time'] = df.loc[0, 'time']
+    elif kind == 'volume_monotonic':
+        df.loc[n // 2:, 'volume'] -= 1000
+    elif kind == 'amount_monotonic':
+        df.loc[n // 3, 'amount'] = 0
+    elif kind == 'price_band':
+        df.loc[n // 4, 'lastPrice'] = 11.2
+    elif kind == 'session_coverage':
+        df = df.iloc[:n // 3]
+    elif kind == 'has_data':
+        df = df.iloc[:0]
+    return df
+
+
+FRAMES = {f'{i:06d}.SZ': _ticks(seed=i) for i in range(40)}
+BAD = {f'9{i:05d}.SZ': kind for i, kind in enumerate(CHECKS)}
+FRAMES.update({code: _corrupt(kind) for code, kind in BAD.items()})
+FRAMES['300001.SZ'] = _ticks(seed=99).assign(lastPrice=lambda d: d['lastPrice'] * 0 + 11.8)   # 创业板 20%
+
+
+def fake_reader(codes, trade_date):
+    return {c: FRAMES.get(c) for c in codes}
+
+
+class TestIntegrityVerifier(unittest.TestCase):
+    """Tick 内容不变量并行校验"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_check_ticks_clean(self):
+        df = _ticks()
+        mask = check_ticks(df['time'].to_numpy(), df['lastPrice'].to_numpy(), df['volume'].to_numpy(),
+                           df['amount'].to_numpy(), 10.0, 0.10)
+        self.assertEqual(mask, 0)
+
+    def test_each_check_isolated(self):
+        """每只坏票恰好命中对应的那一项；创业板按 20% 涨跌幅不误报"""
+        summary = IntegrityVerifier(processes=0, chunk_size=7, reader=fake_reader).run(list(FRAMES), DATE)
+        self.assertEqual(summary.checked, len(FRAMES))
+        self.assertEqual({c: names for c, names in summary.failures.items()},
+                         {code: [kind] for code, kind in BAD.items()})
+        self.assertEqual(summary.fail_counts, dict.fromkeys(CHECKS, 1))
+        self.assertEqual(summary.passed, len(FRAMES) - len(BAD))
+        self.assertIn('price_band', summary.table())
+
+    def test_processes_match_serial(self):
+        """多进程流式汇总与单进程结果一致，回调逐只触发"""
+        seen = []
+        serial = IntegrityVerifier(processes=0, chunk_size=9, reader=fake_reader).run(list(FRAMES), DATE)
+        parallel = IntegrityVerifier(processes=3, chunk_size=9, reader=fake_reader).run(
+            list(FRAMES), DATE, on_result=lambda code, rows, mask: seen.append(code))
+        self.assertEqual(parallel.failures, serial.failures)
+        self.assertEqual(parallel.rows, serial.rows)
+        self.assertEqual(sorted(seen), sorted(FRAMES))
+
+    def test_manifest_recorded(self):
+        manifest = CoverageManifest('tick', cache_dir=self.tmp)
+        IntegrityVerifier(processes=0, reader=fake_reader, manifest=manifest).run(list(FRAMES), DATE)
+        rows = manifest.rows(['000000.SZ', '900000.SZ'], [DATE])[:, 0]
+        self.assertEqual(rows.tolist(), [len(FRAMES['000000.SZ']), 0])
+        self.assertEqual(manifest.dates(), [DATE])
+
+    def test_failed_chunk_not_recorded(self):
+        """块读取失败：汇总记 has_data 失败，但清单保持未知"""
+        def broken_reader(codes, trade_date):
+            raise OSError('读取失败')
+        manifest = CoverageManifest('tick', cache_dir=self.tmp)
+        summary = IntegrityVerifier(processes=0, reader=broken_reader, manifest=manifest).run(['000000.SZ'], DATE)
+        self.assertEqual(summary.failures, {'000000.SZ': ['has_data']})
+        self.assertEqual(manifest.rows(['000000.SZ'], [DATE])[0, 0], -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+LiveUniverseMaintainer 单元测试
+
+测试静态输入构建、向量化日内判定与成员增量，以及实盘引擎在启动时准备、主循环只刷新
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers import live_universe
+from logic.data_providers.live_universe import LiveUniverseMaintainer
+from tasks.run_live_trading_engine import LiveTradingEngine
+
+TARGET = '20260318'
+
+
+def _daily(n_bars, volume=1e5, amount=5e8, high=12.0, include_today=True):
+    dates = [f'202601{i:02d}' for i in range(1, n_bars)] + [TARGET if include_today else '20260131']
+    return pd.DataFrame({
+        'high': [high] * n_bars,
+        'close': [10.0] * n_bars,
+        'volume': [volume] * n_bars,
+        'amount': [amount] * n_bars,
+    }, index=dates[-n_bars:])
+
+
+class TestLiveUniverseMaintainer(unittest.TestCase):
+    """测试实盘增量粗筛"""
+
+    def setUp(self):
+        self.m = LiveUniverseMaintainer(TARGET)
+        self.m.min_avg_amount = 1.5e8
+        history = {
+            'AAA.SZ': _daily(61),                       # 阈值15%
+            'BBB.SZ': _daily(30),                       # 阈值10%
+            'CCC.SZ': _daily(15),                       # 不足20根 → 静态剔除
+            'DDD.SZ': _daily(61, amount=1e7),           # 均额不足 → 静态剔除
+            'EEE.SZ': _daily(61),                       # 无流通股本 → 跳过量比/换手
+        }
+        float_volume = {'AAA.SZ': 1e8, 'BBB.SZ': 1e8, 'CCC.SZ': 1e8, 'DDD.SZ': 1e8}
+        self.m.load_static(history, float_volume)
+
+    def test_static_prefilter(self):
+        """日内不变的条件在准备阶段剔除"""
+        self.assertEqual(sorted(self.m.codes), ['AAA.SZ', 'BBB.SZ', 'EEE.SZ'])
+        stats = self.m.get_stats()
+        self.assertEqual(stats['static_space'], 1)
+        self.assertEqual(stats['static_amount'], 1)
+
+    def test_intraday_gates(self):
+        """量比/换手/空间差按日内Tick判定"""
+        ticks = {
+            # 量比 3.0, 换手 30%, 空间差 (12-10.5)/12=12.5% <= 15%
+            'AAA.SZ': {'lastPrice': 10.5, 'volume': 3e5, 'high': 10.6},
+            # 空间差 12.5% > 10% → 否决
+            'BBB.SZ': {'lastPrice': 10.5, 'volume': 3e5, 'high': 10.6},
+            # 无流通股本：量比不足也放行
+            'EEE.SZ': {'lastPrice': 11.0, 'volume': 1e4, 'high': 11.0},
+        }
+        mask = self.m.evaluate(ticks)
+        passed = {c for c, ok in zip(self.m.codes, mask) if ok}
+        self.assertEqual(passed, {'AAA.SZ', 'EEE.SZ'})
+
+    def test_refresh_emits_deltas(self):
+        """刷新只返回成员变化"""
+        hot = {'lastPrice': 10.5, 'volume': 3e5, 'high': 10.6}
+        cold = {'lastPrice': 10.5, 'volume': 1e5, 'high': 10.6}
+        d1 = self.m.refresh({'AAA.SZ': hot})
+        self.assertEqual(d1.added, ['AAA.SZ'])
+        d2 = self.m.refresh({'AAA.SZ': hot})
+        self.assertEqual((d2.added, d2.removed), ([], []))
+        d3 = self.m.refresh({'AAA.SZ': cold})
+        self.assertEqual(d3.removed, ['AAA.SZ'])
+        self.assertEqual(d3.size, 0)
+
+    def test_members_sorted_by_volume_ratio(self):
+        """成员按量比降序"""
+        self.m._float_volume[:] = 1e8
+        self.m.refresh({
+            'AAA.SZ': {'lastPrice': 10.5, 'volume': 3e5, 'high': 10.6},
+            'EEE.SZ': {'lastPrice': 10.5, 'volume': 5e5, 'high': 10.6},
+        })
+        self.assertEqual(self.m.members(), ['EEE.SZ', 'AAA.SZ'])
+
+
+class TestEngineUniverseLifecycle(unittest.TestCase):
+    """实盘引擎：静态输入在启动/盘前准备，主循环只调用 refresh()"""
+
+    def _engine(self):
+        return SimpleNamespace(_live_universe=None, target_date=TARGET, mode='live',
+                               _last_universe_refresh_time=None, _universe_refresh_interval_min=1,
+                               candidate_pool={}, opportunity_pool={}, eliminated_pool={})
+
+    def test_prepare_at_startup_then_refresh_only(self):
+        calls = []
+
+        class _Maintainer:
+            codes = []
+
+            def __init__(self, target_date):
+                calls.append(('init', target_date))
+
+            def prepare(self):
+                calls.append('prepare')
+                return True
+
+            def refresh(self, ticks=None):
+                calls.append('refresh')
+                return live_universe.UniverseDelta()
+
+        engine = self._engine()
+        with patch.object(live_universe, 'LiveUniverseMaintainer', _Maintainer):
+            t0 = datetime(2026, 3, 18, 10, 0)
+            LiveTradingEngine._maybe_refresh_universe(engine, t0)
+            self.assertEqual(calls, [])              # 未准备：主循环不构建
+            LiveTradingEngine._prepare_live_universe(engine)
+            LiveTradingEngine._prepare_live_universe(engine)
+            self.assertEqual(calls, [('init', TARGET), 'prepare'])
+            engine._last_universe_refresh_time = t0
+            LiveTradingEngine._maybe_refresh_universe(engine, t0 + timedelta(minutes=1))
+        self.assertEqual(calls, [('init', TARGET), 'prepare', 'refresh'])
+
+    def test_failed_prepare_is_not_kept(self):
+        engine = self._engine()
+        failing = type('_M', (), {'__init__': lambda self, target_date: None, 'prepare': lambda self: False})
+        with patch.object(live_universe, 'LiveUniverseMaintainer', failing):
+            LiveTradingEngine._prepare_live_universe(engine)
+        self.assertIsNone(engine._live_universe)
+
+
+if __name__ == '__main__':
+    unittest.main()
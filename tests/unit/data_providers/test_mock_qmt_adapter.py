@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+MockQmtAdapter 单元测试
+
+测试 get_tick_at_time 的有序时间数组 + 单调游标，以及列式批量查询
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.mock_qmt_adapter import MockQmtAdapter
+
+# 2026-03-18 09:30:00 北京时间（毫秒）
+T0 = 1773797400000
+
+
+def _ticks(offsets_s, base_price):
+    n = len(offsets_s)
+    return pd.DataFrame({
+        'time': [T0 + s * 1000 for s in offsets_s],
+        'lastPrice': [base_price + i for i in range(n)],
+        'open': [base_price] * n, 'high': [base_price + i for i in range(n)],
+        'low': [base_price] * n, 'lastClose': [base_price] * n,
+        'amount': [1e4 * (i + 1) for i in range(n)],
+        'volume': [100 * (i + 1) for i in range(n)],
+        'bidPrice': [[base_price + i - 0.01] * 5 for i in range(n)],
+        'askPrice': [[base_price + i + 0.01] * 5 for i in range(n)],
+        'bidVol': [[10] * 5] * n,
+        'askVol': [[20] * 5] * n,
+    })
+
+
+class TestMockQmtAdapterCursor(unittest.TestCase):
+    """按时刻取Tick"""
+
+    def setUp(self):
+        self.adapter = MockQmtAdapter(target_date='20260318')
+        self.adapter._tick_data_cache = {
+            'A': _ticks([0, 3, 6, 9, 60], 10.0),
+            'B': _ticks([5, 10], 20.0),
+        }
+
+    def test_as_of_lookup(self):
+        """取该时刻及之前最后一笔，时刻前无Tick返回None"""
+        self.assertEqual(self.adapter.get_tick_at_time('A', '09:30:04')['lastPrice'], 11.0)
+        self.assertEqual(self.adapter.get_tick_at_time('A', '093006')['lastPrice'], 12.0)
+        self.assertIsNone(self.adapter.get_tick_at_time('B', '093004'))
+        self.assertIsNone(self.adapter.get_tick_at_time('C', '093004'))
+        tick = self.adapter.get_tick_at_time('A', '100000')
+        self.assertEqual(tick['lastPrice'], 14.0)
+        self.assertEqual(tick['time'], T0 + 60000)
+        self.assertAlmostEqual(tick['bidPrice1'], 13.99)
+        self.assertEqual(tick['askVol1'], 20.0)
+
+    def test_forward_and_backward_playback(self):
+        """顺序推进与回退结果一致"""
+        seconds = list(range(0, 70, 1))
+        forward = [self.adapter.get_tick_at_time('A', f'0930{s:02d}' if s < 60 else f'0931{s - 60:02d}')
+                   for s in seconds]
+        fresh = MockQmtAdapter(target_date='20260318')
+        fresh._tick_data_cache = self.adapter._tick_data_cache
+        backward = [fresh.get_tick_at_time('A', f'0930{s:02d}' if s < 60 else f'0931{s - 60:02d}')
+                    for s in reversed(seconds)]
+        self.assertEqual(forward, list(reversed(backward)))
+
+    def test_batch_lookup_is_columnar(self):
+        """多票同一时刻返回按输入顺序对齐的列"""
+        batch = self.adapter.get_ticks_at_time(['B', 'X', 'A'], '093005')
+        self.assertEqual(batch['valid'].tolist(), [True, False, True])
+        self.assertEqual(batch['lastPrice'].tolist(), [20.0, 0.0, 11.0])
+        self.assertEqual(batch['time'].tolist(), [T0 + 5000, -1, T0 + 3000])
+
+    def test_timeline_uses_cursor(self):
+        """时间线每个槽位给出各票最新Tick"""
+        timeline = self.adapter.get_timeline_ticks(['A', 'B'], interval_seconds=3)
+        self.assertEqual(timeline[0]['time'], '093000')
+        self.assertEqual(set(timeline[0]['ticks']), {'A'})
+        self.assertEqual(set(timeline[2]['ticks']), {'A', 'B'})
+        self.assertEqual(timeline[-1]['ticks']['B']['lastPrice'], 21.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
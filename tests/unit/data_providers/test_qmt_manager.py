@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+QmtDataManager 单元测试
+
+测试补充下载按被验证的交易日修复（verify --date X --fix 不得补成今天），
+以及Tick下载后只对本次实际下载的票补建快照索引
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers import download_scheduler, qmt_manager, snapshot_index
+from logic.data_providers.qmt_manager import DownloadResult, QmtDataManager
+
+
+def _recorder(calls):
+    """假管理器：记录各周期下载请求的日期参数"""
+    def make(name):
+        def download(stock_list, *args, **kwargs):
+            calls[name] = args
+            return {s: DownloadResult(stock_code=s, period=name, success=True) for s in stock_list}
+        return download
+    return types.SimpleNamespace(download_daily_data=make('1d'), download_minute_data=make('1m'),
+                                 download_tick_data=make('tick'))
+
+
+class TestSupplementMissingData(unittest.TestCase):
+    """补充下载"""
+
+    def test_uses_verified_trade_date(self):
+        calls = {}
+        missing = [('000001.SZ', 'tick'), ('000001.SZ', '1m'), ('600000.SH', '1d')]
+        results = QmtDataManager.supplement_missing_data(_recorder(calls), missing, trade_date='20260105')
+        self.assertEqual(calls['tick'], ('20260105',))
+        self.assertEqual(calls['1m'], ('20260105', '20260105'))
+        self.assertEqual(calls['1d'], ('20251226', '20260105'))
+        self.assertEqual(len(results), 2)
+
+    def test_empty_list(self):
+        self.assertEqual(QmtDataManager.supplement_missing_data(_recorder({}), [], trade_date='20260105'), {})
+
+
+class TestTickDownloadSnapshotHook(unittest.TestCase):
+    """Tick下载后的快照索引补建"""
+
+    def test_indexes_only_downloaded_codes(self):
+        results = {
+            'AAA.SZ': DownloadResult(success=True, stock_code='AAA.SZ', period='tick', downloaded=True),
+            'BBB.SZ': DownloadResult(success=True, stock_code='BBB.SZ', period='tick', message='已存在 (3000条)'),
+            'CCC.SZ': DownloadResult(success=False, stock_code='CCC.SZ', period='tick'),
+        }
+        calls = []
+
+        class _Index:
+            def __init__(self, trade_date):
+                self.trade_date = trade_date
+
+            def ensure(self, stock_list, **kwargs):
+                calls.append((self.trade_date, list(stock_list), kwargs))
+
+        manager = types.SimpleNamespace(use_vip=False)
+        with patch.object(qmt_manager, 'XT_AVAILABLE', True), \
+                patch.object(qmt_manager, 'get_coverage_manifest', lambda period: None), \
+                patch.object(download_scheduler.DownloadScheduler, 'run', lambda self, *a, **kw: results), \
+                patch.object(snapshot_index, 'SnapshotIndex', _Index):
+            QmtDataManager.download_tick_data(manager, list(results), '20260105', use_vip=False)
+            self.assertEqual(calls, [('20260105', ['AAA.SZ'], {})])
+            results['AAA.SZ'].downloaded = False
+            QmtDataManager.download_tick_data(manager, list(results), '20260105', use_vip=False)
+        self.assertEqual(len(calls), 1)             # 全部已存在：不读Tick
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+RollingIndicators 单元测试
+
+逐日推进的增量指标与 DailyPanel 整窗重算逐项一致：停牌缺K、NaN 数据、
+股票池进出、上一日缺K线的票冷启动、滚动和重同步、日历回退起点过早时窗口扩容不截断
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.daily_panel import DailyPanel
+from logic.data_providers.rolling_indicators import RollingIndicators, RollingWindow
+
+CALENDAR = pd.bdate_range('2026-01-05', periods=60).strftime('%Y%m%d').tolist()
+CODES = [f'{600000 + i:06d}.SH' for i in range(12)]
+
+
+def _frames():
+    """随机日K；部分票停牌缺行、个别字段 NaN、一只票上市较晚"""
+    rng = np.random.default_rng(7)
+    frames = {}
+    for k, code in enumerate(CODES):
+        n = len(CALENDAR)
+        close = 10 + rng.standard_normal(n).cumsum() * 0.2
+        df = pd.DataFrame({
+            'open': close + rng.uniform(-0.1, 0.1, n),
+            'high': close + rng.uniform(0.0, 0.4, n),
+            'low': close - rng.uniform(0.0, 0.4, n),
+            'close': close,
+            'volume': rng.uniform(1e3, 1e5, n),
+            'amount': rng.uniform(1e6, 1e8, n),
+        }, index=CALENDAR)
+        if k % 3 == 1:
+            df = df.drop(index=rng.choice(CALENDAR, 8, replace=False))
+        if k % 4 == 2:
+            df.iloc[rng.integers(0, len(df), 3), df.columns.get_loc('volume')] = np.nan
+            df.iloc[rng.integers(0, len(df), 2), df.columns.get_loc('close')] = np.nan
+        if k == 11:
+            df = df.iloc[40:]
+        frames[code] = df
+    return frames
+
+
+def _starts(i, span=30):
+    return {'avg': CALENDAR[i - 22], 'ma': CALENDAR[i - span], 'atr': CALENDAR[i - 25]}
+
+
+def _panel(frames, codes, i, span=30):
+    lo, hi = min(_starts(i, span).values()), CALENDAR[i]
+    return DailyPanel.from_frames(codes, {c: frames[c][(frames[c].index >= lo) & (frames[c].index <= hi)]
+                                          for c in codes})
+
+
+class TestRollingIndicators(unittest.TestCase):
+    """增量推进 vs 整窗重算"""
+
+    def assert_matches(self, rolling, panel, starts, fv):
+        close = dict(rtol=1e-9, atol=1e-12, equal_nan=True)
+        np.testing.assert_allclose(rolling.avg_volume(), panel.avg_volume(starts['avg']), **close)
+        np.testing.assert_allclose(rolling.avg_turnover(fv), panel.avg_turnover(starts['avg'], fv), **close)
+        ma_r, ma_p = rolling.moving_averages(), panel.moving_averages(starts['ma'])
+        for key in ('ma5', 'ma10', 'ma20', 'close'):
+            np.testing.assert_allclose(ma_r[key], ma_p[key], err_msg=key, **close)
+        np.testing.assert_array_equal(ma_r['valid'], ma_p['valid'])
+        atr_r, atr_p = rolling.atr(), panel.atr(starts['atr'])
+        np.testing.assert_array_equal(atr_r['valid'], atr_p['valid'])
+        valid = atr_p['valid']
+        np.testing.assert_allclose(atr_r['atr'][valid], atr_p['atr'][valid], **close)
+        np.testing.assert_allclose(atr_r['prev_close'][valid], atr_p['prev_close'][valid], **close)
+
+    def test_daily_roll_matches_full_recompute(self):
+        frames = _frames()
+        fv = np.linspace(1e8, 5e8, len(CODES))
+        rolling = RollingIndicators.from_panel(_panel(frames, CODES, 32), _starts(32), CALENDAR[32])
+        for i in range(33, len(CALENDAR)):
+            panel = _panel(frames, CODES, i)
+            rolling = rolling.roll_to(panel, CALENDAR[i - 1], _starts(i), CALENDAR[i])
+            self.assertEqual(rolling.trade_date, CALENDAR[i])
+            self.assert_matches(rolling, panel, _starts(i), fv)
+
+    def test_pool_change(self):
+        """股票池进出：新进票整行冷启动，其余票沿用滚动状态"""
+        frames = _frames()
+        first, second = CODES[:8], CODES[4:]
+        rolling = RollingIndicators.from_panel(_panel(frames, first, 45), _starts(45), CALENDAR[45])
+        panel = _panel(frames, second, 46)
+        rolling = rolling.roll_to(panel, CALENDAR[45], _starts(46), CALENDAR[46])
+        self.assertEqual(rolling.codes, second)
+        self.assert_matches(rolling, panel, _starts(46), np.full(len(second), 3e8))
+
+    def test_empty_row_cold_starts(self):
+        """上一日整行缺K线（状态全空）的票，面板整窗重读后按整行冷启动"""
+        frames = _frames()
+        base_frames = dict(frames, **{CODES[0]: frames[CODES[0]].iloc[:0]})
+        rolling = RollingIndicators.from_panel(_panel(base_frames, CODES, 45), _starts(45), CALENDAR[45])
+        self.assertEqual(rolling.windows['ma_span'].size[0], 0)
+        panel = _panel(frames, CODES, 46)
+        rolling = rolling.roll_to(panel, CALENDAR[45], _starts(46), CALENDAR[46])
+        self.assert_matches(rolling, panel, _starts(46), np.full(len(CODES), 3e8))
+
+    def test_resync_keeps_values(self):
+        frames = _frames()
+        rolling = RollingIndicators.from_panel(_panel(frames, CODES, 40), _starts(40), CALENDAR[40])
+        before = rolling.avg_volume()
+        for w in rolling.windows.values():
+            w.resync()
+        np.testing.assert_allclose(rolling.avg_volume(), before, rtol=1e-12, equal_nan=True)
+
+    def test_long_span_grows_instead_of_truncating(self):
+        """起点早于 SPAN_CAPACITY 根（日历回退）：只按日期淘汰的窗口扩容，与整窗重算一致"""
+        frames = _frames()
+        span = RollingIndicators.SPAN_CAPACITY + 12
+        rolling = RollingIndicators.from_panel(_panel(frames, CODES, 50, span), _starts(50, span), CALENDAR[50])
+        self.assertGreater(rolling.windows['ma_span'].size.max(), RollingIndicators.SPAN_CAPACITY)
+        for i in (51, 52):
+            panel = _panel(frames, CODES, i, span)
+            rolling = rolling.roll_to(panel, CALENDAR[i - 1], _starts(i, span), CALENDAR[i])
+            self.assert_matches(rolling, panel, _starts(i, span), np.full(len(CODES), 3e8))
+        self.assertEqual(rolling.windows['ma5'].capacity, 5)
+
+
+class TestRollingWindow(unittest.TestCase):
+    """单窗口"""
+
+    def test_capacity_and_date_eviction(self):
+        w = RollingWindow(2, capacity=3)
+        rows = np.array([0, 1])
+        for d, v in enumerate([1.0, 2.0, np.nan, 4.0, 5.0], start=1):
+            w.push(rows, np.array([v, v * 10]), np.array([d, d]))
+        np.testing.assert_allclose(w.mean_skipna(), [4.5, 45.0])
+        self.assertTrue(np.isnan(w.mean_strict()).all())
+        w.evict_before(4)
+        np.testing.assert_allclose(w.mean_strict(), [4.5, 45.0])
+        self.assertEqual(w.size.tolist(), [2, 2])
+
+    def test_growable_keeps_order(self):
+        """可扩容窗口满窗扩容，队头/均值按时间序不变"""
+        w = RollingWindow(1, capacity=2, growable=True)
+        for d in range(1, 6):
+            w.push(np.array([0]), np.array([float(d)]), np.array([d]))
+        self.assertEqual((w.size[0], w.oldest()[0]), (5, 1.0))
+        np.testing.assert_allclose(w.mean_strict(), [3.0])
+        w.evict_before(3)
+        self.assertEqual((w.size[0], w.oldest()[0]), (3, 3.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+SnapshotIndex 单元测试
+
+测试关键时刻抽取、落盘往返、无数据票不入索引与强制重建，以及 extract_snapshot_at_time 毫秒时间戳口径
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.snapshot_index import SnapshotIndex
+from logic.utils.price_utils import extract_snapshot_at_time
+
+TARGET = '20260318'
+
+
+def _ms(hhmmss: str) -> int:
+    return SnapshotIndex._to_ms(TARGET, hhmmss)
+
+
+def _ticks():
+    times = ['091500', '092500', '093003', '094459', '100000', '145957', '150002']
+    prices = [10.0, 10.2, 10.3, 10.5, 10.4, 10.8, 10.9]
+    return pd.DataFrame({
+        'time': [_ms(t) for t in times],
+        'lastPrice': prices,
+        'open': [0.0, 10.2, 10.2, 10.2, 10.2, 10.2, 10.2],
+        'high': prices,
+        'low': [10.0] * 7,
+        'lastClose': [10.0] * 7,
+        'volume': [0, 500, 900, 2000, 2600, 9000, 9100],
+        'amount': [0.0, 5.1e5, 9.3e5, 2.1e6, 2.7e6, 9.5e6, 9.6e6],
+        'askPrice': [[p + 0.01] * 5 for p in prices],
+        'bidPrice': [[p - 0.01] * 5 for p in prices],
+    })
+
+
+class TestSnapshotIndex(unittest.TestCase):
+    """关键时刻快照索引"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.index = SnapshotIndex(TARGET, index_dir=self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_instants_take_last_tick_at_or_before(self):
+        """每个时刻取该时刻及之前最后一笔"""
+        self.index.add('000001.SZ', _ticks())
+        self.assertEqual(self.index.get('000001.SZ', 'auction')['lastPrice'], 10.2)
+        self.assertEqual(self.index.get('000001.SZ', '093000')['lastPrice'], 10.2)
+        self.assertEqual(self.index.get('000001.SZ', '0945')['lastPrice'], 10.5)
+        self.assertEqual(self.index.get('000001.SZ', '1000')['volume'], 2600)
+        close = self.index.get('000001.SZ', 'close')
+        self.assertEqual(close['lastPrice'], 10.9)
+        self.assertEqual(close['time'], _ms('150002'))
+        self.assertAlmostEqual(close['askPrice1'], 10.91)
+        self.assertIsNone(self.index.get('000001.SZ', '103000'))
+
+    def test_missing_instant_and_empty_stock(self):
+        """时刻前无Tick返回None；无数据的票不入索引（下载补齐后可再探测）"""
+        late = _ticks().iloc[3:]
+        self.index.add('600000.SH', late)
+        self.index.add('300001.SZ', None)
+        self.assertIsNone(self.index.get('600000.SH', 'auction'))
+        self.assertIsNotNone(self.index.get('600000.SH', 'close'))
+        self.assertNotIn('300001.SZ', self.index)
+        self.assertIsNone(self.index.get('300001.SZ', 'close'))
+
+    def test_ensure_rereads_empty_and_force_rebuilds(self):
+        """无Tick的票下次 ensure 仍会读取；force 重读已索引的票"""
+        local = {'000001.SZ': _ticks().iloc[:3]}
+        xtdata = types.SimpleNamespace(get_local_data=lambda stock_list, **kw: {c: local[c] for c in stock_list if c in local})
+        with patch.dict(sys.modules, {'xtquant': types.SimpleNamespace(xtdata=xtdata)}):
+            self.assertEqual(self.index.ensure(['000001.SZ', '300001.SZ']), 1)
+            persisted = SnapshotIndex(TARGET, index_dir=self.tmp)
+            self.assertTrue(persisted.load())
+            self.assertEqual(persisted.codes, ['000001.SZ'])
+            local['300001.SZ'] = _ticks()
+            self.assertEqual(self.index.ensure(['000001.SZ', '300001.SZ']), 1)
+            self.assertEqual(self.index.get('300001.SZ', 'close')['lastPrice'], 10.9)
+            local['000001.SZ'] = _ticks()
+            self.assertEqual(self.index.ensure(['000001.SZ'], force=True), 1)
+            self.assertEqual(self.index.get('000001.SZ', 'close')['lastPrice'], 10.9)
+            self.assertEqual(self.index.codes, ['000001.SZ', '300001.SZ'])
+
+    def test_save_load_roundtrip(self):
+        """落盘往返（旧文件里的无数据行在读取时丢弃）"""
+        self.index.add('000001.SZ', _ticks())
+        self.index._row['300001.SZ'] = len(self.index.codes)       # 模拟旧版写入的无数据行
+        self.index._codes.append('300001.SZ')
+        self.index._times = np.concatenate([self.index._times, np.full((1, len(SnapshotIndex.INSTANTS)), -1)])
+        self.index._values = np.concatenate([self.index._values, np.zeros((1,) + self.index._values.shape[1:])])
+        self.index.save()
+        loaded = SnapshotIndex(TARGET, index_dir=self.tmp)
+        self.assertTrue(loaded.load())
+        self.assertEqual(loaded.codes, ['000001.SZ'])
+        self.assertEqual(loaded.snapshot(['000001.SZ', '300001.SZ'], 'close'),
+                         self.index.snapshot(['000001.SZ', '300001.SZ'], 'close'))
+
+    def test_extract_snapshot_at_time_epoch_ms(self):
+        """extract_snapshot_at_time 支持毫秒时间戳，并与索引同口径"""
+        df = _ticks()
+        self.index.add('000001.SZ', df)
+        for hhmmss in ('092505', '150005'):
+            row = extract_snapshot_at_time(df, hhmmss)
+            self.assertEqual(row['lastPrice'], self.index.get('000001.SZ', hhmmss)['lastPrice'])
+        self.assertIsNone(extract_snapshot_at_time(df, '091000'))
+
+    def test_extract_snapshot_at_time_hhmmssmmm(self):
+        """HHMMSSmmm 口径保持不变"""
+        df = pd.DataFrame({'time': [92500000, 93003000, 150002000], 'lastPrice': [1.0, 2.0, 3.0]})
+        self.assertEqual(extract_snapshot_at_time(df, '092505')['lastPrice'], 1.0)
+        self.assertEqual(extract_snapshot_at_time(df, '150005')['lastPrice'], 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+SymbolTable / ColumnStore 单元测试
+
+测试代码驻留、扩容后数据保留、批量 gather 缺失默认值，
+以及 TrueDictionary 批量接口与单只接口逐位一致
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.symbol_table import ColumnStore, SymbolTable
+from logic.data_providers.true_dictionary import TrueDictionary
+
+
+class TestSymbolTable(unittest.TestCase):
+    """代码驻留"""
+
+    def test_intern_stable_ids(self):
+        table = SymbolTable(['000001.SZ', '600000.SH'])
+        ids = table.intern(['600000.SH', '300750.SZ', '000001.SZ'])
+        self.assertEqual(ids.tolist(), [1, 2, 0])
+        self.assertEqual(table.ids(['300750.SZ', '999999.SH']).tolist(), [2, -1])
+        self.assertEqual(len(table), 3)
+
+
+class TestColumnStore(unittest.TestCase):
+    """稠密列"""
+
+    def test_growth_keeps_values(self):
+        """驻留超过初始容量后原有值不丢"""
+        store = ColumnStore(['price'])
+        store.set('price', store.intern(['A']), [1.5])
+        codes = [f'{i:06d}.SZ' for i in range(200)]
+        ids = store.intern(codes)
+        store.set('price', ids, np.arange(200, dtype=float))
+        self.assertEqual(store.get_one('price', 'A'), 1.5)
+        self.assertEqual(store.get_one('price', '000199.SZ'), 199.0)
+        self.assertEqual(store.count('price'), 201)
+
+    def test_gather_defaults(self):
+        """未驻留 / NaN 缺失取 default，结果与输入对齐"""
+        store = ColumnStore(['price', 'volume'])
+        store.set('price', store.intern(['A', 'B']), [1.0, np.nan])
+        out = store.get('price', store.ids(['B', 'X', 'A']), default=-1.0)
+        self.assertEqual(out.tolist(), [-1.0, -1.0, 1.0])
+        self.assertIsNone(store.get_one('volume', 'A', None))
+        self.assertEqual(store.to_dict('price'), {'A': 1.0})
+        self.assertEqual(ColumnStore(['price']).get('price', np.array([-1, -1]), 0.0).tolist(), [0.0, 0.0])
+
+
+class TestTrueDictionaryBatch(unittest.TestCase):
+    """TrueDictionary 批量接口"""
+
+    def setUp(self):
+        TrueDictionary._instance = None
+        TrueDictionary._initialized = False
+        self.td = TrueDictionary()
+
+    def tearDown(self):
+        TrueDictionary._instance = None
+        TrueDictionary._initialized = False
+
+    def test_batch_matches_scalar(self):
+        store = self.td._store
+        ids = store.intern(['000001.SZ', '600000.SH'])
+        store.set('float_volume', ids, [1.9e10, 2.9e10])
+        store.set('avg_volume_5d', ids[:1], [1.2e6])
+        store.set('up_stop_price', ids[1:], [8.8])
+
+        codes = ['600000.SH', '999999.SH', '000001.SZ']
+        batch_ids = self.td.get_symbol_ids(codes)
+        getters = [
+            (self.td.get_float_volume_batch, self.td.get_float_volume),
+            (self.td.get_avg_volume_5d_batch, self.td.get_avg_volume_5d),
+            (self.td.get_up_stop_price_batch, self.td.get_up_stop_price),
+            (self.td.get_atr_20d_batch, self.td.get_atr_20d),
+        ]
+        for batch, scalar in getters:
+            self.assertEqual(batch(batch_ids).tolist(), [scalar(c) for c in codes], scalar.__name__)
+        self.assertEqual(self.td.field_count('float_volume'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
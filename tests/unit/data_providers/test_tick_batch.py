@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+TickBatch / 列式Tick适配器 单元测试
+
+测试列式帧与 StandardTick.to_qmt_dict() 口径一致、TickRow 行视图与
+StandardTick 属性一致、本地DataFrame向量化转换，以及回放游标按时间对齐
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.tick_batch import TickBatch, TickRow
+from logic.data_providers.standard_tick import StandardTick
+from logic.data_providers.tick_adapters import MockTickAdapter
+
+# 2026-03-18 09:30:00 北京时间（毫秒）
+T0 = 1773797400000
+
+
+def _qmt_tick(price, volume, bid_vol, ask_vol, array_book=True):
+    tick = {
+        'lastPrice': price, 'volume': volume, 'amount': price * volume * 100,
+        'lastClose': 10.0, 'open': 10.1, 'high': price + 0.2, 'low': 9.9,
+        'limitUp': 11.0, 'limitDown': 9.0,
+        'bidPrice1': price - 0.01, 'bidPrice2': price - 0.02, 'bidPrice3': 0,
+        'bidPrice4': 0, 'bidPrice5': 0,
+        'askPrice1': price + 0.01, 'askPrice2': price + 0.02, 'askPrice3': 0,
+        'askPrice4': 0, 'askPrice5': 0,
+    }
+    if array_book:
+        tick['bidVol'] = list(bid_vol)
+        tick['askVol'] = list(ask_vol)
+    else:
+        for k in range(5):
+            tick[f'bidVol{k + 1}'] = bid_vol[k]
+            tick[f'askVol{k + 1}'] = ask_vol[k]
+    return tick
+
+
+class TestTickBatch(unittest.TestCase):
+    """列式帧与逐票路径口径一致"""
+
+    def setUp(self):
+        self.raw = {
+            '000001.SZ': _qmt_tick(10.52, 1234.5, [12, 3.5, 0, 7, 1], [4, 0, 9, 2, 0.3]),
+            '600000.SH': _qmt_tick(7.31, 88.0, [1, 2, 3, 4, 5], [5, 4, 3, 2, 1], array_book=False),
+        }
+        self.codes = ['000001.SZ', '300001.SZ', '600000.SH']
+
+    def test_qmt_dict_matches_standard_tick(self):
+        """物化字典与 from_qmt_tick().to_qmt_dict() 逐键相等"""
+        view = TickBatch.from_qmt_ticks(self.codes, self.raw).as_qmt_dicts()
+        for code, tick in self.raw.items():
+            expected = StandardTick.from_qmt_tick(code, tick).to_qmt_dict()
+            actual = view[code]
+            self.assertEqual(list(actual), list(expected))
+            for key, value in expected.items():
+                self.assertAlmostEqual(actual[key], value, places=12, msg=f'{code}.{key}')
+
+    def test_view_only_contains_ticks_present(self):
+        """无Tick的票不出现在视图中"""
+        view = TickBatch.from_qmt_ticks(self.codes, self.raw).as_qmt_dicts()
+        self.assertEqual(len(view), 2)
+        self.assertNotIn('300001.SZ', view)
+        self.assertIsNone(view.get('300001.SZ'))
+        self.assertEqual(set(view), set(self.raw))
+        self.assertIsInstance(view['000001.SZ'], dict)
+        self.assertIs(view['000001.SZ'], view['000001.SZ'])
+
+    def test_standard_ticks_roundtrip(self):
+        """列式 → StandardTick 与直接转换相同"""
+        ticks = TickBatch.from_qmt_ticks(self.codes, self.raw).to_standard_ticks()
+        for code, tick in self.raw.items():
+            expected = StandardTick.from_qmt_tick(code, tick)
+            self.assertEqual(ticks[code].volume_shares, expected.volume_shares)
+            self.assertEqual(ticks[code].bid_vols, expected.bid_vols)
+            self.assertEqual(ticks[code].ask_vols, expected.ask_vols)
+            self.assertAlmostEqual(ticks[code].depth_ratio, expected.depth_ratio, places=12)
+
+    def test_rows_match_standard_tick(self):
+        """TickRow 属性与 StandardTick 逐项相等"""
+        rows = TickBatch.from_qmt_ticks(self.codes, self.raw).rows()
+        self.assertEqual(set(rows), set(self.raw))
+        for code, tick in self.raw.items():
+            expected = StandardTick.from_qmt_tick(code, tick)
+            row = rows[code]
+            self.assertIsInstance(row, TickRow)
+            actual = row.to_dict()
+            for key, value in expected.to_dict().items():
+                if key in ('time', 'extra'):
+                    continue
+                if isinstance(value, list):
+                    np.testing.assert_allclose(actual[key], value, err_msg=f'{code}.{key}')
+                else:
+                    self.assertAlmostEqual(actual[key], value, places=12, msg=f'{code}.{key}')
+            self.assertAlmostEqual(row.depth_ratio, expected.depth_ratio, places=12)
+            self.assertEqual(list(row.to_qmt_dict()), list(expected.to_qmt_dict()))
+
+    def test_depth_ratio_computed_once(self):
+        """深度比整批计算一次并缓存"""
+        batch = TickBatch.from_qmt_ticks(self.codes, self.raw)
+        self.assertIs(batch.depth_ratio, batch.depth_ratio)
+        self.assertIsNone(batch.row('300001.SZ'))
+
+
+class TestTickBatchFromLocal(unittest.TestCase):
+    """本地Tick DataFrame 整列转换"""
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'time': [T0, T0 + 3000, T0 + 6000],
+            'lastPrice': [10.0, 10.1, np.nan],
+            'volume': [100.7, 200, 300],
+            'amount': [1e3, 2e3, 3e3],
+            'open': [10.0] * 3, 'high': [10.0, 10.1, 10.2], 'low': [10.0] * 3,
+            'lastClose': [9.9] * 3,
+            'bidPrice': [[9.99, 9.98, 0, 0, 0]] * 3,
+            'bidVol': [[12, 3.5, 0, 0, 0]] * 3,
+        })
+
+    def test_scalars_match_from_local_tick(self):
+        """标量口径同 StandardTick.from_local_tick"""
+        batch = TickBatch.from_local_ticks('000001.SZ', self.df)
+        self.assertTrue(batch.valid.all())
+        for i, rec in enumerate(self.df.fillna(0).to_dict('records')):
+            expected = StandardTick.from_local_tick('000001.SZ', rec)
+            self.assertEqual(int(batch.volume_shares[i]), expected.volume_shares)
+            for name in ('last_price', 'amount_yuan', 'open_price', 'high_price',
+                         'low_price', 'prev_close'):
+                self.assertAlmostEqual(float(getattr(batch, name)[i]), getattr(expected, name))
+
+    def test_book_stacked_and_row_time(self):
+        """五档数组列堆叠为矩阵，行视图取逐行时间"""
+        batch = TickBatch.from_local_ticks('000001.SZ', self.df)
+        self.assertEqual(batch.bid_prices.shape, (3, 5))
+        self.assertEqual(batch.bid_vols[0].tolist(), [1200, 350, 0, 0, 0])
+        self.assertEqual(batch.ask_vols.sum(), 0)
+        row = batch.row('000001.SZ')
+        self.assertEqual(row.time, '20260318093006')
+        self.assertEqual(row.high_price, 10.2)
+
+
+class TestMockTickAdapterFrames(unittest.TestCase):
+    """回放游标按共享时间轴对齐"""
+
+    def setUp(self):
+        self.adapter = MockTickAdapter(target_date='20260318')
+        frames = {
+            '000001.SZ': pd.DataFrame({
+                'time': [T0, T0 + 3000, T0 + 6000],
+                'lastPrice': [10.0, 10.1, 10.2],
+                'volume': [100, 200, 300],
+                'amount': [1e3, 2e3, 3e3],
+                'open': [10.0] * 3, 'high': [10.0, 10.1, 10.2], 'low': [10.0] * 3,
+                'lastClose': [9.9] * 3,
+                'bidPrice': [[9.99, 9.98, 0, 0, 0], [10.09, 10.08, 0, 0, 0], [10.19, 0, 0, 0, 0]],
+                'askVol': [[5, 0, 0, 0, 0], [6, 1, 0, 0, 0], [7, 2, 3, 0, 0]],
+            }),
+            '600000.SH': pd.DataFrame({
+                'time': [T0 + 1000, T0 + 6000],
+                'lastPrice': [7.0, 7.2],
+                'volume': [50, 80],
+                'amount': [350.0, 576.0],
+                'open': [7.0] * 2, 'high': [7.0, 7.2], 'low': [7.0] * 2,
+                'lastClose': [6.9] * 2,
+            }),
+        }
+        self.assertEqual(self.adapter.load_frames(frames), 2)
+
+    def test_time_axis_is_union(self):
+        """时间轴为两只票时间并集"""
+        self.assertEqual(len(self.adapter._time_axis), 4)
+        self.assertEqual(self.adapter.get_current_time(), '20260318093000')
+
+    def test_cursor_forward_fills_by_time(self):
+        """每帧取该时刻及之前最新一笔，尚未开始的票不出现"""
+        codes = ['600000.SH', '000001.SZ', '999999.SZ']
+        frame = self.adapter.get_frame(codes).as_qmt_dicts()
+        self.assertEqual(list(frame), ['000001.SZ'])
+
+        self.assertTrue(self.adapter.advance_frame())  # T0+1s
+        frame = self.adapter.get_frame(codes).as_qmt_dicts()
+        self.assertEqual(frame['000001.SZ']['lastPrice'], 10.0)
+        self.assertEqual(frame['600000.SH']['lastPrice'], 7.0)
+
+        self.assertTrue(self.adapter.advance_frame())  # T0+3s
+        frame = self.adapter.get_frame(codes).as_qmt_dicts()
+        self.assertEqual(frame['000001.SZ']['lastPrice'], 10.1)
+        self.assertEqual(frame['600000.SH']['lastPrice'], 7.0)
+
+        self.assertTrue(self.adapter.advance_frame())  # T0+6s
+        self.assertFalse(self.adapter.advance_frame())
+        ticks = self.adapter.get_ticks(codes)
+        self.assertEqual(ticks['000001.SZ'].volume_shares, 300)
+        self.assertEqual(ticks['600000.SH'].last_price, 7.2)
+        self.assertEqual(ticks['600000.SH'].prev_close, 6.9)
+        self.assertEqual(ticks['600000.SH'].time, '20260318093006')
+
+    def test_book_levels_replayed(self):
+        """五档随帧回放（量手→股），无五档列的票保持 0"""
+        self.assertTrue(self.adapter.advance_frame())
+        self.assertTrue(self.adapter.advance_frame())  # T0+3s
+        frame = self.adapter.get_frame(['000001.SZ', '600000.SH'])
+        self.assertEqual(frame.bid_prices[0, :2].tolist(), [10.09, 10.08])
+        self.assertEqual(frame.ask_vols[0].tolist(), [600, 100, 0, 0, 0])
+        self.assertEqual(frame.ask_vols[1].sum(), 0)
+        self.assertEqual(frame.as_qmt_dicts()['000001.SZ']['askVol2'], 1)      # QMT 字典口径为手
+
+
+if __name__ == '__main__':
+    unittest.main()
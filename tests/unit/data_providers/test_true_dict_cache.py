@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+TrueDictCache 单元测试
+
+测试二进制日缓存往返、完整性校验（过期/截断/损坏/版本），
+以及 TrueDictionary 全字段落盘与毫秒级装弹
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers import true_dict_cache
+from logic.data_providers.daily_panel import DailyPanel
+from logic.data_providers.true_dict_cache import TrueDictCache
+from logic.data_providers.true_dictionary import TrueDictionary
+
+TARGET = '20260318'
+
+
+def _arrays():
+    return {
+        'codes': np.array(['000001.SZ', '600000.SH'], dtype='U16'),
+        'float_volume': np.array([1.9e10, np.nan]),
+        'panel_dates': np.array([[20260317, 20260318], [0, 20260318]], dtype=np.int64),
+        'empty': np.zeros((2, 0)),
+    }
+
+
+class TestTrueDictCache(unittest.TestCase):
+    """二进制日缓存"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.cache = TrueDictCache(TARGET, cache_dir=self.tmp)
+        self.cache.save(_arrays(), meta={'stock_count': 2})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_roundtrip_memmap(self):
+        """memmap 与读入内存两种方式往返一致"""
+        for mmap in (True, False):
+            loaded = TrueDictCache(TARGET, cache_dir=self.tmp)
+            arrays = loaded.load(mmap=mmap)
+            self.assertEqual(loaded.meta, {'stock_count': 2})
+            for name, expected in _arrays().items():
+                np.testing.assert_array_equal(arrays[name], expected)
+                self.assertEqual(arrays[name].dtype, expected.dtype)
+        self.assertIsInstance(TrueDictCache(TARGET, cache_dir=self.tmp).load()['float_volume'], np.memmap)
+
+    def test_stale_date_rejected(self):
+        """文件内交易日与请求日不符视为过期"""
+        stale = TrueDictCache('20260319', cache_dir=self.tmp)
+        shutil.copy(self.cache.path, stale.path)
+        self.assertIsNone(stale.load())
+
+    def test_truncated_rejected(self):
+        data = self.cache.path.read_bytes()
+        self.cache.path.write_bytes(data[:-8])
+        self.assertIsNone(self.cache.load())
+
+    def test_corrupted_rejected(self):
+        data = bytearray(self.cache.path.read_bytes())
+        data[-50] ^= 0xFF  # panel_dates 数据区（末段为对齐填充）
+        self.cache.path.write_bytes(bytes(data))
+        self.assertIsNone(self.cache.load())
+        self.assertIsNotNone(self.cache.load(verify=False))
+
+    def test_version_mismatch_rejected(self):
+        data = bytearray(self.cache.path.read_bytes())
+        data[8:12] = struct.pack('<I', true_dict_cache.VERSION + 1)
+        self.cache.path.write_bytes(bytes(data))
+        self.assertIsNone(self.cache.load())
+
+
+class TestTrueDictionaryDayCache(unittest.TestCase):
+    """TrueDictionary 全字段日缓存"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self._fresh_dictionary()
+
+    def tearDown(self):
+        self._reset_singleton()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    @staticmethod
+    def _reset_singleton():
+        TrueDictionary._instance = None
+        TrueDictionary._initialized = False
+
+    def _fresh_dictionary(self) -> TrueDictionary:
+        self._reset_singleton()
+        td = TrueDictionary()
+        td.CACHE_DIR = self.tmp
+        return td
+
+    def test_all_fields_roundtrip(self):
+        td = self._fresh_dictionary()
+        store = td._store
+        values = {
+            'float_volume': {'000001.SZ': 19405918198, '600000.SH': 29352178686},
+            'up_stop_price': {'000001.SZ': 12.1},
+            'down_stop_price': {'000001.SZ': 9.9},
+            'avg_volume_5d': {'000001.SZ': 1.2e6, '600000.SH': 4.5e5},
+            'avg_turnover_5d': {'000001.SZ': 0.62},
+            'atr_20d': {'000001.SZ': 0.031, '600000.SH': 0.05},
+            'prev_close': {'000001.SZ': 11.0},
+            'has_ma': {'000001.SZ': 1.0},
+            'ma5': {'000001.SZ': 11.0}, 'ma10': {'000001.SZ': 10.8},
+            'ma20': {'000001.SZ': 10.5}, 'ma_close': {'000001.SZ': 11.0},
+        }
+        for field, data in values.items():
+            store.set(field, store.intern(data), list(data.values()))
+        td._sector_map = {'000001.SZ': ['银行']}
+        frame = pd.DataFrame({'open': [10.9], 'high': [11.2], 'low': [10.8], 'close': [11.0],
+                              'volume': [1e6], 'amount': [1.1e9]}, index=[TARGET])
+        td._daily_panel = DailyPanel.from_frames(['000001.SZ'], {'000001.SZ': frame})
+        ma = td.get_ma_data('000001.SZ')
+        self.assertTrue(td._save_day_cache(TARGET))
+
+        td = self._fresh_dictionary()
+        stats = td._load_day_cache(TARGET, ['000001.SZ', '600000.SH'])
+        self.assertTrue(stats['cache_hit'])
+        for field, data in values.items():
+            self.assertEqual(td._store.to_dict(field), data, field)
+        self.assertEqual(td._sector_map, {'000001.SZ': ['银行']})
+        self.assertEqual(td.get_ma_data('000001.SZ'), ma)
+        self.assertIsNone(td.get_ma_data('600000.SH'))
+        self.assertIsInstance(td.get_float_volume('000001.SZ'), float)
+        self.assertEqual(td._daily_panel.last_dates().tolist(), [int(TARGET), 0])
+
+        base = td._find_base_panel('20260319')
+        self.assertEqual(base[0], TARGET)
+        self.assertIsNone(td._find_base_panel(TARGET))
+
+    def test_poisoned_cache_discarded(self):
+        """覆盖不足一半的缓存判定投毒，备份后重新装弹"""
+        td = self._fresh_dictionary()
+        td._store.set_one('float_volume', '000001.SZ', 100)
+        td._save_day_cache(TARGET)
+        self.assertIsNone(td._load_day_cache(TARGET, ['000001.SZ', '000002.SZ', '000003.SZ']))
+        self.assertTrue((self.tmp / f'true_dict_{TARGET}.tdc.poisoned').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+UniverseCache 单元测试
+
+测试面板按日截断、成员表落盘往返与参数哈希，
+日K缺失时不落盘，
+以及区间预计算（一次读日K、主表只取一次）与逐日 UniverseBuilder 建池结果逐日一致、重跑全部命中缓存
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.daily_panel import DailyPanel
+from logic.data_providers.instrument_master import InstrumentMaster
+from logic.data_providers.universe_cache import UniverseCache, funnel_key, precompute_universes
+from logic.utils.calendar_utils import get_trading_days_between
+
+CALENDAR = pd.bdate_range('2025-06-02', '2025-12-12').strftime('%Y%m%d').tolist()
+DATES = get_trading_days_between('20251201', '20251212')
+
+
+def _frames(n_stocks=160, seed=7):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for k in range(n_stocks):
+        n = len(CALENDAR)
+        close = rng.choice([1.5, 10.0, 40.0]) * np.exp(rng.standard_normal(n).cumsum() * 0.02)
+        volume = rng.uniform(5e4, 5e5, n) * np.where(rng.random(n) < 0.15, 4.0, 1.0)
+        df = pd.DataFrame({
+            'open': close, 'high': close * (1 + rng.uniform(0, 0.03, n)), 'low': close * 0.98,
+            'close': close, 'volume': volume, 'amount': volume * close * 100 * rng.choice([0.5, 2.0]),
+        }, index=CALENDAR)
+        if k % 7 == 1:
+            df = df.iloc[-rng.integers(5, 40):]                   # 次新
+        elif k % 7 == 2:
+            df = df.drop(index=rng.choice(CALENDAR, 20, replace=False))   # 停牌
+        frames[f'{k:06d}.SZ'] = df
+    return frames
+
+
+FRAMES = _frames()
+CODES = list(FRAMES)
+
+
+def _master(trade_date):
+    details = {c: {'InstrumentName': 'ST样本' if i % 11 == 0 else f'样本{i}'} for i, c in enumerate(CODES)}
+    return InstrumentMaster.from_details(trade_date, CODES, details)
+
+
+def _read(stock_list, start_date, end_date, chunk_size=None):
+    window = {c: df[(df.index >= start_date) & (df.index <= end_date)] for c, df in FRAMES.items()}
+    return DailyPanel.from_frames(list(stock_list), window)
+
+
+class TestUniverseCache(unittest.TestCase):
+    """候选池成员表缓存与区间预计算"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.patches = [
+            mock.patch.object(InstrumentMaster, 'get', side_effect=lambda d, *a, **k: _master(d)),
+            mock.patch('logic.data_providers.true_dictionary.get_true_dictionary',
+                       side_effect=RuntimeError('离线')),
+        ]
+        self.master_get = self.patches[0].start()
+        self.patches[1].start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_panel_until(self):
+        """整段面板截断 == 直接读到该日的面板"""
+        full = _read(CODES, CALENDAR[0], CALENDAR[-1])
+        for end in ('20251205', '20250602', '20250101'):
+            expect = _read(CODES, CALENDAR[0], end)
+            got = full.until(end)
+            self.assertEqual(got.width, expect.width)
+            np.testing.assert_array_equal(got.dates, expect.dates)
+            for f in DailyPanel.FIELDS:
+                np.testing.assert_array_equal(got.values[f], expect.values[f])
+
+    def test_roundtrip_and_key(self):
+        cache = UniverseCache(funnel_key(1.5e8, {'000001.SZ'}), self.tmp)
+        cache.save('20251201', ['000002.SZ', '000003.SZ'], {'000002.SZ': 3.5, '000004.SZ': 0.0},
+                   {'final_pool': 2})
+        pool, ratios, stats = cache.load('20251201')
+        self.assertEqual(pool, ['000002.SZ', '000003.SZ'])
+        self.assertEqual(ratios, {'000002.SZ': 3.5, '000004.SZ': 0.0})
+        self.assertEqual(stats, {'final_pool': 2})
+        self.assertIsNone(cache.load('20251202'))
+        self.assertEqual(cache.dates(), ['20251201'])
+        # 任一漏斗参数变化换 key
+        self.assertNotEqual(funnel_key(1.5e8, set()), funnel_key(2e8, set()))
+        self.assertNotEqual(funnel_key(1.5e8, set()), funnel_key(1.5e8, {'000001.SZ'}))
+        self.assertEqual(funnel_key(1.5e8, ['B', 'A']), funnel_key(1.5e8, ['A', 'B']))
+
+    def test_precompute_matches_daily_build(self):
+        """区间预计算只读一次日K，逐日结果与逐日现场建池一致；重跑全部命中"""
+        from logic.data_providers.universe_builder import UniverseBuilder
+
+        expected = {}
+        with mock.patch.object(DailyPanel, 'read', side_effect=_read):
+            for date in DATES:
+                expected[date] = UniverseBuilder(date, use_cache=False).build()
+
+        self.master_get.reset_mock()
+        with mock.patch.object(DailyPanel, 'read', side_effect=_read) as read:
+            counts = precompute_universes(DATES, cache_dir=self.tmp)
+        self.assertEqual(read.call_count, 1)
+        self.assertEqual(self.master_get.call_count, 1)         # 无落盘主表时整段只刷新一次
+        self.assertEqual(sorted(counts), DATES)
+
+        for date in DATES:
+            builder = UniverseBuilder(date, cache_dir=self.tmp)
+            with mock.patch.object(InstrumentMaster, 'get', side_effect=AssertionError('should not build')):
+                pool, ratios = builder.build()
+            self.assertTrue(builder.get_stats()['cache_hit'])
+            self.assertEqual(pool, expected[date][0])
+            self.assertEqual(ratios.keys(), expected[date][1].keys())
+            np.testing.assert_allclose(list(ratios.values()), list(expected[date][1].values()))
+        self.assertTrue(any(expected[d][0] for d in DATES))
+
+        with mock.patch.object(DailyPanel, 'read', side_effect=AssertionError('should not read')):
+            self.assertEqual(precompute_universes(DATES, cache_dir=self.tmp), counts)
+
+    def test_missing_daily_bars_not_cached(self):
+        """日K大面积缺失（近7日无K线的票超过警报线）时建池结果不落盘"""
+        from logic.data_providers.universe_builder import UniverseBuilder
+
+        def stale(stock_list, start_date, end_date, chunk_size=None):
+            window = {c: df[(df.index >= start_date) & (df.index <= '20251120')] for c, df in FRAMES.items()}
+            return DailyPanel.from_frames(list(stock_list), window)
+
+        cache = UniverseBuilder(DATES[-1], cache_dir=self.tmp).cache
+        with mock.patch.object(DailyPanel, 'read', side_effect=stale):
+            UniverseBuilder(DATES[-1], cache_dir=self.tmp).build()
+        self.assertEqual(cache.dates(), [])
+        with mock.patch.object(DailyPanel, 'read', side_effect=_read):      # 补数后重建才落盘
+            UniverseBuilder(DATES[-1], cache_dir=self.tmp).build()
+        self.assertEqual(cache.dates(), [DATES[-1]])
+
+    def test_today_not_cached(self):
+        from datetime import datetime
+        from logic.data_providers.universe_builder import UniverseBuilder
+
+        builder = UniverseBuilder(datetime.now().strftime('%Y%m%d'), cache_dir=self.tmp)
+        self.assertFalse(builder.use_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+UniverseFunnels 单元测试
+
+向量化漏斗2/漏斗3 与原逐只 pandas 实现（下方 _legacy_*，照搬旧 UniverseBuilder 循环）
+在含停牌、次新、NaN、零量、价格越界的随机日K上逐票一致
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.data_providers.daily_panel import DailyPanel
+from logic.data_providers.universe_funnels import funnel2, funnel3
+
+CALENDAR = pd.bdate_range('2025-12-01', periods=62).strftime('%Y%m%d').tolist()
+TARGET = CALENDAR[-1]
+START7 = CALENDAR[-8]
+START60 = CALENDAR[-61]
+MIN_AVG_AMOUNT = 1.5e8
+
+
+def _frames(n_stocks=300, seed=11):
+    rng = np.random.default_rng(seed)
+    frames, float_volume = {}, []
+    for k in range(n_stocks):
+        n = len(CALENDAR)
+        base = rng.choice([1.5, 8.0, 30.0, 600.0], p=[0.05, 0.6, 0.3, 0.05])
+        close = base * np.exp(rng.standard_normal(n).cumsum() * 0.03)
+        volume = rng.uniform(5e4, 5e5, n)
+        volume[-1] *= rng.choice([0.5, 1.0, 3.0, 6.0])
+        df = pd.DataFrame({
+            'open': close, 'high': close * (1 + rng.uniform(0, 0.05, n)), 'low': close * 0.97,
+            'close': close, 'volume': volume,
+            'amount': volume * close * 100 * rng.choice([0.2, 1.0, 3.0]),
+        }, index=CALENDAR)
+        kind = k % 9
+        if kind == 1:
+            df = df.iloc[-rng.integers(1, 25):]                 # 次新
+        elif kind == 2:
+            df = df.drop(index=rng.choice(CALENDAR[:-1], 12, replace=False))   # 停牌
+        elif kind == 3:
+            df.iloc[rng.integers(50, 61, 2), df.columns.get_loc('volume')] = np.nan
+        elif kind == 4:
+            df.iloc[-1, df.columns.get_loc('volume')] = 0.0
+        elif kind == 5:
+            df = df.iloc[:-3]                                   # 近期停牌
+        elif kind == 6:
+            df = df.iloc[:0]
+        frames[f'{k:06d}.SZ'] = df
+        float_volume.append(rng.choice([0.0, 1e7, 1e8, 1e9]))
+    return frames, np.array(float_volume)
+
+
+def _legacy_funnel2(frames, float_volume):
+    passed, ratios = [], {}
+    cnt = {'nodata': 0, 'volume': 0, 'price': 0, 'turnover': 0}
+    for stock, fv in zip(frames, float_volume):
+        df = frames[stock]
+        df = df[df.index >= START7]
+        if df is None or len(df) < 1:
+            cnt['nodata'] += 1
+            ratios[stock] = 0.0
+            continue
+        hist_n = min(5, len(df) - 1)
+        if hist_n > 0:
+            today_volume = float(df['volume'].iloc[-1])
+            avg_volume_5d = df['volume'].iloc[-hist_n - 1:-1].mean()
+            if avg_volume_5d > 0 and not (pd.isna(today_volume) or np.isinf(today_volume)):
+                ratios[stock] = float(today_volume / avg_volume_5d)
+            else:
+                ratios[stock] = 0.0
+        else:
+            today_volume = float(df['volume'].iloc[-1]) if len(df) > 0 else 0.0
+            ratios[stock] = 1.0 if today_volume > 0 else 0.0
+        last_close = float(df['close'].iloc[-1])
+        today_volume = float(df['volume'].iloc[-1])
+        today_amount = float(df['amount'].iloc[-1])
+        if last_close <= 0 or today_volume <= 0:
+            cnt['nodata'] += 1
+            continue
+        if not (2.0 <= last_close <= 500.0):
+            cnt['price'] += 1
+            continue
+        _hist_n = min(5, len(df) - 1)
+        if _hist_n > 0:
+            avg_amount_5d = df['amount'].iloc[-_hist_n - 1:-1].mean()
+            avg_volume_5d = df['volume'].iloc[-_hist_n - 1:-1].mean()
+            avg_amount_5d = avg_amount_5d if not pd.isna(avg_amount_5d) else 0
+            avg_volume_5d = avg_volume_5d if not pd.isna(avg_volume_5d) else 0
+        else:
+            avg_amount_5d = float(df['amount'].iloc[-1])
+            avg_volume_5d = float(df['volume'].iloc[-1])
+        if avg_amount_5d < MIN_AVG_AMOUNT:
+            cnt['volume'] += 1
+            continue
+        if fv <= 0:
+            passed.append(stock)
+            continue
+        today_turnover_pct = (today_volume * 100 / fv) * 100
+        volume_ratio = today_volume / avg_volume_5d if avg_volume_5d > 0 else 0
+        if volume_ratio < 2.0 or today_turnover_pct < 2.0:
+            cnt['turnover'] += 1
+            continue
+        passed.append(stock)
+    return passed, ratios, cnt
+
+
+def _legacy_funnel3(frames, stocks):
+    passed, cnt = [], {'fail': 0, 'nodata': 0}
+    for stock in stocks:
+        df = frames[stock]
+        df = df[df.index >= START60]
+        if len(df) < 10:
+            cnt['nodata'] += 1
+            continue
+        if len(df) < 20:
+            cnt['fail'] += 1
+            continue
+        high_60d = float(df['high'].max())
+        current_close = float(df.iloc[-1]['close'])
+        if high_60d <= 0:
+            cnt['nodata'] += 1
+            continue
+        threshold = 0.10 if len(df) < 60 else 0.15
+        if (high_60d - current_close) / high_60d <= threshold:
+            passed.append(stock)
+        else:
+            cnt['fail'] += 1
+    return passed, cnt
+
+
+class TestUniverseFunnels(unittest.TestCase):
+    """向量化漏斗 vs 原逐只实现"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.frames, cls.float_volume = _frames()
+        codes = list(cls.frames)
+        window = {c: df[df.index >= START60] for c, df in cls.frames.items()}
+        cls.panel = DailyPanel.from_frames(codes, window)
+        cls.codes = codes
+
+    def test_funnel2_matches_legacy(self):
+        mask, ratio, cnt = funnel2(self.panel, START7, self.float_volume, MIN_AVG_AMOUNT)
+        passed, ratios, legacy = _legacy_funnel2(self.frames, self.float_volume)
+        self.assertEqual([c for c, ok in zip(self.codes, mask) if ok], passed)
+        np.testing.assert_allclose(ratio, [ratios[c] for c in self.codes], rtol=1e-12)
+        self.assertEqual(cnt['nodata'], legacy['nodata'])
+        self.assertEqual(cnt['price'], legacy['price'])
+        self.assertEqual(cnt['amount'], legacy['volume'])
+        self.assertEqual(cnt['volume_ratio'] + cnt['turnover'], legacy['turnover'])
+        self.assertGreater(len(passed), 0)
+
+    def test_funnel3_matches_legacy(self):
+        mask, cnt = funnel3(self.panel, START60)
+        passed, legacy = _legacy_funnel3(self.frames, self.codes)
+        self.assertEqual([c for c, ok in zip(self.codes, mask) if ok], passed)
+        self.assertEqual(cnt['nodata'], legacy['nodata'])
+        self.assertEqual(cnt['short_history'] + cnt['space_gap'], legacy['fail'])
+        self.assertGreater(len(passed), 0)
+
+    def test_empty_panel(self):
+        panel = DailyPanel.from_frames(['A', 'B'], {})
+        mask, ratio, cnt = funnel2(panel, START7, np.zeros(2), MIN_AVG_AMOUNT)
+        self.assertEqual((mask.tolist(), ratio.tolist(), cnt['nodata']), ([False, False], [0.0, 0.0], 2))
+        mask, cnt = funnel3(panel, START60)
+        self.assertEqual((mask.tolist(), cnt['nodata']), ([False, False], 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+记忆模块单元测试初始化
+"""
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+SessionSnapshot 增量快照单元测试
+
+测试帧边界增量移交（含数组化 L1 累加器复用缓冲比对、未脏段与未写累加器跳过）、
+增量日志重放、压实与停顿指标
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.core.l1_flow import L1FlowAccumulator
+from logic.memory.session_snapshot import SessionSnapshot
+
+
+def _make_engine():
+    return SimpleNamespace(
+        mode='live',
+        decision_brain=None,
+        execution_manager=None,
+        opportunity_pool={},
+        highest_scores={},
+        watchlist=['000001.SZ', '600000.SH'],
+        market_total_inflow_cache=1000000.0,
+        global_tick_frame=0,
+        session_snapshot=None,
+        l1_inflow_accumulator={
+            '000001.SZ': {'inflow': 1.0, 'last_amount': 100.0, 'last_price': 10.0},
+            '600000.SH': {'inflow': -2.0, 'last_amount': 200.0, 'last_price': 8.0},
+        },
+    )
+
+
+class TestIncrementalSnapshot(unittest.TestCase):
+    """测试增量快照"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._orig_dir = SessionSnapshot.SNAPSHOT_DIR
+        SessionSnapshot.SNAPSHOT_DIR = Path(self._tmp.name)
+        self.snap = SessionSnapshot('20260318')
+        self.engine = _make_engine()
+
+    def tearDown(self):
+        SessionSnapshot.SNAPSHOT_DIR = self._orig_dir
+        self._tmp.cleanup()
+
+    def _flush(self):
+        self.snap._drain_queue(timeout=None)
+
+    def test_first_frame_is_full_then_only_changes(self):
+        """首帧全量，之后只移交变化的票和段"""
+        first = self.snap.capture_frame(self.engine)
+        self.assertTrue(first.get('full'))
+        self.assertEqual(len(first['l1']), 2)
+
+        self.engine.l1_inflow_accumulator['000001.SZ']['inflow'] = 5.0
+        second = self.snap.capture_frame(self.engine)
+        self.assertNotIn('full', second)
+        self.assertEqual(list(second['l1']), ['000001.SZ'])
+        self.assertNotIn('sections', second)
+
+        del self.engine.l1_inflow_accumulator['600000.SH']
+        third = self.snap.capture_frame(self.engine)
+        self.assertEqual(third['l1_removed'], ['600000.SH'])
+
+    def test_array_accumulator_reuses_buffers(self):
+        """数组化累加器：两块缓冲交替复用，只移交变化/新增/复用下标的票"""
+        acc = L1FlowAccumulator()
+        acc.load_state(self.engine.l1_inflow_accumulator)
+        self.engine.l1_inflow_accumulator = acc
+        first = self.snap.capture_frame(self.engine)
+        self.assertEqual(first['l1'], {'000001.SZ': (1.0, 100.0, 10.0), '600000.SH': (-2.0, 200.0, 8.0)})
+        buffers = {id(self.snap._l1_buf), id(self.snap._l1_prev)}
+
+        acc['000001.SZ'] = (5.0, 150.0, 10.1)
+        second = self.snap.capture_frame(self.engine)
+        self.assertEqual(second['l1'], {'000001.SZ': (5.0, 150.0, 10.1)})
+        self.assertNotIn('l1_removed', second)
+        self.assertNotIn('l1', self.snap.capture_frame(self.engine))
+        self.assertEqual({id(self.snap._l1_buf), id(self.snap._l1_prev)}, buffers)
+
+        del acc['600000.SH']
+        acc['300750.SZ'] = (3.0, 30.0, 200.0)            # 复用被释放的下标
+        fourth = self.snap.capture_frame(self.engine)
+        self.assertEqual(fourth['l1'], {'300750.SZ': (3.0, 30.0, 200.0)})
+        self.assertEqual(fourth['l1_removed'], ['600000.SH'])
+
+        for i in range(300):                              # 超出初始容量
+            acc[f'{i:06d}.SZ'] = (float(i), 0.0, 0.0)
+        self.assertEqual(len(self.snap.capture_frame(self.engine)['l1']), 300)
+        self.assertNotIn('l1', self.snap.capture_frame(self.engine))
+        self._flush()
+        self.assertEqual(self.snap._merged['l1_inflow_accumulator']['300750.SZ']['inflow'], 3.0)
+        self.assertNotIn('600000.SH', self.snap._merged['l1_inflow_accumulator'])
+
+    def test_clean_sections_and_l1_are_not_collected(self):
+        """版本键未变的段不构建，写版本未变的数组化累加器不拷贝"""
+        acc = L1FlowAccumulator()
+        acc.load_state(self.engine.l1_inflow_accumulator)
+        self.engine.l1_inflow_accumulator = acc
+        self.engine.highest_scores = {'000001.SZ': {'score': 80.0, 'time': '09:35', 'price': 10.0}}
+        self.snap.capture_frame(self.engine)
+
+        with mock.patch.object(self.snap, '_collect_sections', wraps=self.snap._collect_sections) as collect, \
+                mock.patch.object(acc, 'copy_into', wraps=acc.copy_into) as copy:
+            self.assertEqual(set(self.snap.capture_frame(self.engine)), {'seq', 'meta'})
+            self.assertEqual(collect.call_args.args[1], [])
+            copy.assert_not_called()
+
+            self.engine.highest_scores['000001.SZ'].update(score=90.0)   # 原地改写
+            self.engine.watchlist.append('300750.SZ')
+            acc['000001.SZ'] = (5.0, 150.0, 10.1)
+            record = self.snap.capture_frame(self.engine)
+            self.assertEqual(collect.call_args.args[1], ['highest_scores', 'watchlist'])
+            self.assertEqual(set(record['sections']), {'highest_scores', 'watchlist'})
+            self.assertEqual(record['l1'], {'000001.SZ': (5.0, 150.0, 10.1)})
+            self.assertEqual(copy.call_count, 1)
+
+    def test_load_replays_delta_log(self):
+        """崩溃后 load = 全量 + 增量重放，与引擎最终状态一致"""
+        self.snap.capture_frame(self.engine)
+        self._flush()
+        self.snap.compact()
+
+        self.engine.global_tick_frame = 7
+        self.engine.l1_inflow_accumulator['600000.SH']['inflow'] = 9.5
+        self.engine.watchlist.append('300750.SZ')
+        self.snap.capture_frame(self.engine)
+        self._flush()
+
+        restored = SessionSnapshot('20260318').load()
+        expected = self.snap.build_snapshot(self.engine)
+        self.assertEqual(restored['global_tick_frame'], 7)
+        self.assertEqual(restored['watchlist'], expected['watchlist'])
+        self.assertEqual(restored['l1_inflow_accumulator'], expected['l1_inflow_accumulator'])
+
+    def test_truncated_tail_is_ignored(self):
+        """增量日志尾部被截断时，已完整写入的记录仍可恢复"""
+        self.snap.capture_frame(self.engine)
+        self._flush()
+        with open(self.snap._delta_file, 'ab') as f:
+            f.write(b'\x40\x00\x00\x00partial')
+
+        restored = SessionSnapshot('20260318').load()
+        self.assertEqual(restored['l1_inflow_accumulator']['000001.SZ']['inflow'], 1.0)
+
+    def test_compact_clears_delta_log(self):
+        """压实后增量日志清空，全量 JSON 记录 delta_seq"""
+        self.snap.capture_frame(self.engine)
+        self.snap.capture_frame(self.engine)
+        self._flush()
+        self.assertTrue(self.snap._delta_file.exists())
+        self.assertTrue(self.snap.compact())
+        self.assertFalse(self.snap._delta_file.exists())
+        self.assertEqual(SessionSnapshot('20260318').load()['delta_seq'], 2)
+
+    def test_stall_metrics(self):
+        """停顿指标按帧统计"""
+        for _ in range(5):
+            self.snap.capture_frame(self.engine)
+        metrics = self.snap.get_stall_metrics()
+        self.assertEqual(metrics['frames'], 5)
+        # 5 条增量 + 首帧移交的 1 份滚动窗口
+        self.assertEqual(metrics['pending'], 6)
+        self.assertGreaterEqual(metrics['max_ms'], metrics['avg_ms'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+WarmRestartStore 单元测试
+
+测试滚动窗口二进制往返、日期校验与本地Tick补缺
+
+Author: CTO
+Date: 2026-03-18
+"""
+
+import sys
+import tempfile
+import types
+import unittest
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from logic.memory.warm_restart import WarmRestartStore
+
+T0 = datetime(2026, 3, 18, 10, 0, 0)
+
+
+class _FakeEngine:
+    _TICK_HISTORY_MAXLEN = 60
+
+    def __init__(self):
+        self.watchlist = ['000001.SZ']
+        self.candidate_pool = {}
+        self.tick_history = {}
+        self.volume_history = {}
+        self.l1_inflow_accumulator = {}
+        self.l1_calls = []
+        self.now = T0
+
+    def get_current_time(self):
+        return self.now
+
+    def _calculate_l1_inflow(self, code, amount, price, pre_close, high, low, tick=None):
+        self.l1_calls.append((code, amount, price))
+        acc = self.l1_inflow_accumulator.setdefault(
+            code, {'inflow': 0.0, 'last_amount': amount, 'last_price': price})
+        acc['inflow'] += amount - acc['last_amount']
+        acc['last_amount'] = amount
+        acc['last_price'] = price
+        return acc['inflow']
+
+
+def _fill(engine, n=70):
+    engine.tick_history['000001.SZ'] = deque(maxlen=60)
+    engine.volume_history['000001.SZ'] = deque(maxlen=60)
+    for i in range(n):
+        engine.tick_history['000001.SZ'].append(
+            {'price': 10.0 + i * 0.01, 'timestamp': T0 - timedelta(seconds=3 * (n - i)), 'volume': 1000.0 + i})
+        engine.volume_history['000001.SZ'].append(1000.0 + i)
+    engine.l1_inflow_accumulator['000001.SZ'] = {'inflow': 5e6, 'last_amount': 1e8, 'last_price': 10.69}
+
+
+class TestWarmRestartStore(unittest.TestCase):
+    """测试滚动窗口热重启"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = WarmRestartStore('20260318', snapshot_dir=self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip(self):
+        """保存后还原的窗口与 L1 累加器与原引擎一致"""
+        src = _FakeEngine()
+        _fill(src)
+        self.assertTrue(self.store.write(self.store.capture(src)))
+
+        dst = _FakeEngine()
+        data = self.store.load()
+        self.assertEqual(data['saved_at'], T0)
+        self.assertEqual(self.store.restore_to_engine(dst, data), 1)
+        self.assertEqual(list(dst.tick_history['000001.SZ']), list(src.tick_history['000001.SZ']))
+        self.assertEqual(list(dst.volume_history['000001.SZ']), list(src.volume_history['000001.SZ']))
+        self.assertEqual(dst.tick_history['000001.SZ'].maxlen, 60)
+        self.assertEqual(dst.l1_inflow_accumulator, src.l1_inflow_accumulator)
+
+    def test_other_date_ignored(self):
+        """不同交易日的窗口文件不恢复"""
+        src = _FakeEngine()
+        _fill(src)
+        self.store.write(self.store.capture(src))
+        other = WarmRestartStore('20260317', snapshot_dir=self._tmp.name)
+        other._window_file = self.store._window_file
+        self.assertIsNone(other.load())
+
+    def test_maybe_capture_interval(self):
+        """未到间隔不拷贝"""
+        engine = _FakeEngine()
+        self.assertIsNotNone(self.store.maybe_capture(engine))
+        self.assertIsNone(self.store.maybe_capture(engine))
+
+    def test_gap_fill_replays_missing_ticks(self):
+        """保存时刻之后的本地Tick按时间顺序补进窗口与累加器"""
+        engine = _FakeEngine()
+        _fill(engine)
+        saved_at = T0
+        # 本地Tick：保存前1笔（应跳过）+ 保存后3笔
+        base_ms = (saved_at - datetime(1970, 1, 1)).total_seconds() * 1000 - 8 * 3600 * 1000
+        df = pd.DataFrame({
+            'time': [base_ms - 3000, base_ms + 3000, base_ms + 6000, base_ms + 9000],
+            'lastPrice': [10.69, 10.70, 10.71, 10.72],
+            'open': [10.0] * 4, 'high': [10.8] * 4, 'low': [9.9] * 4, 'lastClose': [10.0] * 4,
+            'volume': [1069, 1070, 1071, 1072],
+            'amount': [1e8, 1.01e8, 1.02e8, 1.03e8],
+        })
+        fake_xtdata = SimpleNamespace(get_local_data=lambda **kw: {'000001.SZ': df})
+        fake_xtquant = types.ModuleType('xtquant')
+        fake_xtquant.xtdata = fake_xtdata
+        with mock.patch.dict(sys.modules, {'xtquant': fake_xtquant, 'xtquant.xtdata': fake_xtdata}):
+            replayed = self.store.gap_fill(engine, saved_at, until=saved_at + timedelta(seconds=10))
+
+        self.assertEqual(replayed, 3)
+        self.assertEqual([c[1] for c in engine.l1_calls], [1.01e8, 1.02e8, 1.03e8])
+        self.assertEqual(engine.l1_inflow_accumulator['000001.SZ']['inflow'], 5e6 + 3e6)
+        last = engine.tick_history['000001.SZ'][-1]
+        self.assertEqual(last['timestamp'], saved_at + timedelta(seconds=9))
+        self.assertEqual(engine.volume_history['000001.SZ'][-1], 1072)
+
+
+if __name__ == '__main__':
+    unittest.main()
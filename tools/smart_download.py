@@ -13,11 +13,12 @@
   1. 日K直接读本地；不足时先自动补充，补失败才退出
   2. 常规模式：逐日 UniverseBuilder 粗筛 → 下载 Tick（量比达标票）
      【新增】附带计算全市场量比 95th 分位数作为动态阈值写入 tick_index.json
-  3. --full 模式：全市场循环投递，每100只打印一次进度
+  3. --full 模式：全市场全部交易日一条流水线投递
   4. --stocks 模式：绕开粗筛，直接对指定股票下载 Tick（研究用）
   5. [P0修复] download_history_data 是异步调用，ok计数必须经落盘验证
-     verify_landed() 投递后 sleep(VERIFY_WAIT_S) 再读本地，真实非空才算 verified
-     全量模式批量投递完后统一抽样验证（不逐只等待，保证速度）
+     【CTO V233 流水线下载】投递 / 落盘轮询 / 验证由 DownloadPipeline 重叠执行：
+     不再固定 sleep 等落盘，也不再抽样验证——每一项都以本地数据层读回为准，
+     覆盖清单已有的跳过、缺口优先投递，结束时报告吞吐与未完成项
 """
 import sys
 import time
@@ -27,10 +28,12 @@ from datetime import datetime, timedelta
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-PRINT_EVERY    = 100   # 每100只打印一次进度
-DAY_SLEEP      = 2     # 两个交易日之间间隔(s)
-VERIFY_WAIT_S  = 1.5   # 投递后等待落盘的秒数（--stocks 模式每只验证）
-BATCH_VERIFY_N = 10    # --full/粗筛模式完成后抽样验证的只数
+from sim import install_if_configured  # 【CTO V233 仿真行情】数据源=fake 时 xtquant → 仿真包
+install_if_configured()
+
+PRINT_EVERY    = 5.0   # 每5秒打印一次流水线进度
+PIPE_WORKERS   = 8     # 投递线程数
+INCOMPLETE_TOP = 20    # 报告里列出的未完成项数
 
 
 def log(msg: str) -> None:
@@ -39,45 +42,55 @@ def log(msg: str) -> None:
 
 
 # ────────────────────────────────────────────
-# 核心：落盘验证
+# 核心：流水线投递 + 落盘验证
 # ────────────────────────────────────────────
 
-def verify_landed(stock: str, date: str, xtdata, wait_s: float = VERIFY_WAIT_S) -> bool:
-    """
-    等待 wait_s 秒后读本地 tick，返回是否真实落盘。
-    注意：get_local_data 的 field_list=[] 表示读全部字段。
-    """
-    time.sleep(wait_s)
-    try:
-        raw = xtdata.get_local_data(
-            field_list=[], stock_list=[stock],
-            period='tick', start_time=date, end_time=date,
-            count=-1
-        )
-        df = raw.get(stock)
-        return df is not None and len(df) > 0
-    except Exception:
-        return False
+_pipelines = {}
 
 
-def batch_verify_sample(stocks: list[str], date: str, xtdata,
-                         n: int = BATCH_VERIFY_N) -> dict:
+def run_pipeline(xtdata, period: str, items, skip_covered: bool = True):
     """
-    批量投递完成后，从 stocks 中等间距抽取 n 只验证落盘情况。
-    返回 {'checked': n, 'landed': k, 'sample': [...]}
+    投递 items=[(code, start, end)] 并轮询到全部落盘或超时，返回 PipelineReport。
+    单日项先查 period 覆盖清单：已覆盖跳过，未知缺口优先。
+    同一周期复用一个流水线实例，落盘延迟观测跨日累积，后续日期的超时直接按实测收紧。
     """
-    if not stocks:
-        return {'checked': 0, 'landed': 0, 'sample': []}
-    step    = max(1, len(stocks) // n)
-    targets = stocks[::step][:n]
-    landed  = 0
-    sample  = []
-    for s in targets:
-        ok = verify_landed(s, date, xtdata, wait_s=0.5)   # 抽样给短暂等待
-        if ok:
-            landed += 1
-        sample.append({'stock': s, 'landed': ok})
-    return {'checked': len(targets), 'landed': landed, 'sample': sample}
+    from logic.data_providers.coverage_manifest import get_coverage_manifest
+    from logic.data_providers.download_pipeline import DownloadPipeline
+
+    pipeline = _pipelines.get(period)
+    if pipeline is None:
+        def progress(r):
+            log(f'  [{period}] {r.summary()}')
+
+        pipeline = _pipelines[period] = DownloadPipeline(
+            xtdata, period, workers=PIPE_WORKERS, manifest=get_coverage_manifest(period),
+            progress_interval=PRINT_EVERY, on_progress=progress)
+    return pipeline.run(items, skip_covered=skip_covered)
+
+
+def print_report(report, title: str) -> None:
+    """最终报告：吞吐 + 未完成项清单"""
+    log(f'  [{title}] 吞吐: {report.items_per_sec:.1f}项/s {report.rows_per_sec:.0f}条/s | '
+        f'落盘{report.landed} 已覆盖{report.skipped} 未完成{len(report.incomplete)} / 共{report.total}项')
+    for item, reason in list(report.incomplete.items())[:INCOMPLETE_TOP]:
+        log(f'    [X] {item.code} {item.start}~{item.end}: {reason}')
+    if len(report.incomplete) > INCOMPLETE_TOP:
+        log(f'    ... 另有 {len(report.incomplete) - INCOMPLETE_TOP} 项未完成')
+
+
+def day_summary(report, date: str, stocks: list[str]) -> dict:
+    """按单日汇总流水线结果：落盘（含已覆盖）/ 行数 / 未完成"""
+    from logic.data_providers.download_pipeline import DownloadItem
+
+    summary = {'count': len(stocks), 'landed': 0, 'rows': 0, 'incomplete': []}
+    for stock in stocks:
+        item = DownloadItem(stock, date, date)
+        if item in report.incomplete:
+            summary['incomplete'].append(stock)
+        elif item in report.results:
+            summary['rows'] += report.results[item]
+            summary['landed'] += 1
+    return summary
 
 
 # ────────────────────────────────────────────
@@ -118,82 +131,33 @@ def get_trading_days(start_date: str, end_date: str, xtdata) -> list:
 
 
 # ────────────────────────────────────────────
-# 日K本地检查 + 自动补充（P2修复）
-# ────────────────────────────────────────────
-
-
-# ────────────────────────────────────────────
-# 单日下载核心（批量投递 + 完成后抽样验证）
+# tick_index 落盘记录
 # ────────────────────────────────────────────
 
-def download_one_day(date: str, stocks: list[str], xtdata,
-                     full: bool, do_verify: bool = False,
-                     volume_ratio_threshold: float | None = None) -> dict:
+def write_tick_index(date: str, mode: str, summary: dict, elapsed: float,
+                     volume_ratio_threshold: float | None = None) -> None:
     """
     [P0修复说明]
-    download_history_data 是异步调用，立即返回None。
     原始代码中 ok+1 只说明"调用未抛异常"，不代表数据落盘。
-    本函数：
-      - 批量投递全部股票（保持速度）
-      - 完成后抽样 BATCH_VERIFY_N 只验证真实落盘率
-      - 落盘率写入 tick_index.json
-    若需逐只精确验证，请用 download_with_verify()（--stocks模式专用）
+    【CTO V233】landed 为流水线逐只读回确认的落盘数（含此前已覆盖的），
+    incomplete 为超时/投递失败的票，不再是抽样估计。
 
     Args:
         volume_ratio_threshold: 【新墝】动态量比阈值，写入 tick_index.json 供回测参考
     """
-    total = len(stocks)
-    t0    = time.time()
-    ok    = 0
-    fail  = 0
-
-    log(f'  开始投递 {total}只 Tick ({date})')
-    for i, stock in enumerate(stocks):
-        try:
-            xtdata.download_history_data(stock, 'tick',
-                                         start_time=date, end_time=date)
-            ok += 1
-        except Exception:
-            fail += 1
-
-        if (i + 1) % PRINT_EVERY == 0 or (i + 1) == total:
-            elapsed   = time.time() - t0
-            speed     = (i + 1) / elapsed if elapsed > 0 else 0
-            remaining = (total - i - 1) / speed if speed > 0 else 0
-            log(f'  [{i+1}/{total}] 投递[OK]{ok} 失败[X]{fail} | '
-                f'{elapsed:.0f}s已用 预计剩{remaining:.0f}s | {speed:.0f}只/s')
-
-    elapsed = time.time() - t0
-    log(f'  投递完毕: {total}只 投递成功{ok} 投递失败{fail} 耗时{elapsed:.0f}s')
-
-    # 抽样落盘验证
-    verify_result = {'checked': 0, 'landed': 0, 'sample': []}
-    if do_verify and ok > 0:
-        log(f'  [落盘验证] 抽取{BATCH_VERIFY_N}只验证真实落盘...')
-        time.sleep(2)   # 给异步队列处理窗口
-        verify_result = batch_verify_sample(stocks, date, xtdata)
-        land_rate = verify_result['landed'] / verify_result['checked'] * 100 \
-                    if verify_result['checked'] > 0 else 0
-        log(f'  [落盘验证] {verify_result["landed"]}/{verify_result["checked"]}只 '
-            f'落盘率{land_rate:.0f}%')
-        if land_rate < 30:
-            log(f'  [WARN]  落盘率过低！可能原因: QMT数据服务未启动 / 服务端无此日期Tick / 磁盘写满')
-
-    # 写 tick_index
     try:
         idx_dir = Path(__file__).parent.parent / 'data' / 'tick_index'
         idx_dir.mkdir(parents=True, exist_ok=True)
         record = {
-            'date':          date,
-            'mode':          'full' if full else 'filtered',
-            'count':         total,
-            'dispatched_ok': ok,
-            'dispatched_fail': fail,
-            'elapsed_s':     round(elapsed, 1),
-            'verify':        verify_result,
-            'timestamp':     datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'note':          '[P0] dispatched_ok=投递成功数(非落盘数)，'
-                             '落盘以verify.landed/checked为准'
+            'date':        date,
+            'mode':        mode,
+            'count':       summary['count'],
+            'landed':      summary['landed'],
+            'rows':        summary['rows'],
+            'incomplete':  summary['incomplete'],
+            'elapsed_s':   round(elapsed, 1),
+            'timestamp':   datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'note':        '[V233] landed=本地读回确认落盘数(含已覆盖)'
         }
         # 【新墝】记录动态量比阈值
         if volume_ratio_threshold is not None:
@@ -203,59 +167,27 @@ def download_one_day(date: str, stocks: list[str], xtdata,
     except Exception:
         pass
 
-    return {'dispatched': ok, 'fail': fail, 'verify': verify_result}
-
 
-# ────────────────────────────────────────────
-# --stocks 模式：逐只投递+验证（研究用，慢但精确）
-# ────────────────────────────────────────────
-
-def download_with_verify(date: str, stocks: list[str], xtdata) -> dict:
+def download_tick_days(day_stocks: dict[str, list[str]], xtdata, mode: str,
+                       thresholds: dict[str, float] | None = None):
     """
-    [P1] --stocks 模式专用：每只股票投递后等待落盘验证。
-    速度慢（每只约1.5s），但结果精确，适合研究少量标的。
-    验证失败时重试一次。
+    全部交易日的 Tick 一条流水线投递（跨日重叠），完成后逐日写 tick_index。
+    day_stocks: {date: [stock, ...]}
     """
-    total    = len(stocks)
-    verified = 0
-    failed   = 0
-    detail   = []
-
-    log(f'  [--stocks精确模式] 逐只投递+验证 {total}只 ({date})')
-    for i, stock in enumerate(stocks):
-        try:
-            xtdata.download_history_data(stock, 'tick',
-                                         start_time=date, end_time=date)
-        except Exception as e:
-            log(f'  [{i+1}/{total}] {stock} 投递异常: {e}')
-            failed += 1
-            detail.append({'stock': stock, 'status': 'dispatch_error'})
-            continue
-
-        landed = verify_landed(stock, date, xtdata, wait_s=VERIFY_WAIT_S)
-        if not landed:
-            # 重试一次：再投递+再等待
-            try:
-                xtdata.download_history_data(stock, 'tick',
-                                             start_time=date, end_time=date)
-            except Exception:
-                pass
-            landed = verify_landed(stock, date, xtdata, wait_s=VERIFY_WAIT_S)
-
-        if landed:
-            verified += 1
-            status = 'landed'
-        else:
-            failed += 1
-            status = 'not_landed'   # 服务端可能无此日期数据
-
-        log(f'  [{i+1}/{total}] {stock} → {"[OK] 落盘" if landed else "[X] 未落盘"} ({status})')
-        detail.append({'stock': stock, 'status': status})
-
-    log(f'  [{date}] 落盘[OK]{verified} 未落盘[X]{failed} / 共{total}只')
-    if failed > 0 and verified == 0:
-        log('  [WARN]  全部未落盘！服务端可能无此日期Tick，或QMT数据服务未连接')
-    return {'date': date, 'verified': verified, 'failed': failed, 'detail': detail}
+    items = [(s, d, d) for d, stocks in day_stocks.items() for s in stocks]
+    log(f'  开始流水线投递 {len(items)}项 Tick ({len(day_stocks)}天)')
+    report = run_pipeline(xtdata, 'tick', items)
+    for date, stocks in day_stocks.items():
+        summary = day_summary(report, date, stocks)
+        land_rate = summary['landed'] / summary['count'] * 100 if summary['count'] else 0
+        log(f'  [{date}] 落盘[OK]{summary["landed"]} 未完成[X]{len(summary["incomplete"])} '
+            f'/ 共{summary["count"]}只 落盘率{land_rate:.0f}%')
+        if summary['count'] and land_rate < 30:
+            log('  [WARN]  落盘率过低！可能原因: QMT数据服务未启动 / 服务端无此日期Tick / 磁盘写满')
+        write_tick_index(date, mode, summary, report.elapsed,
+                         (thresholds or {}).get(date))
+    print_report(report, 'Tick')
+    return report
 
 
 # ────────────────────────────────────────────
@@ -327,8 +259,13 @@ def main():
         trading_days = get_trading_days(start_date, end_date, xtdata)
         log(f'交易日列表: {len(trading_days)}天 ({trading_days[0] if trading_days else "N/A"} ~ {trading_days[-1] if trading_days else "N/A"})')
         
+        from logic.data_providers.coverage_manifest import get_coverage_manifest, probe
+        manifest_1m = get_coverage_manifest('1m')
+        
         consecutive_no_data = 0
         total_downloaded_days = 0
+        grand_landed = grand_rows = grand_incomplete = 0
+        grand_t0 = time.time()
         STOP_DAYS = 20  # 连续20天无数据停止
         
         log(f'开始回溯下载，停止条件: 连续{STOP_DAYS}天无数据')
@@ -337,45 +274,27 @@ def main():
         # 倒序遍历交易日（从最新开始）
         for date_str in reversed(trading_days):
             
-            # 【BUG#5修复】随机抽样20只检查
-            import random
-            sample_stocks = random.sample(target_stocks, min(20, len(target_stocks)))
-            
-            skip_check = xtdata.get_local_data(
-                field_list=['close'],
-                stock_list=sample_stocks,  # 用随机抽样
-                period='1m',
-                start_time=date_str,
-                end_time=date_str
-            )
-            
-            existing_count = 0
-            if skip_check:
-                for s in sample_stocks:  # 【BUG#5修复】用随机抽样结果
-                    if s in skip_check and skip_check[s] is not None and len(skip_check[s]) > 0:
-                        existing_count += 1
-            
-            if existing_count >= 10:  # 20只中>=10只已有数据，跳过
-                log(f'>>> {date_str} 已有数据 ({existing_count}/20随机抽样)，跳过')
+            # 【CTO V233 覆盖清单】先查清单（零读取）；清单对该日一无所知时才抽样20只探测并登记
+            covered = manifest_1m.covered(target_stocks, [date_str])[:, 0]
+            if not (manifest_1m.rows(target_stocks, [date_str]) >= 0).any():
+                import random
+                sample_stocks = random.sample(target_stocks, min(20, len(target_stocks)))
+                probe(manifest_1m, xtdata, sample_stocks, date_str)
+                manifest_1m.flush()
+                sample_covered = int(manifest_1m.covered(sample_stocks, [date_str]).sum())
+                if sample_covered >= len(sample_stocks) / 2:
+                    log(f'>>> {date_str} 已有数据 ({sample_covered}/{len(sample_stocks)}抽样)，跳过')
+                    continue
+            elif covered.sum() >= len(target_stocks) / 2:
+                log(f'>>> {date_str} 已有数据 (清单覆盖 {int(covered.sum())}/{len(target_stocks)})，跳过')
                 continue
             
             log(f'>>> 回溯日期: {date_str} (连续无数据: {consecutive_no_data}/{STOP_DAYS})')
             
             try:
                 # 【CTO V116 极速宽网嗅探】
-                # 1. 【BUG#4修复】并发下发当日日K
-                import concurrent.futures
-                def submit_daily(stock):
-                    try:
-                        xtdata.download_history_data(stock, '1d', start_time=date_str, end_time=date_str)
-                        return True
-                    except Exception:
-                        return False
-                
-                with concurrent.futures.ThreadPoolExecutor(max_workers=32) as executor:
-                    list(executor.map(submit_daily, target_stocks))
-                
-                time.sleep(1.5)  # 等落盘
+                # 1. 【CTO V233】当日日K走流水线：并发投递 + 轮询落盘，落完即走（不再固定等待）
+                run_pipeline(xtdata, '1d', [(s, date_str, date_str) for s in target_stocks])
                 
                 # 2. 【BUG#3修复】死水股过滤 - 纯成交额，不用get_full_tick
                 DEAD_AMOUNT = 100000000.0  # 1亿
@@ -416,45 +335,24 @@ def main():
                     log(f'  [WARN] 当日无活跃股，跳过')
                     continue
                 
-                # 3. 【CTO V158 分批500只异步投递】
-                BATCH_SIZE = 500
+                # 3. 【CTO V233 流水线投递】替代500只一批串行投递 + sleep(2) + 抽样5只探测：
+                #    清单已覆盖的跳过，其余并发投递、逐只读回确认落盘
                 t0 = time.time()
-                total_submitted = 0
-                for batch_start in range(0, len(active_stocks), BATCH_SIZE):
-                    batch = active_stocks[batch_start:batch_start + BATCH_SIZE]
-                    batch_num = batch_start // BATCH_SIZE + 1
-                    total_batches = (len(active_stocks) + BATCH_SIZE - 1) // BATCH_SIZE
-                    
-                    for stock in batch:
-                        try:
-                            xtdata.download_history_data(stock, '1m', start_time=date_str, end_time=date_str)
-                            total_submitted += 1
-                        except Exception:
-                            pass
-                    
-                    log(f'  批次 {batch_num}/{total_batches} 投递完成 ({len(batch)}只)')
+                report = run_pipeline(xtdata, '1m', [(s, date_str, date_str) for s in active_stocks])
                 elapsed = time.time() - t0
+                grand_landed += report.landed
+                grand_rows += report.rows
+                grand_incomplete += len(report.incomplete)
+                if report.incomplete:
+                    print_report(report, f'1m {date_str}')
                 
-                time.sleep(2.0)  # 等待异步落盘
-                
-                # 抽样探测是否真实有数据
-                test_batch = active_stocks[:5]
-                raw = xtdata.get_local_data(
-                    field_list=[], stock_list=test_batch, 
-                    period='1m', start_time=date_str, end_time=date_str
-                )
-                
-                has_data = False
-                if raw:
-                    for s in test_batch:
-                        if s in raw and raw[s] is not None and len(raw[s]) > 0:
-                            has_data = True
-                            break
+                has_data = len(report.results) > 0
                 
                 if has_data:
                     consecutive_no_data = 0
                     total_downloaded_days += 1
-                    log(f'  [OK] {date_str} 分K落盘成功 ({elapsed:.0f}s, {len(active_stocks)}只) - 累计{total_downloaded_days}天')
+                    log(f'  [OK] {date_str} 分K落盘 {len(report.results)}/{len(active_stocks)}只 '
+                        f'({elapsed:.0f}s) - 累计{total_downloaded_days}天')
                 else:
                     consecutive_no_data += 1
                     log(f'  [WARN] {date_str} 数据为空，券商服务器无此日数据')
@@ -469,6 +367,10 @@ def main():
         print('分K回溯下载完成报告')
         print('=' * 60)
         print(f'有效下载天数: {total_downloaded_days} 天')
+        grand_elapsed = time.time() - grand_t0
+        print(f'分K落盘: {grand_landed}只次 {grand_rows}条 | 未完成: {grand_incomplete}只次')
+        print(f'吞吐: {grand_landed / max(grand_elapsed, 1e-9):.1f}只次/s '
+              f'{grand_rows / max(grand_elapsed, 1e-9):.0f}条/s | 总耗时 {grand_elapsed:.0f}s')
         print(f'停止原因: 连续{STOP_DAYS}天无数据')
         print('=' * 60)
         return
@@ -517,21 +419,11 @@ def main():
     
     try:
         # [CTO V115] QMT download_history_data 仅支持单只股票 str，不支持 list！
-        # [CTO V122] 多线程并发投递，32线程暴力加速
-        def submit_one(stock):
-            try:
-                xtdata.download_history_data(stock, '1d', start_time=kline_start, end_time=end_date)
-                return True
-            except Exception:
-                return False
-        
-        import concurrent.futures
-        t0_submit = time.time()
-        with concurrent.futures.ThreadPoolExecutor(max_workers=32) as executor:
-            futures = {executor.submit(submit_one, s): s for s in all_stocks}
-            done = sum(1 for f in concurrent.futures.as_completed(futures))
-        log(f'  OK 全市场日K投递完毕 ({done}只, {time.time()-t0_submit:.1f}s)，等待 3 秒落盘...')
-        time.sleep(3)
+        # 【CTO V233】流水线并发投递 + 轮询落盘，替代 32 线程投递后固定 sleep(3)
+        report = run_pipeline(xtdata, '1d', [(s, kline_start, end_date) for s in all_stocks])
+        log(f'  OK 全市场日K落盘 {report.landed}/{report.total}只 ({report.elapsed:.1f}s)')
+        if report.incomplete:
+            print_report(report, '日K')
     except Exception as e:
         log(f'  [WARN] 日K下载报出异常: {e}')
 
@@ -552,13 +444,19 @@ def main():
     if pinpoint_stocks:
         log(f'[阶段二] PINPOINT模式 - 逐只精确验证落盘')
         grand_t0    = time.time()
+        report = run_pipeline(xtdata, 'tick', [(s, d, d) for d in trading_days for s in pinpoint_stocks])
         all_results = []
         for i, date in enumerate(trading_days):
-            log(f'\n>>> [{i+1}/{len(trading_days)}] {date}')
-            result = download_with_verify(date, pinpoint_stocks, xtdata)
-            all_results.append(result)
-            if i < len(trading_days) - 1:
-                time.sleep(DAY_SLEEP)
+            summary = day_summary(report, date, pinpoint_stocks)
+            detail = [{'stock': s, 'status': 'not_landed' if s in summary['incomplete'] else 'landed'}
+                      for s in pinpoint_stocks]
+            log(f'>>> [{i+1}/{len(trading_days)}] {date} 落盘[OK]{summary["landed"]} '
+                f'未落盘[X]{len(summary["incomplete"])} / 共{len(pinpoint_stocks)}只')
+            for d in detail:
+                log(f'  {d["stock"]} → {"[OK] 落盘" if d["status"] == "landed" else "[X] 未落盘"}')
+            all_results.append({'date': date, 'verified': summary['landed'],
+                                'failed': len(summary['incomplete']), 'detail': detail})
+        print_report(report, 'PINPOINT')
 
         # 汇总报告写入 tick_index
         try:
@@ -587,15 +485,7 @@ def main():
     if full_mode:
         log(f'[阶段二] FULL模式 - {len(trading_days)}天 x {len(all_stocks)}只')
         grand_t0 = time.time()
-        for i, date in enumerate(trading_days):
-            log(f'\n>>> [{i+1}/{len(trading_days)}] {date}')
-            download_one_day(date, all_stocks, xtdata, full=True, do_verify=True)
-            total_elapsed = time.time() - grand_t0
-            remaining     = (total_elapsed / (i + 1)) * (len(trading_days) - i - 1)
-            log(f'  总进度: {i+1}/{len(trading_days)}天 | '
-                f'总耗时{total_elapsed:.0f}s | 预计剩{remaining:.0f}s ({remaining/60:.1f}min)')
-            if i < len(trading_days) - 1:
-                time.sleep(DAY_SLEEP)
+        download_tick_days({d: all_stocks for d in trading_days}, xtdata, 'full')
         total_elapsed = time.time() - grand_t0
         log(f'\n[OK] FULL全量完成! 总耗时 {total_elapsed:.0f}s ({total_elapsed/60:.1f}min)')
         return
@@ -603,11 +493,17 @@ def main():
     # 粗筛模式 【CTO V122 样本完整性保卫令】
     # 老板命令：进了watchlist全下！绝不物理删除负样本！
     from logic.data_providers.universe_builder import UniverseBuilder
+    from logic.data_providers.universe_cache import precompute_universes
     import numpy as np
-    import concurrent.futures
 
-    grand_total = 0
-    grand_t0    = time.time()
+    grand_t0 = time.time()
+    try:
+        precompute_universes(trading_days)
+    except Exception as e:
+        log(f'  [WARN] 候选池区间预计算失败，逐日现场建池: {e}')
+
+    # 【CTO V233】先逐日粗筛出全部候选池，再一条流水线跨日投递（日与日之间不再固定间隔）
+    day_stocks, thresholds = {}, {}
     for i, date in enumerate(trading_days):
         log(f'\n>>> [{i+1}/{len(trading_days)}] {date}')
         try:
@@ -634,17 +530,14 @@ def main():
             log(f'  [X] 粗筛失败: {e}，跳过')
             continue
 
-        download_one_day(date, valid_stocks, xtdata, full=False,
-                         do_verify=True, volume_ratio_threshold=vol_threshold)
-        grand_total   += len(valid_stocks)
-        total_elapsed  = time.time() - grand_t0
-        remaining      = (total_elapsed / (i + 1)) * (len(trading_days) - i - 1)
-        log(f'  总进度: {i+1}/{len(trading_days)}天 | '
-            f'总耗时{total_elapsed:.0f}s | 预计剩{remaining:.0f}s ({remaining/60:.1f}min)')
-        if i < len(trading_days) - 1:
-            time.sleep(DAY_SLEEP)
-    log(f'\n[OK] 完成! 处理 {len(trading_days)}天，投递 {grand_total}只次Tick指令')
+        day_stocks[date] = valid_stocks
+        thresholds[date] = vol_threshold
 
+    grand_total = sum(len(v) for v in day_stocks.values())
+    if day_stocks:
+        download_tick_days(day_stocks, xtdata, 'filtered', thresholds)
+    total_elapsed = time.time() - grand_t0
+    log(f'\n[OK] 完成! 处理 {len(trading_days)}天，{grand_total}只次Tick | 总耗时{total_elapsed:.0f}s')
 
 if __name__ == '__main__':
     main()